@@ -0,0 +1,164 @@
+"""
+CRM - Admin Stats Service
+Collection statistics for the admin console without full collection counts.
+
+Counts and sizes come from `$collStats` storage stats (the same metadata
+`estimated_document_count` reads), gathered for all collections
+concurrently and cached per database for ADMIN_STATS_TTL seconds. Each fresh
+computation also records a daily snapshot in `collection_stats_snapshots`,
+which is what per-collection growth is measured against.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ADMIN_STATS_TTL = float(os.environ.get("ADMIN_STATS_TTL", "30"))
+ADMIN_STATS_CONCURRENCY = int(os.environ.get("ADMIN_STATS_CONCURRENCY", "8"))
+COLLECTION_STATS_SNAPSHOTS = os.environ.get("COLLECTION_STATS_SNAPSHOTS", "true").lower() == "true"
+SNAPSHOT_COLLECTION = "collection_stats_snapshots"
+DEFAULT_GROWTH_DAYS = 7
+
+# db name -> (expires_at, stats)
+_cache: Dict[str, tuple] = {}
+_locks: Dict[str, asyncio.Lock] = {}
+
+
+async def collection_stats(db, name: str) -> Dict:
+    """Count, sizes and index sizes of one collection"""
+    try:
+        shards = await db[name].aggregate([{"$collStats": {"storageStats": {}}}]).to_list(None)
+    except Exception:
+        # Views and other collections without storage stats
+        return {"name": name, "count": await db[name].estimated_document_count(), "size": 0,
+                "storageSize": 0, "avgObjSize": 0, "indexes": 0, "totalIndexSize": 0, "indexSizes": {}}
+
+    # One document per shard
+    stats = {"name": name, "count": 0, "size": 0, "storageSize": 0, "indexes": 0,
+             "totalIndexSize": 0, "indexSizes": {}}
+    for shard in shards:
+        storage = shard.get("storageStats", {})
+        stats["count"] += storage.get("count", 0)
+        stats["size"] += storage.get("size", 0)
+        stats["storageSize"] += storage.get("storageSize", 0)
+        stats["totalIndexSize"] += storage.get("totalIndexSize", 0)
+        stats["indexes"] = max(stats["indexes"], storage.get("nindexes", 0))
+        for index_name, size in storage.get("indexSizes", {}).items():
+            stats["indexSizes"][index_name] = stats["indexSizes"].get(index_name, 0) + size
+    stats["avgObjSize"] = stats["size"] // stats["count"] if stats["count"] else 0
+    return stats
+
+
+async def _compute(db) -> Dict:
+    names = [name for name in await db.list_collection_names() if not name.startswith("system.")]
+    semaphore = asyncio.Semaphore(ADMIN_STATS_CONCURRENCY)
+
+    async def bounded(name):
+        async with semaphore:
+            return await collection_stats(db, name)
+
+    collections = sorted(await asyncio.gather(*[bounded(name) for name in names]), key=lambda c: c["name"])
+    return {
+        "collections": collections,
+        "total": len(collections),
+        "total_documents": sum(c["count"] for c in collections),
+        "total_size": sum(c["size"] for c in collections),
+        "total_index_size": sum(c["totalIndexSize"] for c in collections),
+        "generated_at": datetime.now(timezone.utc)
+    }
+
+
+async def database_stats(db, refresh: bool = False) -> Dict:
+    """Stats of every collection in `db`, served from a short-lived cache"""
+    cached = _cache.get(db.name)
+    if not refresh and cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    lock = _locks.setdefault(db.name, asyncio.Lock())
+    async with lock:
+        cached = _cache.get(db.name)
+        if not refresh and cached and cached[0] > time.monotonic():
+            return cached[1]
+        stats = await _compute(db)
+        _cache[db.name] = (time.monotonic() + ADMIN_STATS_TTL, stats)
+
+    if COLLECTION_STATS_SNAPSHOTS:
+        try:
+            await save_snapshot(db, stats)
+        except Exception as e:
+            logger.error(f"Collection stats snapshot failed for {db.name}: {str(e)}")
+    return stats
+
+
+async def save_snapshot(db, stats: Optional[Dict] = None, overwrite: bool = False) -> Dict:
+    """Record today's (UTC) counts and sizes; by default the first one of the day is kept"""
+    stats = stats or await _compute(db)
+    date = stats["generated_at"].strftime("%Y-%m-%d")
+    snapshot = {
+        "_id": date,
+        "taken_at": stats["generated_at"],
+        "collections": {
+            c["name"]: {"count": c["count"], "size": c["size"], "totalIndexSize": c["totalIndexSize"]}
+            for c in stats["collections"]
+        }
+    }
+    if overwrite:
+        await db[SNAPSHOT_COLLECTION].replace_one({"_id": date}, snapshot, upsert=True)
+    else:
+        await db[SNAPSHOT_COLLECTION].update_one({"_id": date}, {"$setOnInsert": snapshot}, upsert=True)
+    return snapshot
+
+
+async def with_growth(db, stats: Dict, days: int = DEFAULT_GROWTH_DAYS) -> Dict:
+    """Copy of `stats` with each collection's change since the snapshot `days` ago"""
+    since = (stats["generated_at"] - timedelta(days=days)).strftime("%Y-%m-%d")
+    snapshot = await db[SNAPSHOT_COLLECTION].find_one({"_id": {"$lte": since}}, sort=[("_id", -1)])
+    if snapshot is None:
+        # Not enough history yet: compare with the oldest snapshot available
+        snapshot = await db[SNAPSHOT_COLLECTION].find_one({}, sort=[("_id", 1)])
+
+    collections: List[Dict] = []
+    for collection in stats["collections"]:
+        collection = dict(collection)
+        previous = (snapshot or {}).get("collections", {}).get(collection["name"])
+        collection["growth"] = None
+        if previous is not None:
+            elapsed = max((stats["generated_at"] - _aware(snapshot["taken_at"])).total_seconds() / 86400, 1 / 24)
+            count_change = collection["count"] - previous.get("count", 0)
+            collection["growth"] = {
+                "since": snapshot["_id"],
+                "count_change": count_change,
+                "size_change": collection["size"] - previous.get("size", 0),
+                "index_size_change": collection["totalIndexSize"] - previous.get("totalIndexSize", 0),
+                "count_per_day": round(count_change / elapsed, 1)
+            }
+        collections.append(collection)
+    return {**stats, "collections": collections, "growth_since": snapshot["_id"] if snapshot else None}
+
+
+def _aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def invalidate(db):
+    """Drop the cached stats of `db` (e.g. after creating or dropping a collection)"""
+    _cache.pop(db.name, None)
+
+
+async def run_collection_stats_snapshot_job(db):
+    """Background loop recording a collection stats snapshot every night (UTC)"""
+    while True:
+        now = datetime.now(timezone.utc)
+        next_run = datetime(now.year, now.month, now.day, tzinfo=timezone.utc) + timedelta(days=1, minutes=10)
+        await asyncio.sleep((next_run - now).total_seconds())
+        try:
+            await save_snapshot(db, overwrite=True)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Collection stats snapshot failed: {str(e)}")
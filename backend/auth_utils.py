@@ -1,16 +1,34 @@
 """
 Authentication utilities for JWT-based auth with multi-tenant support
 """
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
+import asyncio
+import hashlib
 import os
+import threading
+import time
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt runs in a dedicated pool so logins never block the event loop.
+# PASSWORD_HASH_CONCURRENCY bounds running + queued hash operations.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_CONCURRENCY = int(os.getenv("PASSWORD_HASH_CONCURRENCY", str(PASSWORD_HASH_WORKERS * 4)))
+_password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_password_semaphore: Optional[asyncio.Semaphore] = None
+
+# Verified token payloads, keyed by SHA-256 of the token and kept until `exp`
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+_token_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_token_cache_lock = threading.Lock()
+
 # JWT settings
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
@@ -27,6 +45,24 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def _run_password_job(func, *args):
+    global _password_semaphore
+    if _password_semaphore is None:
+        _password_semaphore = asyncio.Semaphore(PASSWORD_HASH_CONCURRENCY)
+    async with _password_semaphore:
+        return await asyncio.get_running_loop().run_in_executor(_password_executor, func, *args)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the bcrypt pool without blocking the event loop"""
+    return await _run_password_job(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in the bcrypt pool without blocking the event loop"""
+    return await _run_password_job(get_password_hash, password)
+
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
     Create JWT access token
@@ -58,6 +94,9 @@ def decode_access_token(token: str) -> Dict[str, Any]:
     """
     Decode and verify JWT token
     
+    Verified payloads are cached until their `exp`, so repeated requests with
+    the same token skip signature verification.
+    
     Args:
         token: JWT token string
     
@@ -67,9 +106,19 @@ def decode_access_token(token: str) -> Dict[str, Any]:
     Raises:
         HTTPException: If token is invalid or expired
     """
+    cache_key = hashlib.sha256(token.encode()).hexdigest()
+    now = time.time()
+    with _token_cache_lock:
+        cached = _token_cache.get(cache_key)
+        if cached is not None:
+            payload, expires_at = cached
+            if expires_at > now:
+                _token_cache.move_to_end(cache_key)
+                return dict(payload)
+            del _token_cache[cache_key]
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -77,6 +126,21 @@ def decode_access_token(token: str) -> Dict[str, Any]:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    expires_at = payload.get("exp")
+    if isinstance(expires_at, (int, float)) and TOKEN_CACHE_SIZE > 0:
+        with _token_cache_lock:
+            _token_cache[cache_key] = (dict(payload), float(expires_at))
+            _token_cache.move_to_end(cache_key)
+            while len(_token_cache) > TOKEN_CACHE_SIZE:
+                _token_cache.popitem(last=False)
+    return payload
+
+
+def clear_token_cache():
+    """Forget all cached token verifications (e.g. after rotating SECRET_KEY)"""
+    with _token_cache_lock:
+        _token_cache.clear()
+
 
 def verify_token_tenant(token_payload: Dict[str, Any], url_tenant_slug: str) -> bool:
     """
@@ -0,0 +1,114 @@
+"""
+Microbenchmark: credit card listing latency at 1k cards
+
+Compares the old listing path (decrypt every card with Fernet, then mask)
+with the projection-only path that reads the precomputed display fields.
+Runs fully in memory, no MongoDB needed.
+
+Usage:
+    cd backend && python benchmarks/bench_credit_cards_list.py [--cards 1000] [--rounds 20]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "vitingo_bench")
+
+from routes.credit_cards import (
+    CARD_DISPLAY_PROJECTION,
+    CreditCardResponse,
+    build_card_display_fields,
+    card_to_response,
+    decrypt_card_number,
+    encrypt_card_number,
+    mask_card_number,
+)
+
+TEST_CARD_NUMBERS = ["4111111111111111", "5555555555554444", "4012888888881881"]
+
+
+def make_cards(count: int) -> list:
+    cards = []
+    now = datetime.utcnow()
+    for i in range(count):
+        number = TEST_CARD_NUMBERS[i % len(TEST_CARD_NUMBERS)]
+        cards.append({
+            "id": str(uuid.uuid4()),
+            "cardCategory": "corporate",
+            "cardHolderFullName": f"Kart Sahibi {i}",
+            "companyId": None,
+            "companyName": "Quattro Stand",
+            "encrypted_card_number": encrypt_card_number(number),
+            **build_card_display_fields(number),
+            "expiryDate": "12/30",
+            "cardType": "visa",
+            "bank": "Garanti",
+            "spendingLimit": 50000.0,
+            "isActive": True,
+            "created_at": now,
+            "updated_at": now,
+        })
+    return cards
+
+
+def list_with_decryption(cards: list) -> list:
+    """Previous listing path: decrypt + mask per row"""
+    result = []
+    for card in cards:
+        masked_number = mask_card_number(decrypt_card_number(card["encrypted_card_number"]))
+        result.append(CreditCardResponse(
+            id=card["id"],
+            cardCategory=card.get("cardCategory", "personal"),
+            cardHolderFullName=card.get("cardHolderFullName", ""),
+            companyId=card.get("companyId"),
+            companyName=card.get("companyName"),
+            cardNumber=masked_number,
+            expiryDate=card.get("expiryDate", ""),
+            cardType=card.get("cardType", "visa"),
+            bank=card.get("bank"),
+            spendingLimit=card.get("spendingLimit"),
+            isActive=card.get("isActive", True),
+            created_at=card["created_at"],
+            updated_at=card["updated_at"],
+        ))
+    return result
+
+
+def list_with_projection(cards: list) -> list:
+    """Current listing path: projected documents, precomputed display fields"""
+    projected = [{k: v for k, v in card.items() if k in CARD_DISPLAY_PROJECTION} for card in cards]
+    return [card_to_response(card) for card in projected]
+
+
+def measure(fn, cards: list, rounds: int) -> list:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn(cards)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cards", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    cards = make_cards(args.cards)
+    print(f"Credit card listing benchmark ({args.cards} cards, {args.rounds} rounds)")
+    print("-" * 60)
+    for name, fn in [("decrypt + mask", list_with_decryption), ("projection only", list_with_projection)]:
+        timings = measure(fn, cards, args.rounds)
+        print(f"{name:<18} median {statistics.median(timings):8.2f} ms   max {max(timings):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
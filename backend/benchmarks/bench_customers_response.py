@@ -0,0 +1,118 @@
+"""
+Benchmark: customers list response encoding (p50/p99)
+
+Compares the previous response path (recursive serialize_document followed
+by JSONResponse rendering) with FastJSONResponse, which encodes MongoDB
+documents in a single native pass. Uses 5k synthetic customer documents,
+no MongoDB needed.
+
+Usage:
+    cd backend && python benchmarks/bench_customers_response.py [--rows 5000] [--rounds 50]
+"""
+import argparse
+import statistics
+import sys
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+import time
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from json_response import FastJSONResponse, orjson
+
+
+def serialize_document(doc):
+    """Previous per-document serializer (copied from server.py for comparison)"""
+    if isinstance(doc, dict):
+        result = {}
+        for key, value in doc.items():
+            if isinstance(value, ObjectId):
+                result[key] = str(value)
+            elif isinstance(value, datetime):
+                result[key] = value.isoformat()
+            elif isinstance(value, dict):
+                result[key] = serialize_document(value)
+            elif isinstance(value, list):
+                result[key] = [serialize_document(item) if isinstance(item, (dict, ObjectId, datetime)) else item for item in value]
+            else:
+                result[key] = value
+        return result
+    elif isinstance(doc, list):
+        return [serialize_document(item) if isinstance(item, (dict, ObjectId, datetime)) else item for item in doc]
+    elif isinstance(doc, ObjectId):
+        return str(doc)
+    elif isinstance(doc, datetime):
+        return doc.isoformat()
+    else:
+        return doc
+
+
+def make_customers(count: int) -> list:
+    now = datetime.now(timezone.utc)
+    customers = []
+    for i in range(count):
+        customers.append({
+            "_id": ObjectId(),
+            "id": str(uuid.uuid4()),
+            "companyName": f"Müşteri Firma {i} A.Ş.",
+            "companyTitle": f"Müşteri Firma {i} Ticaret Anonim Şirketi",
+            "relationshipType": "customer",
+            "contactPerson": f"Yetkili Kişi {i}",
+            "phone": "+90 212 555 00 00",
+            "email": f"info{i}@example.com",
+            "address": "Büyükdere Cad. No:1 Şişli",
+            "country": "TR",
+            "city": "İstanbul",
+            "sector": "Fuarcılık",
+            "tags": ["fuar", "stand", "vip"],
+            "contacts": [
+                {"id": str(uuid.uuid4()), "fullName": "Ayşe Yılmaz", "email": "ayse@example.com", "created_at": now},
+                {"id": str(uuid.uuid4()), "fullName": "Mehmet Öz", "email": "mehmet@example.com", "created_at": now},
+            ],
+            "bankInfo": {"iban": "TR000000000000000000000000", "bankName": "Garanti", "updated_at": now},
+            "isFavorite": i % 7 == 0,
+            "createdAt": now.isoformat(),
+            "updated_at": now,
+        })
+    return customers
+
+
+def legacy_response(customers: list) -> bytes:
+    return JSONResponse(content=[serialize_document(c) for c in customers]).body
+
+
+def fast_response(customers: list) -> bytes:
+    return FastJSONResponse(content=customers).body
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    customers = make_customers(args.rows)
+    encoder = "orjson" if orjson is not None else "json (orjson not installed)"
+    print(f"Customers response benchmark ({args.rows} rows, {args.rounds} rounds, encoder: {encoder})")
+    print("-" * 70)
+    for name, fn in [("serialize_document + JSONResponse", legacy_response), ("FastJSONResponse", fast_response)]:
+        timings = []
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            fn(customers)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{name:<36} p50 {statistics.median(timings):8.2f} ms   p99 {percentile(timings, 99):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
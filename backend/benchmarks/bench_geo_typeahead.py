@@ -0,0 +1,85 @@
+"""
+Benchmark: geo typeahead lookups (p50/p99)
+
+Compares a linear scan with a case-insensitive substring match (what the
+`$regex` endpoints did, minus the database round trip) with the in-memory
+GeoSnapshot prefix index. Uses synthetic cities, no MongoDB needed.
+
+Usage:
+    cd backend && python benchmarks/bench_geo_typeahead.py [--cities 50000] [--rounds 2000]
+"""
+import argparse
+import random
+import re
+import statistics
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from geo_index import GeoSnapshot
+
+SYLLABLES = ["is", "tan", "bul", "an", "ka", "ra", "iz", "mir", "şan", "lı", "ur", "fa", "çan", "ak", "ka", "le", "ğu", "öz", "gü", "ney"]
+
+
+def make_cities(count: int) -> list:
+    rng = random.Random(42)
+    countries = ["TR", "DE", "US", "FR", "IT", "ES", "AE", "CN"]
+    cities = []
+    for i in range(count):
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+        cities.append({
+            "_id": str(i),
+            "id": str(i),
+            "name": name,
+            "country_iso2": rng.choice(countries),
+            "population": rng.randint(1000, 5_000_000),
+            "is_capital": i % 997 == 0,
+        })
+    return cities
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cities", type=int, default=50000)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    cities = make_cities(args.cities)
+    start = time.perf_counter()
+    snapshot = GeoSnapshot(1, [], cities)
+    snapshot.search_cities("a", limit=10)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    rng = random.Random(7)
+    queries = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(1, 4))) for _ in range(args.rounds)]
+
+    def regex_scan(query):
+        pattern = re.compile(re.escape(query), re.IGNORECASE)
+        matches = [c for c in cities if pattern.search(c["name"])]
+        return sorted(matches, key=lambda c: -c["population"])[:10]
+
+    def prefix_index(query):
+        return snapshot.search_cities(query, limit=10)
+
+    print(f"Geo typeahead benchmark ({args.cities} cities, {args.rounds} queries, index build {build_ms:.0f} ms)")
+    print("-" * 70)
+    for name, fn in [("linear regex scan", regex_scan), ("GeoSnapshot prefix index", prefix_index)]:
+        timings = []
+        for query in queries:
+            t0 = time.perf_counter()
+            fn(query)
+            timings.append((time.perf_counter() - t0) * 1_000_000)
+        print(f"{name:<28} p50 {statistics.median(timings):10.1f} µs   p99 {percentile(timings, 99):10.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
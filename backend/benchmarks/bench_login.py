@@ -0,0 +1,108 @@
+"""
+Benchmark: login path under concurrent load (p50/p99, event loop stalls)
+
+Fires concurrent logins against a simulated user lookup and compares bcrypt
+verification inline on the event loop (the old `verify_password` call) with
+the bounded pool behind `verify_password_async`. A ticker task measures how
+long the event loop is blocked meanwhile. Also times `decode_access_token`
+with a cold and a warm token cache. No MongoDB needed.
+
+Usage:
+    cd backend && python benchmarks/bench_login.py [--logins 64] [--concurrency 32]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import auth_utils
+from auth_utils import (
+    create_access_token,
+    decode_access_token,
+    get_password_hash,
+    verify_password,
+    verify_password_async,
+)
+
+PASSWORD = "benchmark-password"
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def ticker(stop: asyncio.Event, lags: list, interval: float = 0.005):
+    """Record how late each tick fires; large values mean a blocked loop"""
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+
+async def run(name: str, verify, password_hash: str, logins: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    timings = []
+
+    async def login():
+        async with semaphore:
+            t0 = time.perf_counter()
+            await asyncio.sleep(0.002)  # user lookup round trip
+            assert await verify(PASSWORD, password_hash)
+            create_access_token({"sub": "bench@example.com", "tenant_slug": "bench"})
+            timings.append((time.perf_counter() - t0) * 1000)
+
+    stop = asyncio.Event()
+    lags = []
+    tick = asyncio.create_task(ticker(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(*[login() for _ in range(logins)])
+    total = time.perf_counter() - start
+    stop.set()
+    await tick
+
+    print(f"{name:<26} p50 {statistics.median(timings):8.1f} ms   p99 {percentile(timings, 99):8.1f} ms   "
+          f"{logins / total:6.1f} logins/s   max loop stall {max(lags or [0]):7.1f} ms")
+
+
+async def inline_verify(plain: str, hashed: str) -> bool:
+    return verify_password(plain, hashed)
+
+
+def bench_tokens(rounds: int):
+    tokens = [create_access_token({"sub": f"user{i}@example.com", "tenant_slug": "bench"}) for i in range(rounds)]
+    for label in ("cold cache", "warm cache"):
+        if label == "cold cache":
+            auth_utils.clear_token_cache()
+        timings = []
+        for token in tokens:
+            t0 = time.perf_counter()
+            decode_access_token(token)
+            timings.append((time.perf_counter() - t0) * 1_000_000)
+        print(f"decode_access_token {label:<6} p50 {statistics.median(timings):8.1f} µs   p99 {percentile(timings, 99):8.1f} µs")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--tokens", type=int, default=2000)
+    args = parser.parse_args()
+
+    password_hash = get_password_hash(PASSWORD)
+    print(f"Login benchmark ({args.logins} logins, {args.concurrency} concurrent, "
+          f"{auth_utils.PASSWORD_HASH_WORKERS} bcrypt workers)")
+    print("-" * 100)
+    await run("inline verify_password", inline_verify, password_hash, args.logins, args.concurrency)
+    await run("pooled verify_password", verify_password_async, password_hash, args.logins, args.concurrency)
+    print("-" * 100)
+    bench_tokens(args.tokens)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
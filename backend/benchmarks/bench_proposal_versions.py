@@ -0,0 +1,173 @@
+"""
+Benchmark: proposal version storage and restore time
+
+Simulates a heavily iterated proposal (300 line items, 20 versions, a few
+edits between versions) and stores every version two ways: a full snapshot
+copy per version (what create_version did) and proposal_versioning's diffs
+with periodic checkpoints. Reports the stored BSON bytes, the size of the
+version listing and the time to restore each version (BSON decode plus diff
+applications). Uses synthetic data, no MongoDB needed.
+
+Usage:
+    cd backend && python benchmarks/bench_proposal_versions.py [--items 300] [--versions 20] [--edits 5]
+"""
+import argparse
+import copy
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import bson
+
+import proposal_versioning
+from proposal_versioning import DELTA, diff_snapshots, is_checkpoint_due, reconstruct
+
+METADATA_BYTES = 300  # id, names, dates, flags of one version document
+
+
+def make_line_item(rng: random.Random, order: int, now: datetime) -> dict:
+    quantity = float(rng.randint(1, 40))
+    unit_price = round(rng.uniform(50, 5000), 2)
+    subtotal = round(quantity * unit_price, 2)
+    tax_amount = round(subtotal * 0.2, 2)
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "proposal_id": "bench",
+        "display_order": order,
+        "item_type": "standard",
+        "category": rng.choice(["Stand", "Grafik", "Elektrik", "Mobilya", "Lojistik"]),
+        "description": f"Kalem {order}: " + " ".join(rng.choice(["ahşap", "panel", "led", "halı", "vitrin", "tezgah"]) for _ in range(6)),
+        "details": "",
+        "quantity": quantity,
+        "unit": "adet",
+        "unit_price": unit_price,
+        "discount_type": "none",
+        "discount_value": 0.0,
+        "discount_amount": 0.0,
+        "tax_rate": 20.0,
+        "tax_amount": tax_amount,
+        "subtotal": subtotal,
+        "total": round(subtotal + tax_amount, 2),
+        "notes": "",
+        "is_active": True,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def make_proposal(rng: random.Random, items: int) -> dict:
+    now = datetime(2026, 1, 1)
+    modules = [
+        {
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "proposal_id": "bench",
+            "module_type": module_type,
+            "display_order": order,
+            "is_active": True,
+            "content": {"title": module_type.replace("_", " ").title(), "body": "Lorem ipsum dolor sit amet. " * 40},
+            "created_at": now,
+            "updated_at": now,
+        }
+        for order, module_type in enumerate(["cover_page", "introduction", "about_company", "pricing", "timeline", "terms_conditions"])
+    ]
+    return {
+        "modules": modules,
+        "line_items": [make_line_item(rng, order, now) for order in range(items)],
+        "pricing_summary": {"subtotal": 0.0, "discount_type": "none", "discount_value": 0.0, "total": 0.0},
+        "settings": {"currency": "EUR", "language": "tr", "page_orientation": "portrait"},
+    }
+
+
+def edit(rng: random.Random, snapshot: dict, edits: int, step: int) -> dict:
+    """Next iteration: a few price/quantity changes, an occasional add, remove or reorder"""
+    snapshot = copy.deepcopy(snapshot)
+    now = datetime(2026, 1, 1) + timedelta(days=step)
+    line_items = snapshot["line_items"]
+    for item in rng.sample(line_items, min(edits, len(line_items))):
+        item["unit_price"] = round(item["unit_price"] * rng.uniform(0.9, 1.1), 2)
+        item["subtotal"] = round(item["quantity"] * item["unit_price"], 2)
+        item["total"] = round(item["subtotal"] * 1.2, 2)
+        item["updated_at"] = now
+    if rng.random() < 0.5:
+        line_items.append(make_line_item(rng, len(line_items), now))
+    if rng.random() < 0.3:
+        line_items.pop(rng.randrange(len(line_items)))
+    if rng.random() < 0.2:
+        index = rng.randrange(len(line_items))
+        line_items.insert(rng.randrange(len(line_items)), line_items.pop(index))
+    snapshot["modules"][1]["content"]["body"] += f" Revizyon {step}."
+    snapshot["pricing_summary"]["subtotal"] = round(sum(item["subtotal"] for item in line_items), 2)
+    return snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=300)
+    parser.add_argument("--versions", type=int, default=20)
+    parser.add_argument("--edits", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    snapshots = [make_proposal(rng, args.items)]
+    for step in range(1, args.versions):
+        snapshots.append(edit(rng, snapshots[-1], args.edits, step))
+
+    # Full copies: one BSON document per version
+    full_docs = [bson.encode({"version_number": number, "snapshot": snapshot}) for number, snapshot in enumerate(snapshots)]
+
+    # Diffs with checkpoints, following proposal_versioning.prepare_version
+    start = time.perf_counter()
+    delta_docs = []
+    chain_length = None
+    for number, snapshot in enumerate(snapshots):
+        if is_checkpoint_due(chain_length):
+            chain_length = 0
+            delta_docs.append(bson.encode({"version_number": number, "storage": "full", "snapshot": snapshot}))
+        else:
+            chain_length += 1
+            delta_docs.append(bson.encode({"version_number": number, "storage": DELTA, "delta": diff_snapshots(snapshots[number - 1], snapshot)}))
+    diff_ms = (time.perf_counter() - start) * 1000 / len(snapshots)
+
+    def restore_full(number):
+        return bson.decode(full_docs[number])["snapshot"]
+
+    def restore_delta(number):
+        documents = [bson.decode(delta_docs[number])]
+        while documents[-1].get("storage") == DELTA:
+            documents.append(bson.decode(delta_docs[documents[-1]["version_number"] - 1]))
+        checkpoint = documents.pop()
+        return reconstruct(checkpoint["snapshot"], [document["delta"] for document in reversed(documents)])
+
+    for number, snapshot in enumerate(snapshots):
+        assert restore_delta(number) == snapshot, f"version {number} restored incorrectly"
+
+    full_bytes = sum(map(len, full_docs))
+    delta_bytes = sum(map(len, delta_docs))
+    print(f"Proposal version benchmark ({args.items} line items, {args.versions} versions, "
+          f"{args.edits} edits/version, checkpoint every {proposal_versioning.PROPOSAL_VERSION_CHECKPOINT_INTERVAL})")
+    print("-" * 78)
+    print(f"{'':<28}{'stored':>14}{'listing':>14}{'restore p50':>13}{'max':>11}")
+    for name, total, listing, restore in [
+        ("full snapshot per version", full_bytes, full_bytes, restore_full),
+        ("diffs + checkpoints", delta_bytes, METADATA_BYTES * len(snapshots), restore_delta),
+    ]:
+        timings = []
+        for number in range(len(snapshots)):
+            for _ in range(args.rounds):
+                t0 = time.perf_counter()
+                restore(number)
+                timings.append((time.perf_counter() - t0) * 1000)
+        print(f"{name:<28}{total / 1024:>11.0f} KB{listing / 1024:>11.0f} KB"
+              f"{statistics.median(timings):>10.2f} ms{max(timings):>8.2f} ms")
+    print(f"diff computation: {diff_ms:.2f} ms per version, storage ratio {delta_bytes / full_bytes:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark: tenant database provisioning time
+
+Builds throwaway tenant databases from the tenant template two ways:
+sequential create_collection/create_index calls with one insert per seed
+document (what the migration scripts and seed endpoints did), and
+`tenant_provisioning.apply_template` (concurrent index builds, bulk seeds).
+Needs a MongoDB at MONGO_URL; the benchmark databases are dropped afterwards.
+
+Usage:
+    cd backend && python benchmarks/bench_tenant_provisioning.py [--rounds 5]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from tenant_provisioning import apply_template
+from tenant_template import TENANT_TEMPLATE
+
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+
+
+async def sequential(db):
+    for name, indexes in TENANT_TEMPLATE["collections"].items():
+        await db.create_collection(name)
+        for keys, options in indexes:
+            await db[name].create_index(keys, **options)
+    for name, build in TENANT_TEMPLATE["seeds"].items():
+        for doc in build():
+            await db[name].insert_one(doc)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(MONGO_URL)
+    print(f"Tenant provisioning benchmark (template v{TENANT_TEMPLATE['version']}, "
+          f"{len(TENANT_TEMPLATE['collections'])} collections, {args.rounds} rounds)")
+    print("-" * 70)
+    try:
+        for label, provision in [("sequential calls", sequential), ("apply_template", apply_template)]:
+            timings = []
+            for i in range(args.rounds):
+                db = client[f"bench_provisioning_{i}"]
+                await client.drop_database(db.name)
+                t0 = time.perf_counter()
+                await provision(db)
+                timings.append((time.perf_counter() - t0) * 1000)
+                await client.drop_database(db.name)
+            print(f"{label:<20} p50 {statistics.median(timings):8.0f} ms   max {max(timings):8.0f} ms")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,270 @@
+"""
+CRM - Contract Rendering Service
+Contract templates compiled once, PDFs rendered off the event loop.
+
+A contract template is a list of page texts plus fields whose `placeholder`
+text is replaced by the field value. `compile_template()` locates every
+placeholder once and keeps each page as alternating literal text and field
+keys, so filling a contract is a join instead of one full-page
+`str.replace` per field. Compiled templates are cached per process and
+checked against the template's `updated_at`; update/delete also drop them
+explicitly via `invalidate()`.
+
+WeasyPrint rendering and PyPDF2 text extraction are CPU bound and run in a
+process pool (CONTRACT_RENDER_WORKERS); CONTRACT_RENDER_CONCURRENCY bounds
+running + queued jobs. Extracted PDF text is cached by content hash in
+`pdf_text_cache`.
+"""
+
+import asyncio
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING
+
+logger = logging.getLogger(__name__)
+
+CONTRACT_RENDER_POOL = os.environ.get("CONTRACT_RENDER_POOL", "process").lower()  # process, thread
+CONTRACT_RENDER_WORKERS = int(os.environ.get("CONTRACT_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+CONTRACT_RENDER_CONCURRENCY = int(os.environ.get("CONTRACT_RENDER_CONCURRENCY", str(CONTRACT_RENDER_WORKERS * 4)))
+PDF_TEXT_CACHE_TTL_DAYS = int(os.environ.get("PDF_TEXT_CACHE_TTL_DAYS", "30"))
+
+PDF_TEXT_CACHE_COLLECTION = "pdf_text_cache"
+MISSING_VALUE = "[DOLDURULMADI]"
+MAX_BATCH_ITEMS = 500
+
+# "contract": stored contracts (create_contract), "document": /contracts/generate with page numbers
+_HTML_HEAD = {
+    "contract": """
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <style>
+                body { font-family: Arial, sans-serif; line-height: 1.6; margin: 40px; font-size: 12pt; }
+                .page { page-break-after: always; margin-bottom: 40px; }
+                .page:last-child { page-break-after: auto; }
+                pre { white-space: pre-wrap; font-family: Arial, sans-serif; font-size: 12pt; }
+            </style>
+        </head>
+        <body>
+        """,
+    "document": """
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <style>
+                body {
+                    font-family: Arial, sans-serif;
+                    line-height: 1.6;
+                    margin: 40px;
+                    font-size: 12pt;
+                }
+                .page {
+                    page-break-after: always;
+                    margin-bottom: 40px;
+                }
+                .page:last-child {
+                    page-break-after: auto;
+                }
+                .page-number {
+                    text-align: center;
+                    font-size: 10pt;
+                    color: #666;
+                    margin-bottom: 20px;
+                }
+                pre {
+                    white-space: pre-wrap;
+                    font-family: Arial, sans-serif;
+                    font-size: 12pt;
+                }
+            </style>
+        </head>
+        <body>
+        """
+}
+_HTML_TAIL = {
+    "contract": "</body></html>",
+    "document": """
+        </body>
+        </html>
+        """
+}
+
+
+# ===================== COMPILED TEMPLATES =====================
+
+class CompiledTemplate:
+    """Template pages split at their placeholders: (page_number, (text, key, text, key, ..., text))"""
+
+    def __init__(self, template: Dict):
+        self.id = template.get("id")
+        self.template_name = template.get("template_name", "")
+        self.updated_at = template.get("updated_at")
+        self.field_keys = []
+        placeholders: Dict[str, str] = {}
+        for field in template.get("fields", []):
+            placeholder, field_key = field.get("placeholder", ""), field.get("field_key", "")
+            # An empty placeholder never marks a position in the text
+            if placeholder and placeholder not in placeholders:
+                placeholders[placeholder] = field_key
+            if field_key not in self.field_keys:
+                self.field_keys.append(field_key)
+
+        pattern = re.compile("|".join(map(re.escape, placeholders))) if placeholders else None
+        self.pages: List[Tuple[Any, Tuple[str, ...]]] = []
+        for page in template.get("pages", []):
+            text = page.get("text", "")
+            segments: List[str] = []
+            position = 0
+            for match in (pattern.finditer(text) if pattern else ()):
+                segments += [text[position:match.start()], placeholders[match.group(0)]]
+                position = match.end()
+            segments.append(text[position:])
+            self.pages.append((page.get("page_number", 1), tuple(segments)))
+
+    def fill_page(self, segments: Tuple[str, ...], field_values: Dict[str, Any]) -> str:
+        parts = list(segments)
+        for index in range(1, len(parts), 2):
+            parts[index] = str(field_values.get(parts[index], MISSING_VALUE))
+        return "".join(parts)
+
+    def render_html(self, field_values: Dict[str, Any], style: str = "document") -> str:
+        pages = []
+        for page_number, segments in self.pages:
+            page_text = self.fill_page(segments, field_values)
+            if style == "contract":
+                pages.append(f'<div class="page"><pre>{page_text}</pre></div>')
+            else:
+                pages.append(f"""
+            <div class="page">
+                <div class="page-number">Sayfa {page_number}</div>
+                <pre>{page_text}</pre>
+            </div>
+            """)
+        return _HTML_HEAD[style] + "".join(pages) + _HTML_TAIL[style]
+
+
+_compiled: Dict[str, CompiledTemplate] = {}
+
+
+def invalidate(template_id: str):
+    """Drop the compiled template (update_contract_template, delete_contract_template)"""
+    _compiled.pop(template_id, None)
+
+
+async def get_compiled_template(db, template_id: str) -> Optional[CompiledTemplate]:
+    """Compiled template, recompiled when another process changed `updated_at`"""
+    compiled = _compiled.get(template_id)
+    if compiled is not None:
+        current = await db.contract_templates.find_one({"id": template_id}, {"_id": 0, "updated_at": 1})
+        if current is None:
+            invalidate(template_id)
+            return None
+        if current.get("updated_at") == compiled.updated_at:
+            return compiled
+
+    template = await db.contract_templates.find_one({"id": template_id}, {"_id": 0})
+    if not template:
+        return None
+    compiled = _compiled[template_id] = CompiledTemplate(template)
+    return compiled
+
+
+# ===================== WORKER POOL =====================
+
+_executor: Optional[Executor] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if CONTRACT_RENDER_POOL == "thread":
+            _executor = ThreadPoolExecutor(max_workers=CONTRACT_RENDER_WORKERS, thread_name_prefix="contract-render")
+        else:
+            # spawn: never fork a process that holds Motor's threads and sockets
+            _executor = ProcessPoolExecutor(max_workers=CONTRACT_RENDER_WORKERS,
+                                            mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+async def _run(func, *args):
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(CONTRACT_RENDER_CONCURRENCY)
+    async with _semaphore:
+        return await asyncio.get_running_loop().run_in_executor(_get_executor(), func, *args)
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def html_to_pdf(html_content: str) -> bytes:
+    """WeasyPrint render; runs inside the pool"""
+    from weasyprint import HTML
+
+    pdf_buffer = io.BytesIO()
+    HTML(string=html_content, encoding='utf-8').write_pdf(pdf_buffer)
+    return pdf_buffer.getvalue()
+
+
+def extract_text(pdf_content: bytes) -> Dict:
+    """Text of every page; runs inside the pool"""
+    import PyPDF2
+
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_content))
+    pages_text = []
+    for page_num, page in enumerate(pdf_reader.pages):
+        text = page.extract_text()
+        pages_text.append({
+            "page_number": page_num + 1,
+            "text": text,
+            "lines": text.split('\n') if text else []
+        })
+    return {"total_pages": len(pdf_reader.pages), "pages": pages_text}
+
+
+async def render_pdf(compiled: CompiledTemplate, field_values: Dict[str, Any], style: str = "document") -> bytes:
+    return await _run(html_to_pdf, compiled.render_html(field_values, style))
+
+
+async def render_pdfs(compiled: CompiledTemplate, field_values_list: List[Dict[str, Any]],
+                      style: str = "document") -> List[bytes]:
+    """PDFs for many value sets of one template, rendered in parallel across the pool"""
+    return list(await asyncio.gather(*(render_pdf(compiled, values, style) for values in field_values_list)))
+
+
+# ===================== PDF TEXT CACHE =====================
+
+async def ensure_contract_indexes(db):
+    await db[PDF_TEXT_CACHE_COLLECTION].create_index([("key", ASCENDING)], unique=True)
+    await db[PDF_TEXT_CACHE_COLLECTION].create_index(
+        [("created_at", ASCENDING)], expireAfterSeconds=PDF_TEXT_CACHE_TTL_DAYS * 86400
+    )
+
+
+async def extract_pdf_text_cached(db, pdf_content: bytes) -> Dict:
+    """{total_pages, pages, cached}; identical uploads are parsed once"""
+    key = hashlib.sha256(pdf_content).hexdigest()
+    cached = await db[PDF_TEXT_CACHE_COLLECTION].find_one({"key": key}, {"_id": 0, "total_pages": 1, "pages": 1})
+    if cached:
+        return {**cached, "cached": True}
+
+    extracted = await _run(extract_text, pdf_content)
+    await db[PDF_TEXT_CACHE_COLLECTION].update_one(
+        {"key": key},
+        {"$set": {**extracted, "size": len(pdf_content), "created_at": datetime.now(timezone.utc)}},
+        upsert=True
+    )
+    return {**extracted, "cached": False}
@@ -11,6 +11,8 @@ from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 
 from middleware.tenant_router import get_tenant_context, tenant_router
 from auth_utils import decode_access_token
+import entitlements
+import tenant_quotas
 
 # MongoDB connection
 MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
@@ -36,6 +38,11 @@ async def get_tenant_db(tenant_context: Dict = Depends(get_tenant_context)) -> A
     """
     Dependency to get tenant database connection
     
+    Holds one of the tenant's request slots for the whole request (429 when
+    the tenant's concurrency limit stays exhausted) and returns the database
+    wrapped in the tenant's query budgets (maxTimeMS, max documents per
+    cursor), see tenant_quotas.
+    
     Returns:
         AsyncIOMotorDatabase: Tenant-specific database
     
@@ -44,7 +51,8 @@ async def get_tenant_db(tenant_context: Dict = Depends(get_tenant_context)) -> A
         async def get_customers(tenant_db: AsyncIOMotorDatabase = Depends(get_tenant_db)):
             customers = await tenant_db.customers.find().to_list(100)
     """
-    return tenant_context["tenant_db"]
+    async with tenant_quotas.admit(tenant_context["tenant_slug"]) as quota:
+        yield tenant_quotas.QuotaDatabase(tenant_context["tenant_db"], quota)
 
 
 async def get_tenant_info(tenant_context: Dict = Depends(get_tenant_context)) -> dict:
@@ -117,8 +125,33 @@ async def get_current_user_required(authorization: Optional[str] = Header(None))
     return payload
 
 
+async def get_full_tenant_context(tenant_context: Dict = Depends(get_tenant_context)) -> Dict:
+    """
+    Dependency to get full tenant context (all information)
+    
+    Like get_tenant_db, holds one of the tenant's request slots and wraps
+    `tenant_db` in the tenant's query budgets (see tenant_quotas).
+    
+    Returns:
+        Dict: {
+            "tenant_slug": str,
+            "tenant": dict,
+            "tenant_db": AsyncIOMotorDatabase
+        }
+    
+    Usage:
+        @app.get("/api/{tenant_slug}/resource")
+        async def endpoint(context: Dict = Depends(get_full_tenant_context)):
+            tenant_slug = context["tenant_slug"]
+            tenant = context["tenant"]
+            tenant_db = context["tenant_db"]
+    """
+    async with tenant_quotas.admit(tenant_context["tenant_slug"]) as quota:
+        yield {**tenant_context, "tenant_db": tenant_quotas.QuotaDatabase(tenant_context["tenant_db"], quota)}
+
+
 async def verify_tenant_access(
-    tenant_context: Dict = Depends(get_tenant_context),
+    tenant_context: Dict = Depends(get_full_tenant_context),
     current_user: Dict = Depends(get_current_user_required)
 ) -> Dict:
     """
@@ -153,22 +186,54 @@ async def verify_tenant_access(
     return tenant_context
 
 
-async def get_full_tenant_context(tenant_context: Dict = Depends(get_tenant_context)) -> Dict:
+
+
+async def _tenant_entitlements(request: Request) -> "entitlements.TenantEntitlements":
+    tenant_slug = await tenant_router.extract_tenant_slug_from_path(request.url.path)
+    if not tenant_slug:
+        raise HTTPException(
+            status_code=400,
+            detail="Tenant slug not found in URL path. Expected format: /api/{tenant_slug}/..."
+        )
+    tenant = await entitlements.get_tenant(tenant_slug)
+    if tenant is None:
+        raise HTTPException(status_code=404, detail=f"Tenant not found: {tenant_slug}")
+    return tenant
+
+
+def require_feature(feature_key: str):
     """
-    Dependency to get full tenant context (all information)
+    Dependency factory gating a route on a package feature
     
-    Returns:
-        Dict: {
-            "tenant_slug": str,
-            "tenant": dict,
-            "tenant_db": AsyncIOMotorDatabase
-        }
+    Answered from the in-memory entitlement snapshot (no database round trip).
     
     Usage:
-        @app.get("/api/{tenant_slug}/resource")
-        async def endpoint(context: Dict = Depends(get_full_tenant_context)):
-            tenant_slug = context["tenant_slug"]
-            tenant = context["tenant"]
-            tenant_db = context["tenant_db"]
+        @router.get("/api/{tenant_slug}/contracts", dependencies=[Depends(require_feature("contracts"))])
+    
+    Raises:
+        HTTPException: 403 with upgrade suggestions if the tenant's package lacks the feature
     """
-    return tenant_context
+    async def dependency(request: Request) -> "entitlements.TenantEntitlements":
+        tenant = await _tenant_entitlements(request)
+        if not tenant.has_feature(feature_key):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail={"message": f"Feature not included in package: {feature_key}", **tenant.check_feature(feature_key)}
+            )
+        return tenant
+    return dependency
+
+
+def require_flag(flag_key: str):
+    """
+    Dependency factory gating a route on a feature flag (see require_feature)
+    
+    Raises:
+        HTTPException: 404 while the flag is off for the tenant
+    """
+    async def dependency(request: Request) -> "entitlements.TenantEntitlements":
+        tenant = await _tenant_entitlements(request)
+        if not tenant.check_flag(flag_key)["enabled"]:
+            raise HTTPException(status_code=404, detail="Not Found")
+        return tenant
+    return dependency
@@ -13,8 +13,6 @@ import logging
 import uuid
 from typing import Optional, List
 from dotenv import load_dotenv
-import sendgrid
-from sendgrid.helpers.mail import Mail, Email as SGEmail, To, Content, Bcc, ReplyTo, Header
 
 # Load environment variables
 load_dotenv()
@@ -32,6 +30,7 @@ from email_models import (
     EmailStatus,
     EmailAddress
 )
+from email_service import email_service
 
 logger = logging.getLogger(__name__)
 
@@ -45,8 +44,7 @@ def set_database(database):
     global db
     db = database
 
-# SendGrid configuration
-SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY")
+# SendGrid configuration (API key and transport: email_service)
 PLATFORM_EMAIL = os.getenv("PLATFORM_EMAIL", "mail@vitingo.com")
 PLATFORM_NAME = os.getenv("PLATFORM_NAME", "Vitingo CRM")
 INBOUND_DOMAIN = os.getenv("INBOUND_DOMAIN", "inbound.vitingo.com")
@@ -214,54 +212,30 @@ async def send_email(
         if not thread_id:
             thread_id = str(uuid.uuid4())
         
-        # Prepare SendGrid email
-        if not SENDGRID_API_KEY:
+        # Prepare email
+        if not email_service.configured:
             raise HTTPException(status_code=500, detail="SendGrid not configured")
         
-        # Create Mail object using the simple working format
         sender_name = user_settings.get("senderName", PLATFORM_NAME) if user_settings else PLATFORM_NAME
         recipient_name = email_data.toName or email_data.to
         
-        message = Mail(
-            from_email=SGEmail(PLATFORM_EMAIL, sender_name),
-            to_emails=To(email_data.to, recipient_name),
-            subject=email_data.subject
-        )
-        
-        # Add content (text/plain first, then text/html)
-        message.add_content(Content("text/plain", email_data.bodyText or ""))
-        message.add_content(Content("text/html", email_data.bodyHtml or f"<p>{email_data.bodyText}</p>"))
-        
-        # Reply-To: User's email (optional)
-        # if user_settings and user_settings.get("senderEmail"):
-        #     from sendgrid.helpers.mail import ReplyTo
-        #     message.reply_to = ReplyTo(user_settings["senderEmail"], user_settings.get("senderName", ""))
-        
-        # Custom headers for thread tracking (optional)
-        # from sendgrid.helpers.mail import Header
-        # message.add_header(Header("X-Thread-ID", thread_id))
-        
-        # Send via SendGrid
-        sendgrid_message_id = None
+        # Send through the shared async transport (pooled connections, no blocking call)
         email_status = EmailStatus.SENT
-        
-        try:
-            logger.info(f"Attempting to send email with API key: {SENDGRID_API_KEY[:25]}...")
-            logger.info(f"From: {PLATFORM_EMAIL}, To: {email_data.to}, Subject: {email_data.subject}")
-            sg = sendgrid.SendGridAPIClient(api_key=SENDGRID_API_KEY)
-            response = sg.send(message)
-            sendgrid_message_id = response.headers.get("X-Message-Id")
+        logger.info(f"From: {PLATFORM_EMAIL}, To: {email_data.to}, Subject: {email_data.subject}")
+        result = await email_service.send_email(
+            email_data.to,
+            email_data.subject,
+            email_data.bodyHtml or f"<p>{email_data.bodyText}</p>",
+            plain_content=email_data.bodyText or "",
+            from_email=PLATFORM_EMAIL,
+            from_name=sender_name,
+            to_name=recipient_name
+        )
+        if result["success"]:
+            sendgrid_message_id = result.get("message_id")
             logger.info(f"✅ Email sent successfully via SendGrid: {sendgrid_message_id}")
-        except Exception as e:
-            # Log detailed error
-            import traceback
-            logger.error(f"❌ SendGrid send failed: {str(e)}")
-            logger.error(f"Error type: {type(e).__name__}")
-            if hasattr(e, 'body'):
-                logger.error(f"Error body: {e.body}")
-            if hasattr(e, 'reason'):
-                logger.error(f"Error reason: {e.reason}")
-            logger.error(f"Full traceback: {traceback.format_exc()}")
+        else:
+            logger.error(f"❌ SendGrid send failed: {result.get('error')}")
             logger.warning(f"Email saved locally for demo.")
             email_status = EmailStatus.SENT  # Keep as SENT for demo purposes
             sendgrid_message_id = f"demo-{str(uuid.uuid4())[:8]}"
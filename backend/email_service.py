@@ -1,75 +1,23 @@
 import os
+import re
 import logging
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, From, To, Subject, HtmlContent, PlainTextContent
-from typing import Optional
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import email_transport
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class EmailService:
-    def __init__(self):
-        # Get SendGrid API key from environment
-        self.api_key = os.environ.get('SENDGRID_API_KEY')
-        if not self.api_key:
-            logger.warning("SENDGRID_API_KEY not found in environment variables")
-        else:
-            logger.info(f"SendGrid API key loaded: {self.api_key[:20]}...")
-        
-        self.sender_email = os.environ.get('SENDER_EMAIL', 'info@quattrostand.com')
-        self.sg = SendGridAPIClient(self.api_key) if self.api_key else None
-        
-        logger.info(f"Email service initialized with sender: {self.sender_email}")
-
-    def send_survey_invitation(self, customer_data: dict, project_data: dict, survey_link: str) -> dict:
-        """Send survey invitation email to customer"""
-        try:
-            if not self.sg:
-                logger.error("SendGrid client not initialized - missing API key")
-                return {"success": False, "error": "Email service not configured"}
+NOT_CONFIGURED = "Email service not configured"
 
-            # Create personalized email content
-            subject = f"{project_data['fairName']} - Müşteri Memnuniyet Anketi"
-            
-            html_content = self._generate_survey_email_html(customer_data, project_data, survey_link)
-            plain_content = self._generate_survey_email_text(customer_data, project_data, survey_link)
-
-            # Create SendGrid mail object
-            message = Mail(
-                from_email=From(self.sender_email, "Vitingo CRM - Quattro Stand"),
-                to_emails=To(customer_data['email']),
-                subject=Subject(subject),
-                html_content=HtmlContent(html_content),
-                plain_text_content=PlainTextContent(plain_content)
-            )
-
-            # Send email
-            response = self.sg.send(message)
-            
-            logger.info(f"Survey invitation sent to {customer_data['email']} - Status: {response.status_code}")
-            
-            return {
-                "success": True,
-                "status_code": response.status_code,
-                "message": "Survey invitation sent successfully"
-            }
-
-        except Exception as e:
-            logger.error(f"Failed to send survey invitation: {str(e)}")
-            return {
-                "success": False,
-                "error": str(e)
-            }
+# ===================== TEMPLATES =====================
+# %field% placeholders are filled by _render(); in batch sends the unfilled
+# placeholders go to SendGrid as per-recipient substitution tags.
 
-    def send_test_email(self, to_email: str) -> dict:
-        """Send test email to verify SendGrid configuration"""
-        try:
-            if not self.sg:
-                return {"success": False, "error": "Email service not configured"}
-
-            subject = "Vitingo CRM - Test Email"
-            html_content = """
+TEST_EMAIL_HTML = """
             <html>
                 <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
                     <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 30px; text-align: center; color: white;">
@@ -87,7 +35,7 @@ class EmailService:
                             <ul style="color: #555; line-height: 1.8;">
                                 <li><strong>Gönderen:</strong> info@quattrostand.com</li>
                                 <li><strong>Servis:</strong> SendGrid API</li>
-                                <li><strong>Tarih:</strong> {current_date}</li>
+                                <li><strong>Tarih:</strong> %current_date%</li>
                                 <li><strong>Sistem:</strong> Vitingo CRM</li>
                             </ul>
                         </div>
@@ -104,9 +52,9 @@ class EmailService:
                     </div>
                 </body>
             </html>
-            """.replace("{current_date}", self._get_current_date())
+            """
 
-            plain_content = f"""
+TEST_EMAIL_TEXT = """
             Vitingo CRM - Test Email
 
             Merhaba!
@@ -116,7 +64,7 @@ class EmailService:
             Test Detayları:
             - Gönderen: info@quattrostand.com  
             - Servis: SendGrid API
-            - Tarih: {self._get_current_date()}
+            - Tarih: %current_date%
             - Sistem: Vitingo CRM
 
             Artık müşteri memnuniyet anketlerini gerçek email olarak gönderebilirsiniz!
@@ -124,79 +72,7 @@ class EmailService:
             Vitingo CRM | Fuar Stand Üretim ve Tasarım
             """
 
-            message = Mail(
-                from_email=From(self.sender_email, "Vitingo CRM - Test"),
-                to_emails=To(to_email),
-                subject=Subject(subject),
-                html_content=HtmlContent(html_content),
-                plain_text_content=PlainTextContent(plain_content)
-            )
-
-            response = self.sg.send(message)
-            
-            logger.info(f"Test email sent to {to_email} - Status: {response.status_code}")
-            
-            return {
-                "success": True,
-                "status_code": response.status_code,
-                "message": f"Test email sent successfully to {to_email}"
-            }
-
-        except Exception as e:
-            logger.error(f"Failed to send test email: {str(e)}")
-            return {
-                "success": False,
-                "error": str(e)
-            }
-
-    def send_handover_invitation(self, customer_data: dict, project_data: dict, handover_link: str) -> dict:
-        """Send handover invitation email to customer"""
-        try:
-            if not self.sg:
-                logger.error("SendGrid client not initialized - missing API key")
-                return {"success": False, "error": "Email service not configured"}
-
-            # Determine language and create appropriate subject
-            language = project_data.get('language', 'tr')
-            if language == 'tr':
-                subject = f"{project_data['name']} - Fuar Standı Teslim Formu"
-            else:
-                subject = f"{project_data['name']} - Fair Stand Handover Form"
-            
-            html_content = self._generate_handover_email_html(customer_data, project_data, handover_link, language)
-            plain_content = self._generate_handover_email_text(customer_data, project_data, handover_link, language)
-
-            # Create SendGrid mail object
-            message = Mail(
-                from_email=From(self.sender_email, "Vitingo CRM - Quattro Stand"),
-                to_emails=To(customer_data['email']),
-                subject=Subject(subject),
-                html_content=HtmlContent(html_content),
-                plain_text_content=PlainTextContent(plain_content)
-            )
-
-            # Send email
-            response = self.sg.send(message)
-            
-            logger.info(f"Handover invitation sent to {customer_data['email']} - Status: {response.status_code}")
-            
-            return {
-                "success": True,
-                "status_code": response.status_code,
-                "message": "Handover invitation sent successfully"
-            }
-
-        except Exception as e:
-            logger.error(f"Failed to send handover invitation: {str(e)}")
-            return {
-                "success": False,
-                "error": str(e)
-            }
-
-    def _generate_handover_email_html(self, customer_data: dict, project_data: dict, handover_link: str, language: str = 'tr') -> str:
-        """Generate HTML content for handover invitation email"""
-        if language == 'tr':
-            return f"""
+HANDOVER_EMAIL_HTML_TR = """
             <html>
                 <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
                     <div style="background: linear-gradient(135deg, #10b981 0%, #059669 100%); padding: 30px; text-align: center; color: white;">
@@ -204,10 +80,10 @@ class EmailService:
                     </div>
                     
                     <div style="padding: 30px; background: #f8f9fa;">
-                        <p style="font-size: 16px; color: #333;">Sayın <strong>{customer_data['contact']}</strong>,</p>
+                        <p style="font-size: 16px; color: #333;">Sayın <strong>%contact%</strong>,</p>
                         
                         <p style="color: #555; line-height: 1.6;">
-                            <strong>{project_data['name']}</strong> projeniz kapsamında hazırlanan fuar standınız tamamlanmış ve teslime hazır haldedir.
+                            <strong>%project_name%</strong> projeniz kapsamında hazırlanan fuar standınız tamamlanmış ve teslime hazır haldedir.
                         </p>
                         
                         <div style="background: white; padding: 20px; border-radius: 8px; margin: 20px 0; border-left: 4px solid #10b981;">
@@ -225,7 +101,7 @@ class EmailService:
                         </div>
                         
                         <div style="text-align: center; margin: 30px 0;">
-                            <a href="{handover_link}" 
+                            <a href="%handover_link%" 
                                style="background: linear-gradient(135deg, #10b981 0%, #059669 100%); 
                                       color: white; 
                                       padding: 15px 30px; 
@@ -258,8 +134,8 @@ class EmailService:
                 </body>
             </html>
             """
-        else:
-            return f"""
+
+HANDOVER_EMAIL_HTML_EN = """
             <html>
                 <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
                     <div style="background: linear-gradient(135deg, #10b981 0%, #059669 100%); padding: 30px; text-align: center; color: white;">
@@ -267,10 +143,10 @@ class EmailService:
                     </div>
                     
                     <div style="padding: 30px; background: #f8f9fa;">
-                        <p style="font-size: 16px; color: #333;">Dear <strong>{customer_data['contact']}</strong>,</p>
+                        <p style="font-size: 16px; color: #333;">Dear <strong>%contact%</strong>,</p>
                         
                         <p style="color: #555; line-height: 1.6;">
-                            Your fair stand for the <strong>{project_data['name']}</strong> project has been completed and is ready for handover.
+                            Your fair stand for the <strong>%project_name%</strong> project has been completed and is ready for handover.
                         </p>
                         
                         <div style="background: white; padding: 20px; border-radius: 8px; margin: 20px 0; border-left: 4px solid #10b981;">
@@ -288,7 +164,7 @@ class EmailService:
                         </div>
                         
                         <div style="text-align: center; margin: 30px 0;">
-                            <a href="{handover_link}" 
+                            <a href="%handover_link%" 
                                style="background: linear-gradient(135deg, #10b981 0%, #059669 100%); 
                                       color: white; 
                                       padding: 15px 30px; 
@@ -322,15 +198,12 @@ class EmailService:
             </html>
             """
 
-    def _generate_handover_email_text(self, customer_data: dict, project_data: dict, handover_link: str, language: str = 'tr') -> str:
-        """Generate plain text content for handover invitation email"""
-        if language == 'tr':
-            return f"""
+HANDOVER_EMAIL_TEXT_TR = """
             🏗️ Fuar Standınız Hazır!
 
-            Sayın {customer_data['contact']},
+            Sayın %contact%,
 
-            {project_data['name']} projeniz kapsamında hazırlanan fuar standınız tamamlanmış ve teslime hazır haldedir.
+            %project_name% projeniz kapsamında hazırlanan fuar standınız tamamlanmış ve teslime hazır haldedir.
 
             📋 Teslim İşlemi:
             Standınızı teslim almak için aşağıdaki linke tıklayarak teslim formunu doldurunuz.
@@ -342,7 +215,7 @@ class EmailService:
             ✅ Teslim sonrası memnuniyet anketi gönderilecek
 
             Teslim formunu doldurmak için:
-            {handover_link}
+            %handover_link%
 
             💡 Bilgi: Teslim formunu onayladıktan sonra size otomatik olarak bir memnuniyet anketi gönderilecektir.
 
@@ -351,13 +224,13 @@ class EmailService:
             Vitingo CRM | Fuar Stand Üretim ve Tasarım
             info@quattrostand.com
             """
-        else:
-            return f"""
+
+HANDOVER_EMAIL_TEXT_EN = """
             🏗️ Your Fair Stand is Ready!
 
-            Dear {customer_data['contact']},
+            Dear %contact%,
 
-            Your fair stand for the {project_data['name']} project has been completed and is ready for handover.
+            Your fair stand for the %project_name% project has been completed and is ready for handover.
 
             📋 Handover Process:
             To receive your stand, please click the link below to complete the handover form.
@@ -369,7 +242,7 @@ class EmailService:
             ✅ Satisfaction survey will be sent after handover
 
             To complete the handover form:
-            {handover_link}
+            %handover_link%
 
             💡 Note: A satisfaction survey will be automatically sent to you after confirming the handover form.
 
@@ -379,9 +252,7 @@ class EmailService:
             info@quattrostand.com
             """
 
-    def _generate_survey_email_html(self, customer_data: dict, project_data: dict, survey_link: str) -> str:
-        """Generate HTML content for survey invitation email"""
-        return f"""
+SURVEY_EMAIL_HTML = """
         <html>
             <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
                 <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 30px; text-align: center; color: white;">
@@ -389,19 +260,19 @@ class EmailService:
                 </div>
                 
                 <div style="padding: 30px; background: #f8f9fa;">
-                    <p style="font-size: 16px; color: #333;">Sayın <strong>{customer_data['contact']}</strong>,</p>
+                    <p style="font-size: 16px; color: #333;">Sayın <strong>%contact%</strong>,</p>
                     
                     <p style="color: #555; line-height: 1.6;">
-                        <strong>{project_data['fairName']}</strong> fuarı için hazırladığımız stand projenizle ilgili deneyiminizi öğrenmek istiyoruz.
+                        <strong>%fair_name%</strong> fuarı için hazırladığımız stand projenizle ilgili deneyiminizi öğrenmek istiyoruz.
                     </p>
                     
                     <div style="background: white; padding: 20px; border-radius: 8px; margin: 20px 0; border-left: 4px solid #667eea;">
                         <h3 style="color: #333; margin-top: 0;">Proje Detayları:</h3>
                         <ul style="color: #555; line-height: 1.8;">
-                            <li><strong>Proje:</strong> {project_data['name']}</li>
-                            <li><strong>Fuar:</strong> {project_data['fairName']}</li>
-                            <li><strong>Lokasyon:</strong> {project_data['city']}, {project_data['country']}</li>
-                            <li><strong>Teslimat Tarihi:</strong> {self._format_date(project_data['deliveryDate'])}</li>
+                            <li><strong>Proje:</strong> %project_name%</li>
+                            <li><strong>Fuar:</strong> %fair_name%</li>
+                            <li><strong>Lokasyon:</strong> %city%, %country%</li>
+                            <li><strong>Teslimat Tarihi:</strong> %delivery_date%</li>
                         </ul>
                     </div>
                     
@@ -411,7 +282,7 @@ class EmailService:
                     </p>
                     
                     <div style="text-align: center; margin: 30px 0;">
-                        <a href="{survey_link}" 
+                        <a href="%survey_link%" 
                            style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
                                   color: white; 
                                   padding: 15px 30px; 
@@ -439,25 +310,23 @@ class EmailService:
         </html>
         """
 
-    def _generate_survey_email_text(self, customer_data: dict, project_data: dict, survey_link: str) -> str:
-        """Generate plain text content for survey invitation email"""
-        return f"""
+SURVEY_EMAIL_TEXT = """
         Değerli Görüşünüz Bizim İçin Önemli!
 
-        Sayın {customer_data['contact']},
+        Sayın %contact%,
 
-        {project_data['fairName']} fuarı için hazırladığımız stand projenizle ilgili deneyiminizi öğrenmek istiyoruz.
+        %fair_name% fuarı için hazırladığımız stand projenizle ilgili deneyiminizi öğrenmek istiyoruz.
 
         Proje Detayları:
-        - Proje: {project_data['name']}
-        - Fuar: {project_data['fairName']} 
-        - Lokasyon: {project_data['city']}, {project_data['country']}
-        - Teslimat Tarihi: {self._format_date(project_data['deliveryDate'])}
+        - Proje: %project_name%
+        - Fuar: %fair_name% 
+        - Lokasyon: %city%, %country%
+        - Teslimat Tarihi: %delivery_date%
 
         Anketi tamamlamanız yaklaşık 3-5 dakika sürecektir. Görüşleriniz gelecekteki projelerimizi daha da iyileştirmemize yardımcı olacaktır.
 
         Ankete başlamak için aşağıdaki linke tıklayın:
-        {survey_link}
+        %survey_link%
 
         Bu anket linki sadece sizin için oluşturulmuştur ve tek kullanımlıktır.
 
@@ -465,187 +334,69 @@ class EmailService:
         info@quattrostand.com
         """
 
-    def _format_date(self, date_string: str) -> str:
-        """Format date string to Turkish locale"""
-        try:
-            from datetime import datetime
-            date_obj = datetime.fromisoformat(date_string)
-            return date_obj.strftime("%d.%m.%Y")
-        except:
-            return date_string
-
-    def _get_current_date(self) -> str:
-        """Get current date in Turkish format"""
-        from datetime import datetime
-        return datetime.now().strftime("%d.%m.%Y %H:%M")
-    
-    def send_user_email(self, to_email: str, to_name: str, from_email: str, from_name: str, 
-                       subject: str, body: str, cc: str = "", bcc: str = "", attachments: list = None) -> dict:
-        """Send email from user to user via CRM system"""
-        try:
-            if not self.sg:
-                logger.error("SendGrid client not initialized - missing API key")
-                return {"success": False, "error": "Email service not configured"}
-
-            # Create HTML content for user email
-            html_content = self._generate_user_email_html(
-                to_name=to_name,
-                from_name=from_name,
-                subject=subject,
-                body=body
-            )
-            
-            # Create plain text content
-            plain_content = f"""
-{subject}
-
-{body}
-
----
-Gönderen: {from_name}
-E-posta: {from_email}
-Vitingo CRM Sistemi
-            """.strip()
-
-            # Create SendGrid mail object
-            message = Mail(
-                from_email=From(self.sender_email, f"Vitingo CRM - {from_name}"),
-                to_emails=To(to_email, to_name),
-                subject=Subject(subject),
-                html_content=HtmlContent(html_content),
-                plain_text_content=PlainTextContent(plain_content)
-            )
-            
-            # Add CC if provided
-            if cc:
-                cc_emails = [email.strip() for email in cc.split(',') if email.strip()]
-                for cc_email in cc_emails:
-                    message.add_cc(To(cc_email))
-            
-            # Add BCC if provided
-            if bcc:
-                bcc_emails = [email.strip() for email in bcc.split(',') if email.strip()]
-                for bcc_email in bcc_emails:
-                    message.add_bcc(To(bcc_email))
-            
-            # Add reply-to
-            message.reply_to = From(from_email, from_name)
-            
-            # Handle attachments
-            if attachments:
-                from sendgrid.helpers.mail import Attachment, FileContent, FileName, FileType, Disposition
-                import base64
-                
-                for attachment in attachments:
-                    try:
-                        # Extract base64 data (remove data:type;base64, prefix)
-                        file_data = attachment['data']
-                        if file_data.startswith('data:'):
-                            file_data = file_data.split(',')[1]
-                        
-                        # Create attachment
-                        attached_file = Attachment(
-                            FileContent(file_data),
-                            FileName(attachment['name']),
-                            FileType(attachment['type']),
-                            Disposition('attachment')
-                        )
-                        message.add_attachment(attached_file)
-                        logger.info(f"Added attachment: {attachment['name']}")
-                        
-                    except Exception as attach_error:
-                        logger.error(f"Error adding attachment {attachment.get('name', 'unknown')}: {str(attach_error)}")
-
-            # Send email
-            response = self.sg.send(message)
-            
-            logger.info(f"User email sent from {from_email} to {to_email} - Status: {response.status_code}")
-            
-            if response.status_code == 202:
-                return {
-                    "success": True,
-                    "message": "Email sent successfully",
-                    "message_id": response.headers.get('X-Message-Id')
-                }
-            else:
-                logger.error(f"SendGrid returned unexpected status: {response.status_code}")
-                return {
-                    "success": False,
-                    "error": f"Email sending failed with status: {response.status_code}"
-                }
-
-        except Exception as e:
-            logger.error(f"Error sending user email: {str(e)}")
-            return {
-                "success": False,
-                "error": str(e)
-            }
-    
-    def _generate_user_email_html(self, to_name: str, from_name: str, subject: str, body: str) -> str:
-        """Generate HTML content for user email"""
-        return f"""
+USER_EMAIL_HTML = """
         <!DOCTYPE html>
         <html lang="tr">
         <head>
             <meta charset="UTF-8">
             <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>{subject}</title>
+            <title>%subject%</title>
             <style>
-                body {{
+                body {
                     font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
                     line-height: 1.6;
                     color: #333;
                     margin: 0;
                     padding: 0;
                     background-color: #f4f4f4;
-                }}
-                .email-container {{
+                }
+                .email-container {
                     max-width: 600px;
                     margin: 20px auto;
                     background-color: #ffffff;
                     border-radius: 8px;
                     overflow: hidden;
                     box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-                }}
-                .email-header {{
+                }
+                .email-header {
                     background: linear-gradient(135deg, #3B82F6, #1E40AF);
                     color: white;
                     padding: 30px 20px;
                     text-align: center;
-                }}
-                .email-header h1 {{
+                }
+                .email-header h1 {
                     margin: 0;
                     font-size: 24px;
                     font-weight: bold;
-                }}
-                .email-body {{
+                }
+                .email-body {
                     padding: 30px;
-                }}
-                .email-body h2 {{
+                }
+                .email-body h2 {
                     color: #1E40AF;
                     margin-top: 0;
-                }}
-                .email-content {{
+                }
+                .email-content {
                     white-space: pre-wrap;
                     background: #f8fafc;
                     padding: 20px;
                     border-radius: 6px;
                     border-left: 4px solid #3B82F6;
                     margin: 20px 0;
-                }}
-                .email-signature {{
+                }
+                .email-signature {
                     margin-top: 30px;
                     padding-top: 20px;
                     border-top: 1px solid #e2e8f0;
                     color: #64748b;
-                }}
-                .email-footer {{
+                }
+                .email-footer {
                     background-color: #f8fafc;
                     padding: 20px;
                     text-align: center;
                     font-size: 14px;
                     color: #64748b;
-                }}
+                }
             </style>
         </head>
         <body>
@@ -655,17 +406,17 @@ Vitingo CRM Sistemi
                 </div>
                 
                 <div class="email-body">
-                    <h2>Merhaba {to_name},</h2>
-                    <p>{from_name} size bir mesaj gönderdi:</p>
+                    <h2>Merhaba %to_name%,</h2>
+                    <p>%from_name% size bir mesaj gönderdi:</p>
                     
                     <div class="email-content">
-                        {body}
+                        %body%
                     </div>
                     
                     <div class="email-signature">
                         <p><strong>Gönderen:</strong></p>
                         <p>
-                            <strong>{from_name}</strong><br>
+                            <strong>%from_name%</strong><br>
                             Vitingo CRM Sistemi<br>
                             Bu e-posta Vitingo CRM sistemi üzerinden gönderilmiştir.
                         </p>
@@ -674,49 +425,385 @@ Vitingo CRM Sistemi
                 
                 <div class="email-footer">
                     <p>Bu e-posta Vitingo CRM sistemi tarafından gönderilmiştir.</p>
-                    <p>© {self._get_current_date().split(' ')[0].split('.')[2]} Vitingo CRM - Tüm hakları saklıdır</p>
+                    <p>© %year% Vitingo CRM - Tüm hakları saklıdır</p>
                 </div>
             </div>
         </body>
         </html>
         """
 
-    def send_email(self, to_email: str, subject: str, html_content: str, plain_content: Optional[str] = None) -> dict:
-        """Generic send email method for any email content"""
+USER_EMAIL_TEXT = """
+%subject%
+
+%body%
+
+---
+Gönderen: %from_name%
+E-posta: %from_email%
+Vitingo CRM Sistemi
+"""
+
+HANDOVER_EMAIL_HTML = {"tr": HANDOVER_EMAIL_HTML_TR, "en": HANDOVER_EMAIL_HTML_EN}
+HANDOVER_EMAIL_TEXT = {"tr": HANDOVER_EMAIL_TEXT_TR, "en": HANDOVER_EMAIL_TEXT_EN}
+
+_PLACEHOLDER = re.compile(r"%([a-z_]+)%")
+
+
+@lru_cache(maxsize=None)
+def _compile(template: str) -> Tuple[str, ...]:
+    """Template split once into literal text (even indexes) and field names (odd indexes)"""
+    return tuple(_PLACEHOLDER.split(template))
+
+
+def _render(template: str, values: Dict[str, str]) -> str:
+    """Fill the placeholders; fields missing from values stay as %field% tags"""
+    parts = _compile(template)
+    rendered = list(parts)
+    for index in range(1, len(parts), 2):
+        field = parts[index]
+        rendered[index] = str(values[field]) if field in values else f"%{field}%"
+    return "".join(rendered)
+
+
+def _substitutions(values: Dict[str, str]) -> Dict[str, str]:
+    return {f"%{field}%": str(value) for field, value in values.items()}
+
+
+def _addresses(emails: str) -> List[Dict[str, str]]:
+    """Comma separated list -> SendGrid address objects"""
+    return [{"email": email.strip()} for email in (emails or "").split(',') if email.strip()]
+
+
+class EmailService:
+    def __init__(self):
+        # Get SendGrid API key from environment
+        self.api_key = os.environ.get('SENDGRID_API_KEY')
+        if not self.api_key:
+            logger.warning("SENDGRID_API_KEY not found in environment variables")
+        else:
+            logger.info(f"SendGrid API key loaded: {self.api_key[:20]}...")
+        
+        self.sender_email = os.environ.get('SENDER_EMAIL', 'info@quattrostand.com')
+        self.transport = email_transport.create_transport(self.api_key)
+        
+        logger.info(f"Email service initialized with sender: {self.sender_email} "
+                    f"(transport: {self.transport.name if self.transport else 'none'})")
+
+    @property
+    def configured(self) -> bool:
+        return self.transport is not None
+
+    async def close(self):
+        """Close the transport's pooled connections (app shutdown)"""
+        if self.transport:
+            await self.transport.close()
+
+    # ===================== PAYLOADS =====================
+
+    def _payload(self, to_email: str, subject: str, html_content: Optional[str] = None,
+                 plain_content: Optional[str] = None, from_name: str = "Vitingo CRM - Quattro Stand",
+                 from_email: Optional[str] = None, to_name: Optional[str] = None,
+                 cc: str = "", bcc: str = "", reply_to: Optional[Dict] = None,
+                 attachments: Optional[list] = None) -> Dict:
+        """SendGrid v3 mail/send payload for a single recipient"""
+        recipient = {"email": to_email}
+        if to_name:
+            recipient["name"] = to_name
+        personalization = {"to": [recipient]}
+        if _addresses(cc):
+            personalization["cc"] = _addresses(cc)
+        if _addresses(bcc):
+            personalization["bcc"] = _addresses(bcc)
+        return self._base_payload(subject, html_content, plain_content, from_name, from_email,
+                                  reply_to, attachments, [personalization])
+
+    def _base_payload(self, subject: str, html_content: Optional[str], plain_content: Optional[str],
+                      from_name: Optional[str], from_email: Optional[str], reply_to: Optional[Dict],
+                      attachments: Optional[list], personalizations: List[Dict]) -> Dict:
+        sender = {"email": from_email or self.sender_email}
+        if from_name:
+            sender["name"] = from_name
+        payload = {
+            "personalizations": personalizations,
+            "from": sender,
+            "subject": subject,
+            # SendGrid requires text/plain before text/html
+            "content": [
+                {"type": content_type, "value": value}
+                for content_type, value in (("text/plain", plain_content), ("text/html", html_content))
+                if value
+            ]
+        }
+        if reply_to:
+            payload["reply_to"] = reply_to
+        if attachments:
+            payload["attachments"] = self._attachments(attachments)
+        return payload
+
+    def _attachments(self, attachments: list) -> List[Dict]:
+        """[{name, type, data}] (data as base64 or data URL) -> SendGrid attachments"""
+        converted = []
+        for attachment in attachments:
+            try:
+                # Extract base64 data (remove data:type;base64, prefix)
+                file_data = attachment['data']
+                if file_data.startswith('data:'):
+                    file_data = file_data.split(',')[1]
+                converted.append({
+                    "content": file_data,
+                    "filename": attachment['name'],
+                    "type": attachment.get('type') or "application/octet-stream",
+                    "disposition": "attachment"
+                })
+                logger.info(f"Added attachment: {attachment['name']}")
+            except Exception as attach_error:
+                logger.error(f"Error adding attachment {attachment.get('name', 'unknown')}: {str(attach_error)}")
+        return converted
+
+    async def _deliver(self, payload: Dict, description: str, success_message: str) -> Dict:
+        """Hand the payload to the transport; never raises, like the send_* methods always did"""
+        if not self.transport:
+            logger.error("SendGrid client not initialized - missing API key")
+            return {"success": False, "error": NOT_CONFIGURED}
+        try:
+            result = await self.transport.send(payload)
+        except Exception as e:
+            logger.error(f"Failed to send {description}: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+        if not result["success"]:
+            logger.error(f"Failed to send {description}: {result['error']}")
+            return result
+        logger.info(f"{description} sent - Status: {result['status_code']}")
+        return {**result, "message": success_message}
+
+    # ===================== TEMPLATE VALUES =====================
+
+    def _survey_values(self, customer_data: dict, project_data: dict, survey_link: str) -> Dict[str, str]:
+        return {
+            "contact": customer_data['contact'],
+            "fair_name": project_data['fairName'],
+            "project_name": project_data['name'],
+            "city": project_data['city'],
+            "country": project_data['country'],
+            "delivery_date": self._format_date(project_data['deliveryDate']),
+            "survey_link": survey_link
+        }
+
+    def _handover_values(self, customer_data: dict, project_data: dict, handover_link: str) -> Dict[str, str]:
+        return {
+            "contact": customer_data['contact'],
+            "project_name": project_data['name'],
+            "handover_link": handover_link
+        }
+
+    # ===================== SENDS =====================
+
+    async def send_survey_invitation(self, customer_data: dict, project_data: dict, survey_link: str) -> dict:
+        """Send survey invitation email to customer"""
         try:
-            if not self.sg:
-                logger.error("SendGrid client not initialized - missing API key")
-                return {"success": False, "error": "Email service not configured"}
-
-            # Create SendGrid mail object
-            message = Mail(
-                from_email=From(self.sender_email, "Vitingo CRM - Quattro Stand"),
-                to_emails=To(to_email),
-                subject=Subject(subject),
-                html_content=HtmlContent(html_content)
-            )
+            # Create personalized email content
+            subject = f"{project_data['fairName']} - Müşteri Memnuniyet Anketi"
             
-            # Add plain text content if provided
-            if plain_content:
-                message.plain_text_content = PlainTextContent(plain_content)
+            html_content = self._generate_survey_email_html(customer_data, project_data, survey_link)
+            plain_content = self._generate_survey_email_text(customer_data, project_data, survey_link)
+            payload = self._payload(customer_data['email'], subject, html_content, plain_content)
+        except Exception as e:
+            logger.error(f"Failed to send survey invitation: {str(e)}")
+            return {"success": False, "error": str(e)}
 
-            # Send email
-            response = self.sg.send(message)
-            
-            logger.info(f"Email sent to {to_email} - Status: {response.status_code}")
-            
-            return {
-                "success": True,
-                "status_code": response.status_code,
-                "message": "Email sent successfully"
-            }
+        return await self._deliver(payload, f"Survey invitation to {customer_data['email']}",
+                                   "Survey invitation sent successfully")
 
+    async def send_test_email(self, to_email: str) -> dict:
+        """Send test email to verify SendGrid configuration"""
+        values = {"current_date": self._get_current_date()}
+        payload = self._payload(
+            to_email,
+            "Vitingo CRM - Test Email",
+            _render(TEST_EMAIL_HTML, values),
+            _render(TEST_EMAIL_TEXT, values),
+            from_name="Vitingo CRM - Test"
+        )
+        return await self._deliver(payload, f"Test email to {to_email}",
+                                   f"Test email sent successfully to {to_email}")
+
+    async def send_handover_invitation(self, customer_data: dict, project_data: dict, handover_link: str) -> dict:
+        """Send handover invitation email to customer"""
+        try:
+            # Determine language and create appropriate subject
+            language = project_data.get('language', 'tr')
+            if language == 'tr':
+                subject = f"{project_data['name']} - Fuar Standı Teslim Formu"
+            else:
+                subject = f"{project_data['name']} - Fair Stand Handover Form"
+            
+            html_content = self._generate_handover_email_html(customer_data, project_data, handover_link, language)
+            plain_content = self._generate_handover_email_text(customer_data, project_data, handover_link, language)
+            payload = self._payload(customer_data['email'], subject, html_content, plain_content)
         except Exception as e:
-            logger.error(f"Failed to send email: {str(e)}")
-            return {
-                "success": False,
-                "error": str(e)
-            }
+            logger.error(f"Failed to send handover invitation: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+        return await self._deliver(payload, f"Handover invitation to {customer_data['email']}",
+                                   "Handover invitation sent successfully")
+
+    def _generate_handover_email_html(self, customer_data: dict, project_data: dict, handover_link: str, language: str = 'tr') -> str:
+        """Generate HTML content for handover invitation email"""
+        template = HANDOVER_EMAIL_HTML['tr' if language == 'tr' else 'en']
+        return _render(template, self._handover_values(customer_data, project_data, handover_link))
+
+    def _generate_handover_email_text(self, customer_data: dict, project_data: dict, handover_link: str, language: str = 'tr') -> str:
+        """Generate plain text content for handover invitation email"""
+        template = HANDOVER_EMAIL_TEXT['tr' if language == 'tr' else 'en']
+        return _render(template, self._handover_values(customer_data, project_data, handover_link))
+
+    def _generate_survey_email_html(self, customer_data: dict, project_data: dict, survey_link: str) -> str:
+        """Generate HTML content for survey invitation email"""
+        return _render(SURVEY_EMAIL_HTML, self._survey_values(customer_data, project_data, survey_link))
+
+    def _generate_survey_email_text(self, customer_data: dict, project_data: dict, survey_link: str) -> str:
+        """Generate plain text content for survey invitation email"""
+        return _render(SURVEY_EMAIL_TEXT, self._survey_values(customer_data, project_data, survey_link))
+
+    def _format_date(self, date_string: str) -> str:
+        """Format date string to Turkish locale"""
+        try:
+            date_obj = datetime.fromisoformat(date_string)
+            return date_obj.strftime("%d.%m.%Y")
+        except:
+            return date_string
+
+    def _get_current_date(self) -> str:
+        """Get current date in Turkish format"""
+        return datetime.now().strftime("%d.%m.%Y %H:%M")
+    
+    async def send_user_email(self, to_email: str, to_name: str, from_email: str, from_name: str, 
+                              subject: str, body: str, cc: str = "", bcc: str = "", attachments: list = None) -> dict:
+        """Send email from user to user via CRM system"""
+        values = {"to_name": to_name, "from_name": from_name, "from_email": from_email,
+                  "subject": subject, "body": body}
+        payload = self._payload(
+            to_email,
+            subject,
+            self._generate_user_email_html(to_name=to_name, from_name=from_name, subject=subject, body=body),
+            _render(USER_EMAIL_TEXT, values).strip(),
+            from_name=f"Vitingo CRM - {from_name}",
+            to_name=to_name,
+            cc=cc,
+            bcc=bcc,
+            # Add reply-to
+            reply_to={"email": from_email, "name": from_name},
+            attachments=attachments
+        )
+        return await self._deliver(payload, f"User email from {from_email} to {to_email}",
+                                   "Email sent successfully")
+
+    async def send_user_email_batch(self, recipients: List[Dict], from_email: str, from_name: str,
+                                    subject: str) -> dict:
+        """Send one user email to many recipients with per-recipient name and body
+
+        recipients: [{"to_email", "to_name", "body"}]. The template is rendered
+        once; names and bodies travel as substitutions, up to
+        MAX_PERSONALIZATIONS recipients per API call.
+        """
+        shared = {"from_name": from_name, "from_email": from_email, "subject": subject,
+                  "year": self._get_current_date().split(' ')[0].split('.')[2]}
+        return await self.send_batch(
+            [
+                {
+                    "email": recipient["to_email"],
+                    "name": recipient.get("to_name"),
+                    "values": {"to_name": recipient.get("to_name") or "", "body": recipient["body"]}
+                }
+                for recipient in recipients
+            ],
+            subject,
+            _render(USER_EMAIL_HTML, shared),
+            _render(USER_EMAIL_TEXT, shared).strip(),
+            from_name=f"Vitingo CRM - {from_name}",
+            reply_to={"email": from_email, "name": from_name}
+        )
+
+    async def send_batch(self, recipients: List[Dict], subject: str, html_template: Optional[str],
+                         plain_template: Optional[str], from_name: str = "Vitingo CRM - Quattro Stand",
+                         from_email: Optional[str] = None, reply_to: Optional[Dict] = None) -> dict:
+        """Send a %field% template to many recipients: [{"email", "name", "values"}]
+
+        Recipients are grouped MAX_PERSONALIZATIONS per API call, each with its
+        values as substitutions. A recipient whose substitutions exceed
+        SendGrid's per-personalization limit is rendered and sent on its own.
+        `failed_emails` lists the recipients of the API calls that failed.
+        """
+        if not self.transport:
+            logger.error("SendGrid client not initialized - missing API key")
+            return {"success": False, "error": NOT_CONFIGURED}
+
+        payloads, personalizations = [], []
+        for recipient in recipients:
+            to = {"email": recipient["email"]}
+            if recipient.get("name"):
+                to["name"] = recipient["name"]
+            values = recipient.get("values", {})
+            substitutions = _substitutions(values)
+            if email_transport.substitution_size(substitutions) > email_transport.MAX_SUBSTITUTION_BYTES:
+                payloads.append(self._base_payload(
+                    _render(subject, values),
+                    _render(html_template, values) if html_template else None,
+                    _render(plain_template, values) if plain_template else None,
+                    from_name, from_email, reply_to, None, [{"to": [to]}]
+                ))
+            else:
+                personalizations.append({"to": [to], "substitutions": substitutions})
+
+        chunk = email_transport.MAX_PERSONALIZATIONS
+        payloads += [
+            self._base_payload(subject, html_template, plain_template, from_name, from_email, reply_to, None,
+                               personalizations[start:start + chunk])
+            for start in range(0, len(personalizations), chunk)
+        ]
+
+        results = []
+        for payload in payloads:
+            count = len(payload["personalizations"])
+            result = await self._deliver(payload, f"Batch email to {count} recipient(s)", "Batch sent")
+            results.append((count, result))
+
+        sent = sum(count for count, result in results if result["success"])
+        errors = [result["error"] for _, result in results if not result["success"]]
+        failed_emails = [
+            to["email"]
+            for payload, (_, result) in zip(payloads, results) if not result["success"]
+            for personalization in payload["personalizations"] for to in personalization["to"]
+        ]
+        return {
+            "success": not errors,
+            "sent": sent,
+            "failed": len(recipients) - sent,
+            "failed_emails": failed_emails,
+            "api_calls": len(payloads),
+            "message_ids": [result.get("message_id") for _, result in results if result["success"]],
+            **({"error": "; ".join(errors)} if errors else {"message": "Batch email sent successfully"})
+        }
+    
+    def _generate_user_email_html(self, to_name: str, from_name: str, subject: str, body: str) -> str:
+        """Generate HTML content for user email"""
+        return _render(USER_EMAIL_HTML, {
+            "to_name": to_name,
+            "from_name": from_name,
+            "subject": subject,
+            "body": body,
+            "year": self._get_current_date().split(' ')[0].split('.')[2]
+        })
+
+    async def send_email(self, to_email: str, subject: str, html_content: Optional[str],
+                         plain_content: Optional[str] = None, from_email: Optional[str] = None,
+                         from_name: Optional[str] = "Vitingo CRM - Quattro Stand",
+                         attachments: Optional[list] = None, to_name: Optional[str] = None) -> dict:
+        """Generic send email method for any email content"""
+        payload = self._payload(to_email, subject, html_content, plain_content, from_name=from_name,
+                                from_email=from_email, to_name=to_name, attachments=attachments)
+        return await self._deliver(payload, f"Email to {to_email}", "Email sent successfully")
 
 # Global email service instance
-email_service = EmailService()
\ No newline at end of file
+email_service = EmailService()
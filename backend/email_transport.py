@@ -0,0 +1,211 @@
+"""
+CRM - Email Transport Service
+Async delivery of SendGrid v3 mail/send payloads.
+
+EmailService builds one JSON payload per send (or per batch of up to
+MAX_PERSONALIZATIONS recipients) and hands it to the transport selected by
+EMAIL_TRANSPORT:
+
+- sendgrid (default): POST to the SendGrid API over a shared aiohttp session,
+  so connections are reused instead of opening a TLS connection per email
+  and the event loop is never blocked on the HTTPS call.
+- file: every recipient becomes an .eml file (plus the raw payload as JSON)
+  in EMAIL_FILE_DIR, for tests and local development.
+- smtp: every recipient is sent to EMAIL_SMTP_HOST:EMAIL_SMTP_PORT, e.g. a
+  local SMTP sink such as `python -m aiosmtpd -n -l localhost:1025` or MailHog.
+
+The file and smtp transports expand personalizations and substitutions the
+same way SendGrid does, so a batch looks identical on every transport.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import os
+import smtplib
+import uuid
+from datetime import datetime
+from email.message import EmailMessage
+from email.utils import formataddr, make_msgid
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+EMAIL_TRANSPORT = os.environ.get("EMAIL_TRANSPORT", "sendgrid").lower()
+SENDGRID_API_URL = os.environ.get("SENDGRID_API_URL", "https://api.sendgrid.com")
+EMAIL_HTTP_POOL_SIZE = int(os.environ.get("EMAIL_HTTP_POOL_SIZE", "20"))
+EMAIL_HTTP_TIMEOUT = float(os.environ.get("EMAIL_HTTP_TIMEOUT", "30"))
+EMAIL_FILE_DIR = os.environ.get("EMAIL_FILE_DIR", "/tmp/vitingo-emails")
+EMAIL_SMTP_HOST = os.environ.get("EMAIL_SMTP_HOST", "localhost")
+EMAIL_SMTP_PORT = int(os.environ.get("EMAIL_SMTP_PORT", "1025"))
+
+# SendGrid limits: recipients per request, substitution bytes per personalization
+MAX_PERSONALIZATIONS = 1000
+MAX_SUBSTITUTION_BYTES = 10000
+
+
+class EmailTransport:
+    """Delivers one mail/send payload; returns the EmailService result dict"""
+
+    name = "base"
+
+    async def send(self, payload: Dict) -> Dict:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class SendGridTransport(EmailTransport):
+    """SendGrid v3 API over one keep-alive aiohttp session per event loop"""
+
+    name = "sendgrid"
+
+    def __init__(self, api_key: str, base_url: str = SENDGRID_API_URL):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        # A session is bound to the loop it was created on (API vs. job_worker process, scripts)
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=EMAIL_HTTP_POOL_SIZE, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=EMAIL_HTTP_TIMEOUT),
+                headers={"Authorization": f"Bearer {self.api_key}"}
+            )
+            self._loop = loop
+        return self._session
+
+    async def send(self, payload: Dict) -> Dict:
+        session = self._get_session()
+        async with session.post(f"{self.base_url}/v3/mail/send", json=payload) as response:
+            if 200 <= response.status < 300:
+                return {
+                    "success": True,
+                    "status_code": response.status,
+                    "message_id": response.headers.get("X-Message-Id")
+                }
+            body = await response.text()
+            return {
+                "success": False,
+                "status_code": response.status,
+                "error": f"SendGrid returned {response.status}: {body[:500]}"
+            }
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+def _address(entry: Dict) -> str:
+    return formataddr((entry.get("name") or "", entry["email"]))
+
+
+def _substitute(text: Optional[str], substitutions: Dict[str, str]) -> Optional[str]:
+    if not text or not substitutions:
+        return text
+    for tag, value in substitutions.items():
+        text = text.replace(tag, value)
+    return text
+
+
+def expand(payload: Dict) -> Iterator[EmailMessage]:
+    """One MIME message per personalization, with its substitutions applied"""
+    content = {part["type"]: part["value"] for part in payload.get("content", [])}
+    for personalization in payload["personalizations"]:
+        substitutions = personalization.get("substitutions", {})
+        message = EmailMessage()
+        message["Message-ID"] = make_msgid(domain="vitingo.local")
+        message["From"] = _address(payload["from"])
+        message["To"] = ", ".join(_address(entry) for entry in personalization["to"])
+        if personalization.get("cc"):
+            message["Cc"] = ", ".join(_address(entry) for entry in personalization["cc"])
+        if personalization.get("bcc"):
+            message["Bcc"] = ", ".join(_address(entry) for entry in personalization["bcc"])
+        if payload.get("reply_to"):
+            message["Reply-To"] = _address(payload["reply_to"])
+        message["Subject"] = _substitute(personalization.get("subject", payload.get("subject", "")), substitutions)
+
+        plain = _substitute(content.get("text/plain"), substitutions)
+        html = _substitute(content.get("text/html"), substitutions)
+        message.set_content(plain or "")
+        if html:
+            message.add_alternative(html, subtype="html")
+
+        for attachment in payload.get("attachments", []):
+            maintype, _, subtype = attachment.get("type", "application/octet-stream").partition("/")
+            message.add_attachment(
+                base64.b64decode(attachment["content"]),
+                maintype=maintype,
+                subtype=subtype or "octet-stream",
+                filename=attachment["filename"]
+            )
+        yield message
+
+
+class FileTransport(EmailTransport):
+    """Writes every recipient's message as .eml and the payload as .json"""
+
+    name = "file"
+
+    def __init__(self, directory: str = EMAIL_FILE_DIR):
+        self.directory = Path(directory)
+
+    def _write(self, payload: Dict) -> str:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        message_id = f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:12]}"
+        (self.directory / f"{message_id}.json").write_text(
+            json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        for index, message in enumerate(expand(payload)):
+            (self.directory / f"{message_id}-{index:04d}.eml").write_bytes(message.as_bytes())
+        return message_id
+
+    async def send(self, payload: Dict) -> Dict:
+        message_id = await asyncio.to_thread(self._write, payload)
+        return {"success": True, "status_code": 202, "message_id": message_id}
+
+
+class SmtpTransport(EmailTransport):
+    """Plain SMTP delivery, meant for a local sink; one connection per payload"""
+
+    name = "smtp"
+
+    def __init__(self, host: str = EMAIL_SMTP_HOST, port: int = EMAIL_SMTP_PORT):
+        self.host = host
+        self.port = port
+
+    def _deliver(self, payload: Dict) -> List[str]:
+        message_ids = []
+        with smtplib.SMTP(self.host, self.port, timeout=EMAIL_HTTP_TIMEOUT) as smtp:
+            for message in expand(payload):
+                smtp.send_message(message)  # Bcc is turned into envelope recipients
+                message_ids.append(message["Message-ID"])
+        return message_ids
+
+    async def send(self, payload: Dict) -> Dict:
+        message_ids = await asyncio.to_thread(self._deliver, payload)
+        return {"success": True, "status_code": 250, "message_id": message_ids[0] if message_ids else None}
+
+
+def create_transport(api_key: Optional[str]) -> Optional[EmailTransport]:
+    """Transport selected by EMAIL_TRANSPORT; None when SendGrid has no API key"""
+    if EMAIL_TRANSPORT == "file":
+        return FileTransport()
+    if EMAIL_TRANSPORT == "smtp":
+        return SmtpTransport()
+    if EMAIL_TRANSPORT != "sendgrid":
+        logger.warning(f"Unknown EMAIL_TRANSPORT {EMAIL_TRANSPORT!r}, using sendgrid")
+    return SendGridTransport(api_key) if api_key else None
+
+
+def substitution_size(substitutions: Dict[str, str]) -> int:
+    return sum(len(tag.encode()) + len(value.encode()) for tag, value in substitutions.items())
@@ -0,0 +1,280 @@
+"""
+Tenant Entitlements
+Compiled, in-memory package features, feature overrides and feature flags.
+
+Packages, tenants and feature flags are loaded together into an immutable
+`EntitlementSnapshot`. Each tenant's effective feature set (package features
+with its `feature_overrides` applied) is compiled on first use and answered
+from memory afterwards, so feature checks and route gating need no database
+round trip. Writes to packages, flags or tenant subscriptions call
+`invalidate()`, which bumps the version in `library_versions`; other workers
+reload within ENTITLEMENT_VERSION_CHECK_INTERVAL seconds.
+
+Gradual rollouts bucket tenants with a keyed SHA-256 of flag key + tenant
+slug, so every worker gives the same answer and raising the percentage only
+ever adds tenants.
+
+Usage:
+    tenant = await entitlements.get_tenant("acme")
+    tenant.has_feature("contracts")
+
+    @router.get("/api/{tenant_slug}/contracts", dependencies=[Depends(require_feature("contracts"))])
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+logger = logging.getLogger(__name__)
+
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+client = AsyncIOMotorClient(MONGO_URL)
+# Packages and tenants live in the platform database, flags next to the CRM data
+platform_db = client["vitingo_platform"]
+flags_db = client["crm_db"]
+
+ENTITLEMENT_VERSION_KEY = "entitlements"
+ENTITLEMENT_VERSION_CHECK_INTERVAL = float(os.environ.get("ENTITLEMENT_VERSION_CHECK_INTERVAL", "10"))
+DEFAULT_PACKAGE_KEY = "starter"
+# Rollout buckets per flag; percentages are compared in basis points
+ROLLOUT_BUCKETS = 10000
+
+TENANT_PROJECTION = {"_id": 0, "slug": 1, "package_key": 1, "subscription.package_key": 1, "feature_overrides": 1}
+
+
+def flag_key(flag: Dict) -> Optional[str]:
+    """Flags are keyed by `key`; seeded flags use `flag`"""
+    return flag.get("key") or flag.get("flag")
+
+
+def rollout_bucket(key: str, tenant_slug: str) -> int:
+    """Stable bucket (0..ROLLOUT_BUCKETS-1) of a tenant for one flag, identical in every process"""
+    digest = hashlib.sha256(f"{key}:{tenant_slug}".encode()).digest()
+    return int.from_bytes(digest[:8], "big") % ROLLOUT_BUCKETS
+
+
+def in_rollout(bucket: int, rollout_percentage: float) -> bool:
+    """Buckets below the percentage are in, so increasing it never turns a tenant off"""
+    return bucket < rollout_percentage * ROLLOUT_BUCKETS / 100
+
+
+def evaluate_flag(flag: Dict, tenant_slug: str, user_role: Optional[str] = None,
+                  bucket: Optional[int] = None) -> Tuple[bool, str]:
+    """(enabled, reason) of one flag for a tenant"""
+    if tenant_slug in flag.get("blacklist_tenants", []):
+        return False, "blacklist"
+    if tenant_slug in flag.get("whitelist_tenants", []):
+        return True, "whitelist"
+
+    status = flag.get("status", "disabled")
+    if status == "disabled":
+        return False, "disabled"
+    if status == "development":
+        # Sadece whitelist'tekiler görebilir (yukarıda kontrol edildi)
+        return False, "development_only"
+    if status == "testing":
+        if user_role in ["super-admin", "admin"]:
+            return True, "testing_admin"
+        return False, "testing_restricted"
+    if status == "gradual":
+        rollout_percentage = flag.get("rollout_percentage", 0)
+        if bucket is None:
+            bucket = rollout_bucket(flag_key(flag), tenant_slug)
+        if in_rollout(bucket, rollout_percentage):
+            return True, f"rollout_{rollout_percentage}%"
+        return False, f"rollout_excluded_{rollout_percentage}%"
+    if status == "enabled":
+        return True, "enabled"
+    return False, "unknown_status"
+
+
+def tenant_package_key(tenant: Dict) -> str:
+    return (
+        tenant.get("package_key")
+        or (tenant.get("subscription") or {}).get("package_key")
+        or DEFAULT_PACKAGE_KEY
+    )
+
+
+class TenantEntitlements:
+    """Effective features and limits of one tenant. Read-only."""
+
+    def __init__(self, snapshot: "EntitlementSnapshot", tenant: Dict):
+        self.snapshot = snapshot
+        self.tenant_slug = tenant["slug"]
+        self.package_key = tenant_package_key(tenant)
+        package = snapshot.packages.get(self.package_key)
+        self.package_found = package is not None
+        package = package or {"key": DEFAULT_PACKAGE_KEY, "features": [], "limits": {}}
+        self.package_name = package.get("name", "Starter")
+        self.limits: Dict = package.get("limits", {})
+        self.feature_overrides: Dict[str, bool] = dict(tenant.get("feature_overrides") or {})
+
+        features = set(package.get("features", []))
+        for feature_key, enabled in self.feature_overrides.items():
+            if enabled:
+                features.add(feature_key)
+            else:
+                features.discard(feature_key)
+        self.features: FrozenSet[str] = frozenset(features)
+
+    def has_feature(self, feature_key: str) -> bool:
+        return feature_key in self.features
+
+    def check_feature(self, feature_key: str) -> Dict:
+        """Access to one feature, with the packages that include it when denied"""
+        has_access = feature_key in self.features
+        return {
+            "feature_key": feature_key,
+            "has_access": has_access,
+            "reason": "included" if has_access else "not_in_package",
+            "current_package": self.package_key,
+            "upgrade_packages": [] if has_access else list(self.snapshot.feature_packages.get(feature_key, ())),
+        }
+
+    def check_flag(self, key: str, user_role: Optional[str] = None) -> Dict:
+        flag = self.snapshot.flags.get(key)
+        if flag is None:
+            return {"key": key, "enabled": False, "reason": "not_found"}
+        enabled, reason = evaluate_flag(flag, self.tenant_slug, user_role, self.snapshot.bucket(key, self.tenant_slug))
+        return {"key": key, "enabled": enabled, "reason": reason}
+
+    def evaluate(self, features: Optional[Iterable[str]] = None, flags: Optional[Iterable[str]] = None,
+                 user_role: Optional[str] = None) -> Dict:
+        """Features, flags and limits in one answer; all of them when no keys are given"""
+        feature_keys = self.features | self.snapshot.known_features if features is None else features
+        flag_keys = self.snapshot.flags.keys() if flags is None else flags
+        return {
+            "tenant_slug": self.tenant_slug,
+            "package_key": self.package_key,
+            "package_name": self.package_name,
+            "version": self.snapshot.version,
+            "features": {key: self.check_feature(key) for key in sorted(feature_keys)},
+            "flags": {key: self.check_flag(key, user_role) for key in sorted(flag_keys)},
+            "limits": self.limits,
+        }
+
+
+class EntitlementSnapshot:
+    """Packages, tenants and flags at one entitlement version"""
+
+    def __init__(self, version: int, packages: List[Dict], tenants: List[Dict], flags: List[Dict]):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.checked_at = self.loaded_at
+        self.packages: Dict[str, Dict] = {pkg["key"]: pkg for pkg in packages if pkg.get("key")}
+        self.flags: Dict[str, Dict] = {flag_key(flag): flag for flag in flags if flag_key(flag)}
+
+        # Upgrade suggestions: active packages including each feature
+        feature_packages: Dict[str, List[str]] = {}
+        for pkg in sorted(self.packages.values(), key=lambda p: p.get("sort_order", 100)):
+            if not pkg.get("is_active", True):
+                continue
+            for feature in pkg.get("features", []):
+                feature_packages.setdefault(feature, []).append(pkg["key"])
+        self.feature_packages: Dict[str, Tuple[str, ...]] = {k: tuple(v) for k, v in feature_packages.items()}
+        self.known_features: FrozenSet[str] = frozenset(feature_packages)
+
+        self._tenant_docs: Dict[str, Dict] = {tenant["slug"]: tenant for tenant in tenants if tenant.get("slug")}
+        self._tenants: Dict[str, TenantEntitlements] = {}
+        # Rollout bucket of every tenant for every flag
+        self._buckets: Dict[str, Dict[str, int]] = {
+            key: {slug: rollout_bucket(key, slug) for slug in self._tenant_docs} for key in self.flags
+        }
+
+    @property
+    def tenant_count(self) -> int:
+        return len(self._tenant_docs)
+
+    def bucket(self, key: str, tenant_slug: str) -> int:
+        bucket = self._buckets.get(key, {}).get(tenant_slug)
+        return rollout_bucket(key, tenant_slug) if bucket is None else bucket
+
+    def active_tenant_count(self, flag: Dict) -> int:
+        """Tenants the flag is on for (roles aside), using the precomputed buckets"""
+        key = flag_key(flag)
+        buckets = self._buckets.get(key)
+        if buckets is None:
+            buckets = {slug: rollout_bucket(key, slug) for slug in self._tenant_docs}
+        return sum(1 for slug, bucket in buckets.items() if evaluate_flag(flag, slug, bucket=bucket)[0])
+
+    def tenant(self, tenant_slug: str) -> Optional[TenantEntitlements]:
+        entitlements = self._tenants.get(tenant_slug)
+        if entitlements is None:
+            doc = self._tenant_docs.get(tenant_slug)
+            if doc is None:
+                return None
+            # Compiled on first use; the snapshot itself stays immutable
+            entitlements = self._tenants[tenant_slug] = TenantEntitlements(self, doc)
+        return entitlements
+
+
+_snapshot: Optional[EntitlementSnapshot] = None
+_lock: Optional[asyncio.Lock] = None
+
+
+async def _current_version() -> int:
+    doc = await platform_db.library_versions.find_one({"_id": ENTITLEMENT_VERSION_KEY})
+    return doc["version"] if doc else 0
+
+
+async def _load() -> EntitlementSnapshot:
+    version = await _current_version()
+    packages, tenants, flags = await asyncio.gather(
+        platform_db.packages.find({}, {"_id": 0}).to_list(None),
+        platform_db.tenants.find({}, TENANT_PROJECTION).to_list(None),
+        flags_db.feature_flags.find({}, {"_id": 0}).to_list(None),
+    )
+    snapshot = EntitlementSnapshot(version, packages, tenants, flags)
+    logger.info(
+        f"Entitlements loaded: {len(snapshot.packages)} packages, {len(tenants)} tenants, "
+        f"{len(snapshot.flags)} flags (v{version})"
+    )
+    return snapshot
+
+
+async def get(force: bool = False) -> EntitlementSnapshot:
+    """Current snapshot, reloaded when the entitlement version changed"""
+    global _snapshot, _lock
+    snapshot = _snapshot
+    if not force and snapshot is not None and time.monotonic() - snapshot.checked_at < ENTITLEMENT_VERSION_CHECK_INTERVAL:
+        return snapshot
+
+    if _lock is None:
+        _lock = asyncio.Lock()
+    async with _lock:
+        if _snapshot is not None and _snapshot is not snapshot:
+            # Reloaded by another request while we waited
+            return _snapshot
+        if snapshot is not None:
+            age = time.monotonic() - (snapshot.loaded_at if force else snapshot.checked_at)
+            if age < ENTITLEMENT_VERSION_CHECK_INTERVAL:
+                return snapshot
+            if not force and await _current_version() == snapshot.version:
+                snapshot.checked_at = time.monotonic()
+                return snapshot
+        _snapshot = await _load()
+        return _snapshot
+
+
+async def get_tenant(tenant_slug: str) -> Optional[TenantEntitlements]:
+    """Entitlements of one tenant; a tenant created since the last load triggers one reload"""
+    snapshot = await get()
+    entitlements = snapshot.tenant(tenant_slug)
+    if entitlements is None:
+        entitlements = (await get(force=True)).tenant(tenant_slug)
+    return entitlements
+
+
+async def invalidate():
+    """Bump the entitlement version after a package, flag or tenant write and drop the local snapshot"""
+    global _snapshot
+    await platform_db.library_versions.update_one(
+        {"_id": ENTITLEMENT_VERSION_KEY}, {"$inc": {"version": 1}}, upsert=True
+    )
+    _snapshot = None
@@ -0,0 +1,120 @@
+"""
+Request-Scoped Entity Loaders
+DataLoader-style batching and memoization for lookups by id.
+
+Every `load()` issued in the same event loop tick is coalesced into a single
+`$in` query, and each key is fetched at most once per request. Keys may be
+either the application `id` field or a 24-char ObjectId string (the
+`{"$or": [{"id": ...}, {"_id": ObjectId(...)}]}` pattern used across the API).
+
+Usage:
+    get_loaders = request_loaders(db)
+
+    @api_router.post("/whatsapp/bulk-reminder")
+    async def send_bulk_payment_reminder(loaders: RequestLoaders = Depends(get_loaders)):
+        customers = await loaders.customers.load_many(customer_ids)
+"""
+
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional
+
+from bson import ObjectId
+
+
+class EntityLoader:
+    """Batched, memoized lookups by id for one collection"""
+
+    def __init__(self, collection, projection: Optional[Dict[str, Any]] = None):
+        self.collection = collection
+        self.projection = projection
+        self._cache: Dict[str, asyncio.Future] = {}
+        self._queue: List[str] = []
+        self._dispatch_scheduled = False
+
+    def load(self, key: Any) -> "asyncio.Future[Optional[Dict]]":
+        """Return an awaitable resolving to the document for `key` (or None)"""
+        key = str(key)
+        if key in self._cache:
+            return self._cache[key]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._cache[key] = future
+        self._queue.append(key)
+        if not self._dispatch_scheduled:
+            self._dispatch_scheduled = True
+            loop.call_soon(lambda: asyncio.ensure_future(self._dispatch()))
+        return future
+
+    async def load_many(self, keys: Iterable[Any]) -> List[Optional[Dict]]:
+        """Load several keys with a single query"""
+        return list(await asyncio.gather(*[self.load(key) for key in keys]))
+
+    async def load_map(self, keys: Iterable[Any]) -> Dict[str, Dict]:
+        """Load several keys and return {key: document} for the ones found"""
+        unique_keys = list(dict.fromkeys(str(key) for key in keys))
+        docs = await self.load_many(unique_keys)
+        return {key: doc for key, doc in zip(unique_keys, docs) if doc is not None}
+
+    def prime(self, key: Any, doc: Optional[Dict]):
+        """Seed the cache with a document fetched elsewhere"""
+        key = str(key)
+        if key not in self._cache:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(doc)
+            self._cache[key] = future
+
+    async def _dispatch(self):
+        keys, self._queue = self._queue, []
+        self._dispatch_scheduled = False
+        try:
+            found = await self._fetch(keys)
+        except Exception as e:
+            for key in keys:
+                future = self._cache.pop(key)
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for key in keys:
+            future = self._cache[key]
+            if not future.done():
+                future.set_result(found.get(key))
+
+    async def _fetch(self, keys: List[str]) -> Dict[str, Dict]:
+        object_ids = [ObjectId(key) for key in keys if ObjectId.is_valid(key)]
+        query = {"id": {"$in": keys}}
+        if object_ids:
+            query = {"$or": [query, {"_id": {"$in": object_ids}}]}
+
+        projection = None
+        if self.projection:
+            projection = {**self.projection, "id": 1}
+            projection.pop("_id", None)
+
+        wanted = set(keys)
+        found = {}
+        async for doc in self.collection.find(query, projection):
+            object_id = str(doc.pop("_id", ""))
+            if doc.get("id") in wanted:
+                found[doc["id"]] = doc
+            if object_id in wanted:
+                found[object_id] = doc
+        return found
+
+
+class RequestLoaders:
+    """Loaders for the entities most often resolved by id within one request"""
+
+    def __init__(self, db):
+        self.customers = EntityLoader(db.customers)
+        self.suppliers = EntityLoader(db.suppliers)
+        self.users = EntityLoader(db.users)
+        self.projects = EntityLoader(db.projects)
+
+
+def request_loaders(db):
+    """Build a FastAPI dependency returning fresh loaders for each request"""
+    async def get_loaders() -> RequestLoaders:
+        return RequestLoaders(db)
+    return get_loaders
@@ -0,0 +1,296 @@
+"""
+Geo Library Index
+In-process, immutable prefix index over countries and cities for typeahead.
+
+Countries and cities barely change, so each database's geo collections are
+loaded once into a `GeoSnapshot`: diacritic-folded keys (every word start of
+every name) in a sorted array answered with bisect, plus precomputed
+population-ranked results for the short prefixes typed first. A snapshot is
+never mutated; library writes call `invalidate()`, which bumps the version in
+`library_versions` and drops the local copy. Other processes pick up the bump
+within GEO_VERSION_CHECK_INTERVAL seconds.
+
+Full lists are rendered once per snapshot and served with ETag/Cache-Control.
+
+Usage:
+    geo = await geo_index.get(db)
+    cities = geo.search_cities("ist", country="TR", limit=10)
+    return geo.cached_response(request, "cities", lambda: list(geo.cities))
+"""
+
+import asyncio
+import hashlib
+import heapq
+import logging
+import os
+import re
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import Request, Response
+
+from json_response import dumps
+from reference_cache import conditional_response
+from search_service import fold
+
+logger = logging.getLogger(__name__)
+
+GEO_VERSION_KEY = "geo"
+GEO_VERSION_CHECK_INTERVAL = float(os.environ.get("GEO_VERSION_CHECK_INTERVAL", "30"))
+GEO_CACHE_MAX_AGE = int(os.environ.get("GEO_CACHE_MAX_AGE", "300"))
+# Prefixes up to this length have their top results precomputed
+TOP_PREFIX_DEPTH = 3
+TOP_PREFIX_RESULTS = 50
+# Rendered responses kept per snapshot; keys come from request parameters
+GEO_RENDERED_CACHE_SIZE = int(os.environ.get("GEO_RENDERED_CACHE_SIZE", "256"))
+
+TURKISH_ALPHABET = "abcçdefgğhıijklmnoöprsştuüvyz"
+TURKISH_ORDER = {letter: index for index, letter in enumerate(TURKISH_ALPHABET)}
+NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def fold_key(text: str) -> str:
+    """Folded text with punctuation collapsed to single spaces"""
+    return NON_ALNUM.sub(" ", fold(text)).strip()
+
+
+def word_keys(text: str) -> List[str]:
+    """Keys for every word start, so "new york" is found by "ne" and "yo" """
+    folded = fold_key(text)
+    if not folded:
+        return []
+    words = folded.split(" ")
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+def turkish_sort_key(text: str) -> Tuple:
+    """Sort key following the Turkish alphabet (c < ç < d, ı < i)"""
+    lowered = (text or "").replace("I", "ı").replace("İ", "i").lower()
+    return tuple(TURKISH_ORDER.get(ch, 100 + ord(ch)) for ch in lowered)
+
+
+class PrefixIndex:
+    """Immutable prefix index over a sequence of documents"""
+
+    def __init__(self, docs: Sequence[Dict], key_fields: Sequence[str], rank_key: Callable[[Dict], Tuple]):
+        self.docs = docs
+        pairs = []
+        for position, doc in enumerate(docs):
+            seen = set()
+            for field in key_fields:
+                value = doc.get(field)
+                if not value:
+                    continue
+                for key in word_keys(str(value)):
+                    if key not in seen:
+                        seen.add(key)
+                        pairs.append((key, position))
+        pairs.sort()
+        self._keys = [key for key, _ in pairs]
+        self._positions = [position for _, position in pairs]
+        self._rank = [rank_key(doc) for doc in docs]
+
+        # Top results for every short prefix
+        candidates: Dict[str, set] = {}
+        for key, position in pairs:
+            for length in range(1, min(len(key), TOP_PREFIX_DEPTH) + 1):
+                candidates.setdefault(key[:length], set()).add(position)
+        self._top = {
+            prefix: tuple(heapq.nsmallest(TOP_PREFIX_RESULTS, positions, key=self._rank.__getitem__))
+            for prefix, positions in candidates.items()
+        }
+
+    def _matches(self, prefix: str) -> set:
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + "\uffff", lo)
+        return set(self._positions[lo:hi])
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Dict]:
+        """Documents with a word starting with `query`, best ranked first"""
+        prefix = fold_key(query)
+        if not prefix:
+            return []
+        if len(prefix) <= TOP_PREFIX_DEPTH and limit is not None and limit <= TOP_PREFIX_RESULTS:
+            positions = self._top.get(prefix, ())[:limit]
+        else:
+            matches = self._matches(prefix)
+            if limit is None:
+                positions = sorted(matches, key=self._rank.__getitem__)
+            else:
+                positions = heapq.nsmallest(limit, matches, key=self._rank.__getitem__)
+        return [self.docs[position] for position in positions]
+
+
+def population(doc: Dict) -> int:
+    try:
+        return int(doc.get("population") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def country_rank(doc: Dict) -> Tuple:
+    return (-population(doc), doc.get("sort_order", 100), turkish_sort_key(doc.get("name", "")))
+
+
+def city_rank(doc: Dict) -> Tuple:
+    return (not doc.get("is_capital", False), -population(doc), turkish_sort_key(doc.get("name", "")))
+
+
+def city_country_keys(doc: Dict) -> List[str]:
+    """Every way a city refers to its country (library name, ISO2, global code)"""
+    return [fold_key(str(doc[field])) for field in ("country", "country_iso2", "country_code") if doc.get(field)]
+
+
+def _country_key(country: str) -> str:
+    return fold_key(country)
+
+
+class GeoSnapshot:
+    """Immutable countries/cities snapshot of one database. Documents are read-only."""
+
+    def __init__(self, version: int, countries: List[Dict], cities: List[Dict]):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.checked_at = self.loaded_at
+        self.countries = tuple(countries)
+        self.cities = tuple(cities)
+        self.country_index = PrefixIndex(
+            self.countries, ("name", "name_tr", "name_native", "code", "iso2", "iso3"), country_rank
+        )
+
+        by_country: Dict[str, List[Dict]] = {}
+        for city in self.cities:
+            for key in dict.fromkeys(city_country_keys(city)):
+                by_country.setdefault(key, []).append(city)
+        self._cities_by_country = {key: tuple(docs) for key, docs in by_country.items()}
+        self._city_indexes: Dict[str, PrefixIndex] = {}
+        self._all_city_index: Optional[PrefixIndex] = None
+        self._rendered: Dict[str, Tuple[bytes, str]] = {}
+
+    def cities_of(self, country: str) -> Tuple[Dict, ...]:
+        """Cities of a country given as library name, ISO2 or global code"""
+        return self._cities_by_country.get(_country_key(country), ())
+
+    def _city_index(self, country: Optional[str]) -> PrefixIndex:
+        if country is None:
+            if self._all_city_index is None:
+                self._all_city_index = PrefixIndex(self.cities, ("name", "name_tr"), city_rank)
+            return self._all_city_index
+        key = _country_key(country)
+        index = self._city_indexes.get(key)
+        if index is None:
+            cities = self._cities_by_country.get(key)
+            if cities is None:
+                # Unknown country: nothing to find, and nothing cached per request input
+                return _EMPTY_INDEX
+            # Built on first use; the snapshot itself stays immutable
+            index = PrefixIndex(cities, ("name", "name_tr"), city_rank)
+            self._city_indexes[key] = index
+        return index
+
+    def search_countries(self, query: str, limit: Optional[int] = None) -> List[Dict]:
+        return self.country_index.search(query, limit)
+
+    def search_cities(self, query: str, country: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        return self._city_index(country).search(query, limit)
+
+    def ranked_cities(self, country: Optional[str] = None) -> List[Dict]:
+        """All cities (of a country), capitals and most populous first"""
+        cities = self.cities if country is None else self.cities_of(country)
+        return sorted(cities, key=city_rank)
+
+    def cached_response(self, request: Request, key: str, build: Callable[[], object]) -> Response:
+        """Render `build()` once per snapshot and serve it with ETag/Cache-Control"""
+        rendered = self._rendered.get(key)
+        if rendered is None:
+            body = dumps(build())
+            rendered = (body, '"' + hashlib.sha1(body).hexdigest() + '"')
+            if len(self._rendered) >= GEO_RENDERED_CACHE_SIZE:
+                # Oldest first; keeps arbitrary query parameters from growing the cache
+                del self._rendered[next(iter(self._rendered))]
+            self._rendered[key] = rendered
+        body, etag = rendered
+        return conditional_response(request, body, etag, max_age=GEO_CACHE_MAX_AGE, public=True)
+
+
+_EMPTY_INDEX = PrefixIndex((), ("name", "name_tr"), city_rank)
+
+_snapshots: Dict[str, GeoSnapshot] = {}
+_locks: Dict[str, asyncio.Lock] = {}
+
+
+async def _current_version(db) -> int:
+    doc = await db.library_versions.find_one({"_id": GEO_VERSION_KEY})
+    return doc["version"] if doc else 0
+
+
+def _public(doc: Dict) -> Dict:
+    if "_id" in doc:
+        doc["_id"] = str(doc["_id"])
+    return doc
+
+
+async def _load(db) -> GeoSnapshot:
+    version = await _current_version(db)
+    countries, cities = await asyncio.gather(
+        db.countries.find({}).to_list(None),
+        db.cities.find({}).to_list(None),
+    )
+    countries = [_public(doc) for doc in countries]
+    cities = [_public(doc) for doc in cities]
+    countries.sort(key=lambda doc: turkish_sort_key(doc.get("name", "")))
+    cities.sort(key=lambda doc: doc.get("name", ""))
+    snapshot = GeoSnapshot(version, countries, cities)
+    logger.info(f"Geo index loaded for {db.name}: {len(countries)} countries, {len(cities)} cities (v{version})")
+    return snapshot
+
+
+async def get(db) -> GeoSnapshot:
+    """Current snapshot for `db`, loading or refreshing it when the version changed"""
+    snapshot = _snapshots.get(db.name)
+    now = time.monotonic()
+    if snapshot is not None and now - snapshot.checked_at < GEO_VERSION_CHECK_INTERVAL:
+        return snapshot
+
+    lock = _locks.setdefault(db.name, asyncio.Lock())
+    async with lock:
+        snapshot = _snapshots.get(db.name)
+        if snapshot is not None and time.monotonic() - snapshot.checked_at < GEO_VERSION_CHECK_INTERVAL:
+            return snapshot
+        if snapshot is not None and await _current_version(db) == snapshot.version:
+            snapshot.checked_at = time.monotonic()
+            return snapshot
+        snapshot = await _load(db)
+        _snapshots[db.name] = snapshot
+        return snapshot
+
+
+async def invalidate(db):
+    """Bump the geo version after a library write and drop the local snapshot"""
+    await db.library_versions.update_one(
+        {"_id": GEO_VERSION_KEY}, {"$inc": {"version": 1}}, upsert=True
+    )
+    _snapshots.pop(db.name, None)
+
+
+def paginate(items: Sequence[Dict], page: int, limit: int) -> Tuple[List[Dict], Dict]:
+    """Slice a ranked result list into the {page, limit, total_count, ...} shape used by geo endpoints"""
+    page = max(1, page)
+    limit = max(1, limit)
+    total_count = len(items)
+    skip = (page - 1) * limit
+    total_pages = (total_count + limit - 1) // limit
+    return list(items[skip:skip + limit]), {
+        "page": page,
+        "limit": limit,
+        "total_count": total_count,
+        "total_pages": total_pages,
+        "has_next": page < total_pages,
+        "has_prev": page > 1
+    }
+
+
+def matching(docs: Iterable[Dict], **filters) -> List[Dict]:
+    """Documents whose fields equal every given filter value"""
+    return [doc for doc in docs if all(doc.get(field) == value for field, value in filters.items())]
@@ -0,0 +1,109 @@
+"""
+CRM - Job Handlers
+Background job types run by job_queue workers (in-process or `python -m job_worker`).
+
+Emails go out through the async EmailService transport; a failed send raises
+and is retried with backoff. Invitation records are created by the endpoints
+with `email_status: "queued"` and updated here once the email has been sent
+or has finally failed.
+"""
+
+from datetime import datetime
+
+import job_queue
+import stand_design_service
+from email_service import NOT_CONFIGURED, email_service
+
+
+async def _send(method, *args, **kwargs) -> dict:
+    return _check(await method(*args, **kwargs))
+
+
+def _check(result: dict) -> dict:
+    if not result.get("success"):
+        error = result.get("error", "Unknown error")
+        if error == NOT_CONFIGURED:
+            raise job_queue.PermanentJobError(error)
+        raise RuntimeError(f"Failed to send email: {error}")
+    return result
+
+
+def _mark_failed(collection: str, token_field: str):
+    async def mark_failed(db, payload: dict, error: str):
+        await db[collection].update_one(
+            {token_field: payload[token_field]},
+            {"$set": {"email_status": "failed", "email_error": error}}
+        )
+    return mark_failed
+
+
+@job_queue.handler("email.survey_invitation", concurrency=4,
+                   on_failure=_mark_failed("survey_invitations", "survey_token"))
+async def send_survey_invitation(db, payload: dict):
+    result = await _send(email_service.send_survey_invitation,
+                         payload["customer_data"], payload["project_data"], payload["survey_link"])
+    await db.survey_invitations.update_one(
+        {"survey_token": payload["survey_token"]},
+        {"$set": {"email_status": "sent", "email_sent_at": datetime.now().isoformat()}}
+    )
+    return {"status_code": result.get("status_code")}
+
+
+@job_queue.handler("email.handover_invitation", concurrency=4,
+                   on_failure=_mark_failed("handover_invitations", "handover_token"))
+async def send_handover_invitation(db, payload: dict):
+    result = await _send(email_service.send_handover_invitation,
+                         payload["customer_data"], payload["project_data"], payload["handover_link"])
+    await db.handover_invitations.update_one(
+        {"handover_token": payload["handover_token"]},
+        {"$set": {"email_status": "sent", "email_sent_at": datetime.now().isoformat()}}
+    )
+    return {"status_code": result.get("status_code")}
+
+
+@job_queue.handler("email.user_email", concurrency=4)
+async def send_user_email(db, payload: dict):
+    """payload: keyword arguments of EmailService.send_user_email"""
+    result = await _send(email_service.send_user_email, **payload)
+    return {"status_code": result.get("status_code")}
+
+
+@job_queue.handler("email.user_email_batch", concurrency=2)
+async def send_user_email_batch(db, payload: dict):
+    """payload: keyword arguments of EmailService.send_user_email_batch
+
+    Retrying the job would send the chunks that already went out again, so
+    only a batch where nothing was sent raises. After a partial failure the
+    failed recipients are queued as a new job and this one succeeds.
+    """
+    result = await email_service.send_user_email_batch(**payload)
+    if not result.get("sent"):
+        _check(result)  # raises; permanently when not configured
+    summary = {"sent": result["sent"], "api_calls": result["api_calls"]}
+    if result["failed"]:
+        failed = set(result["failed_emails"])
+        retry = await job_queue.enqueue(db, "email.user_email_batch", {
+            **payload,
+            "recipients": [recipient for recipient in payload["recipients"] if recipient["to_email"] in failed]
+        })
+        summary.update({"failed": result["failed"], "error": result["error"], "retry_job_id": retry["id"]})
+    return summary
+
+
+async def _mark_design_run_failed(db, payload: dict, error: str):
+    await stand_design_service.mark_run_failed(db, payload["run_id"], error)
+
+
+@job_queue.handler("design.generate_stand_designs", concurrency=2, max_attempts=3,
+                   on_failure=_mark_design_run_failed)
+async def generate_stand_designs(db, payload: dict):
+    """payload: {"run_id"} of a design run created by stand_design_service.create_run"""
+    try:
+        provider = stand_design_service.get_provider()
+    except stand_design_service.DesignProviderNotConfigured as e:
+        raise job_queue.PermanentJobError(str(e))
+    try:
+        run = await stand_design_service.execute_run(db, payload["run_id"], provider)
+    except LookupError as e:
+        raise job_queue.PermanentJobError(str(e))
+    return {"completed": run["completed"], "failed": run["failed"]}
@@ -0,0 +1,349 @@
+"""
+CRM - Job Queue Service
+Durable background jobs stored in MongoDB (no external broker).
+
+Jobs live in the `jobs` collection. A worker claims the next job of a type
+with one atomic `find_one_and_update` (highest priority first, then oldest
+`run_at`) and holds a lease on it that a heartbeat extends while the handler
+runs. If a worker dies, its lease expires and another worker picks the job
+up again. Failed attempts are retried with exponential backoff until
+`max_attempts`; PermanentJobError fails a job at once. An `idempotency_key`
+makes `enqueue()` return the existing job instead of creating a duplicate.
+
+Handlers are registered per job type with their own concurrency:
+
+    @job_queue.handler("email.survey_invitation", concurrency=4)
+    async def send_survey_invitation(db, payload):
+        ...
+        return {"sent": True}          # stored as the job result
+
+    job = await job_queue.enqueue(db, "email.survey_invitation", {...})
+
+Workers run inside the API process (JOB_WORKERS_IN_PROCESS, started by
+server.py) or separately:
+
+    python -m job_worker [--types email.survey_invitation,...] [--worker-id ID]
+"""
+
+import asyncio
+import logging
+import os
+import random
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+JOBS_COLLECTION = "jobs"
+JOB_WORKERS_IN_PROCESS = os.environ.get("JOB_WORKERS_IN_PROCESS", "true").lower() == "true"
+JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", "2"))
+JOB_RETENTION_DAYS = int(os.environ.get("JOB_RETENTION_DAYS", "14"))
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_LEASE_SECONDS = 300
+BACKOFF_BASE_SECONDS = 10
+BACKOFF_MAX_SECONDS = 3600
+MAX_ERROR_HISTORY = 10
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+JobHandler = Callable[..., Awaitable[Optional[Dict]]]
+
+
+class PermanentJobError(Exception):
+    """The job can never succeed (bad payload, missing configuration): fail without retrying"""
+
+
+class JobType:
+    """A registered handler and how its jobs are run"""
+
+    def __init__(self, name: str, func: JobHandler, concurrency: int, max_attempts: int, lease_seconds: int,
+                 on_failure: Optional[Callable[..., Awaitable[None]]] = None):
+        self.name = name
+        self.func = func
+        self.on_failure = on_failure
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+
+
+_job_types: Dict[str, JobType] = {}
+# Wakes in-process workers when a job is enqueued in the same process
+_wakeups: Dict[str, asyncio.Event] = {}
+
+
+def handler(name: str, concurrency: int = 1, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+            lease_seconds: int = DEFAULT_LEASE_SECONDS, on_failure: Optional[Callable[..., Awaitable[None]]] = None):
+    """Register `func(db, payload) -> result` as the handler of job type `name`.
+
+    `on_failure(db, payload, error)` runs once when the job has finally failed.
+    """
+    def register(func: JobHandler) -> JobHandler:
+        _job_types[name] = JobType(name, func, concurrency, max_attempts, lease_seconds, on_failure)
+        return func
+    return register
+
+
+def registered_types() -> List[str]:
+    return sorted(_job_types)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Delay before retry number `attempts`, with jitter so failed jobs do not retry in lockstep"""
+    delay = min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def public_job(job: Dict) -> Dict:
+    job = dict(job)
+    job["id"] = job.pop("_id")
+    return job
+
+
+async def ensure_job_indexes(db):
+    jobs = db[JOBS_COLLECTION]
+    await jobs.create_index([("type", ASCENDING), ("status", ASCENDING), ("priority", DESCENDING), ("run_at", ASCENDING)])
+    await jobs.create_index([("status", ASCENDING), ("lease_until", ASCENDING)])
+    await jobs.create_index(
+        [("idempotency_key", ASCENDING)],
+        unique=True,
+        partialFilterExpression={"idempotency_key": {"$type": "string"}}
+    )
+    await jobs.create_index([("finished_at", ASCENDING)], expireAfterSeconds=JOB_RETENTION_DAYS * 86400)
+
+
+async def enqueue(db, job_type: str, payload: Optional[Dict] = None, priority: int = 0,
+                  idempotency_key: Optional[str] = None, run_at: Optional[datetime] = None,
+                  max_attempts: Optional[int] = None) -> Dict:
+    """Queue a job; with an `idempotency_key` an existing job with that key is returned instead"""
+    registered = _job_types.get(job_type)
+    now = _now()
+    job = {
+        "_id": str(uuid.uuid4()),
+        "type": job_type,
+        "payload": payload or {},
+        "status": QUEUED,
+        "priority": priority,
+        "attempts": 0,
+        "max_attempts": max_attempts or (registered.max_attempts if registered else DEFAULT_MAX_ATTEMPTS),
+        "run_at": run_at or now,
+        "lease_until": None,
+        "locked_by": None,
+        "result": None,
+        "errors": [],
+        "created_at": now,
+        "updated_at": now,
+        "started_at": None,
+        "finished_at": None
+    }
+    if idempotency_key:
+        job["idempotency_key"] = idempotency_key
+    try:
+        await db[JOBS_COLLECTION].insert_one(job)
+    except DuplicateKeyError:
+        existing = await db[JOBS_COLLECTION].find_one({"idempotency_key": idempotency_key})
+        if existing is not None:
+            return public_job(existing)
+        raise
+
+    wakeup = _wakeups.get(job_type)
+    if wakeup is not None:
+        wakeup.set()
+    return public_job(job)
+
+
+async def get_job(db, job_id: str) -> Optional[Dict]:
+    job = await db[JOBS_COLLECTION].find_one({"_id": job_id})
+    return public_job(job) if job else None
+
+
+async def cancel(db, job_id: str) -> bool:
+    """Cancel a job that has not started yet"""
+    result = await db[JOBS_COLLECTION].update_one(
+        {"_id": job_id, "status": QUEUED},
+        {"$set": {"status": CANCELLED, "finished_at": _now(), "updated_at": _now()}}
+    )
+    return result.modified_count == 1
+
+
+async def retry(db, job_id: str) -> bool:
+    """Queue a failed or cancelled job again with a fresh attempt budget"""
+    result = await db[JOBS_COLLECTION].update_one(
+        {"_id": job_id, "status": {"$in": [FAILED, CANCELLED]}},
+        {"$set": {"status": QUEUED, "attempts": 0, "run_at": _now(), "locked_by": None, "finished_at": None,
+                  "updated_at": _now()}}
+    )
+    return result.modified_count == 1
+
+
+async def queue_stats(db) -> Dict:
+    """Job counts per type and status, plus the oldest waiting job per type"""
+    rows = await db[JOBS_COLLECTION].aggregate([
+        {"$group": {
+            "_id": {"type": "$type", "status": "$status"},
+            "count": {"$sum": 1},
+            "oldest_run_at": {"$min": "$run_at"}
+        }}
+    ]).to_list(None)
+    types: Dict[str, Dict] = {}
+    for row in rows:
+        entry = types.setdefault(row["_id"]["type"], {"counts": {}, "oldest_queued_at": None})
+        entry["counts"][row["_id"]["status"]] = row["count"]
+        if row["_id"]["status"] == QUEUED:
+            entry["oldest_queued_at"] = row["oldest_run_at"]
+    return {"types": types, "registered": registered_types()}
+
+
+# ===================== WORKER =====================
+
+class JobWorker:
+    """Runs registered handlers: `concurrency` claim loops per job type"""
+
+    def __init__(self, db, types: Optional[Iterable[str]] = None, worker_id: Optional[str] = None):
+        self.db = db
+        self.jobs = db[JOBS_COLLECTION]
+        self.types = [_job_types[name] for name in (types or registered_types())]
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._stopping = False
+
+    async def claim(self, job_type: JobType) -> Optional[Dict]:
+        """Take the next due job of `job_type`, or one whose lease has expired"""
+        now = _now()
+        return await self.jobs.find_one_and_update(
+            {
+                "type": job_type.name,
+                "$or": [
+                    {"status": QUEUED, "run_at": {"$lte": now}},
+                    {"status": RUNNING, "lease_until": {"$lt": now}}
+                ]
+            },
+            {
+                "$set": {
+                    "status": RUNNING,
+                    "locked_by": self.worker_id,
+                    "lease_until": now + timedelta(seconds=job_type.lease_seconds),
+                    "started_at": now,
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("priority", DESCENDING), ("run_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _heartbeat(self, job: Dict, job_type: JobType):
+        while True:
+            await asyncio.sleep(job_type.lease_seconds / 3)
+            await self.jobs.update_one(
+                {"_id": job["_id"], "locked_by": self.worker_id},
+                {"$set": {"lease_until": _now() + timedelta(seconds=job_type.lease_seconds)}}
+            )
+
+    async def _finish(self, job: Dict, update: Dict):
+        # Only the lease holder may finish a job
+        update["updated_at"] = _now()
+        await self.jobs.update_one(
+            {"_id": job["_id"], "locked_by": self.worker_id, "status": RUNNING},
+            {"$set": update}
+        )
+
+    async def _failed(self, job: Dict, job_type: JobType, error: str):
+        """Run the type's on_failure hook once the job has finally failed"""
+        if job_type.on_failure is None:
+            return
+        try:
+            await job_type.on_failure(self.db, job["payload"], error)
+        except Exception as hook_error:
+            logger.error(f"on_failure of {job['type']} {job['_id']} failed: {str(hook_error)}")
+
+    async def run_job(self, job: Dict, job_type: JobType):
+        if job["attempts"] > job["max_attempts"]:
+            # Reclaimed after expired leases more often than it may be attempted
+            error = f"Lease expired on all {job['max_attempts']} attempts"
+            await self._finish(job, {"status": FAILED, "finished_at": _now(), "locked_by": None,
+                                     "lease_until": None})
+            logger.error(f"Job {job['type']} {job['_id']} failed: {error}")
+            await self._failed(job, job_type, error)
+            return
+        heartbeat = asyncio.create_task(self._heartbeat(job, job_type))
+        try:
+            result = await job_type.func(self.db, job["payload"])
+        except asyncio.CancelledError:
+            # Worker shutdown: hand the job back without using up an attempt
+            await self._finish(job, {"status": QUEUED, "attempts": job["attempts"] - 1,
+                                     "locked_by": None, "lease_until": None})
+            raise
+        except Exception as e:
+            permanent = isinstance(e, PermanentJobError)
+            error = {"attempt": job["attempts"], "error": f"{type(e).__name__}: {str(e)}", "at": _now()}
+            update = {
+                "errors": (job.get("errors") or [])[-(MAX_ERROR_HISTORY - 1):] + [error],
+                "locked_by": None,
+                "lease_until": None
+            }
+            if permanent or job["attempts"] >= job["max_attempts"]:
+                update.update({"status": FAILED, "finished_at": _now()})
+                logger.error(f"Job {job['type']} {job['_id']} failed after {job['attempts']} attempts: {str(e)}")
+                await self._failed(job, job_type, str(e))
+            else:
+                delay = backoff_seconds(job["attempts"])
+                update.update({"status": QUEUED, "run_at": _now() + timedelta(seconds=delay)})
+                logger.warning(f"Job {job['type']} {job['_id']} attempt {job['attempts']} failed, "
+                               f"retrying in {delay:.0f}s: {str(e)}")
+            await self._finish(job, update)
+        else:
+            await self._finish(job, {"status": SUCCEEDED, "result": result, "finished_at": _now(),
+                                     "locked_by": None, "lease_until": None})
+        finally:
+            heartbeat.cancel()
+
+    async def _loop(self, job_type: JobType, wakeup: asyncio.Event):
+        while not self._stopping:
+            try:
+                job = await self.claim(job_type)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Claiming {job_type.name} jobs failed: {str(e)}")
+                job = None
+            if job is not None:
+                try:
+                    await self.run_job(job, job_type)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # e.g. Mongo unavailable while recording the outcome; the job is
+                    # picked up again once its lease expires
+                    logger.error(f"Running {job_type.name} job {job['_id']} failed: {str(e)}")
+                continue
+            wakeup.clear()
+            try:
+                await asyncio.wait_for(wakeup.wait(), JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self):
+        """Run until cancelled"""
+        loops = []
+        for job_type in self.types:
+            wakeup = _wakeups.setdefault(job_type.name, asyncio.Event())
+            loops += [self._loop(job_type, wakeup) for _ in range(job_type.concurrency)]
+        logger.info(f"Job worker {self.worker_id} started: "
+                    f"{', '.join(f'{t.name} x{t.concurrency}' for t in self.types)}")
+        try:
+            await asyncio.gather(*loops)
+        finally:
+            self._stopping = True
@@ -0,0 +1,43 @@
+"""
+Background job worker process
+
+Runs the handlers registered in job_handlers outside the API process. Set
+JOB_WORKERS_IN_PROCESS=false for the API when workers run separately.
+
+Usage:
+    cd backend && python -m job_worker [--types email.survey_invitation,...] [--worker-id ID]
+"""
+import argparse
+import asyncio
+import logging
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+load_dotenv(Path(__file__).parent / '.env')
+
+import job_handlers  # noqa: F401 (registers the handlers)
+import job_queue
+from email_service import email_service
+
+
+async def main(args):
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    db = client[os.environ["DB_NAME"]]
+    await job_queue.ensure_job_indexes(db)
+    types = [name.strip() for name in args.types.split(",")] if args.types else None
+    try:
+        await job_queue.JobWorker(db, types=types, worker_id=args.worker_id).run()
+    finally:
+        await email_service.close()
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("--types", help="Comma separated job types (default: all registered)")
+    parser.add_argument("--worker-id")
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(parser.parse_args()))
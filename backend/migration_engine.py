@@ -0,0 +1,233 @@
+"""
+CRM - Migration Engine
+Streaming, resumable collection copies between databases (tenant onboarding).
+
+Documents are read from a cursor in `_id` order, BATCH_SIZE at a time, and
+several collections are copied concurrently. After every batch the engine
+reads the written documents back, compares a SHA-256 checksum of their BSON
+with the source batch and stores a checkpoint (last `_id`, copied count,
+running checksum) in `migration_checkpoints` of the target database. A run
+that crashes resumes after the last verified batch; batches are idempotent
+because documents keep their source `_id`.
+
+Usage:
+    engine = MigrationEngine(client["vitingo_crm"], client["vitingo_t_acme"], job="acme")
+    results = await engine.run(["customers", ("countries", "global_countries")])
+    print_summary(results)
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import bson
+from pymongo.errors import BulkWriteError, CollectionInvalid
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+CONCURRENCY = 4
+PROGRESS_EVERY_BATCHES = 10
+CHECKPOINT_COLLECTION = "migration_checkpoints"
+DUPLICATE_KEY = 11000
+
+CollectionSpec = Union[str, Tuple[str, str]]
+
+
+class MigrationError(Exception):
+    """A batch could not be copied or did not verify"""
+
+
+def batch_checksum(docs: Sequence[Dict]) -> str:
+    digest = hashlib.sha256()
+    for doc in docs:
+        digest.update(bson.encode(doc))
+    return digest.hexdigest()
+
+
+class CollectionResult:
+    """Progress and throughput of one collection copy"""
+
+    def __init__(self, source: str, target: str):
+        self.source = source
+        self.target = target
+        self.copied = 0
+        self.bytes = 0
+        self.batches = 0
+        self.resumed_from = 0
+        self.source_count = 0
+        self.target_count = 0
+        self.checksum = ""
+        self.seconds = 0.0
+        self.error: Optional[str] = None
+
+    @property
+    def verified(self) -> bool:
+        return self.error is None and self.source_count == self.target_count
+
+    @property
+    def docs_per_second(self) -> float:
+        copied = self.copied - self.resumed_from
+        return copied / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> Dict:
+        return {
+            "source": self.source,
+            "target": self.target,
+            "copied": self.copied,
+            "resumed_from": self.resumed_from,
+            "batches": self.batches,
+            "source_count": self.source_count,
+            "target_count": self.target_count,
+            "checksum": self.checksum,
+            "verified": self.verified,
+            "docs_per_second": round(self.docs_per_second, 1),
+            "mb_per_second": round(self.bytes / self.seconds / 1_000_000, 2) if self.seconds else 0.0,
+            "error": self.error
+        }
+
+
+class MigrationEngine:
+    """Copy collections from `source_db` to `target_db` in verified, checkpointed batches"""
+
+    def __init__(self, source_db, target_db, job: str, batch_size: int = BATCH_SIZE,
+                 concurrency: int = CONCURRENCY, log: Callable[[str], None] = print):
+        self.source_db = source_db
+        self.target_db = target_db
+        self.job = job
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.log = log
+        self.checkpoints = target_db[CHECKPOINT_COLLECTION]
+
+    def _checkpoint_id(self, source: str, target: str) -> str:
+        return f"{self.job}:{self.source_db.name}.{source}->{target}"
+
+    async def run(self, collections: Iterable[CollectionSpec], restart: bool = False) -> Dict[str, CollectionResult]:
+        """Copy every collection (name, or (source, target) pair); `restart` ignores checkpoints"""
+        pairs = [(spec, spec) if isinstance(spec, str) else tuple(spec) for spec in collections]
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(source: str, target: str) -> CollectionResult:
+            async with semaphore:
+                return await self.copy_collection(source, target, restart=restart)
+
+        results = await asyncio.gather(*[bounded(source, target) for source, target in pairs])
+        return {result.source: result for result in results}
+
+    async def copy_collection(self, source: str, target: str, restart: bool = False) -> CollectionResult:
+        result = CollectionResult(source, target)
+        checkpoint_id = self._checkpoint_id(source, target)
+        checkpoint = None if restart else await self.checkpoints.find_one({"_id": checkpoint_id})
+        source_collection = self.source_db[source]
+        target_collection = self.target_db[target]
+
+        query = {}
+        if checkpoint:
+            result.copied = result.resumed_from = checkpoint.get("copied", 0)
+            result.batches = checkpoint.get("batches", 0)
+            result.checksum = checkpoint.get("checksum", "")
+            if checkpoint.get("last_id") is not None:
+                query = {"_id": {"$gt": checkpoint["last_id"]}}
+            if checkpoint.get("status") == "done":
+                self.log(f"   ⏭️  {source}: already migrated ({result.copied} documents)")
+        else:
+            await self.checkpoints.replace_one({"_id": checkpoint_id}, {
+                "_id": checkpoint_id,
+                "job": self.job,
+                "source": f"{self.source_db.name}.{source}",
+                "target": f"{self.target_db.name}.{target}",
+                "status": "running",
+                "copied": 0,
+                "batches": 0,
+                "checksum": "",
+                "last_id": None,
+                "started_at": datetime.now(timezone.utc)
+            }, upsert=True)
+
+        started = time.perf_counter()
+        try:
+            cursor = source_collection.find(query).sort("_id", 1).batch_size(self.batch_size)
+            batch: List[Dict] = []
+            async for doc in cursor:
+                batch.append(doc)
+                if len(batch) >= self.batch_size:
+                    await self._copy_batch(batch, target_collection, result, checkpoint_id)
+                    batch = []
+            if batch:
+                await self._copy_batch(batch, target_collection, result, checkpoint_id)
+
+            result.source_count, result.target_count = await asyncio.gather(
+                source_collection.estimated_document_count(),
+                target_collection.estimated_document_count()
+            )
+            await self.checkpoints.update_one({"_id": checkpoint_id}, {"$set": {
+                "status": "done" if result.verified else "count_mismatch",
+                "source_count": result.source_count,
+                "target_count": result.target_count,
+                "finished_at": datetime.now(timezone.utc)
+            }})
+        except Exception as e:
+            result.error = str(e)
+            logger.error(f"Migration of {source} -> {target} stopped after {result.copied} documents: {str(e)}")
+            await self.checkpoints.update_one({"_id": checkpoint_id}, {"$set": {"status": "failed", "error": str(e)}})
+        result.seconds = time.perf_counter() - started
+        return result
+
+    async def _copy_batch(self, batch: List[Dict], target_collection, result: CollectionResult, checkpoint_id: str):
+        checksum = batch_checksum(batch)
+        try:
+            await target_collection.insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            # Documents written before a crash are already there (same _id)
+            other = [err for err in e.details.get("writeErrors", []) if err.get("code") != DUPLICATE_KEY]
+            if other:
+                raise MigrationError(f"{len(other)} write errors, first: {other[0].get('errmsg')}")
+
+        ids = [doc["_id"] for doc in batch]
+        written = await target_collection.find({"_id": {"$in": ids}}).sort("_id", 1).to_list(None)
+        if batch_checksum(written) != checksum:
+            raise MigrationError(f"Checksum mismatch in batch {result.batches + 1} ({ids[0]} .. {ids[-1]})")
+
+        result.copied += len(batch)
+        result.batches += 1
+        result.bytes += sum(len(bson.encode(doc)) for doc in batch)
+        result.checksum = hashlib.sha256((result.checksum + checksum).encode()).hexdigest()
+        await self.checkpoints.update_one({"_id": checkpoint_id}, {"$set": {
+            "last_id": ids[-1],
+            "copied": result.copied,
+            "batches": result.batches,
+            "checksum": result.checksum,
+            "updated_at": datetime.now(timezone.utc)
+        }})
+        if result.batches % PROGRESS_EVERY_BATCHES == 0:
+            self.log(f"   … {result.source}: {result.copied} documents")
+
+
+async def ensure_collection(db, name: str) -> bool:
+    """Create collection `name` unless it exists, so a migration can be re-run to resume"""
+    try:
+        await db.create_collection(name)
+        return True
+    except CollectionInvalid:
+        return False
+
+
+def print_summary(results: Dict[str, CollectionResult], log: Callable[[str], None] = print):
+    """Per-collection counts, verification and throughput"""
+    total_docs = sum(r.copied - r.resumed_from for r in results.values())
+    total_seconds = max((r.seconds for r in results.values()), default=0.0)
+    for r in results.values():
+        icon = "✅" if r.verified else "❌"
+        line = (f"   {icon} {r.source} -> {r.target}: {r.source_count} → {r.target_count} "
+                f"({r.docs_per_second:.0f} docs/s, {r.batches} batches)")
+        if r.resumed_from:
+            line += f", resumed at {r.resumed_from}"
+        if r.error:
+            line += f" — {r.error}"
+        log(line)
+    if total_seconds:
+        log(f"   📈 {total_docs} documents in {total_seconds:.1f}s ({total_docs / total_seconds:.0f} docs/s)")
@@ -6,9 +6,15 @@ Created: 2025-12-07
 
 import asyncio
 import os
+import sys
+from pathlib import Path
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo import ASCENDING
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from migration_engine import MigrationEngine, ensure_collection, print_summary
+
 # MongoDB connection
 MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 client = AsyncIOMotorClient(MONGO_URL)
@@ -26,45 +32,45 @@ async def create_platform_db_structure():
     
     # 1. Tenants collection
     print("\n🔹 Creating 'tenants' collection...")
-    await platform_db.create_collection("tenants")
+    await ensure_collection(platform_db, "tenants")
     await platform_db.tenants.create_index([("slug", ASCENDING)], unique=True)
     await platform_db.tenants.create_index([("status", ASCENDING)])
     print("   ✅ Tenants collection created with indexes")
     
     # 2. Users collection (platform-level users)
     print("\n🔹 Creating 'users' collection...")
-    await platform_db.create_collection("users")
+    await ensure_collection(platform_db, "users")
     await platform_db.users.create_index([("email", ASCENDING)], unique=True)
     await platform_db.users.create_index([("tenant_id", ASCENDING)])
     print("   ✅ Users collection created with indexes")
     
     # 3. Feature flags collection
     print("\n🔹 Creating 'feature_flags' collection...")
-    await platform_db.create_collection("feature_flags")
+    await ensure_collection(platform_db, "feature_flags")
     await platform_db.feature_flags.create_index([("flag", ASCENDING)], unique=True)
     print("   ✅ Feature flags collection created")
     
     # 4. Packages collection
     print("\n🔹 Creating 'packages' collection...")
-    await platform_db.create_collection("packages")
+    await ensure_collection(platform_db, "packages")
     await platform_db.packages.create_index([("key", ASCENDING)], unique=True)
     print("   ✅ Packages collection created")
     
     # 5. Global data collections
     print("\n🔹 Creating global data collections...")
     for collection_name in ["global_currencies", "global_countries", "global_cities", "global_languages"]:
-        await platform_db.create_collection(collection_name)
+        await ensure_collection(platform_db, collection_name)
         print(f"   ✅ {collection_name} collection created")
     
     # 6. Subscriptions collection
     print("\n🔹 Creating 'subscriptions' collection...")
-    await platform_db.create_collection("subscriptions")
+    await ensure_collection(platform_db, "subscriptions")
     await platform_db.subscriptions.create_index([("tenant_id", ASCENDING)])
     print("   ✅ Subscriptions collection created")
     
     # 7. Invoices collection
     print("\n🔹 Creating 'invoices' collection...")
-    await platform_db.create_collection("invoices")
+    await ensure_collection(platform_db, "invoices")
     await platform_db.invoices.create_index([("tenant_id", ASCENDING)])
     print("   ✅ Invoices collection created")
     
@@ -84,40 +90,22 @@ async def migrate_shared_data():
     source_db = client["crm_db"]
     target_db = client["vitingo_platform"]
     
-    # 1. Migrate feature_flags
-    print("\n🔄 Migrating feature_flags...")
-    flags = await source_db.feature_flags.find({}, {"_id": 0}).to_list(None)
-    if flags:
-        await target_db.feature_flags.insert_many(flags)
-        print(f"   ✅ Migrated {len(flags)} feature flags")
-    else:
-        print("   ⚠️  No feature flags found to migrate")
-    
-    # 2. Migrate packages
-    print("\n🔄 Migrating packages...")
-    packages = await source_db.packages.find({}, {"_id": 0}).to_list(None)
-    if packages:
-        await target_db.packages.insert_many(packages)
-        print(f"   ✅ Migrated {len(packages)} packages")
-    else:
-        print("   ⚠️  No packages found to migrate")
-    
-    # 3. Migrate global data with 'global_' prefix
-    global_collections = [
+    # Streamed in checkpointed batches; a re-run resumes where it stopped
+    engine = MigrationEngine(source_db, target_db, job="platform_shared_data")
+    results = await engine.run([
+        "feature_flags",
+        "packages",
+        # Global data with 'global_' prefix
         ("currencies", "global_currencies"),
         ("countries", "global_countries"),
         ("cities", "global_cities"),
         ("languages", "global_languages")
-    ]
-    
-    for source_col, target_col in global_collections:
-        print(f"\n🔄 Migrating {source_col} -> {target_col}...")
-        data = await source_db[source_col].find({}, {"_id": 0}).to_list(None)
-        if data:
-            await target_db[target_col].insert_many(data)
-            print(f"   ✅ Migrated {len(data)} documents")
-        else:
-            print(f"   ⚠️  No data found in {source_col}")
+    ])
+    print_summary(results)
+    
+    failed = [name for name, result in results.items() if not result.verified]
+    if failed:
+        raise RuntimeError(f"Migration not verified for: {', '.join(failed)} (re-run to resume)")
     
     print("\n" + "="*70)
     print("✅ Data migration completed successfully!")
@@ -6,10 +6,16 @@ Created: 2025-12-07
 
 import asyncio
 import os
+import sys
 from datetime import datetime, timezone
+from pathlib import Path
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo import ASCENDING
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from migration_engine import MigrationEngine, ensure_collection, print_summary
+
 # MongoDB connection
 MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 client = AsyncIOMotorClient(MONGO_URL)
@@ -32,7 +38,7 @@ async def create_tenant_db_structure():
     
     # 1. Customers collection
     print("\n🔹 Creating 'customers' collection...")
-    await tenant_db.create_collection("customers")
+    await ensure_collection(tenant_db, "customers")
     await tenant_db.customers.create_index([("id", ASCENDING)], unique=True)
     await tenant_db.customers.create_index([("email", ASCENDING)])
     await tenant_db.customers.create_index([("company", ASCENDING)])
@@ -40,7 +46,7 @@ async def create_tenant_db_structure():
     
     # 2. Projects collection
     print("\n🔹 Creating 'projects' collection...")
-    await tenant_db.create_collection("projects")
+    await ensure_collection(tenant_db, "projects")
     await tenant_db.projects.create_index([("projectNumber", ASCENDING)], unique=True)
     await tenant_db.projects.create_index([("customerId", ASCENDING)])
     await tenant_db.projects.create_index([("status", ASCENDING)])
@@ -48,28 +54,28 @@ async def create_tenant_db_structure():
     
     # 3. Products collection
     print("\n🔹 Creating 'products' collection...")
-    await tenant_db.create_collection("products")
+    await ensure_collection(tenant_db, "products")
     await tenant_db.products.create_index([("id", ASCENDING)], unique=True)
     await tenant_db.products.create_index([("category", ASCENDING)])
     print("   ✅ Products collection created with indexes")
     
     # 4. Leads collection
     print("\n🔹 Creating 'leads' collection...")
-    await tenant_db.create_collection("leads")
+    await ensure_collection(tenant_db, "leads")
     await tenant_db.leads.create_index([("id", ASCENDING)], unique=True)
     await tenant_db.leads.create_index([("status", ASCENDING)])
     print("   ✅ Leads collection created with indexes")
     
     # 5. Calendar events collection
     print("\n🔹 Creating 'calendar_events' collection...")
-    await tenant_db.create_collection("calendar_events")
+    await ensure_collection(tenant_db, "calendar_events")
     await tenant_db.calendar_events.create_index([("id", ASCENDING)], unique=True)
     await tenant_db.calendar_events.create_index([("start_date", ASCENDING)])
     print("   ✅ Calendar events collection created with indexes")
     
     # 6. Tasks collection
     print("\n🔹 Creating 'tasks' collection...")
-    await tenant_db.create_collection("tasks")
+    await ensure_collection(tenant_db, "tasks")
     await tenant_db.tasks.create_index([("id", ASCENDING)], unique=True)
     await tenant_db.tasks.create_index([("status", ASCENDING)])
     await tenant_db.tasks.create_index([("assigned_to", ASCENDING)])
@@ -77,7 +83,7 @@ async def create_tenant_db_structure():
     
     # 7. Documents collection
     print("\n🔹 Creating 'documents' collection...")
-    await tenant_db.create_collection("documents")
+    await ensure_collection(tenant_db, "documents")
     await tenant_db.documents.create_index([("id", ASCENDING)], unique=True)
     await tenant_db.documents.create_index([("entity_type", ASCENDING)])
     await tenant_db.documents.create_index([("entity_id", ASCENDING)])
@@ -85,7 +91,7 @@ async def create_tenant_db_structure():
     
     # 8. Activities collection
     print("\n🔹 Creating 'activities' collection...")
-    await tenant_db.create_collection("activities")
+    await ensure_collection(tenant_db, "activities")
     await tenant_db.activities.create_index([("id", ASCENDING)], unique=True)
     await tenant_db.activities.create_index([("entity_type", ASCENDING)])
     await tenant_db.activities.create_index([("entity_id", ASCENDING)])
@@ -94,7 +100,7 @@ async def create_tenant_db_structure():
     
     # 9. Settings collection
     print("\n🔹 Creating 'settings' collection...")
-    await tenant_db.create_collection("settings")
+    await ensure_collection(tenant_db, "settings")
     await tenant_db.settings.create_index([("key", ASCENDING)], unique=True)
     print("   ✅ Settings collection created with indexes")
     
@@ -122,41 +128,15 @@ async def migrate_tenant_data():
         "calendar_events"
     ]
     
-    migration_stats = {}
-    
-    for collection_name in collections_to_migrate:
-        print(f"\n🔄 Migrating {collection_name}...")
-        
-        # Check if source collection exists and has data
-        try:
-            source_count = await source_db[collection_name].count_documents({})
-            if source_count == 0:
-                print(f"   ⚠️  No data found in source collection: {collection_name}")
-                migration_stats[collection_name] = 0
-                continue
-            
-            # Fetch all documents (without _id to avoid conflicts)
-            documents = await source_db[collection_name].find({}, {"_id": 0}).to_list(None)
-            
-            if documents:
-                # Insert into target database
-                await target_db[collection_name].insert_many(documents)
-                migration_stats[collection_name] = len(documents)
-                print(f"   ✅ Migrated {len(documents)} documents")
-            else:
-                migration_stats[collection_name] = 0
-                print(f"   ⚠️  No documents to migrate")
-                
-        except Exception as e:
-            print(f"   ❌ Error migrating {collection_name}: {str(e)}")
-            migration_stats[collection_name] = 0
+    # Streamed in checkpointed, checksum-verified batches; a re-run resumes where it stopped
+    engine = MigrationEngine(source_db, target_db, job=TENANT_SLUG)
+    results = await engine.run(collections_to_migrate)
+    migration_stats = {name: result.copied for name, result in results.items()}
     
     print("\n" + "="*70)
     print("✅ Data migration completed!")
     print("\n📊 Migration Summary:")
-    for col, count in migration_stats.items():
-        status_icon = "✅" if count > 0 else "⚠️ "
-        print(f"   {status_icon} {col}: {count} documents")
+    print_summary(results)
     print("="*70)
     
     return migration_stats
@@ -198,7 +178,10 @@ async def create_tenant_record():
         "is_active": True
     }
     
-    # Insert tenant record
+    # Insert tenant record (kept as is when a re-run finds it)
+    if await platform_db.tenants.find_one({"slug": TENANT_SLUG}):
+        print(f"   ⚠️  Tenant record already exists: {TENANT_SLUG}")
+        return
     await platform_db.tenants.insert_one(tenant_record)
     print(f"   ✅ Tenant record created: {TENANT_SLUG}")
     print(f"   📋 Tenant ID: {TENANT_ID}")
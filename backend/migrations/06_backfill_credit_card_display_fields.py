@@ -0,0 +1,75 @@
+"""
+Migration: Backfill masked display fields on credit cards
+Adds cardLast4, cardBrand and maskedCardNumber to existing credit_cards
+documents so the listing endpoints no longer have to decrypt card numbers.
+
+Usage:
+    python migrations/06_backfill_credit_card_display_fields.py [--dry-run]
+"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+# Load environment and make backend modules importable
+ROOT_DIR = Path(__file__).parent.parent
+load_dotenv(ROOT_DIR / '.env')
+sys.path.insert(0, str(ROOT_DIR))
+
+from routes.credit_cards import decrypt_card_number, build_card_display_fields
+
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+DB_NAME = os.environ.get("DB_NAME", "vitingo_crm")
+BATCH_SIZE = 500
+
+
+async def backfill(dry_run: bool = False):
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client[DB_NAME]
+
+    print("=" * 60)
+    print("CREDIT CARD DISPLAY FIELDS BACKFILL")
+    print("=" * 60)
+
+    cursor = db.credit_cards.find(
+        {"maskedCardNumber": {"$exists": False}},
+        {"_id": 0, "id": 1, "encrypted_card_number": 1}
+    )
+
+    updated = 0
+    failed = 0
+    operations = []
+    async for card in cursor:
+        try:
+            card_number = decrypt_card_number(card.get("encrypted_card_number", ""))
+        except Exception as e:
+            failed += 1
+            print(f"⚠️  Could not decrypt card {card.get('id')}: {e}")
+            continue
+
+        operations.append(UpdateOne({"id": card["id"]}, {"$set": build_card_display_fields(card_number)}))
+        if len(operations) >= BATCH_SIZE:
+            if not dry_run:
+                await db.credit_cards.bulk_write(operations, ordered=False)
+            updated += len(operations)
+            operations = []
+
+    if operations:
+        if not dry_run:
+            await db.credit_cards.bulk_write(operations, ordered=False)
+        updated += len(operations)
+
+    prefix = "[DRY RUN] Would update" if dry_run else "✅ Updated"
+    print(f"{prefix} {updated} cards")
+    if failed:
+        print(f"⚠️  {failed} cards could not be decrypted and were skipped")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill(dry_run="--dry-run" in sys.argv))
@@ -0,0 +1,84 @@
+"""
+Migration: Normalize lead activity dates
+Converts ISO string values of leads.last_activity and leads.passive_since to
+BSON dates so the passive lead job and stats can use indexed range queries
+and server-side date arithmetic. Also creates the supporting indexes.
+
+Usage:
+    python migrations/07_normalize_lead_activity_dates.py [--dry-run]
+"""
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+ROOT_DIR = Path(__file__).parent.parent
+load_dotenv(ROOT_DIR / '.env')
+sys.path.insert(0, str(ROOT_DIR))
+
+from passive_lead_service import ensure_passive_lead_indexes
+
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+DB_NAME = os.environ.get("DB_NAME", "vitingo_crm")
+DATE_FIELDS = ["last_activity", "passive_since"]
+BATCH_SIZE = 500
+
+
+def parse_iso(value: str):
+    """Parse an ISO timestamp, treating naive values as UTC"""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+async def normalize(dry_run: bool = False):
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client[DB_NAME]
+
+    print("=" * 60)
+    print("LEAD ACTIVITY DATE NORMALIZATION")
+    print("=" * 60)
+
+    for field in DATE_FIELDS:
+        converted = 0
+        invalid = 0
+        operations = []
+        cursor = db.leads.find({field: {"$type": "string"}}, {"_id": 1, field: 1})
+        async for lead in cursor:
+            try:
+                value = parse_iso(lead[field])
+            except ValueError:
+                invalid += 1
+                print(f"⚠️  Unparseable {field} on lead {lead['_id']}: {lead[field]!r}")
+                continue
+
+            operations.append(UpdateOne({"_id": lead["_id"]}, {"$set": {field: value}}))
+            if len(operations) >= BATCH_SIZE:
+                if not dry_run:
+                    await db.leads.bulk_write(operations, ordered=False)
+                converted += len(operations)
+                operations = []
+
+        if operations:
+            if not dry_run:
+                await db.leads.bulk_write(operations, ordered=False)
+            converted += len(operations)
+
+        prefix = "[DRY RUN] Would convert" if dry_run else "✅ Converted"
+        print(f"{prefix} {converted} '{field}' values ({invalid} invalid)")
+
+    if not dry_run:
+        await ensure_passive_lead_indexes(db)
+        print("✅ Indexes on (status, last_activity) and (status, passive_since) ensured")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(normalize(dry_run="--dry-run" in sys.argv))
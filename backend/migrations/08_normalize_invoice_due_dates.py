@@ -0,0 +1,80 @@
+"""
+Migration: Normalize invoice due dates
+Writes a BSON date `dueAt` for every invoice whose due date is only stored
+as a `dueDate`/`due_date` string, or (main /invoices API) only implied by its
+`date` and `payment_term` days, so the aging report can bucket invoices over
+an indexed date. The original fields are left untouched.
+
+Usage:
+    python migrations/08_normalize_invoice_due_dates.py [--dry-run]
+"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+ROOT_DIR = Path(__file__).parent.parent
+load_dotenv(ROOT_DIR / '.env')
+sys.path.insert(0, str(ROOT_DIR))
+
+from report_service import ensure_report_indexes, invoice_due_at
+
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+DB_NAME = os.environ.get("DB_NAME", "vitingo_crm")
+BATCH_SIZE = 500
+
+
+async def normalize(dry_run: bool = False):
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client[DB_NAME]
+
+    print("=" * 60)
+    print("INVOICE DUE DATE NORMALIZATION")
+    print("=" * 60)
+
+    cursor = db.invoices.find(
+        {"dueAt": {"$exists": False}, "$or": [
+            {"dueDate": {"$nin": [None, ""]}},
+            {"due_date": {"$nin": [None, ""]}},
+            {"payment_term": {"$nin": [None, ""]}}
+        ]},
+        {"_id": 1, "dueDate": 1, "due_date": 1, "date": 1, "payment_term": 1}
+    )
+
+    converted = 0
+    invalid = 0
+    operations = []
+    async for invoice in cursor:
+        due_at = invoice_due_at(invoice)
+        if due_at is None:
+            invalid += 1
+            continue
+
+        operations.append(UpdateOne({"_id": invoice["_id"]}, {"$set": {"dueAt": due_at}}))
+        if len(operations) >= BATCH_SIZE:
+            if not dry_run:
+                await db.invoices.bulk_write(operations, ordered=False)
+            converted += len(operations)
+            operations = []
+
+    if operations:
+        if not dry_run:
+            await db.invoices.bulk_write(operations, ordered=False)
+        converted += len(operations)
+
+    prefix = "[DRY RUN] Would set" if dry_run else "✅ Set"
+    print(f"{prefix} dueAt on {converted} invoices ({invalid} unparseable due dates skipped)")
+
+    if not dry_run:
+        await ensure_report_indexes(db)
+        print("✅ Report indexes ensured")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(normalize(dry_run="--dry-run" in sys.argv))
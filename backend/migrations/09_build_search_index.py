@@ -0,0 +1,57 @@
+"""
+Migration: Build the unified search index
+Creates the `search_index` indexes and fills the collection from customers,
+people, suppliers, opportunities, products, fairs and leads. Safe to re-run:
+each entity's entries are rebuilt from scratch.
+
+Usage:
+    python migrations/09_build_search_index.py [--dry-run] [entity ...]
+"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+ROOT_DIR = Path(__file__).parent.parent
+load_dotenv(ROOT_DIR / '.env')
+sys.path.insert(0, str(ROOT_DIR))
+
+from search_service import SEARCH_ENTITIES, ensure_search_indexes, rebuild
+
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+DB_NAME = os.environ.get("DB_NAME", "vitingo_crm")
+
+
+async def build(entities, dry_run: bool = False):
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client[DB_NAME]
+
+    print("=" * 60)
+    print("SEARCH INDEX BUILD")
+    print("=" * 60)
+
+    for entity in entities:
+        collection = SEARCH_ENTITIES[entity]["collection"]
+        total = await db[collection].count_documents({"status": {"$ne": "deleted"}})
+        print(f"  {entity}: {total} documents")
+
+    if dry_run:
+        print("[DRY RUN] Index not modified")
+    else:
+        await ensure_search_indexes(db)
+        counts = await rebuild(db, entities)
+        for entity, count in counts.items():
+            print(f"✅ Indexed {count} {entity}")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if arg != "--dry-run"]
+    unknown = [arg for arg in args if arg not in SEARCH_ENTITIES]
+    if unknown:
+        sys.exit(f"Unknown entities: {', '.join(unknown)}")
+    asyncio.run(build(args or list(SEARCH_ENTITIES), dry_run="--dry-run" in sys.argv))
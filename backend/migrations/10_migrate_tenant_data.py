@@ -0,0 +1,77 @@
+"""
+Migration: Copy a tenant's data into its tenant database
+Streams the given collections from a source database into the tenant
+database (`database_name` of the tenant record, else vitingo_t_<slug>) with
+the migration engine: concurrent collections, checkpointed and
+checksum-verified batches. Re-running resumes after the last verified batch.
+
+Usage:
+    python migrations/10_migrate_tenant_data.py <tenant_slug> [--source-db vitingo_crm]
+        [--batch-size 1000] [--concurrency 4] [--restart] [--dry-run] [collection ...]
+"""
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+ROOT_DIR = Path(__file__).parent.parent
+load_dotenv(ROOT_DIR / '.env')
+sys.path.insert(0, str(ROOT_DIR))
+
+from migration_engine import BATCH_SIZE, CONCURRENCY, MigrationEngine, print_summary
+
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+DB_NAME = os.environ.get("DB_NAME", "vitingo_crm")
+
+
+async def migrate(args):
+    client = AsyncIOMotorClient(MONGO_URL)
+    source_db = client[args.source_db]
+    tenant = await client["vitingo_platform"].tenants.find_one({"slug": args.tenant_slug})
+    target_name = (tenant or {}).get("database_name", f"vitingo_t_{args.tenant_slug}")
+    target_db = client[target_name]
+
+    collections = args.collections or [
+        name for name in await source_db.list_collection_names() if not name.startswith("system.")
+    ]
+
+    print("=" * 60)
+    print(f"TENANT DATA MIGRATION: {args.source_db} -> {target_name}")
+    print("=" * 60)
+    if tenant is None:
+        print(f"⚠️  No tenant record for '{args.tenant_slug}', using {target_name}")
+
+    for name in collections:
+        print(f"  {name}: ~{await source_db[name].estimated_document_count()} documents")
+
+    if args.dry_run:
+        print("[DRY RUN] No documents copied")
+        client.close()
+        return
+
+    engine = MigrationEngine(source_db, target_db, job=args.tenant_slug,
+                             batch_size=args.batch_size, concurrency=args.concurrency)
+    results = await engine.run(collections, restart=args.restart)
+    print_summary(results)
+
+    failed = [name for name, result in results.items() if not result.verified]
+    client.close()
+    if failed:
+        sys.exit(f"❌ Not verified: {', '.join(failed)} (re-run to resume)")
+    print("✅ Migration verified")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("tenant_slug")
+    parser.add_argument("collections", nargs="*")
+    parser.add_argument("--source-db", default=DB_NAME)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--restart", action="store_true", help="Ignore checkpoints of earlier runs")
+    parser.add_argument("--dry-run", action="store_true")
+    asyncio.run(migrate(parser.parse_args()))
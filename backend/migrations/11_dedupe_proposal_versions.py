@@ -0,0 +1,101 @@
+"""
+Migration: Deduplicate proposal version numbers
+Concurrent POST /proposals/{id}/version calls could store two versions with
+the same version_number. Delta-stored versions need (proposal_id,
+version_number) to be unique, so this gives every duplicate after the first
+(by created_at) a new number after the proposal's last version, moves the
+proposal's current_version along and then creates the unique index.
+
+Only full-snapshot versions are renumbered: a delta is a diff against the
+version before it and cannot move. Delta duplicates are reported and the
+index is not created until they are resolved.
+
+Usage:
+    python migrations/11_dedupe_proposal_versions.py [--dry-run]
+"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, UpdateOne
+
+ROOT_DIR = Path(__file__).parent.parent
+load_dotenv(ROOT_DIR / '.env')
+sys.path.insert(0, str(ROOT_DIR))
+
+from proposal_versioning import DELTA
+
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+DB_NAME = os.environ.get("DB_NAME", "crm_db")
+
+
+async def dedupe(dry_run: bool = False):
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client[DB_NAME]
+
+    print("=" * 60)
+    print("PROPOSAL VERSION DEDUPLICATION")
+    print("=" * 60)
+
+    duplicates = await db.proposal_versions.aggregate([
+        {"$sort": {"created_at": 1}},
+        {"$group": {
+            "_id": {"proposal_id": "$proposal_id", "version_number": "$version_number"},
+            "versions": {"$push": {"_id": "$_id", "storage": "$storage"}},
+            "count": {"$sum": 1}
+        }},
+        {"$match": {"count": {"$gt": 1}}}
+    ], allowDiskUse=True).to_list(length=None)
+
+    renumbered = 0
+    blocked = []
+    next_numbers = {}
+    operations = []
+    for group in duplicates:
+        proposal_id = group["_id"]["proposal_id"]
+        if proposal_id not in next_numbers:
+            last = await db.proposal_versions.find_one(
+                {"proposal_id": proposal_id}, {"version_number": 1}, sort=[("version_number", -1)]
+            )
+            next_numbers[proposal_id] = last["version_number"] + 1
+        for version in group["versions"][1:]:
+            if version.get("storage") == DELTA:
+                blocked.append(f"{proposal_id} v{group['_id']['version_number']} ({version['_id']})")
+                continue
+            operations.append(UpdateOne(
+                {"_id": version["_id"]},
+                {"$set": {"version_number": next_numbers[proposal_id], "renumbered_from": group["_id"]["version_number"]}}
+            ))
+            next_numbers[proposal_id] += 1
+            renumbered += 1
+
+    if not dry_run:
+        if operations:
+            await db.proposal_versions.bulk_write(operations, ordered=False)
+        for proposal_id, next_number in next_numbers.items():
+            await db.proposals.update_one(
+                {"id": proposal_id, "current_version": {"$lt": next_number - 1}},
+                {"$set": {"current_version": next_number - 1}}
+            )
+
+    prefix = "[DRY RUN] Would renumber" if dry_run else "✅ Renumbered"
+    print(f"{prefix} {renumbered} duplicate versions in {len(next_numbers)} proposals")
+
+    if blocked:
+        print(f"❌ {len(blocked)} delta-stored duplicates need manual resolution; unique index not created:")
+        for entry in blocked:
+            print(f"   - {entry}")
+    elif not dry_run:
+        await db.proposal_versions.create_index(
+            [("proposal_id", ASCENDING), ("version_number", ASCENDING)], unique=True
+        )
+        print("✅ Unique (proposal_id, version_number) index created")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(dedupe(dry_run="--dry-run" in sys.argv))
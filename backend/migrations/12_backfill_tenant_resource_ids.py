@@ -0,0 +1,100 @@
+"""
+Migration: Backfill id and version on tenant resource documents
+The tenant create endpoints before the generic resource router inserted the
+request body as sent, so banks, briefs, contracts etc. may lack `id` and
+`version`. Those documents cannot be fetched or updated by id, break keyset
+pagination and make the unique `id` index of TenantResource.index_specs()
+fail as soon as a collection holds two of them. This gives every such
+document `id = uuid4()` and `version = 1` in every tenant database, then
+builds the resource indexes.
+
+Usage:
+    python migrations/12_backfill_tenant_resource_ids.py [--dry-run] [tenant_slug ...]
+"""
+import asyncio
+import os
+import sys
+import uuid
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import IndexModel, UpdateOne
+
+ROOT_DIR = Path(__file__).parent.parent
+load_dotenv(ROOT_DIR / '.env')
+sys.path.insert(0, str(ROOT_DIR))
+
+from tenant_resources import TENANT_RESOURCES
+
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+BATCH_SIZE = 500
+
+
+async def backfill_collection(collection, dry_run: bool):
+    """(ids set, versions set) for one resource collection"""
+    ids = 0
+    operations = []
+    async for doc in collection.find({"id": None}, {"_id": 1}):
+        operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"id": str(uuid.uuid4())}}))
+        if len(operations) >= BATCH_SIZE:
+            if not dry_run:
+                await collection.bulk_write(operations, ordered=False)
+            ids += len(operations)
+            operations = []
+    if operations:
+        if not dry_run:
+            await collection.bulk_write(operations, ordered=False)
+        ids += len(operations)
+
+    if dry_run:
+        versions = await collection.count_documents({"version": None})
+    else:
+        versions = (await collection.update_many({"version": None}, {"$set": {"version": 1}})).modified_count
+    return ids, versions
+
+
+async def backfill(dry_run: bool = False, slugs=None):
+    client = AsyncIOMotorClient(MONGO_URL)
+    query = {"slug": {"$in": slugs}} if slugs else {}
+    tenants = await client["vitingo_platform"].tenants.find(
+        query, {"_id": 0, "slug": 1, "database_name": 1}
+    ).to_list(length=None)
+
+    print("=" * 60)
+    print("TENANT RESOURCE ID / VERSION BACKFILL")
+    print("=" * 60)
+
+    total_ids = total_versions = 0
+    for tenant in tenants:
+        db = client[tenant.get("database_name", f"vitingo_t_{tenant['slug']}")]
+        existing = set(await db.list_collection_names())
+        print(f"{tenant['slug']} ({db.name})")
+        for resource in TENANT_RESOURCES:
+            if resource.collection not in existing:
+                continue
+            collection = db[resource.collection]
+            ids, versions = await backfill_collection(collection, dry_run)
+            total_ids += ids
+            total_versions += versions
+            if ids or versions:
+                print(f"  {resource.collection}: {ids} ids, {versions} versions")
+            if not dry_run:
+                # Safe now that every document has a distinct id
+                await collection.create_indexes([
+                    IndexModel(keys, **options) for keys, options in resource.index_specs()
+                ])
+
+    prefix = "[DRY RUN] Would set" if dry_run else "✅ Set"
+    print(f"{prefix} {total_ids} ids and {total_versions} versions in {len(tenants)} tenants")
+    if not dry_run:
+        print("✅ Tenant resource indexes created")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill(
+        dry_run="--dry-run" in sys.argv,
+        slugs=[arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    ))
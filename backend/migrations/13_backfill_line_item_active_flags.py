@@ -0,0 +1,53 @@
+"""
+Migration: Backfill is_active on proposal line items and recompute totals
+add_line_item used to insert line items without `is_active`, and proposal
+totals only counted `is_active: True`, so the stored pricing_summary of
+existing proposals leaves those items out while the proposal views show
+them. Line item edits now move the totals by deltas, which never repair that
+base. This sets `is_active: True` where it is missing and recomputes the
+pricing summary of every proposal once.
+
+Usage:
+    python migrations/13_backfill_line_item_active_flags.py [--dry-run]
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+ROOT_DIR = Path(__file__).parent.parent
+load_dotenv(ROOT_DIR / '.env')
+sys.path.insert(0, str(ROOT_DIR))
+
+from proposal_service import db, recalculate_proposal_totals
+
+
+async def backfill(dry_run: bool = False):
+    print("=" * 60)
+    print("PROPOSAL LINE ITEM is_active BACKFILL")
+    print("=" * 60)
+
+    missing = {"is_active": {"$exists": False}}
+    if dry_run:
+        flagged = await db.proposal_line_items.count_documents(missing)
+    else:
+        flagged = (await db.proposal_line_items.update_many(missing, {"$set": {"is_active": True}})).modified_count
+
+    proposal_ids = await db.proposals.distinct("id")
+    if not dry_run:
+        for index, proposal_id in enumerate(proposal_ids, 1):
+            await recalculate_proposal_totals(proposal_id)
+            if index % 500 == 0:
+                print(f"  {index}/{len(proposal_ids)} proposals recalculated")
+
+    prefix = "[DRY RUN] Would set" if dry_run else "✅ Set"
+    print(f"{prefix} is_active on {flagged} line items")
+    prefix = "[DRY RUN] Would recalculate" if dry_run else "✅ Recalculated"
+    print(f"{prefix} totals of {len(proposal_ids)} proposals")
+
+    db.client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill(dry_run="--dry-run" in sys.argv))
@@ -0,0 +1,193 @@
+"""
+Keyset Pagination for List Endpoints
+Opaque cursors on (sort_key, id), field projection and optional counts.
+
+Usage:
+    @api_router.get("/customers")
+    async def get_customers(page_params: PageParams = Depends()):
+        if page_params.legacy:
+            ...  # old unpaginated response
+        page = await fetch_page(db.customers, {}, page_params, sort_key="createdAt")
+        return page.to_response()
+
+Until the frontend is migrated, requests without `cursor`/`limit` keep the
+legacy unpaginated response. Set LEGACY_LIST_RESPONSES=false to paginate
+every request with DEFAULT_PAGE_SIZE.
+"""
+
+import base64
+import json
+import os
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Type
+
+from fastapi import HTTPException, Query
+from pydantic import BaseModel
+from pymongo import ASCENDING, DESCENDING
+
+from json_response import FastJSONResponse
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+# count=estimate with a filter stops counting here
+ESTIMATE_COUNT_CAP = 10000
+LEGACY_LIST_RESPONSES = os.environ.get("LEGACY_LIST_RESPONSES", "true").lower() == "true"
+
+FIELD_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_][A-Za-z0-9_.]*$")
+
+# (collection, sort_key) pairs used by paginated list endpoints
+PAGINATED_COLLECTIONS = [
+    ("customers", "createdAt"),
+    ("people", "created_at"),
+    ("opportunities", "created_at"),
+    ("invoices", "created_at"),
+    ("suppliers", "created_at"),
+    ("customer_prospects", "created_at"),
+    ("expense_receipts", "created_at"),
+    ("advances", "created_at"),
+    ("leads", "created_at"),
+    ("projects", "created_at"),
+]
+
+
+class PageParams:
+    """Query parameters shared by all paginated list endpoints (use with Depends())"""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+        fields: Optional[str] = Query(None, description="Comma separated list of fields to return"),
+        count: Optional[str] = Query(None, pattern="^(estimate|exact)$", description="Include total count"),
+    ):
+        self.cursor = cursor
+        self.limit = limit or DEFAULT_PAGE_SIZE
+        self.fields = parse_fields(fields)
+        self.count = count
+        self.legacy = LEGACY_LIST_RESPONSES and cursor is None and limit is None
+
+
+class Page:
+    """A single page of documents plus the cursor for the next one"""
+
+    def __init__(self, items: List[Dict], next_cursor: Optional[str], projected: bool,
+                 total: Optional[int] = None, total_is_estimate: bool = False):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.projected = projected
+        self.total = total
+        self.total_is_estimate = total_is_estimate
+
+    def to_response(self, model: Optional[Type[BaseModel]] = None) -> FastJSONResponse:
+        """Build the JSON envelope. Full documents are shaped by `model` like the legacy response."""
+        items = self.items
+        if model is not None and not self.projected:
+            items = [model(**item) for item in items]
+
+        content = {
+            "items": items,
+            "next_cursor": self.next_cursor,
+            "has_more": self.next_cursor is not None,
+        }
+        if self.total is not None:
+            content["total"] = self.total
+            content["total_is_estimate"] = self.total_is_estimate
+        return FastJSONResponse(content=content)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Validate a `fields=` parameter into a list of field names"""
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    for name in names:
+        if not FIELD_NAME_PATTERN.match(name):
+            raise HTTPException(status_code=400, detail=f"Geçersiz alan adı: {name}")
+    return names or None
+
+
+def encode_cursor(sort_value: Any, doc_id: str) -> str:
+    """Encode the last (sort_value, id) of a page into an opaque cursor"""
+    if isinstance(sort_value, datetime):
+        value = {"t": "dt", "v": sort_value.isoformat()}
+    else:
+        value = {"t": "raw", "v": sort_value}
+    raw = json.dumps([value, doc_id], separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Decode a cursor back into (sort_value, id)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, doc_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        sort_value = datetime.fromisoformat(value["v"]) if value["t"] == "dt" else value["v"]
+        return sort_value, doc_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Geçersiz sayfalama imleci (cursor)")
+
+
+def keyset_filter(sort_key: str, sort_value: Any, doc_id: str, descending: bool) -> Dict:
+    """Documents strictly after (sort_value, doc_id) in (sort_key, id) order.
+
+    MongoDB sorts null/missing values lowest, so they come last when descending
+    and first when ascending.
+    """
+    op = "$lt" if descending else "$gt"
+    if sort_value is None:
+        clauses = [{sort_key: None, "id": {op: doc_id}}]
+        if not descending:
+            clauses.append({sort_key: {"$ne": None}})
+    else:
+        clauses = [{sort_key: {op: sort_value}}, {sort_key: sort_value, "id": {op: doc_id}}]
+        if descending:
+            clauses.append({sort_key: None})
+    return {"$or": clauses}
+
+
+async def fetch_page(collection, query: Dict, params: PageParams, sort_key: str = "created_at",
+                     descending: bool = True) -> Page:
+    """Fetch one page of `collection` matching `query`, ordered by (sort_key, id)"""
+    page_query = query
+    if params.cursor:
+        sort_value, doc_id = decode_cursor(params.cursor)
+        cursor_filter = keyset_filter(sort_key, sort_value, doc_id, descending)
+        page_query = {"$and": [query, cursor_filter]} if query else cursor_filter
+
+    projection = {"_id": 0}
+    if params.fields:
+        projection.update({name: 1 for name in params.fields})
+        projection.update({sort_key: 1, "id": 1})
+
+    direction = DESCENDING if descending else ASCENDING
+    docs = await collection.find(page_query, projection).sort(
+        [(sort_key, direction), ("id", direction)]
+    ).limit(params.limit + 1).to_list(params.limit + 1)
+
+    next_cursor = None
+    if len(docs) > params.limit:
+        docs = docs[:params.limit]
+        last = docs[-1]
+        next_cursor = encode_cursor(last.get(sort_key), last.get("id"))
+
+    total = None
+    total_is_estimate = False
+    if params.count == "exact":
+        total = await collection.count_documents(query)
+    elif params.count == "estimate":
+        if query:
+            total = await collection.count_documents(query, limit=ESTIMATE_COUNT_CAP)
+            total_is_estimate = total >= ESTIMATE_COUNT_CAP
+        else:
+            total = await collection.estimated_document_count()
+            total_is_estimate = True
+
+    return Page(docs, next_cursor, projected=params.fields is not None,
+                total=total, total_is_estimate=total_is_estimate)
+
+
+async def ensure_pagination_indexes(db):
+    """Compound (sort_key, id) indexes backing keyset pagination"""
+    for collection_name, sort_key in PAGINATED_COLLECTIONS:
+        await db[collection_name].create_index([(sort_key, DESCENDING), ("id", DESCENDING)])
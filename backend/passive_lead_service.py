@@ -0,0 +1,158 @@
+"""
+CRM - Passive Lead Service
+20-day inactivity rule for leads, run as set-based MongoDB operations.
+
+All queries assume `last_activity` and `passive_since` are stored as BSON dates
+(see migrations/07_normalize_lead_activity_dates.py for existing ISO strings).
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Optional
+
+from pymongo import ASCENDING
+
+logger = logging.getLogger(__name__)
+
+PASSIVE_THRESHOLD_DAYS = 20
+APPROACHING_WINDOW_DAYS = 5
+RECENTLY_PASSIVE_DAYS = 7
+MS_PER_DAY = 24 * 60 * 60 * 1000
+
+# How often the background job applies the rule (seconds)
+PASSIVE_LEAD_JOB_INTERVAL = int(os.environ.get("PASSIVE_LEAD_JOB_INTERVAL", "3600"))
+
+
+def _days_since(field: str, now: datetime) -> Dict:
+    """Aggregation expression: whole days between `field` and `now`"""
+    return {"$toLong": {"$floor": {"$divide": [{"$subtract": [now, f"${field}"]}, MS_PER_DAY]}}}
+
+
+async def ensure_passive_lead_indexes(db):
+    """Indexes backing the transfer job, candidate check and stats"""
+    await db.leads.create_index([("status", ASCENDING), ("last_activity", ASCENDING)])
+    await db.leads.create_index([("status", ASCENDING), ("passive_since", ASCENDING)])
+
+
+async def transfer_stale_leads(db, threshold_days: int = PASSIVE_THRESHOLD_DAYS, now: Optional[datetime] = None) -> Dict:
+    """Move active leads with no activity for `threshold_days` to passive in one update_many.
+
+    `reason` and `passive_since` are computed server-side with a pipeline update.
+    """
+    now = now or datetime.now(timezone.utc)
+    cutoff_date = now - timedelta(days=threshold_days)
+
+    result = await db.leads.update_many(
+        {"status": "active", "last_activity": {"$lte": cutoff_date}},
+        [{
+            "$set": {
+                "status": "passive",
+                "passive_since": now,
+                "reason": {
+                    "$concat": [
+                        {"$toString": _days_since("last_activity", now)},
+                        " gün boyunca işlem yok - Otomatik transfer"
+                    ]
+                }
+            }
+        }]
+    )
+
+    transferred_value = 0
+    if result.modified_count:
+        # passive_since == now identifies exactly the leads moved by this run
+        totals = await db.leads.aggregate([
+            {"$match": {"status": "passive", "passive_since": now}},
+            {"$group": {"_id": None, "value": {"$sum": {"$ifNull": ["$value", 0]}}}}
+        ]).to_list(1)
+        transferred_value = totals[0]["value"] if totals else 0
+
+    return {
+        "transferred_count": result.modified_count,
+        "transferred_value": transferred_value,
+        "threshold_days": threshold_days
+    }
+
+
+async def get_passive_candidates(db, threshold_days: int = PASSIVE_THRESHOLD_DAYS, now: Optional[datetime] = None) -> Dict:
+    """Active leads past or within APPROACHING_WINDOW_DAYS of the threshold"""
+    now = now or datetime.now(timezone.utc)
+    window_cutoff = now - timedelta(days=threshold_days - APPROACHING_WINDOW_DAYS)
+
+    candidates = await db.leads.aggregate([
+        {"$match": {"status": "active", "last_activity": {"$lte": window_cutoff}}},
+        {"$project": {
+            "_id": 0,
+            "id": 1,
+            "name": 1,
+            "value": {"$ifNull": ["$value", 0]},
+            "last_activity": 1,
+            "days_inactive": _days_since("last_activity", now)
+        }},
+        {"$sort": {"days_inactive": -1}}
+    ]).to_list(length=None)
+
+    result = {
+        "ready_for_transfer": [],
+        "approaching_threshold": [],
+        "threshold_days": threshold_days
+    }
+    for lead in candidates:
+        lead["last_activity"] = lead["last_activity"].isoformat()
+        if lead["days_inactive"] >= threshold_days:
+            result["ready_for_transfer"].append(lead)
+        else:
+            lead["days_until_passive"] = threshold_days - lead["days_inactive"]
+            result["approaching_threshold"].append(lead)
+
+    return result
+
+
+async def get_passive_stats(db, now: Optional[datetime] = None) -> Dict:
+    """Count, total value, recent transfers and average passive days in one pass"""
+    now = now or datetime.now(timezone.utc)
+    recent_cutoff = now - timedelta(days=RECENTLY_PASSIVE_DAYS)
+
+    stats = await db.leads.aggregate([
+        {"$match": {"status": "passive"}},
+        {"$group": {
+            "_id": None,
+            "total": {"$sum": 1},
+            "value": {"$sum": {"$ifNull": ["$value", 0]}},
+            "recent": {"$sum": {"$cond": [{"$gte": ["$passive_since", recent_cutoff]}, 1, 0]}},
+            "passive_days": {"$sum": {
+                "$cond": [
+                    {"$eq": [{"$type": "$passive_since"}, "date"]},
+                    _days_since("passive_since", now),
+                    0
+                ]
+            }}
+        }}
+    ]).to_list(1)
+
+    if not stats:
+        return {"total_passive_leads": 0, "recently_passive": 0, "passive_value": 0, "average_passive_days": 0}
+
+    row = stats[0]
+    return {
+        "total_passive_leads": row["total"],
+        "recently_passive": row["recent"],
+        "passive_value": row["value"],
+        "average_passive_days": row["passive_days"] / row["total"] if row["total"] else 0
+    }
+
+
+async def run_passive_lead_job(db, interval: int = PASSIVE_LEAD_JOB_INTERVAL):
+    """Background loop applying the 20-day rule every `interval` seconds"""
+    while True:
+        try:
+            result = await transfer_stale_leads(db)
+            if result["transferred_count"]:
+                logger.info(f"Passive lead job: {result['transferred_count']} leads transferred")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Passive lead job failed: {str(e)}")
+        await asyncio.sleep(interval)
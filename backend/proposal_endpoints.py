@@ -3,6 +3,7 @@ Proposal Module API Endpoints
 """
 
 from proposal_service import *
+import proposal_versioning
 
 # ===================== PROPOSAL PROFILES ENDPOINTS =====================
 
@@ -217,27 +218,12 @@ async def get_proposals(
 async def get_proposal_detail(proposal_id: str):
     """Get proposal with all modules and line items"""
     try:
-        proposal = await db.proposals.find_one({"id": proposal_id}, {"_id": 0})
-        if not proposal:
+        # Proposal, modules and line items in a single $lookup query
+        detail = await get_proposal_aggregate({"id": proposal_id})
+        if not detail:
             raise HTTPException(status_code=404, detail="Proposal not found")
         
-        # Get modules
-        modules = await db.proposal_modules.find(
-            {"proposal_id": proposal_id},
-            {"_id": 0}
-        ).sort("display_order", 1).to_list(length=None)
-        
-        # Get line items
-        line_items = await db.proposal_line_items.find(
-            {"proposal_id": proposal_id},
-            {"_id": 0}
-        ).sort("display_order", 1).to_list(length=None)
-        
-        return {
-            "proposal": proposal,
-            "modules": modules,
-            "line_items": line_items
-        }
+        return detail
     except HTTPException:
         raise
     except Exception as e:
@@ -343,31 +329,34 @@ async def create_version(proposal_id: str, version_data: dict):
         modules = await db.proposal_modules.find(
             {"proposal_id": proposal_id},
             {"_id": 0}
-        ).to_list(length=None)
+        ).sort("display_order", 1).to_list(length=None)
         
         line_items = await db.proposal_line_items.find(
             {"proposal_id": proposal_id},
             {"_id": 0}
-        ).to_list(length=None)
+        ).sort("display_order", 1).to_list(length=None)
         
         # Create version snapshot
         version_number = proposal.get("current_version", 1) + 1
+        snapshot = {
+            "modules": modules,
+            "line_items": line_items,
+            "pricing_summary": proposal.get("pricing_summary"),
+            "settings": proposal.get("settings")
+        }
         
+        # Stored as a diff against the previous version, or as a full checkpoint
         version = ProposalVersion(
             proposal_id=proposal_id,
             version_number=version_number,
             version_name=version_data.get("version_name", f"Versiyon {version_number}"),
-            snapshot={
-                "modules": modules,
-                "line_items": line_items,
-                "pricing_summary": proposal.get("pricing_summary"),
-                "settings": proposal.get("settings")
-            },
             changes_summary=version_data.get("changes_summary", ""),
-            created_by=version_data.get("user_id", "")
+            created_by=version_data.get("user_id", ""),
+            **await proposal_versioning.prepare_version(db, proposal_id, snapshot)
         )
         
         await db.proposal_versions.insert_one(version.dict())
+        version.snapshot = snapshot
         
         # Update proposal version number
         await db.proposals.update_one(
@@ -389,19 +378,41 @@ async def create_version(proposal_id: str, version_data: dict):
         logger.error(f"Error creating version: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@proposal_router.get("/proposals/{proposal_id}/versions", response_model=List[ProposalVersion])
+@proposal_router.get("/proposals/{proposal_id}/versions", response_model=List[ProposalVersionSummary])
 async def get_versions(proposal_id: str):
-    """Get all versions of a proposal"""
+    """Get all versions of a proposal (metadata only, see GET .../versions/{version_number})"""
     try:
         versions = await db.proposal_versions.find(
             {"proposal_id": proposal_id},
-            {"_id": 0}
+            proposal_versioning.METADATA_PROJECTION
         ).sort("version_number", -1).to_list(length=None)
-        return [ProposalVersion(**v) for v in versions]
+        return [ProposalVersionSummary(**v) for v in versions]
     except Exception as e:
         logger.error(f"Error fetching versions: {str(e)}")
         return []
 
+@proposal_router.get("/proposals/{proposal_id}/versions/{version_number}", response_model=ProposalVersion)
+async def get_version(proposal_id: str, version_number: int):
+    """Get one version with its full snapshot, rebuilt from the nearest checkpoint"""
+    try:
+        version = await db.proposal_versions.find_one(
+            {"proposal_id": proposal_id, "version_number": version_number},
+            proposal_versioning.METADATA_PROJECTION
+        )
+        if not version:
+            raise HTTPException(status_code=404, detail="Version not found")
+        
+        snapshot = await proposal_versioning.load_snapshot(db, proposal_id, version_number)
+        if snapshot is None:
+            raise HTTPException(status_code=500, detail="Version snapshot could not be rebuilt")
+        
+        return ProposalVersion(**version, snapshot=snapshot)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching version: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @proposal_router.get("/proposals/{proposal_id}/activities", response_model=List[ProposalActivity])
 async def get_activities(proposal_id: str):
     """Get all activities for a proposal"""
@@ -530,6 +541,7 @@ async def add_line_item(proposal_id: str, item_input: dict):
             "tax_rate": item_input.get("tax_rate", 0.0),
             "display_order": item_input.get("display_order", 0),
             "notes": item_input.get("notes", ""),
+            "is_active": True,
             "created_at": datetime.now(timezone.utc),
             "updated_at": datetime.now(timezone.utc)
         }
@@ -539,8 +551,8 @@ async def add_line_item(proposal_id: str, item_input: dict):
         
         await db.proposal_line_items.insert_one(item_data)
         
-        # Recalculate proposal totals
-        await recalculate_proposal_totals(proposal_id)
+        # Move proposal totals by the new item
+        await apply_line_item_delta(proposal_id, None, item_data)
         
         # Log activity
         await log_activity(
@@ -558,17 +570,39 @@ async def add_line_item(proposal_id: str, item_input: dict):
 async def update_line_item(proposal_id: str, item_id: str, item_update: dict):
     """Update a line item"""
     try:
-        # Calculate totals
-        item_update = await calculate_line_item_totals(item_update)
-        item_update["updated_at"] = datetime.now(timezone.utc)
-        
-        await db.proposal_line_items.update_one(
-            {"id": item_id, "proposal_id": proposal_id},
-            {"$set": item_update}
-        )
+        item_update.pop("_id", None)
+        item_update.pop("id", None)
+        item_update.pop("proposal_id", None)
+        
+        # The totals delta is taken against the stored item, so the write only goes
+        # through while the fields it depends on are unchanged; a concurrent update
+        # of the same item makes this one re-read and recalculate
+        for _ in range(5):
+            existing = await db.proposal_line_items.find_one({"id": item_id, "proposal_id": proposal_id}, {"_id": 0})
+            if not existing:
+                raise HTTPException(status_code=404, detail="Line item not found")
+            
+            # Calculate totals (fields missing from a partial update keep their stored values)
+            updated = await calculate_line_item_totals({**existing, **item_update})
+            updated["updated_at"] = datetime.now(timezone.utc)
+            
+            result = await db.proposal_line_items.update_one(
+                {
+                    "id": item_id,
+                    "proposal_id": proposal_id,
+                    "subtotal": existing.get("subtotal"),
+                    "tax_amount": existing.get("tax_amount"),
+                    "is_active": existing.get("is_active")
+                },
+                {"$set": updated}
+            )
+            if result.matched_count:
+                break
+        else:
+            raise HTTPException(status_code=409, detail="Line item is being updated concurrently, please retry")
         
-        # Recalculate proposal totals
-        await recalculate_proposal_totals(proposal_id)
+        # Move proposal totals by the difference
+        await apply_line_item_delta(proposal_id, existing, updated)
         
         # Log activity
         await log_activity(
@@ -577,8 +611,9 @@ async def update_line_item(proposal_id: str, item_id: str, item_update: dict):
             "Kalem güncellendi"
         )
         
-        updated = await db.proposal_line_items.find_one({"id": item_id}, {"_id": 0})
         return ProposalLineItem(**updated)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error updating line item: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -587,12 +622,15 @@ async def update_line_item(proposal_id: str, item_id: str, item_update: dict):
 async def delete_line_item(proposal_id: str, item_id: str):
     """Delete a line item"""
     try:
-        result = await db.proposal_line_items.delete_one({"id": item_id, "proposal_id": proposal_id})
-        if result.deleted_count == 0:
+        deleted = await db.proposal_line_items.find_one_and_delete(
+            {"id": item_id, "proposal_id": proposal_id},
+            {"_id": 0}
+        )
+        if not deleted:
             raise HTTPException(status_code=404, detail="Line item not found")
         
-        # Recalculate proposal totals
-        await recalculate_proposal_totals(proposal_id)
+        # Take the removed item out of the proposal totals
+        await apply_line_item_delta(proposal_id, deleted, None)
         
         # Log activity
         await log_activity(
@@ -614,21 +652,11 @@ async def delete_line_item(proposal_id: str, item_id: str):
 async def get_public_proposal(token: str):
     """Public proposal view for customers"""
     try:
-        proposal = await db.proposals.find_one({"public_token": token}, {"_id": 0})
-        if not proposal:
+        # Proposal with its active modules and line items in a single query
+        detail = await get_proposal_aggregate({"public_token": token}, active_only=True)
+        if not detail:
             raise HTTPException(status_code=404, detail="Proposal not found")
-        
-        # Get modules
-        modules = await db.proposal_modules.find(
-            {"proposal_id": proposal["id"], "is_active": True},
-            {"_id": 0}
-        ).sort("display_order", 1).to_list(length=None)
-        
-        # Get line items
-        line_items = await db.proposal_line_items.find(
-            {"proposal_id": proposal["id"], "is_active": True},
-            {"_id": 0}
-        ).sort("display_order", 1).to_list(length=None)
+        proposal = detail["proposal"]
         
         # Update tracking - first view
         update_data = {
@@ -653,11 +681,7 @@ async def get_public_proposal(token: str):
             actor_type="customer"
         )
         
-        return {
-            "proposal": proposal,
-            "modules": modules,
-            "line_items": line_items
-        }
+        return detail
     except HTTPException:
         raise
     except Exception as e:
@@ -8,6 +8,8 @@ from pydantic import BaseModel, Field
 from typing import List, Dict, Optional, Any
 from datetime import datetime, timezone
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure
 import uuid
 import os
 import logging
@@ -336,6 +338,23 @@ class ProposalVersion(BaseModel):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     was_sent: bool = False
     sent_at: Optional[datetime] = None
+    # "full": snapshot holds everything, "delta": diff against base_version (proposal_versioning)
+    storage: str = "full"
+    delta: Optional[Dict[str, Any]] = None
+    base_version: Optional[int] = None
+    chain_length: int = 0
+
+class ProposalVersionSummary(BaseModel):
+    id: str
+    proposal_id: str
+    version_number: int
+    version_name: Optional[str] = ""
+    changes_summary: Optional[str] = ""
+    created_by: str
+    created_at: datetime
+    was_sent: bool = False
+    sent_at: Optional[datetime] = None
+    storage: str = "full"
 
 class ProposalActivity(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -542,7 +561,7 @@ async def recalculate_proposal_totals(proposal_id: str):
     # Get all active line items
     line_items = await db.proposal_line_items.find({
         "proposal_id": proposal_id,
-        "is_active": True
+        "is_active": {"$ne": False}
     }, {"_id": 0}).to_list(length=None)
     
     subtotal = sum(item.get("subtotal", 0.0) for item in line_items)
@@ -584,4 +603,104 @@ async def recalculate_proposal_totals(proposal_id: str):
         }}
     )
 
+def _line_item_contribution(item: Optional[dict]) -> tuple:
+    """(subtotal, tax_amount) an item adds to the proposal; inactive items add nothing"""
+    if not item or item.get("is_active", True) is False:
+        return 0.0, 0.0
+    return item.get("subtotal", 0.0), item.get("tax_amount", 0.0)
+
+def _pricing_field(field: str) -> dict:
+    return {"$ifNull": [f"$pricing_summary.{field}", 0.0]}
+
+async def apply_line_item_delta(proposal_id: str, old_item: Optional[dict], new_item: Optional[dict]):
+    """Update pricing_summary by the difference between the old and new line item
+    
+    old_item is None for an added item, new_item is None for a deleted one.
+    Instead of reloading every line item, subtotal and tax are moved by the
+    item's difference, and the discount and total are derived from the new
+    subtotal exactly like recalculate_proposal_totals does, all in one
+    pipeline update that reads the current discount atomically.
+    """
+    old_subtotal, old_tax = _line_item_contribution(old_item)
+    new_subtotal, new_tax = _line_item_contribution(new_item)
+    subtotal_delta = new_subtotal - old_subtotal
+    tax_delta = new_tax - old_tax
+    if not subtotal_delta and not tax_delta:
+        return
+    
+    discount = {"$switch": {
+        "branches": [
+            {
+                "case": {"$eq": ["$pricing_summary.discount_type", "percentage"]},
+                "then": {"$multiply": ["$pricing_summary.subtotal", {"$divide": [_pricing_field("discount_value"), 100]}]}
+            },
+            {"case": {"$eq": ["$pricing_summary.discount_type", "fixed"]}, "then": _pricing_field("discount_value")}
+        ],
+        "default": 0.0
+    }}
+    await db.proposals.update_one(
+        {"id": proposal_id},
+        [
+            {"$set": {
+                "pricing_summary.subtotal": {"$round": [{"$add": [_pricing_field("subtotal"), subtotal_delta]}, 2]},
+                "pricing_summary.tax_amount": {"$round": [{"$add": [_pricing_field("tax_amount"), tax_delta]}, 2]}
+            }},
+            {"$set": {
+                "pricing_summary.discount_amount": {"$round": [discount, 2]},
+                "pricing_summary.total": {"$round": [
+                    {"$add": [{"$subtract": ["$pricing_summary.subtotal", discount]}, "$pricing_summary.tax_amount"]}, 2
+                ]},
+                "updated_at": datetime.now(timezone.utc)
+            }}
+        ]
+    )
+
+def _children_lookup(collection: str, alias: str, active_only: bool) -> dict:
+    match: Dict[str, Any] = {"$expr": {"$eq": ["$proposal_id", "$$proposal_id"]}}
+    if active_only:
+        match["is_active"] = {"$ne": False}
+    return {"$lookup": {
+        "from": collection,
+        "let": {"proposal_id": "$id"},
+        "pipeline": [
+            {"$match": match},
+            {"$sort": {"display_order": 1}},
+            {"$project": {"_id": 0}}
+        ],
+        "as": alias
+    }}
+
+async def get_proposal_aggregate(query: dict, active_only: bool = False) -> Optional[dict]:
+    """Proposal with its modules and line items (sorted by display_order) in one round trip
+    
+    Returns {"proposal", "modules", "line_items"} or None. With active_only
+    deactivated modules and line items are left out (public view).
+    """
+    pipeline = [
+        {"$match": query},
+        {"$limit": 1},
+        _children_lookup("proposal_modules", "modules", active_only),
+        _children_lookup("proposal_line_items", "line_items", active_only),
+        {"$project": {"_id": 0}}
+    ]
+    documents = await db.proposals.aggregate(pipeline).to_list(length=1)
+    if not documents:
+        return None
+    proposal = documents[0]
+    modules = proposal.pop("modules")
+    line_items = proposal.pop("line_items")
+    return {"proposal": proposal, "modules": modules, "line_items": line_items}
+
+async def ensure_proposal_indexes():
+    """Indexes behind the proposal aggregate lookups and version reconstruction"""
+    await db.proposals.create_index([("id", ASCENDING)])
+    await db.proposals.create_index([("public_token", ASCENDING)])
+    await db.proposal_modules.create_index([("proposal_id", ASCENDING), ("display_order", ASCENDING)])
+    await db.proposal_line_items.create_index([("proposal_id", ASCENDING), ("display_order", ASCENDING)])
+    try:
+        await db.proposal_versions.create_index([("proposal_id", ASCENDING), ("version_number", ASCENDING)], unique=True)
+    except OperationFailure as e:
+        # Legacy duplicate version numbers; version diffs rely on this index
+        logger.error(f"Unique proposal version index not created, run migrations/11_dedupe_proposal_versions.py: {str(e)}")
+
 # Continue in next file part...
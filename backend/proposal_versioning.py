@@ -0,0 +1,194 @@
+"""
+CRM - Proposal Versioning Service
+Proposal versions stored as structural diffs with periodic full checkpoints.
+
+A version snapshot is {"modules", "line_items", "pricing_summary", "settings"}.
+Copying all of it into every version makes a 300-item proposal with 20
+versions store 20 full copies. Instead, a version stores only its diff
+against the previous version (`storage: "delta"`). The first version, and
+every PROPOSAL_VERSION_CHECKPOINT_INTERVAL-th version after it, stores the
+full snapshot (`storage: "full"`). Versions written before this change have
+a full snapshot and no `storage` field, so they count as checkpoints.
+
+Reconstructing a version loads its nearest checkpoint and applies at most
+PROPOSAL_VERSION_CHECKPOINT_INTERVAL - 1 diffs.
+
+Diff format, per snapshot key:
+    lists of documents keyed by "id" (modules, line_items):
+        {"added": [doc], "removed": [id],
+         "changed": [{"id", "set": {field: value}, "unset": [field]}],
+         "order": [id] or None}
+    dicts (pricing_summary, settings):
+        {"set": {field: value}, "unset": [field]}
+    anything else, or lists without unique ids:
+        {"replace": value}
+"""
+
+import logging
+import os
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROPOSAL_VERSION_CHECKPOINT_INTERVAL = max(1, int(os.environ.get("PROPOSAL_VERSION_CHECKPOINT_INTERVAL", "10")))
+
+FULL = "full"
+DELTA = "delta"
+
+# What GET /proposals/{id}/versions returns: everything but the stored content
+METADATA_PROJECTION = {"_id": 0, "snapshot": 0, "delta": 0}
+
+
+# ===================== DIFF / APPLY =====================
+
+def _diff_dict(old: Dict, new: Dict) -> Dict:
+    return {
+        "set": {key: value for key, value in new.items() if key not in old or old[key] != value},
+        "unset": [key for key in old if key not in new]
+    }
+
+
+def _apply_dict(old: Dict, diff: Dict) -> Dict:
+    unset = set(diff["unset"])
+    result = {key: value for key, value in old.items() if key not in unset}
+    result.update(diff["set"])
+    return result
+
+
+def _keyed(docs: List) -> Optional[Dict[str, Dict]]:
+    """Documents by id, or None when a document has no id or an id repeats"""
+    keyed = {}
+    for doc in docs:
+        key = doc.get("id") if isinstance(doc, dict) else None
+        if key is None or key in keyed:
+            return None
+        keyed[key] = doc
+    return keyed
+
+
+def _diff_list(old: List, new: List) -> Dict:
+    old_keyed, new_keyed = _keyed(old), _keyed(new)
+    if old_keyed is None or new_keyed is None:
+        return {"replace": new}
+
+    added = [doc for key, doc in new_keyed.items() if key not in old_keyed]
+    removed = [key for key in old_keyed if key not in new_keyed]
+    changed = [
+        {"id": key, **_diff_dict(old_keyed[key], doc)}
+        for key, doc in new_keyed.items()
+        if key in old_keyed and old_keyed[key] != doc
+    ]
+    # Applying keeps surviving documents in place and appends added ones
+    order = None
+    if [key for key in old_keyed if key in new_keyed] + [doc["id"] for doc in added] != list(new_keyed):
+        order = list(new_keyed)
+    return {"added": added, "removed": removed, "changed": changed, "order": order}
+
+
+def _apply_list(old: List, diff: Dict) -> List:
+    removed = set(diff["removed"])
+    changed = {change["id"]: change for change in diff["changed"]}
+    docs = {}
+    for doc in old:
+        key = doc["id"]
+        if key in removed:
+            continue
+        docs[key] = _apply_dict(doc, changed[key]) if key in changed else doc
+    for doc in diff["added"]:
+        docs[doc["id"]] = doc
+    if diff["order"]:
+        return [docs[key] for key in diff["order"]]
+    return list(docs.values())
+
+
+def diff_snapshots(old: Dict, new: Dict) -> Dict:
+    """Structural diff turning snapshot `old` into `new`; only changed keys appear"""
+    diff = {}
+    for key in list(new) + [key for key in old if key not in new]:
+        before, after = old.get(key), new.get(key)
+        if before == after:
+            continue
+        if isinstance(before, list) and isinstance(after, list):
+            diff[key] = _diff_list(before, after)
+        elif isinstance(before, dict) and isinstance(after, dict):
+            diff[key] = _diff_dict(before, after)
+        else:
+            diff[key] = {"replace": after}
+    return diff
+
+
+def apply_diff(snapshot: Dict, diff: Dict) -> Dict:
+    """Snapshot with `diff` applied; `snapshot` itself is not modified"""
+    result = dict(snapshot)
+    for key, change in diff.items():
+        if "replace" in change:
+            result[key] = change["replace"]
+        elif isinstance(result.get(key), list):
+            result[key] = _apply_list(result[key], change)
+        else:
+            result[key] = _apply_dict(result.get(key) or {}, change)
+    return result
+
+
+def reconstruct(checkpoint: Dict, diffs: List[Dict]) -> Dict:
+    snapshot = checkpoint
+    for diff in diffs:
+        snapshot = apply_diff(snapshot, diff)
+    return snapshot
+
+
+def is_checkpoint_due(previous_chain_length: Optional[int]) -> bool:
+    """Whether the next version is stored in full; None means there is no previous version"""
+    return previous_chain_length is None or previous_chain_length + 1 >= PROPOSAL_VERSION_CHECKPOINT_INTERVAL
+
+
+# ===================== STORAGE =====================
+
+async def load_snapshot(db, proposal_id: str, version_number: int) -> Optional[Dict]:
+    """Full snapshot of a stored version: nearest checkpoint plus the diffs after it"""
+    checkpoint = await db.proposal_versions.find_one(
+        {"proposal_id": proposal_id, "version_number": {"$lte": version_number}, "storage": {"$ne": DELTA}},
+        {"_id": 0, "version_number": 1, "snapshot": 1},
+        sort=[("version_number", -1)]
+    )
+    if not checkpoint:
+        return None
+    if checkpoint["version_number"] == version_number:
+        return checkpoint.get("snapshot") or {}
+
+    deltas = await db.proposal_versions.find(
+        {
+            "proposal_id": proposal_id,
+            "version_number": {"$gt": checkpoint["version_number"], "$lte": version_number}
+        },
+        {"_id": 0, "version_number": 1, "delta": 1}
+    ).sort("version_number", 1).to_list(length=None)
+    if not deltas or deltas[-1]["version_number"] != version_number:
+        return None
+    return reconstruct(checkpoint.get("snapshot") or {}, [delta.get("delta") or {} for delta in deltas])
+
+
+async def prepare_version(db, proposal_id: str, snapshot: Dict) -> Dict:
+    """Storage fields (storage, snapshot, delta, base_version, chain_length) for the next version"""
+    latest = await db.proposal_versions.find_one(
+        {"proposal_id": proposal_id},
+        {"_id": 0, "version_number": 1, "storage": 1, "chain_length": 1},
+        sort=[("version_number", -1)]
+    )
+    previous_chain_length = latest.get("chain_length", 0) if latest else None
+
+    previous = None
+    if not is_checkpoint_due(previous_chain_length):
+        previous = await load_snapshot(db, proposal_id, latest["version_number"])
+        if previous is None:
+            logger.warning(f"Proposal {proposal_id} v{latest['version_number']} could not be rebuilt, storing a checkpoint")
+
+    if previous is None:
+        return {"storage": FULL, "snapshot": snapshot, "delta": None, "base_version": None, "chain_length": 0}
+    return {
+        "storage": DELTA,
+        "snapshot": {},
+        "delta": diff_snapshots(previous, snapshot),
+        "base_version": latest["version_number"],
+        "chain_length": previous_chain_length + 1
+    }
@@ -0,0 +1,150 @@
+"""
+Reference Data Cache
+Versioned, per-database snapshots of library/settings lists with HTTP caching.
+
+Each reference list is registered with the collections it is built from:
+
+    @reference_cache.reference("customer_types", ["customer_types"])
+    async def load_customer_types(db):
+        ...
+
+The rendered JSON of every list is kept in memory per database (so per
+tenant) together with the versions of its collections. Writes call
+`bump(db, collection)`, which increments the version in `library_versions`;
+other workers see the bump within REFERENCE_VERSION_CHECK_INTERVAL seconds.
+Responses carry an ETag derived from the content and answer
+`If-None-Match` with 304 Not Modified.
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from fastapi import Request, Response
+
+from json_response import dumps
+
+REFERENCE_VERSION_CHECK_INTERVAL = float(os.environ.get("REFERENCE_VERSION_CHECK_INTERVAL", "10"))
+REFERENCE_CACHE_MAX_AGE = int(os.environ.get("REFERENCE_CACHE_MAX_AGE", "60"))
+
+Loader = Callable[[object], Awaitable[object]]
+
+# key -> (collections, loader)
+_registry: Dict[str, Tuple[Tuple[str, ...], Loader]] = {}
+
+
+class Snapshot:
+    """Rendered content of one reference list at a set of collection versions"""
+
+    def __init__(self, versions: Tuple[int, ...], content, body: bytes):
+        self.versions = versions
+        self.content = content
+        self.body = body
+        self.etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+class _DatabaseState:
+    def __init__(self):
+        self.versions: Dict[str, int] = {}
+        self.checked_at = 0.0
+        self.snapshots: Dict[str, Snapshot] = {}
+        self.locks: Dict[str, asyncio.Lock] = {}
+
+
+_states: Dict[str, _DatabaseState] = {}
+
+
+def reference(key: str, collections: Sequence[str]):
+    """Register `loader(db)` as the source of the reference list `key`"""
+    def decorator(loader: Loader) -> Loader:
+        _registry[key] = (tuple(collections), loader)
+        return loader
+    return decorator
+
+
+def registered_keys() -> List[str]:
+    return list(_registry)
+
+
+def _state(db) -> _DatabaseState:
+    state = _states.get(db.name)
+    if state is None:
+        state = _states[db.name] = _DatabaseState()
+    return state
+
+
+async def _refresh_versions(db, state: _DatabaseState):
+    if time.monotonic() - state.checked_at < REFERENCE_VERSION_CHECK_INTERVAL:
+        return
+    collections = {name for names, _ in _registry.values() for name in names}
+    versions = {}
+    async for doc in db.library_versions.find({"_id": {"$in": list(collections)}}):
+        versions[doc["_id"]] = doc.get("version", 0)
+    state.versions = versions
+    state.checked_at = time.monotonic()
+
+
+async def get(db, key: str) -> Snapshot:
+    """Current snapshot of `key` for `db`, reloaded when one of its collections changed"""
+    collections, loader = _registry[key]
+    state = _state(db)
+    await _refresh_versions(db, state)
+    versions = tuple(state.versions.get(name, 0) for name in collections)
+
+    snapshot = state.snapshots.get(key)
+    if snapshot is not None and snapshot.versions == versions:
+        return snapshot
+
+    lock = state.locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        snapshot = state.snapshots.get(key)
+        if snapshot is not None and snapshot.versions == versions:
+            return snapshot
+        content = await loader(db)
+        snapshot = Snapshot(versions, content, dumps(content))
+        state.snapshots[key] = snapshot
+        return snapshot
+
+
+async def bump(db, *collections: str):
+    """Record a write to reference collections so dependent snapshots are rebuilt"""
+    state = _state(db)
+    for name in collections:
+        result = await db.library_versions.find_one_and_update(
+            {"_id": name}, {"$inc": {"version": 1}}, upsert=True, return_document=True
+        )
+        state.versions[name] = result["version"] if result else state.versions.get(name, 0) + 1
+
+
+def conditional_response(request: Request, body: bytes, etag: str, max_age: int = REFERENCE_CACHE_MAX_AGE,
+                         public: bool = False) -> Response:
+    """JSON response with ETag/Cache-Control, or 304 when the client already has `etag`"""
+    headers = {"ETag": etag, "Cache-Control": f"{'public' if public else 'private'}, max-age={max_age}"}
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def content_response(request: Request, content) -> Response:
+    """Encode a (filtered) view of a snapshot and serve it with HTTP caching"""
+    body = dumps(content)
+    return conditional_response(request, body, '"' + hashlib.sha1(body).hexdigest() + '"')
+
+
+async def response(request: Request, db, key: str) -> Response:
+    """Serve the reference list `key` with HTTP caching"""
+    snapshot = await get(db, key)
+    return conditional_response(request, snapshot.body, snapshot.etag)
+
+
+async def bootstrap_response(request: Request, sources: Iterable[Tuple[object, str]]) -> Response:
+    """All given (db, key) lists in one `{key: list}` object, built from the rendered snapshots"""
+    sources = list(sources)
+    snapshots = await asyncio.gather(*[get(db, key) for db, key in sources])
+    parts = [dumps(key) + b":" + snapshot.body for (_, key), snapshot in zip(sources, snapshots)]
+    body = b"{" + b",".join(parts) + b"}"
+    etag = '"' + hashlib.sha1("".join(s.etag for s in snapshots).encode()).hexdigest() + '"'
+    return conditional_response(request, body, etag)
+
@@ -0,0 +1,539 @@
+"""
+CRM - Report Service
+Accounting reports computed with MongoDB aggregation pipelines, so only the
+aggregated rows leave the database.
+
+Date fields are normalized server-side: invoices use `dueAt` (BSON date,
+written next to `dueDate`/`due_date` via `invoice_due_at()` and backfilled by
+migrations/08_normalize_invoice_due_dates.py) and fall back to parsing the
+legacy `dueDate`/`due_date` strings.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING
+
+logger = logging.getLogger(__name__)
+
+MS_PER_DAY = 24 * 60 * 60 * 1000
+
+AGING_TOP_N = 20
+# (key, label, lower bound in days overdue) - upper bound is the next lower bound
+AGING_BUCKETS = [
+    ("current", "Güncel (0-30)", -1000000),
+    ("days_31_60", "31-60 Gün", 31),
+    ("days_61_90", "61-90 Gün", 61),
+    ("days_91_120", "91-120 Gün", 91),
+    ("over_120", "120+ Gün", 121),
+]
+
+
+# ===================== EXPRESSIONS =====================
+
+def first_truthy(*fields: str, default=0) -> Dict:
+    """Expression equivalent of `doc.get(a) or doc.get(b) or default`"""
+    expr = default
+    for field in reversed(fields):
+        # null, missing and 0 are all falsy for $and
+        expr = {"$cond": [{"$and": [f"${field}"]}, f"${field}", expr]}
+    return expr
+
+
+def day_string(field_expr) -> Dict:
+    """First 10 characters (YYYY-MM-DD) of a date string field"""
+    return {"$substrCP": [{"$toString": field_expr}, 0, 10]}
+
+
+def parsed_day(field_expr) -> Dict:
+    """Parse a YYYY-MM-DD prefix into a date, null when missing or invalid"""
+    return {
+        "$dateFromString": {
+            "dateString": day_string(field_expr),
+            "format": "%Y-%m-%d",
+            "onError": None,
+            "onNull": None
+        }
+    }
+
+
+def days_between(start_expr, end: datetime) -> Dict:
+    """Whole days from `start_expr` to `end`"""
+    return {"$toLong": {"$floor": {"$divide": [{"$subtract": [end, start_expr]}, MS_PER_DAY]}}}
+
+
+INVOICE_TOTAL = first_truthy("total", "grandTotal")
+INVOICE_PAID = {"$ifNull": ["$paidAmount", 0]}
+INVOICE_DUE_RAW = {"$ifNull": ["$dueDate", "$due_date"]}
+INVOICE_DUE_AT = {"$ifNull": ["$dueAt", parsed_day(INVOICE_DUE_RAW)]}
+
+
+def invoice_due_at(invoice: Dict) -> Optional[datetime]:
+    """`dueAt` for an invoice document or update, as a UTC date, None if unknown or invalid.
+
+    Its dueDate/due_date, else (invoices of the main /invoices API) its `date`
+    plus `payment_term` days.
+    """
+    raw = invoice.get("dueDate") or invoice.get("due_date")
+    if not raw:
+        return _issued_plus_term(invoice)
+    if isinstance(raw, datetime):
+        return raw if raw.tzinfo else raw.replace(tzinfo=timezone.utc)
+    try:
+        return datetime.strptime(str(raw)[:10], "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def _issued_plus_term(invoice: Dict) -> Optional[datetime]:
+    issued, term = invoice.get("date"), invoice.get("payment_term")
+    if not issued or term in (None, ""):
+        return None
+    try:
+        if not isinstance(issued, datetime):
+            issued = datetime.strptime(str(issued)[:10], "%Y-%m-%d")
+        issued = datetime(issued.year, issued.month, issued.day, tzinfo=timezone.utc)
+        return issued + timedelta(days=int(term))
+    except (TypeError, ValueError):
+        return None
+
+
+def customer_match(customer_id: str) -> Dict:
+    """Invoices reference customers as either customerId or customer_id"""
+    return {"$or": [{"customerId": customer_id}, {"customer_id": customer_id}]}
+
+
+async def ensure_report_indexes(db):
+    """Indexes backing the report pipelines"""
+    await db.invoices.create_index([("status", ASCENDING), ("dueAt", ASCENDING)])
+    await db.invoices.create_index([("customerId", ASCENDING), ("status", ASCENDING)])
+    for collection, _ in INCOME_EXPENSE_SOURCES.values():
+        await db[collection].create_index([("date", ASCENDING)])
+    await db.collections_new.create_index([("customerId", ASCENDING)])
+    await db.report_snapshots.create_index([("type", ASCENDING), ("date", ASCENDING)], unique=True)
+
+
+# ===================== AGING =====================
+
+async def aging_report(db, as_of: Optional[datetime] = None, customer_id: Optional[str] = None,
+                       top_n: int = AGING_TOP_N) -> Dict:
+    """Receivables aging buckets with the top `top_n` open invoices per bucket.
+
+    `as_of` ages invoices issued up to that date against it (paid amounts are
+    the current ones). `customer_id` drills down into a single customer.
+    """
+    as_of = as_of or datetime.now(timezone.utc)
+
+    match: Dict = {"status": {"$ne": "deleted"}}
+    conditions: List[Dict] = [{"$or": [
+        {"dueAt": {"$type": "date"}},
+        {"dueDate": {"$nin": [None, ""]}},
+        {"due_date": {"$nin": [None, ""]}}
+    ]}]
+    if customer_id:
+        conditions.append(customer_match(customer_id))
+    if as_of.date() < datetime.now(timezone.utc).date():
+        # Historical snapshot: leave out invoices issued after as_of (date as string or BSON date)
+        next_day = datetime(as_of.year, as_of.month, as_of.day, tzinfo=timezone.utc) + timedelta(days=1)
+        issued = parsed_day("$date")
+        conditions.append({"$expr": {"$or": [{"$eq": [issued, None]}, {"$lt": [issued, next_day]}]}})
+    match["$and"] = conditions
+
+    boundaries = [lower for _, _, lower in AGING_BUCKETS[1:]]
+    pipeline = [
+        {"$match": match},
+        {"$addFields": {
+            "_total": INVOICE_TOTAL,
+            "_paid": INVOICE_PAID,
+            "_dueAt": INVOICE_DUE_AT
+        }},
+        {"$addFields": {
+            "_remaining": {"$subtract": ["$_total", "$_paid"]},
+            # Unparseable due dates count as not overdue
+            "_days": {"$ifNull": [days_between("$_dueAt", as_of), 0]}
+        }},
+        {"$match": {"_remaining": {"$gt": 0}}},
+        {"$facet": {
+            "buckets": [{
+                "$bucket": {
+                    "groupBy": "$_days",
+                    "boundaries": [AGING_BUCKETS[0][2], *boundaries],
+                    "default": "over",
+                    "output": {
+                        "count": {"$sum": 1},
+                        "amount": {"$sum": "$_remaining"},
+                        "invoices": {"$topN": {
+                            "n": top_n,
+                            "sortBy": {"_remaining": -1},
+                            "output": {
+                                "id": {"$ifNull": ["$id", {"$toString": "$_id"}]},
+                                "invoiceNo": {"$ifNull": ["$invoice_number", "$invoiceNo", ""]},
+                                "customerName": {"$ifNull": ["$customerName", "$customer_name", ""]},
+                                "dueDate": {"$cond": [
+                                    {"$ne": [INVOICE_DUE_RAW, None]},
+                                    day_string(INVOICE_DUE_RAW),
+                                    {"$dateToString": {"date": "$_dueAt", "format": "%Y-%m-%d"}}
+                                ]},
+                                "total": "$_total",
+                                "paid": "$_paid",
+                                "remaining": "$_remaining",
+                                "daysOverdue": {"$max": [0, "$_days"]}
+                            }
+                        }}
+                    }
+                }
+            }],
+            "totals": [{"$group": {"_id": None, "amount": {"$sum": "$_remaining"}}}]
+        }}
+    ]
+
+    result = await db.invoices.aggregate(pipeline).to_list(1)
+    facets = result[0] if result else {"buckets": [], "totals": []}
+
+    # $bucket ids are lower bounds; anything past the last boundary lands in "over"
+    by_lower_bound = {row["_id"]: row for row in facets["buckets"]}
+    by_lower_bound.setdefault(AGING_BUCKETS[-1][2], by_lower_bound.pop("over", None))
+
+    buckets = {}
+    for key, label, lower in AGING_BUCKETS:
+        row = by_lower_bound.get(lower) or {}
+        buckets[key] = {
+            "label": label,
+            "count": row.get("count", 0),
+            "amount": row.get("amount", 0),
+            "invoices": row.get("invoices", [])
+        }
+
+    return {
+        "asOf": as_of.strftime("%Y-%m-%d"),
+        "totalReceivables": facets["totals"][0]["amount"] if facets["totals"] else 0,
+        "buckets": buckets
+    }
+
+
+# ===================== INCOME / EXPENSE =====================
+
+# source key -> (collection, amount expression)
+INCOME_EXPENSE_SOURCES = {
+    "income": ("invoices", INVOICE_TOTAL),
+    "collected": ("collections_new", {"$ifNull": ["$amount", 0]}),
+    "expense": ("payments_new", {"$ifNull": ["$amount", 0]}),
+    "other_expense": ("expense_receipts", first_truthy("amount", "total")),
+}
+
+MONTH_KEY = {
+    "$cond": [
+        {"$eq": [{"$type": "$date"}, "date"]},
+        {"$dateToString": {"date": "$date", "format": "%Y-%m"}},
+        {"$substrCP": ["$date", 0, 7]}
+    ]
+}
+
+
+def month_range(start_month: str, end_month: str) -> List[str]:
+    """Calendar months from start_month to end_month inclusive (YYYY-MM)"""
+    year, month = map(int, start_month.split("-"))
+    end_year, end_month_num = map(int, end_month.split("-"))
+    months = []
+    while (year, month) <= (end_year, end_month_num):
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def last_n_months(months: int, today: Optional[datetime] = None) -> List[str]:
+    """The last `months` calendar months ending with the current one"""
+    today = today or datetime.now(timezone.utc)
+    year, month = today.year, today.month
+    for _ in range(months - 1):
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+    return month_range(f"{year:04d}-{month:02d}", today.strftime("%Y-%m"))
+
+
+def date_range_match(start_month: str, end_month: str) -> Dict:
+    """Match `date` in [start_month, end_month] whether stored as string or BSON date"""
+    start = datetime.strptime(start_month, "%Y-%m")
+    end_year, end_month_num = map(int, end_month.split("-"))
+    end = datetime(end_year + 1, 1, 1) if end_month_num == 12 else datetime(end_year, end_month_num + 1, 1)
+    return {
+        "status": {"$ne": "deleted"},
+        "$or": [
+            {"date": {"$gte": start_month, "$lt": end.strftime("%Y-%m")}},
+            {"date": {"$gte": start, "$lt": end}}
+        ]
+    }
+
+
+async def monthly_totals(collection, amount_expr: Dict, match: Dict) -> List[Dict]:
+    """One scan: totals per (month, currency)"""
+    return await collection.aggregate([
+        {"$match": match},
+        {"$group": {
+            "_id": {"month": MONTH_KEY, "currency": {"$ifNull": ["$currency", "TRY"]}},
+            "amount": {"$sum": amount_expr},
+            "count": {"$sum": 1}
+        }}
+    ]).to_list(length=None)
+
+
+def convert_amount(amount: float, currency: str, target: Optional[str], rates: Dict[str, float]) -> Optional[float]:
+    """Convert using TRY-based rates (TRY per unit); None when either currency has no rate"""
+    if not target or currency == target:
+        return amount
+    source_rate = 1.0 if currency == "TRY" else rates.get(currency)
+    target_rate = 1.0 if target == "TRY" else rates.get(target)
+    if not source_rate or not target_rate:
+        return None
+    return amount * source_rate / target_rate
+
+
+async def income_expense_report(db, months: List[str], currency: Optional[str] = None,
+                                rates: Optional[Dict[str, float]] = None) -> Tuple[List[Dict], Dict[str, float]]:
+    """Monthly income/collections/expenses for `months`, one $group per source run concurrently.
+
+    Returns the months and, when converting to `currency`, the amounts per
+    source currency that had no rate and were left out of the totals.
+    """
+    match = date_range_match(months[0], months[-1])
+    source_keys = list(INCOME_EXPENSE_SOURCES)
+    results = await asyncio.gather(*[
+        monthly_totals(db[collection], amount_expr, match)
+        for collection, amount_expr in INCOME_EXPENSE_SOURCES.values()
+    ])
+
+    totals = {month: {key: 0.0 for key in source_keys} for month in months}
+    counts = {month: {key: 0 for key in source_keys} for month in months}
+    unconverted: Dict[str, float] = {}
+    for key, rows in zip(source_keys, results):
+        for row in rows:
+            month = row["_id"]["month"]
+            if month not in totals:
+                continue
+            amount = convert_amount(row["amount"], row["_id"]["currency"], currency, rates or {})
+            if amount is None:
+                unconverted[row["_id"]["currency"]] = unconverted.get(row["_id"]["currency"], 0.0) + row["amount"]
+                continue
+            totals[month][key] += amount
+            counts[month][key] += row["count"]
+
+    result = []
+    for month in months:
+        month_totals = totals[month]
+        expense = month_totals["expense"] + month_totals["other_expense"]
+        result.append({
+            "month": datetime.strptime(month, "%Y-%m").strftime("%b %Y"),
+            "monthKey": month,
+            "income": month_totals["income"],
+            "collected": month_totals["collected"],
+            "expense": expense,
+            "profit": month_totals["income"] - expense,
+            "invoiceCount": counts[month]["income"],
+            "collectionCount": counts[month]["collected"],
+            "paymentCount": counts[month]["expense"]
+        })
+    return result, unconverted
+
+
+# ===================== CUSTOMER PERFORMANCE =====================
+
+SNAPSHOT_TOP_N = 200
+# Nightly customer performance snapshots are opt-in
+CUSTOMER_PERFORMANCE_SNAPSHOTS = os.environ.get("CUSTOMER_PERFORMANCE_SNAPSHOTS", "false").lower() == "true"
+
+
+def _payment_score_expr() -> Dict:
+    """0-100 score: paid ratio minus 10 points per overdue invoice"""
+    ratio = {"$cond": [
+        {"$gt": ["$totalInvoiced", 0]},
+        {"$min": [100, {"$multiply": [{"$divide": ["$totalPaid", "$totalInvoiced"]}, 100]}]},
+        100
+    ]}
+    return {"$cond": [
+        {"$gt": ["$overdueAmount", 0]},
+        {"$max": [0, {"$subtract": [ratio, {"$multiply": ["$overdueCount", 10]}]}]},
+        ratio
+    ]}
+
+
+async def customer_performance_report(db, limit: int = 20, today: Optional[datetime] = None) -> Dict:
+    """Per-customer invoiced/paid/collected/overdue figures and the top `limit` by invoiced total.
+
+    Invoices and collections_new are grouped by customer in one pipeline
+    ($unionWith), so the work no longer scales with one query per customer.
+    """
+    today = today or datetime.now(timezone.utc)
+    today_start = datetime(today.year, today.month, today.day, tzinfo=timezone.utc)
+    remaining = {"$subtract": ["$_total", "$_paid"]}
+    is_overdue = {"$and": [
+        {"$ne": ["$_dueAt", None]},
+        {"$lt": ["$_dueAt", today_start]},
+        {"$gt": [remaining, 0]}
+    ]}
+
+    pipeline = [
+        {"$match": {"status": {"$ne": "deleted"}}},
+        {"$project": {
+            "_cust": {"$ifNull": ["$customerId", "$customer_id"]},
+            "_total": INVOICE_TOTAL,
+            "_paid": INVOICE_PAID,
+            "_dueAt": INVOICE_DUE_AT,
+            "_collected": {"$literal": 0},
+            "_invoice": {"$literal": 1}
+        }},
+        {"$unionWith": {
+            "coll": "collections_new",
+            "pipeline": [
+                {"$match": {"status": {"$ne": "deleted"}, "customerId": {"$nin": [None, ""]}}},
+                {"$project": {
+                    "_cust": "$customerId",
+                    "_total": {"$literal": 0},
+                    "_paid": {"$literal": 0},
+                    "_dueAt": {"$literal": None},
+                    "_collected": {"$ifNull": ["$amount", 0]},
+                    "_invoice": {"$literal": 0}
+                }}
+            ]
+        }},
+        {"$match": {"_cust": {"$nin": [None, ""]}}},
+        {"$group": {
+            "_id": "$_cust",
+            "totalInvoiced": {"$sum": "$_total"},
+            "totalPaid": {"$sum": "$_paid"},
+            "totalCollected": {"$sum": "$_collected"},
+            "overdueAmount": {"$sum": {"$cond": [is_overdue, remaining, 0]}},
+            "overdueCount": {"$sum": {"$cond": [is_overdue, 1, 0]}},
+            "invoiceCount": {"$sum": "$_invoice"}
+        }},
+        {"$addFields": {"totalRemaining": {"$subtract": ["$totalInvoiced", "$totalPaid"]}}},
+        {"$match": {"$or": [{"totalInvoiced": {"$gt": 0}}, {"totalRemaining": {"$gt": 0}}]}},
+        {"$lookup": {
+            "from": "customers",
+            "localField": "_id",
+            "foreignField": "id",
+            "pipeline": [{"$project": {"_id": 0, "companyName": 1, "name": 1, "email": 1, "phone": 1, "status": 1}}],
+            "as": "customer"
+        }},
+        {"$unwind": "$customer"},
+        {"$match": {"customer.status": {"$ne": "deleted"}}},
+        {"$addFields": {"paymentScore": {"$round": [_payment_score_expr(), 1]}}},
+        {"$addFields": {"status": {"$switch": {
+            "branches": [
+                {"case": {"$gte": ["$paymentScore", 80]}, "then": "good"},
+                {"case": {"$gte": ["$paymentScore", 50]}, "then": "warning"}
+            ],
+            "default": "risk"
+        }}}},
+        {"$group": {
+            "_id": None,
+            "totalCustomers": {"$sum": 1},
+            "totalInvoiced": {"$sum": "$totalInvoiced"},
+            "totalCollected": {"$sum": "$totalCollected"},
+            "totalRemaining": {"$sum": "$totalRemaining"},
+            "totalOverdue": {"$sum": "$overdueAmount"},
+            "goodCustomers": {"$sum": {"$cond": [{"$eq": ["$status", "good"]}, 1, 0]}},
+            "warningCustomers": {"$sum": {"$cond": [{"$eq": ["$status", "warning"]}, 1, 0]}},
+            "riskCustomers": {"$sum": {"$cond": [{"$eq": ["$status", "risk"]}, 1, 0]}},
+            "customers": {"$topN": {
+                "n": max(1, limit),
+                "sortBy": {"totalInvoiced": -1},
+                "output": {
+                    "id": "$_id",
+                    "name": {"$ifNull": ["$customer.companyName", "$customer.name", "İsimsiz"]},
+                    "email": {"$ifNull": ["$customer.email", ""]},
+                    "phone": {"$ifNull": ["$customer.phone", ""]},
+                    "totalInvoiced": "$totalInvoiced",
+                    "totalPaid": "$totalPaid",
+                    "totalRemaining": "$totalRemaining",
+                    "totalCollected": "$totalCollected",
+                    "overdueAmount": "$overdueAmount",
+                    "overdueCount": "$overdueCount",
+                    "invoiceCount": "$invoiceCount",
+                    "paymentScore": "$paymentScore",
+                    "status": "$status"
+                }
+            }}
+        }}
+    ]
+
+    rows = await db.invoices.aggregate(pipeline).to_list(1)
+    if not rows:
+        summary = {key: 0 for key in (
+            "totalCustomers", "totalInvoiced", "totalCollected", "totalRemaining", "totalOverdue",
+            "goodCustomers", "warningCustomers", "riskCustomers"
+        )}
+        return {"summary": summary, "customers": []}
+
+    row = rows[0]
+    customers = row.pop("customers")
+    row.pop("_id")
+    return {"summary": row, "customers": customers}
+
+
+async def save_customer_performance_snapshot(db, today: Optional[datetime] = None) -> Dict:
+    """Store today's customer performance figures for later period comparison"""
+    today = today or datetime.now(timezone.utc)
+    report = await customer_performance_report(db, limit=SNAPSHOT_TOP_N, today=today)
+    snapshot = {
+        "type": "customer_performance",
+        "date": today.strftime("%Y-%m-%d"),
+        "summary": report["summary"],
+        "customers": report["customers"],
+        "created_at": datetime.now(timezone.utc)
+    }
+    await db.report_snapshots.replace_one(
+        {"type": snapshot["type"], "date": snapshot["date"]}, snapshot, upsert=True
+    )
+    return snapshot
+
+
+async def get_customer_performance_snapshot(db, on_or_before: str) -> Optional[Dict]:
+    """Latest snapshot taken on or before the given YYYY-MM-DD date"""
+    return await db.report_snapshots.find_one(
+        {"type": "customer_performance", "date": {"$lte": on_or_before}},
+        {"_id": 0},
+        sort=[("date", -1)]
+    )
+
+
+def compare_with_snapshot(report: Dict, snapshot: Dict) -> Dict:
+    """Attach previous-period figures and deltas to a customer performance report"""
+    previous_by_id = {c["id"]: c for c in snapshot.get("customers", [])}
+    for customer in report["customers"]:
+        previous = previous_by_id.get(customer["id"])
+        customer["previous"] = None
+        if previous:
+            customer["previous"] = {
+                "totalInvoiced": previous["totalInvoiced"],
+                "paymentScore": previous["paymentScore"],
+                "overdueAmount": previous["overdueAmount"],
+                "invoicedChange": customer["totalInvoiced"] - previous["totalInvoiced"],
+                "scoreChange": round(customer["paymentScore"] - previous["paymentScore"], 1)
+            }
+
+    previous_summary = snapshot.get("summary", {})
+    report["comparison"] = {
+        "snapshotDate": snapshot["date"],
+        "summary": previous_summary,
+        "changes": {
+            key: report["summary"].get(key, 0) - previous_summary.get(key, 0)
+            for key in report["summary"]
+        }
+    }
+    return report
+
+
+async def run_customer_performance_snapshot_job(db):
+    """Background loop taking a customer performance snapshot every night (UTC)"""
+    while True:
+        now = datetime.now(timezone.utc)
+        next_run = datetime(now.year, now.month, now.day, tzinfo=timezone.utc) + timedelta(days=1, minutes=5)
+        await asyncio.sleep((next_run - now).total_seconds())
+        try:
+            await save_customer_performance_snapshot(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Customer performance snapshot failed: {str(e)}")
@@ -24,6 +24,8 @@ from motor.motor_asyncio import AsyncIOMotorClient
 import random
 import os
 
+import entitlements
+
 router = APIRouter(prefix="/api/feature-flags", tags=["Feature Flags"])
 
 # MongoDB connection - direkt bağlantı
@@ -172,6 +174,7 @@ async def create_feature_flag(flag: FeatureFlagCreate):
     flag_doc["id"] = str(result.inserted_id)
     if "_id" in flag_doc:
         del flag_doc["_id"]
+    await entitlements.invalidate()
     
     return flag_doc
 
@@ -205,6 +208,7 @@ async def update_feature_flag(flag_key: str, update: FeatureFlagUpdate):
         {"key": flag_key},
         {"$set": update_data}
     )
+    await entitlements.invalidate()
     
     # Güncellenmiş flag'i döndür
     updated = await collection.find_one({"key": flag_key})
@@ -236,6 +240,7 @@ async def delete_feature_flag(flag_key: str):
         )
     
     await collection.delete_one({"key": flag_key})
+    await entitlements.invalidate()
     
     return {"message": f"Feature flag '{flag_key}' silindi"}
 
@@ -252,9 +257,8 @@ async def check_feature_flag(flag_key: str, check: FeatureFlagCheck, db = Depend
     - reason: Neden açık/kapalı olduğu
     """
     try:
-        collection = db["feature_flags"]
-        
-        flag = await collection.find_one({"flag": flag_key})
+        snapshot = await entitlements.get()
+        flag = snapshot.flags.get(flag_key)
         
         if not flag:
             return {
@@ -270,89 +274,12 @@ async def check_feature_flag(flag_key: str, check: FeatureFlagCheck, db = Depend
             "reason": f"error: {str(e)}"
         }
     
-    tenant_slug = check.tenant_slug
-    
-    # 1. Blacklist kontrolü (her zaman kapalı)
-    if tenant_slug in flag.get("blacklist_tenants", []):
-        return {
-            "key": flag_key,
-            "enabled": False,
-            "reason": "blacklist"
-        }
-    
-    # 2. Whitelist kontrolü (her zaman açık)
-    if tenant_slug in flag.get("whitelist_tenants", []):
-        return {
-            "key": flag_key,
-            "enabled": True,
-            "reason": "whitelist"
-        }
-    
-    # 3. Status kontrolü
-    status = flag.get("status", "disabled")
-    
-    if status == "disabled":
-        return {
-            "key": flag_key,
-            "enabled": False,
-            "reason": "disabled"
-        }
-    
-    if status == "development":
-        # Sadece whitelist'tekiler görebilir (yukarıda kontrol edildi)
-        return {
-            "key": flag_key,
-            "enabled": False,
-            "reason": "development_only"
-        }
-    
-    if status == "testing":
-        # Test modunda - belirli roller görebilir
-        if check.user_role in ["super-admin", "admin"]:
-            return {
-                "key": flag_key,
-                "enabled": True,
-                "reason": "testing_admin"
-            }
-        return {
-            "key": flag_key,
-            "enabled": False,
-            "reason": "testing_restricted"
-        }
-    
-    if status == "gradual":
-        # Kademeli rollout - tenant bazlı deterministik
-        rollout_percentage = flag.get("rollout_percentage", 0)
-        
-        # Tenant slug'ı hash'le ve yüzdelik dilime bak
-        # Deterministik olması için her zaman aynı sonucu vermeli
-        tenant_hash = hash(tenant_slug) % 100
-        
-        if tenant_hash < rollout_percentage:
-            return {
-                "key": flag_key,
-                "enabled": True,
-                "reason": f"rollout_{rollout_percentage}%"
-            }
-        return {
-            "key": flag_key,
-            "enabled": False,
-            "reason": f"rollout_excluded_{rollout_percentage}%"
-        }
-    
-    if status == "enabled":
-        # Enabled durumunda, rol kontrolü kaldırıyoruz - herkes erişebilsin
-        return {
-            "key": flag_key,
-            "enabled": True,
-            "reason": "enabled"
-        }
-    
-    # Bilinmeyen status
+    # Blacklist > whitelist > status (development, testing, gradual, enabled)
+    enabled, reason = entitlements.evaluate_flag(flag, check.tenant_slug, check.user_role)
     return {
         "key": flag_key,
-        "enabled": False,
-        "reason": "unknown_status"
+        "enabled": enabled,
+        "reason": reason
     }
 
 
@@ -372,7 +299,9 @@ async def get_feature_flag_stats(flag_key: str):
     if not flag:
         raise HTTPException(status_code=404, detail=f"Feature flag '{flag_key}' bulunamadı")
     
-    # TODO: Gerçek istatistikler için tracking ekle
+    # Rollout bucket'ları snapshot'ta hazır; whitelist/blacklist dahil sayılır
+    snapshot = await entitlements.get()
+    
     stats = {
         "key": flag_key,
         "status": flag.get("status"),
@@ -381,7 +310,8 @@ async def get_feature_flag_stats(flag_key: str):
         "blacklist_count": len(flag.get("blacklist_tenants", [])),
         "created_at": flag.get("created_at"),
         "enabled_at": flag.get("enabled_at"),
-        "estimated_active_tenants": "N/A"  # TODO: Hesapla
+        "estimated_active_tenants": snapshot.active_tenant_count(flag),
+        "total_tenants": snapshot.tenant_count
     }
     
     return stats
@@ -421,6 +351,7 @@ async def set_rollout_percentage(flag_key: str, percentage: int):
         {"key": flag_key},
         {"$set": update_data}
     )
+    await entitlements.invalidate()
     
     return {
         "message": f"Rollout {percentage}% olarak ayarlandı",
@@ -441,33 +372,19 @@ async def batch_check_feature_flags(tenant_slug: str, flag_keys: List[str]):
     
     Frontend'de sayfa yüklenirken tüm flag'leri çekmek için kullanılır.
     """
-    collection = db["feature_flags"]
+    snapshot = await entitlements.get()
     
     results = {}
     
     for key in flag_keys:
-        flag = await collection.find_one({"key": key})
+        flag = snapshot.flags.get(key)
         
         if not flag:
             results[key] = {"enabled": False, "reason": "not_found"}
             continue
         
-        # Basitleştirilmiş kontrol
-        if tenant_slug in flag.get("blacklist_tenants", []):
-            results[key] = {"enabled": False, "reason": "blacklist"}
-        elif tenant_slug in flag.get("whitelist_tenants", []):
-            results[key] = {"enabled": True, "reason": "whitelist"}
-        elif flag.get("status") == "enabled":
-            results[key] = {"enabled": True, "reason": "enabled"}
-        elif flag.get("status") == "gradual":
-            tenant_hash = hash(tenant_slug) % 100
-            percentage = flag.get("rollout_percentage", 0)
-            results[key] = {
-                "enabled": tenant_hash < percentage,
-                "reason": f"rollout_{percentage}%"
-            }
-        else:
-            results[key] = {"enabled": False, "reason": flag.get("status", "disabled")}
+        enabled, reason = entitlements.evaluate_flag(flag, tenant_slug)
+        results[key] = {"enabled": enabled, "reason": reason}
     
     return results
 
@@ -595,6 +512,7 @@ async def seed_feature_flags():
         created = 0
     
     print(f"✅ {created} flag oluşturuldu")
+    await entitlements.invalidate()
     
     return {
         "success": True,
@@ -11,7 +11,7 @@ Ultra Admin bu verileri yönetir.
 Tenant'lar sadece okuyabilir.
 """
 
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Request
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime, timezone
@@ -19,6 +19,9 @@ from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
 
+import geo_index
+import reference_cache
+
 router = APIRouter(prefix="/api/global", tags=["Global Data"])
 
 # MongoDB connection - direkt bağlantı
@@ -132,8 +135,18 @@ async def get_platform_db():
 # CURRENCIES ENDPOINTS
 # ============================================================
 
+@reference_cache.reference("global_currencies", ["currencies"])
+async def load_global_currencies(db):
+    """Tüm para birimleri, sort_order sırasıyla"""
+    currencies = await db.currencies.find({}).sort("sort_order", 1).to_list(200)
+    for currency in currencies:
+        currency["id"] = str(currency.pop("_id"))
+    return currencies
+
+
 @router.get("/currencies")
 async def list_currencies(
+    request: Request,
     active_only: bool = Query(True, description="Sadece aktif olanlar"),
     common_only: bool = Query(False, description="Sadece sık kullanılanlar")
 ):
@@ -142,21 +155,12 @@ async def list_currencies(
     
     Frontend'de tüm dropdown'larda bu endpoint kullanılır.
     """
-    db = await get_platform_db()
-    collection = db.currencies
-    
-    query = {}
-    if active_only:
-        query["is_active"] = True
-    if common_only:
-        query["is_common"] = True
-    
-    currencies = await collection.find(query).sort("sort_order", 1).to_list(200)
-    
-    for currency in currencies:
-        currency["id"] = str(currency.pop("_id"))
-    
-    return currencies
+    snapshot = await reference_cache.get(await get_platform_db(), "global_currencies")
+    currencies = [
+        currency for currency in snapshot.content
+        if (currency.get("is_active") or not active_only) and (currency.get("is_common") or not common_only)
+    ]
+    return reference_cache.content_response(request, currencies)
 
 
 @router.get("/currencies/{code}")
@@ -195,6 +199,7 @@ async def create_currency(currency: CurrencyCreate):
     }
     
     result = await collection.insert_one(doc)
+    await reference_cache.bump(db, "currencies")
     doc["id"] = str(result.inserted_id)
     
     return doc
@@ -217,6 +222,7 @@ async def update_currency(code: str, update: CurrencyUpdate):
         {"code": code.upper()},
         {"$set": update_data}
     )
+    await reference_cache.bump(db, "currencies")
     
     updated = await collection.find_one({"code": code.upper()})
     updated["id"] = str(updated.pop("_id"))
@@ -239,6 +245,7 @@ async def delete_currency(code: str):
         {"code": code.upper()},
         {"$set": {"is_active": False, "updated_at": datetime.utcnow()}}
     )
+    await reference_cache.bump(db, "currencies")
     
     return {"message": f"Para birimi '{code}' pasif yapıldı"}
 
@@ -247,34 +254,35 @@ async def delete_currency(code: str):
 # COUNTRIES ENDPOINTS
 # ============================================================
 
+def _with_id(doc: dict) -> dict:
+    """Copy of a geo snapshot document with `_id` exposed as `id`"""
+    result = {k: v for k, v in doc.items() if k != "_id"}
+    result["id"] = doc["_id"]
+    return result
+
+
 @router.get("/countries")
 async def list_countries(
+    request: Request,
     active_only: bool = Query(True, description="Sadece aktif olanlar"),
-    search: Optional[str] = Query(None, description="Ara (isim veya kod)")
+    search: Optional[str] = Query(None, description="Ara (isim veya kod, yazarken öneri)")
 ):
     """
     Ülkeleri listele
     """
-    db = await get_platform_db()
-    collection = db.countries
+    geo = await geo_index.get(await get_platform_db())
     
-    query = {}
-    if active_only:
-        query["is_active"] = True
+    def visible(country):
+        return country.get("is_active") or not active_only
     
     if search:
-        query["$or"] = [
-            {"code": {"$regex": search, "$options": "i"}},
-            {"name": {"$regex": search, "$options": "i"}},
-            {"name_tr": {"$regex": search, "$options": "i"}}
-        ]
-    
-    countries = await collection.find(query).sort("sort_order", 1).to_list(300)
+        return [_with_id(c) for c in geo.search_countries(search) if visible(c)][:300]
     
-    for country in countries:
-        country["id"] = str(country.pop("_id"))
+    def build():
+        countries = sorted((c for c in geo.countries if visible(c)), key=lambda c: c.get("sort_order", 100))
+        return [_with_id(c) for c in countries[:300]]
     
-    return countries
+    return geo.cached_response(request, f"global_countries:{active_only}", build)
 
 
 @router.get("/countries/{code}")
@@ -310,6 +318,7 @@ async def create_country(country: CountryCreate):
     }
     
     result = await collection.insert_one(doc)
+    await geo_index.invalidate(db)
     doc["id"] = str(result.inserted_id)
     
     return doc
@@ -332,6 +341,7 @@ async def update_country(code: str, update: CountryUpdate):
         {"code": code.upper()},
         {"$set": update_data}
     )
+    await geo_index.invalidate(db)
     
     updated = await collection.find_one({"code": code.upper()})
     updated["id"] = str(updated.pop("_id"))
@@ -345,37 +355,34 @@ async def update_country(code: str, update: CountryUpdate):
 
 @router.get("/cities")
 async def list_cities(
+    request: Request,
     country_code: Optional[str] = Query(None, description="Ülke kodu ile filtrele"),
     has_fair_center: Optional[bool] = Query(None, description="Fuar merkezi olanlar"),
-    search: Optional[str] = Query(None, description="Şehir adı ara"),
-    limit: int = Query(100, le=500)
+    search: Optional[str] = Query(None, description="Şehir adı ara (yazarken öneri)"),
+    limit: int = Query(100, ge=1, le=500)
 ):
     """
     Şehirleri listele
     """
-    db = await get_platform_db()
-    collection = db.cities
+    geo = await geo_index.get(await get_platform_db())
+    country_code = country_code.upper() if country_code else None
     
-    query = {"is_active": True}
-    
-    if country_code:
-        query["country_code"] = country_code.upper()
-    
-    if has_fair_center is not None:
-        query["has_fair_center"] = has_fair_center
+    def visible(city):
+        return (
+            city.get("is_active") is True
+            and (country_code is None or city.get("country_code") == country_code)
+            and (has_fair_center is None or city.get("has_fair_center") == has_fair_center)
+        )
     
     if search:
-        query["$or"] = [
-            {"name": {"$regex": search, "$options": "i"}},
-            {"name_tr": {"$regex": search, "$options": "i"}}
-        ]
+        ranked = geo.search_cities(search, country=country_code)
+        return [_with_id(city) for city in ranked if visible(city)][:limit]
     
-    cities = await collection.find(query).sort("population", -1).to_list(limit)
+    def build():
+        cities = sorted((c for c in geo.cities if visible(c)), key=lambda c: -geo_index.population(c))
+        return [_with_id(city) for city in cities[:limit]]
     
-    for city in cities:
-        city["id"] = str(city.pop("_id"))
-    
-    return cities
+    return geo.cached_response(request, f"global_cities:{country_code}:{has_fair_center}:{limit}", build)
 
 
 @router.get("/cities/{country_code}/{city_name}")
@@ -410,6 +417,7 @@ async def create_city(city: CityCreate):
     }
     
     result = await collection.insert_one(doc)
+    await geo_index.invalidate(db)
     doc["id"] = str(result.inserted_id)
     
     return doc
@@ -419,24 +427,23 @@ async def create_city(city: CityCreate):
 # LANGUAGES ENDPOINTS
 # ============================================================
 
+@reference_cache.reference("global_languages", ["languages"])
+async def load_global_languages(db):
+    """Tüm diller, sort_order sırasıyla"""
+    languages = await db.languages.find({}).sort("sort_order", 1).to_list(50)
+    for lang in languages:
+        lang["id"] = str(lang.pop("_id"))
+    return languages
+
+
 @router.get("/languages")
-async def list_languages(active_only: bool = Query(True)):
+async def list_languages(request: Request, active_only: bool = Query(True)):
     """
     Dilleri listele
     """
-    db = await get_platform_db()
-    collection = db.languages
-    
-    query = {}
-    if active_only:
-        query["is_active"] = True
-    
-    languages = await collection.find(query).sort("sort_order", 1).to_list(50)
-    
-    for lang in languages:
-        lang["id"] = str(lang.pop("_id"))
-    
-    return languages
+    snapshot = await reference_cache.get(await get_platform_db(), "global_languages")
+    languages = [lang for lang in snapshot.content if lang.get("is_active") or not active_only]
+    return reference_cache.content_response(request, languages)
 
 
 @router.post("/languages")
@@ -457,6 +464,7 @@ async def create_language(language: LanguageCreate):
     }
     
     result = await collection.insert_one(doc)
+    await reference_cache.bump(db, "languages")
     doc["id"] = str(result.inserted_id)
     
     return doc
@@ -479,6 +487,8 @@ async def seed_global_data():
         "cities": await _seed_cities(db),
         "languages": await _seed_languages(db)
     }
+    await geo_index.invalidate(db)
+    await reference_cache.bump(db, "currencies", "languages")
     
     return {
         "message": "Global data seed tamamlandı",
@@ -1084,6 +1094,9 @@ async def seed_all_global_data():
     
     print(f"✅ {results['languages']} dil oluşturuldu")
     
+    await geo_index.invalidate(db)
+    await reference_cache.bump(db, "currencies", "languages")
+    
     return {
         **results,
         "message": "Tüm global data başarıyla seed edildi"
@@ -0,0 +1,78 @@
+"""
+Jobs Router
+===========
+Vitingo CRM - Arka Plan İşleri (Job Queue)
+
+E-posta gönderimi gibi uzun süren işler istek içinde değil, job_queue
+worker'larında çalışır. Endpoint'ler iş durumunu (queued, running,
+succeeded, failed, cancelled), sonucunu ve hata geçmişini döner.
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from motor.motor_asyncio import AsyncIOMotorClient
+from typing import Optional
+import os
+
+import job_queue
+
+router = APIRouter(prefix="/api/jobs", tags=["Jobs"])
+
+# MongoDB connection - job'lar ana veritabanında
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+client = AsyncIOMotorClient(MONGO_URL)
+db = client[os.environ.get('DB_NAME', 'crm_db')]
+
+
+@router.get("/stats")
+async def get_job_stats():
+    """Tip ve duruma göre iş sayıları, en eski bekleyen iş"""
+    try:
+        return await job_queue.queue_stats(db)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("")
+async def list_jobs(
+    type: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500)
+):
+    """Son işler (yeniden eskiye); tip ve duruma göre filtrelenebilir"""
+    query = {}
+    if type:
+        query["type"] = type
+    if status:
+        query["status"] = status
+    try:
+        jobs = await db[job_queue.JOBS_COLLECTION].find(query, {"payload": 0}).sort(
+            "created_at", -1
+        ).limit(limit).to_list(limit)
+        return [job_queue.public_job(job) for job in jobs]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    """Tek işin durumu, sonucu ve hata geçmişi"""
+    job = await job_queue.get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="İş bulunamadı")
+    return job
+
+
+@router.post("/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Henüz başlamamış işi iptal et"""
+    if not await job_queue.cancel(db, job_id):
+        raise HTTPException(status_code=409, detail="Sadece bekleyen (queued) işler iptal edilebilir")
+    return {"success": True, "id": job_id, "status": job_queue.CANCELLED}
+
+
+@router.post("/{job_id}/retry")
+async def retry_job(job_id: str):
+    """Başarısız veya iptal edilmiş işi yeniden kuyruğa al"""
+    if not await job_queue.retry(db, job_id):
+        raise HTTPException(status_code=409, detail="Sadece başarısız veya iptal edilmiş işler yeniden denenebilir")
+    return {"success": True, "id": job_id, "status": job_queue.QUEUED}
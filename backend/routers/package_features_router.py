@@ -21,6 +21,8 @@ from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
 
+import entitlements
+
 router = APIRouter(prefix="/api/packages", tags=["Package Features"])
 
 # MongoDB connection - direkt bağlantı
@@ -110,6 +112,14 @@ class FeatureCheckResponse(BaseModel):
     upgrade_packages: List[str]  # Bu özelliği içeren paketler
 
 
+class EntitlementCheckRequest(BaseModel):
+    """Toplu özellik + flag kontrolü isteği (boş liste = hepsi)"""
+    tenant_slug: str
+    features: Optional[List[str]] = None
+    flags: Optional[List[str]] = None
+    user_role: Optional[str] = None
+
+
 # ============================================================
 # DATABASE HELPERS
 # ============================================================
@@ -183,6 +193,7 @@ async def create_package(package: PackageCreate):
     
     result = await collection.insert_one(doc)
     doc["id"] = str(result.inserted_id)
+    await entitlements.invalidate()
     
     return doc
 
@@ -205,6 +216,8 @@ async def update_package(package_key: str, update: PackageUpdate):
         {"$set": update_data}
     )
     
+    await entitlements.invalidate()
+    
     updated = await collection.find_one({"key": package_key})
     updated["id"] = str(updated.pop("_id"))
     
@@ -266,47 +279,29 @@ async def check_feature(request: FeatureCheckRequest):
     
     Frontend'den çağrılır.
     """
-    db = await get_platform_db()
-    
-    # Tenant'ı bul
-    tenant = await db.tenants.find_one({"slug": request.tenant_slug})
+    tenant = await entitlements.get_tenant(request.tenant_slug)
     
     if not tenant:
         raise HTTPException(status_code=404, detail="Tenant bulunamadı")
     
-    # Tenant'ın paketi
-    package_key = tenant.get("package_key", "starter")
+    # Paket özellikleri + override'lar bellekteki snapshot'tan
+    return FeatureCheckResponse(**tenant.check_feature(request.feature_key))
+
+
+@router.post("/entitlements")
+async def check_entitlements(request: EntitlementCheckRequest):
+    """
+    Tenant'ın özelliklerini, feature flag'lerini ve limitlerini tek seferde kontrol et
     
-    # Paketi bul
-    package = await db.packages.find_one({"key": package_key})
+    Frontend sayfa yüklenirken tek istekle tüm yetkileri almak için.
+    `features` / `flags` verilmezse tümü döner.
+    """
+    tenant = await entitlements.get_tenant(request.tenant_slug)
     
-    if not package:
-        # Varsayılan starter paketi
-        package = {"key": "starter", "features": []}
-    
-    # Özellik dahil mi?
-    has_access = request.feature_key in package.get("features", [])
-    
-    # Feature override kontrolü (Ultra Admin özel açmış olabilir)
-    feature_overrides = tenant.get("feature_overrides", {})
-    if request.feature_key in feature_overrides:
-        has_access = feature_overrides[request.feature_key]
-    
-    # Bu özelliği içeren paketleri bul (upgrade önerisi için)
-    upgrade_packages = []
-    if not has_access:
-        all_packages = await db.packages.find({"is_active": True}).to_list(20)
-        for pkg in all_packages:
-            if request.feature_key in pkg.get("features", []):
-                upgrade_packages.append(pkg["key"])
-    
-    return FeatureCheckResponse(
-        feature_key=request.feature_key,
-        has_access=has_access,
-        reason="included" if has_access else "not_in_package",
-        current_package=package_key,
-        upgrade_packages=upgrade_packages
-    )
+    if not tenant:
+        raise HTTPException(status_code=404, detail="Tenant bulunamadı")
+    
+    return tenant.evaluate(request.features, request.flags, request.user_role)
 
 
 @router.post("/check-limit")
@@ -316,25 +311,16 @@ async def check_limit(tenant_slug: str, limit_key: str, current_usage: int):
     
     Örnek: max_users, max_companies, max_projects
     """
-    db = await get_platform_db()
-    
-    # Tenant'ı bul
-    tenant = await db.tenants.find_one({"slug": tenant_slug})
+    tenant = await entitlements.get_tenant(tenant_slug)
     
     if not tenant:
         raise HTTPException(status_code=404, detail="Tenant bulunamadı")
     
-    # Tenant'ın paketi
-    package_key = tenant.get("package_key", "starter")
-    
-    # Paketi bul
-    package = await db.packages.find_one({"key": package_key})
-    
-    if not package:
+    if not tenant.package_found:
         raise HTTPException(status_code=404, detail="Paket bulunamadı")
     
     # Limit değeri
-    limits = package.get("limits", {})
+    limits = tenant.limits
     max_value = limits.get(limit_key)
     
     if max_value is None:
@@ -368,43 +354,18 @@ async def get_tenant_features(tenant_slug: str):
     
     Frontend sayfa yüklenirken tüm özellikleri çekmek için.
     """
-    db = await get_platform_db()
-    
-    # Tenant'ı bul
-    tenant = await db.tenants.find_one({"slug": tenant_slug})
+    tenant = await entitlements.get_tenant(tenant_slug)
     
     if not tenant:
         raise HTTPException(status_code=404, detail="Tenant bulunamadı")
     
-    # Tenant'ın paketi
-    package_key = tenant.get("package_key", "starter")
-    
-    # Paketi bul
-    package = await db.packages.find_one({"key": package_key})
-    
-    if not package:
-        package = {"key": "starter", "features": [], "limits": {}}
-    
-    # Feature overrides
-    feature_overrides = tenant.get("feature_overrides", {})
-    
-    # Tüm özellikleri birleştir
-    all_features = set(package.get("features", []))
-    
-    # Override'ları uygula
-    for feature_key, enabled in feature_overrides.items():
-        if enabled:
-            all_features.add(feature_key)
-        elif feature_key in all_features:
-            all_features.remove(feature_key)
-    
     return {
         "tenant_slug": tenant_slug,
-        "package_key": package_key,
-        "package_name": package.get("name", "Starter"),
-        "features": list(all_features),
-        "limits": package.get("limits", {}),
-        "feature_overrides": feature_overrides
+        "package_key": tenant.package_key,
+        "package_name": tenant.package_name,
+        "features": list(tenant.features),
+        "limits": tenant.limits,
+        "feature_overrides": tenant.feature_overrides
     }
 
 
@@ -442,7 +403,10 @@ async def seed_packages():
                 "max_customers": 1000,
                 "max_projects": 50,
                 "storage_gb": 10,
-                "email_per_month": 1000
+                "email_per_month": 1000,
+                "max_concurrent_requests": 4,
+                "query_max_time_ms": 5000,
+                "query_max_docs": 10000
             },
             "features": [
                 "customers", "projects", "opportunities", "calendar", 
@@ -468,7 +432,10 @@ async def seed_packages():
                 "max_customers": 5000,
                 "max_projects": 200,
                 "storage_gb": 50,
-                "email_per_month": 5000
+                "email_per_month": 5000,
+                "max_concurrent_requests": 8,
+                "query_max_time_ms": 15000,
+                "query_max_docs": 50000
             },
             "features": [
                 "customers", "customers_advanced", "projects", "opportunities", 
@@ -497,7 +464,10 @@ async def seed_packages():
                 "max_customers": -1,
                 "max_projects": -1,
                 "storage_gb": 200,
-                "email_per_month": 20000
+                "email_per_month": 20000,
+                "max_concurrent_requests": 16,
+                "query_max_time_ms": 30000,
+                "query_max_docs": 200000
             },
             "features": [
                 "customers", "customers_advanced", "projects", "opportunities", 
@@ -524,6 +494,7 @@ async def seed_packages():
         created = 0
     
     print(f"✅ {created} paket oluşturuldu")
+    await entitlements.invalidate()
     
     return {
         "success": True,
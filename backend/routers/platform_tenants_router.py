@@ -0,0 +1,147 @@
+"""
+Platform Tenants Router
+=======================
+Vitingo CRM - Tenant Oluşturma (Provisioning)
+
+Yeni tenant'lar versiyonlu tenant şablonundan oluşturulur:
+- Tenant + sahip kullanıcı kaydı (vitingo_platform)
+- Tenant veritabanı: koleksiyonlar, index'ler, varsayılan veriler
+- Şablon yükseltme: eski tenant'lara yeni şablon versiyonunu uygula
+- Kota metrikleri: tenant başına eşzamanlı istek/sorgu ve reddedilen istekler
+"""
+
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel, EmailStr, Field
+import logging
+
+import tenant_quotas
+from auth_middleware import require_role
+from dependencies import client
+from entitlements import DEFAULT_PACKAGE_KEY
+from tenant_provisioning import (
+    ProvisioningError,
+    applied_template_version,
+    apply_template,
+    provision_tenant,
+)
+from tenant_template import TEMPLATE_VERSION
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/platform/tenants", tags=["Platform Tenants"])
+
+
+# ============================================================
+# MODELS
+# ============================================================
+
+class TenantSignup(BaseModel):
+    """Yeni tenant (self-signup, varsayılan paket)"""
+    slug: str = Field(..., description="Benzersiz tenant slug'ı (küçük harf, rakam, '_')")
+    name: str = Field(..., description="Şirket adı")
+    owner_email: EmailStr
+    owner_name: str
+    owner_password: str = Field(..., min_length=8)
+
+
+class TenantCreate(TenantSignup):
+    """Yeni tenant (Ultra Admin, paket seçilebilir)"""
+    package_key: str = Field("starter", description="Başlangıç paketi")
+
+
+# ============================================================
+# ENDPOINTS
+# ============================================================
+
+async def _provision(signup: TenantSignup, package_key: str):
+    try:
+        return await provision_tenant(
+            client,
+            slug=signup.slug,
+            name=signup.name,
+            owner_email=signup.owner_email,
+            owner_name=signup.owner_name,
+            owner_password=signup.owner_password,
+            package_key=package_key
+        )
+    except ProvisioningError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error provisioning tenant {signup.slug}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("")
+async def create_tenant(signup: TenantSignup):
+    """
+    Yeni tenant oluştur (self-signup, varsayılan paket)
+    
+    Tenant veritabanı şablondan birkaç saniye içinde hazırlanır;
+    dönen `template.timings_ms` süreleri gösterir.
+    """
+    return await _provision(signup, DEFAULT_PACKAGE_KEY)
+
+
+@router.post("/admin")
+async def create_tenant_with_package(request: Request, tenant: TenantCreate):
+    """Yeni tenant oluştur, paketi seçerek (Ultra Admin)"""
+    await require_role(request, ["super_admin"])
+    return await _provision(tenant, tenant.package_key)
+
+
+@router.get("/quotas")
+async def get_tenant_quotas():
+    """
+    Tüm tenant'ların kota metrikleri (bu sunucu süreci)
+    
+    Anlık eşzamanlı istek/sorgu sayıları, reddedilen istekler (429),
+    zaman aşımları (maxTimeMS) ve belge limiti aşımları; en yoğun tenant başta.
+    """
+    return tenant_quotas.stats()
+
+
+@router.get("/{tenant_slug}/quotas")
+async def get_tenant_quota(tenant_slug: str):
+    """Tek tenant'ın paket kotaları ve metrikleri"""
+    return tenant_quotas.stats(tenant_slug)
+
+
+@router.get("/{tenant_slug}/template")
+async def get_tenant_template_status(tenant_slug: str):
+    """Tenant'a uygulanmış şablon versiyonu"""
+    tenant = await client["vitingo_platform"].tenants.find_one({"slug": tenant_slug}, {"_id": 0, "database_name": 1})
+    if not tenant:
+        raise HTTPException(status_code=404, detail="Tenant bulunamadı")
+    
+    db = client[tenant.get("database_name", f"vitingo_t_{tenant_slug}")]
+    applied = await applied_template_version(db)
+    return {
+        "tenant_slug": tenant_slug,
+        "applied_version": applied,
+        "latest_version": TEMPLATE_VERSION,
+        "up_to_date": applied >= TEMPLATE_VERSION
+    }
+
+
+@router.post("/{tenant_slug}/template")
+async def upgrade_tenant_template(tenant_slug: str):
+    """
+    Güncel şablonu tenant'a uygula (Ultra Admin)
+    
+    Eksik koleksiyon/index'leri oluşturur, boş koleksiyonlara varsayılan verileri ekler.
+    Mevcut veriye dokunmaz.
+    """
+    platform_db = client["vitingo_platform"]
+    tenant = await platform_db.tenants.find_one({"slug": tenant_slug}, {"_id": 0, "database_name": 1})
+    if not tenant:
+        raise HTTPException(status_code=404, detail="Tenant bulunamadı")
+    
+    try:
+        result = await apply_template(client[tenant.get("database_name", f"vitingo_t_{tenant_slug}")])
+        await platform_db.tenants.update_one(
+            {"slug": tenant_slug}, {"$set": {"template_version": result["template_version"]}}
+        )
+        return result
+    except Exception as e:
+        logger.error(f"Error applying template to {tenant_slug}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -9,7 +9,7 @@ from datetime import datetime
 
 from dependencies import get_platform_db
 from auth_utils import (
-    verify_password,
+    verify_password_async,
     create_access_token,
     decode_access_token,
     verify_token_tenant
@@ -76,7 +76,7 @@ async def login(
             detail="User account is not properly configured"
         )
     
-    if not verify_password(credentials.password, user["password_hash"]):
+    if not await verify_password_async(credentials.password, user["password_hash"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -73,6 +73,27 @@ class CreditCardResponse(BaseModel):
     updated_at: datetime
 
 
+# Fields returned by listing/detail queries - the ciphertext never leaves the DB
+CARD_DISPLAY_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "cardCategory": 1,
+    "cardHolderFullName": 1,
+    "companyId": 1,
+    "companyName": 1,
+    "cardLast4": 1,
+    "cardBrand": 1,
+    "maskedCardNumber": 1,
+    "expiryDate": 1,
+    "cardType": 1,
+    "bank": 1,
+    "spendingLimit": 1,
+    "isActive": 1,
+    "created_at": 1,
+    "updated_at": 1,
+}
+
+
 # ==================== HELPER FUNCTIONS ====================
 
 def encrypt_card_number(card_number: str) -> str:
@@ -102,6 +123,39 @@ def mask_card_number(card_number: str) -> str:
     return f"**** **** **** {last4}"
 
 
+def build_card_display_fields(card_number: str) -> dict:
+    """Precompute the display fields stored alongside the encrypted card number.
+
+    These are written at create/update time so listings never need to decrypt.
+    """
+    last4 = card_number[-4:] if card_number and len(card_number) >= 4 else ""
+    return {
+        "cardLast4": last4,
+        "cardBrand": detect_card_type(card_number),
+        "maskedCardNumber": mask_card_number(card_number),
+    }
+
+
+def card_to_response(card: dict) -> CreditCardResponse:
+    """Build a masked response from a stored card document (no decryption)"""
+    masked_number = card.get("maskedCardNumber") or mask_card_number(card.get("cardLast4", ""))
+    return CreditCardResponse(
+        id=card["id"],
+        cardCategory=card.get("cardCategory", "personal"),
+        cardHolderFullName=card.get("cardHolderFullName", ""),
+        companyId=card.get("companyId"),
+        companyName=card.get("companyName"),
+        cardNumber=masked_number,
+        expiryDate=card.get("expiryDate", ""),
+        cardType=card.get("cardType") or card.get("cardBrand", "visa"),
+        bank=card.get("bank"),
+        spendingLimit=card.get("spendingLimit"),
+        isActive=card.get("isActive", True),
+        created_at=card.get("created_at", datetime.utcnow()),
+        updated_at=card.get("updated_at", datetime.utcnow())
+    )
+
+
 def validate_luhn(card_number: str) -> bool:
     """Validate card number using Luhn algorithm"""
     # Remove spaces and non-digits
@@ -208,6 +262,7 @@ async def create_credit_card(card: CreditCardCreate):
             "companyId": card.companyId,
             "companyName": card.companyName,
             "encrypted_card_number": encrypted_card_number,  # Store encrypted
+            **build_card_display_fields(card_number_clean),  # Masked display fields
             "expiryDate": card.expiryDate,
             "cardType": detected_type,  # Use auto-detected type
             "bank": card.bank,
@@ -245,38 +300,12 @@ async def create_credit_card(card: CreditCardCreate):
 
 @router.get("/credit-cards", response_model=List[CreditCardResponse])
 async def get_all_credit_cards():
-    """Get all credit cards with masked numbers"""
+    """Get all credit cards with masked numbers (projection only, no decryption)"""
     try:
-        cards = await db.credit_cards.find({}, {"_id": 0}).to_list(1000)
-        
-        # Decrypt and mask card numbers for display
-        result = []
-        for card in cards:
-            try:
-                # Decrypt the card number
-                decrypted_number = decrypt_card_number(card.get("encrypted_card_number", ""))
-                # Mask it for display
-                masked_number = mask_card_number(decrypted_number)
-                
-                result.append(CreditCardResponse(
-                    id=card["id"],
-                    cardCategory=card.get("cardCategory", "personal"),
-                    cardHolderFullName=card.get("cardHolderFullName", ""),
-                    companyId=card.get("companyId"),
-                    companyName=card.get("companyName"),
-                    cardNumber=masked_number,  # Masked for security
-                    expiryDate=card.get("expiryDate", ""),
-                    cardType=card.get("cardType", "visa"),
-                    bank=card.get("bank"),
-                    spendingLimit=card.get("spendingLimit"),
-                    isActive=card.get("isActive", True),
-                    created_at=card.get("created_at", datetime.utcnow()),
-                    updated_at=card.get("updated_at", datetime.utcnow())
-                ))
-            except Exception as e:
-                # Skip cards with decryption errors
-                print(f"Error processing card {card.get('id')}: {str(e)}")
-                continue
+        cards = await db.credit_cards.find({}, CARD_DISPLAY_PROJECTION).to_list(1000)
+        
+        # Display fields are precomputed at write time, no decryption needed
+        result = [card_to_response(card) for card in cards]
         
         return result
         
@@ -288,30 +317,12 @@ async def get_all_credit_cards():
 async def get_credit_card(card_id: str):
     """Get a single credit card by ID"""
     try:
-        card = await db.credit_cards.find_one({"id": card_id}, {"_id": 0})
+        card = await db.credit_cards.find_one({"id": card_id}, CARD_DISPLAY_PROJECTION)
         
         if not card:
             raise HTTPException(status_code=404, detail="Kart bulunamadı")
         
-        # Decrypt and mask the card number
-        decrypted_number = decrypt_card_number(card.get("encrypted_card_number", ""))
-        masked_number = mask_card_number(decrypted_number)
-        
-        return CreditCardResponse(
-            id=card["id"],
-            cardCategory=card.get("cardCategory", "personal"),
-            cardHolderFullName=card.get("cardHolderFullName", ""),
-            companyId=card.get("companyId"),
-            companyName=card.get("companyName"),
-            cardNumber=masked_number,
-            expiryDate=card.get("expiryDate", ""),
-            cardType=card.get("cardType", "visa"),
-            bank=card.get("bank"),
-            spendingLimit=card.get("spendingLimit"),
-            isActive=card.get("isActive", True),
-            created_at=card.get("created_at", datetime.utcnow()),
-            updated_at=card.get("updated_at", datetime.utcnow())
-        )
+        return card_to_response(card)
         
     except HTTPException:
         raise
@@ -324,7 +335,7 @@ async def update_credit_card(card_id: str, card_update: CreditCardUpdate):
     """Update a credit card"""
     try:
         # Check if card exists
-        existing_card = await db.credit_cards.find_one({"id": card_id}, {"_id": 0})
+        existing_card = await db.credit_cards.find_one({"id": card_id}, {"_id": 0, "id": 1})
         if not existing_card:
             raise HTTPException(status_code=404, detail="Kart bulunamadı")
         
@@ -365,9 +376,10 @@ async def update_credit_card(card_id: str, card_update: CreditCardUpdate):
             encrypted_card_number = encrypt_card_number(card_number_clean)
             update_data["encrypted_card_number"] = encrypted_card_number
             
-            # Auto-detect card type
+            # Auto-detect card type and refresh masked display fields
             detected_type = detect_card_type(card_number_clean)
             update_data["cardType"] = detected_type
+            update_data.update(build_card_display_fields(card_number_clean))
         
         update_data["updated_at"] = datetime.utcnow()
         
@@ -378,27 +390,9 @@ async def update_credit_card(card_id: str, card_update: CreditCardUpdate):
         )
         
         # Fetch updated card
-        updated_card = await db.credit_cards.find_one({"id": card_id}, {"_id": 0})
+        updated_card = await db.credit_cards.find_one({"id": card_id}, CARD_DISPLAY_PROJECTION)
         
-        # Decrypt and mask for response
-        decrypted_number = decrypt_card_number(updated_card.get("encrypted_card_number", ""))
-        masked_number = mask_card_number(decrypted_number)
-        
-        return CreditCardResponse(
-            id=updated_card["id"],
-            cardCategory=updated_card.get("cardCategory", "personal"),
-            cardHolderFullName=updated_card.get("cardHolderFullName", ""),
-            companyId=updated_card.get("companyId"),
-            companyName=updated_card.get("companyName"),
-            cardNumber=masked_number,
-            expiryDate=updated_card.get("expiryDate", ""),
-            cardType=updated_card.get("cardType", "visa"),
-            bank=updated_card.get("bank"),
-            spendingLimit=updated_card.get("spendingLimit"),
-            isActive=updated_card.get("isActive", True),
-            created_at=updated_card.get("created_at", datetime.utcnow()),
-            updated_at=updated_card.get("updated_at", datetime.utcnow())
-        )
+        return card_to_response(updated_card)
         
     except HTTPException:
         raise
@@ -7,6 +7,10 @@ import uuid
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
 
+from json_response import FastJSONResponse
+from pagination import PageParams, fetch_page
+import search_service
+
 router = APIRouter(prefix="/api/leads", tags=["leads"])
 
 # Lead Pydantic Model
@@ -76,9 +80,10 @@ def serialize_lead(doc):
 @router.get("")
 async def get_leads(
     status: Optional[str] = None,
+    page_params: PageParams = Depends(),
     db = Depends(get_db)
 ):
-    """Get all leads, optionally filtered by status"""
+    """Get leads, optionally filtered by status (keyset paginated when cursor/limit is given)"""
     try:
         leads_collection = db["leads"]
         
@@ -87,14 +92,18 @@ async def get_leads(
         if status:
             filter_query["status"] = status
         
+        if not page_params.legacy:
+            page = await fetch_page(leads_collection, filter_query, page_params)
+            return page.to_response()
+        
         # Get leads
-        leads_cursor = leads_collection.find(filter_query).sort("created_at", -1)
+        leads_cursor = leads_collection.find(filter_query, {"_id": 0}).sort("created_at", -1)
         leads = await leads_cursor.to_list(length=None)
         
-        # Serialize
-        serialized_leads = [serialize_lead(lead) for lead in leads]
-        
-        return JSONResponse(content=serialized_leads)
+        # datetime values are encoded by the response class
+        return FastJSONResponse(content=leads)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error fetching leads: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Leadler alınırken hata oluştu: {str(e)}")
@@ -119,6 +128,7 @@ async def create_lead(
         
         # Insert
         result = await leads_collection.insert_one(lead_dict)
+        await search_service.reindex(db, "leads", lead.id)
         
         if result.inserted_id:
             # Fetch the created lead
@@ -172,6 +182,7 @@ async def delete_lead(
         
         # Delete
         result = await leads_collection.delete_one({"id": lead_id})
+        await search_service.reindex(db, "leads", lead_id)
         
         if result.deleted_count > 0:
             return JSONResponse(
@@ -253,6 +264,7 @@ async def convert_lead_to_customer(
         # Insert customer
         customer_result = await customers_collection.insert_one(customer_doc)
         new_customer_id = customer_doc["id"]
+        await search_service.reindex(db, "customers", new_customer_id)
         
         # Update lead status
         await leads_collection.update_one(
@@ -265,6 +277,7 @@ async def convert_lead_to_customer(
                 }
             }
         )
+        await search_service.reindex(db, "leads", lead_id)
         
         return JSONResponse(
             content={
@@ -303,6 +316,7 @@ async def update_lead(
             {"id": lead_id},
             {"$set": lead_update}
         )
+        await search_service.reindex(db, "leads", lead_id)
         
         if result.modified_count > 0 or result.matched_count > 0:
             # Fetch updated lead
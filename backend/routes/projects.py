@@ -7,6 +7,9 @@ import uuid
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
 
+from json_response import FastJSONResponse
+from pagination import PageParams, fetch_page
+
 router = APIRouter(prefix="/api/projects", tags=["projects"])
 
 # Payment Term Model
@@ -85,9 +88,10 @@ def serialize_document(doc):
 @router.get("")
 async def get_projects(
     status: Optional[str] = None,
+    page_params: PageParams = Depends(),
     db = Depends(get_db)
 ):
-    """Get all projects, optionally filtered by status"""
+    """Get projects, optionally filtered by status (keyset paginated when cursor/limit is given)"""
     try:
         projects_collection = db["projects"]
         
@@ -96,14 +100,18 @@ async def get_projects(
         if status:
             filter_query["status"] = status
         
+        if not page_params.legacy:
+            page = await fetch_page(projects_collection, filter_query, page_params)
+            return page.to_response()
+        
         # Get projects, sort by created_at (new first)
-        projects_cursor = projects_collection.find(filter_query).sort("created_at", -1)
+        projects_cursor = projects_collection.find(filter_query, {"_id": 0}).sort("created_at", -1)
         projects = await projects_cursor.to_list(length=None)
         
-        # Serialize
-        serialized_projects = [serialize_document(project) for project in projects]
-        
-        return JSONResponse(content=serialized_projects)
+        # datetime values are encoded by the response class
+        return FastJSONResponse(content=projects)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error fetching projects: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Projeler alınırken hata oluştu: {str(e)}")
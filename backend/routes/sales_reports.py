@@ -93,27 +93,6 @@ def calculate_change_percentage(current: float, previous: float) -> float:
         return 100.0 if current > 0 else 0.0
     return ((current - previous) / previous) * 100
 
-def serialize_doc(doc):
-    """Convert MongoDB document to JSON-serializable format"""
-    if isinstance(doc, dict):
-        result = {}
-        for key, value in doc.items():
-            if key == '_id':
-                if isinstance(value, ObjectId):
-                    result[key] = str(value)
-            elif isinstance(value, datetime):
-                result[key] = value.isoformat()
-            elif isinstance(value, ObjectId):
-                result[key] = str(value)
-            elif isinstance(value, list):
-                result[key] = [serialize_doc(item) for item in value]
-            elif isinstance(value, dict):
-                result[key] = serialize_doc(value)
-            else:
-                result[key] = value
-        return result
-    return doc
-
 
 # ========================
 # 1. SATIŞ ÖZETİ (DASHBOARD)
@@ -10,6 +10,7 @@ from typing import List, Dict, Optional
 from datetime import datetime
 
 from dependencies import get_tenant_db, get_tenant_info
+from report_service import invoice_due_at
 
 router = APIRouter()
 
@@ -113,6 +114,8 @@ async def create_invoice(
         invoice_data["createdAt"] = datetime.utcnow()
         invoice_data["updatedAt"] = datetime.utcnow()
         invoice_data["status"] = invoice_data.get("status", "draft")
+        # Indexed BSON due date used by the aging report
+        invoice_data["dueAt"] = invoice_due_at(invoice_data)
         
         result = await tenant_db.invoices.insert_one(invoice_data)
         
@@ -151,6 +154,8 @@ async def update_invoice(
     try:
         # Add update timestamp
         invoice_data["updatedAt"] = datetime.utcnow()
+        if "dueDate" in invoice_data or "due_date" in invoice_data:
+            invoice_data["dueAt"] = invoice_due_at(invoice_data)
         
         result = await tenant_db.invoices.update_one(
             {"invoiceNumber": invoice_id},
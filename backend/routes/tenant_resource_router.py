@@ -0,0 +1,407 @@
+"""
+Tenant Resource Router
+Generic CRUD, keyset pagination and bulk endpoints for a TenantResource
+
+Endpoints (under /api/{tenant_slug}/{path}):
+    GET    ""              list: declared filters, sort=[-]field, cursor/limit/fields/count
+    GET    "/{id}"         single document, optional fields=
+    POST   ""              create
+    PUT    "/{id}"         partial update; `version` (body) or If-Match enables the 409 check
+    DELETE "/{id}"         delete; `version` (query) or If-Match enables the 409 check
+    POST   "/bulk"         create up to MAX_BULK_ITEMS documents
+    PATCH  "/bulk"         update up to MAX_BULK_ITEMS documents (each with id, optional version)
+    POST   "/bulk-delete"  delete by ids
+"""
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pydantic import BaseModel
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from dependencies import get_tenant_db, get_tenant_info
+from pagination import PageParams, fetch_page, parse_fields
+from tenant_resources import TenantDocument, TenantResource
+
+logger = logging.getLogger(__name__)
+
+# Page size when the client sends no limit (the old routers' default)
+LEGACY_PAGE_SIZE = 100
+MAX_BULK_ITEMS = 500
+# Never taken from a payload on update
+PROTECTED_FIELDS = ("_id", "id", "version", "createdAt")
+
+# (database, collection) pairs whose indexes this process has ensured
+_indexed: Set[Tuple[str, str]] = set()
+
+
+class BulkDeleteRequest(BaseModel):
+    ids: List[str]
+
+
+def _tenant(tenant_slug: str, tenant: dict) -> Dict:
+    return {"slug": tenant_slug, "name": tenant["name"]}
+
+
+def _payload(data: TenantDocument, partial: bool) -> Dict:
+    """Fields sent by the client; new documents also get the model's defaults"""
+    payload = data.model_dump(exclude_unset=True)
+    if not partial:
+        for name, field in type(data).model_fields.items():
+            if name not in payload and field.default is not None:
+                payload[name] = field.default
+    for name in PROTECTED_FIELDS:
+        payload.pop(name, None)
+    return payload
+
+
+def _new_document(data: TenantDocument, now: datetime) -> Dict:
+    document = _payload(data, partial=False)
+    document.update({
+        "id": data.id or str(uuid.uuid4()),
+        "version": 1,
+        "createdAt": now,
+        "updatedAt": now
+    })
+    return document
+
+
+def _expected_version(version: Optional[int], if_match: Optional[str]) -> Optional[int]:
+    if version is not None:
+        return version
+    if not if_match:
+        return None
+    try:
+        return int(if_match.strip().removeprefix("W/").strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid If-Match header: {if_match}")
+
+
+def version_filter(doc_id: str, expected: Optional[int]) -> Dict:
+    query = {"id": doc_id}
+    if expected is not None:
+        # Documents written before versioning have no version field
+        query["version"] = {"$in": [0, None]} if expected == 0 else expected
+    return query
+
+
+async def _raise_missing_or_conflict(collection, resource: TenantResource, doc_id: str, expected: Optional[int]):
+    current = await collection.find_one({"id": doc_id}, {"_id": 0, "version": 1})
+    if current is None or expected is None:
+        raise HTTPException(status_code=404, detail=f"{resource.label} not found: {doc_id}")
+    raise HTTPException(
+        status_code=409,
+        detail=f"{resource.label} {doc_id} was modified by another request "
+               f"(expected version {expected}, current {current.get('version', 0)})"
+    )
+
+
+def _check_bulk_size(items: list):
+    if not items:
+        raise HTTPException(status_code=400, detail="No items given")
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_ITEMS} items per request")
+
+
+def build_router(resource: TenantResource) -> APIRouter:
+    """Router with the CRUD and bulk endpoints of `resource`"""
+    router = APIRouter()
+    model = resource.model
+    base = f"/api/{{tenant_slug}}/{resource.path}"
+
+    async def get_collection(tenant_db: AsyncIOMotorDatabase = Depends(get_tenant_db)):
+        """The resource collection, with its indexes ensured once per tenant database"""
+        collection = tenant_db[resource.collection]
+        key = (tenant_db.name, resource.collection)
+        if key not in _indexed:
+            _indexed.add(key)
+            results = await asyncio.gather(*[
+                collection.create_index(keys, **options) for keys, options in resource.index_specs()
+            ], return_exceptions=True)
+            for error in results:
+                if isinstance(error, Exception):
+                    logger.error(f"Index creation failed for {key[0]}.{key[1]} (documents without id? run migrations/12_backfill_tenant_resource_ids.py): {str(error)}")
+        return collection
+
+    @router.get(base)
+    async def list_documents(
+        request: Request,
+        tenant_slug: str,
+        sort: Optional[str] = Query(None, description="Sort field, prefix with - for descending"),
+        page_params: PageParams = Depends(),
+        collection=Depends(get_collection),
+        tenant: dict = Depends(get_tenant_info)
+    ):
+        """Declared filters, sort=[-]field and keyset pagination (cursor, limit, fields, count)"""
+        try:
+            query = resource.build_query(request.query_params)
+            sort_key, descending = resource.parse_sort(sort)
+            if "limit" not in request.query_params:
+                page_params.limit = LEGACY_PAGE_SIZE
+
+            page = await fetch_page(collection, query, page_params, sort_key=sort_key, descending=descending)
+
+            response = {
+                "status": "success",
+                "tenant": _tenant(tenant_slug, tenant),
+                "count": len(page.items),
+                "data": page.items,
+                "next_cursor": page.next_cursor,
+                "has_more": page.next_cursor is not None
+            }
+            if page.total is not None:
+                response["total"] = page.total
+                response["total_is_estimate"] = page.total_is_estimate
+            return response
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error fetching {resource.name}: {str(e)}"
+            )
+
+    @router.get(base + "/{doc_id}")
+    async def get_document(
+        tenant_slug: str,
+        doc_id: str,
+        fields: Optional[str] = Query(None, description="Comma separated list of fields to return"),
+        collection=Depends(get_collection),
+        tenant: dict = Depends(get_tenant_info)
+    ):
+        try:
+            projection = {"_id": 0}
+            names = parse_fields(fields)
+            if names:
+                projection.update({name: 1 for name in names})
+                projection.update({"id": 1, "version": 1})
+
+            document = await collection.find_one({"id": doc_id}, projection)
+            if not document:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"{resource.label} not found: {doc_id}"
+                )
+
+            return {
+                "status": "success",
+                "tenant": _tenant(tenant_slug, tenant),
+                "data": document
+            }
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error fetching {resource.label.lower()}: {str(e)}"
+            )
+
+    @router.post(base)
+    async def create_document(
+        tenant_slug: str,
+        data: model,
+        collection=Depends(get_collection),
+        tenant: dict = Depends(get_tenant_info)
+    ):
+        try:
+            document = _new_document(data, datetime.utcnow())
+            await collection.insert_one(document)
+            document.pop("_id", None)
+
+            return {
+                "status": "success",
+                "tenant": _tenant(tenant_slug, tenant),
+                "data": document
+            }
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error creating {resource.label.lower()}: {str(e)}"
+            )
+
+    @router.put(base + "/{doc_id}")
+    async def update_document(
+        tenant_slug: str,
+        doc_id: str,
+        data: model,
+        if_match: Optional[str] = Header(None),
+        collection=Depends(get_collection),
+        tenant: dict = Depends(get_tenant_info)
+    ):
+        try:
+            expected = _expected_version(data.version, if_match)
+            changes = _payload(data, partial=True)
+            changes["updatedAt"] = datetime.utcnow()
+
+            updated = await collection.find_one_and_update(
+                version_filter(doc_id, expected),
+                {"$set": changes, "$inc": {"version": 1}},
+                projection={"_id": 0},
+                return_document=ReturnDocument.AFTER
+            )
+            if updated is None:
+                await _raise_missing_or_conflict(collection, resource, doc_id, expected)
+
+            return {
+                "status": "success",
+                "tenant": _tenant(tenant_slug, tenant),
+                "data": updated
+            }
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error updating {resource.label.lower()}: {str(e)}"
+            )
+
+    @router.delete(base + "/{doc_id}")
+    async def delete_document(
+        tenant_slug: str,
+        doc_id: str,
+        version: Optional[int] = Query(None, description="Delete only if the document is still at this version"),
+        if_match: Optional[str] = Header(None),
+        collection=Depends(get_collection),
+        tenant: dict = Depends(get_tenant_info)
+    ):
+        try:
+            expected = _expected_version(version, if_match)
+            result = await collection.delete_one(version_filter(doc_id, expected))
+            if result.deleted_count == 0:
+                await _raise_missing_or_conflict(collection, resource, doc_id, expected)
+
+            return {
+                "status": "success",
+                "tenant": _tenant(tenant_slug, tenant),
+                "message": f"{resource.label} {doc_id} deleted successfully"
+            }
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error deleting {resource.label.lower()}: {str(e)}"
+            )
+
+    @router.post(base + "/bulk")
+    async def bulk_create_documents(
+        tenant_slug: str,
+        items: List[model],
+        collection=Depends(get_collection),
+        tenant: dict = Depends(get_tenant_info)
+    ):
+        try:
+            _check_bulk_size(items)
+            now = datetime.utcnow()
+            documents = [_new_document(item, now) for item in items]
+
+            errors = []
+            try:
+                await collection.insert_many(documents, ordered=False)
+            except BulkWriteError as e:
+                errors = [
+                    {"id": documents[err["index"]]["id"], "error": err.get("errmsg")}
+                    for err in e.details.get("writeErrors", [])
+                ]
+            failed = {error["id"] for error in errors}
+
+            return {
+                "status": "partial" if errors else "success",
+                "tenant": _tenant(tenant_slug, tenant),
+                "count": len(documents) - len(errors),
+                "ids": [doc["id"] for doc in documents if doc["id"] not in failed],
+                "errors": errors
+            }
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error creating {resource.name}: {str(e)}"
+            )
+
+    @router.patch(base + "/bulk")
+    async def bulk_update_documents(
+        tenant_slug: str,
+        items: List[model],
+        collection=Depends(get_collection),
+        tenant: dict = Depends(get_tenant_info)
+    ):
+        try:
+            _check_bulk_size(items)
+            if any(not item.id for item in items):
+                raise HTTPException(status_code=400, detail="Every item needs an id")
+
+            now = datetime.utcnow()
+            operations = []
+            for item in items:
+                changes = _payload(item, partial=True)
+                changes["updatedAt"] = now
+                operations.append(UpdateOne(
+                    version_filter(item.id, item.version),
+                    {"$set": changes, "$inc": {"version": 1}}
+                ))
+            result = await collection.bulk_write(operations, ordered=False)
+
+            not_found, conflicts = [], []
+            if result.matched_count < len(operations):
+                # Find out which items did not match: missing, or at another version
+                current = {
+                    doc["id"]: doc.get("version", 0)
+                    async for doc in collection.find(
+                        {"id": {"$in": [item.id for item in items]}}, {"_id": 0, "id": 1, "version": 1}
+                    )
+                }
+                for item in items:
+                    if item.id not in current:
+                        not_found.append(item.id)
+                    elif item.version is not None and current[item.id] != item.version + 1:
+                        conflicts.append({"id": item.id, "expected": item.version, "current": current[item.id]})
+
+            return {
+                "status": "partial" if not_found or conflicts else "success",
+                "tenant": _tenant(tenant_slug, tenant),
+                "matched": result.matched_count,
+                "modified": result.modified_count,
+                "not_found": not_found,
+                "conflicts": conflicts
+            }
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error updating {resource.name}: {str(e)}"
+            )
+
+    @router.post(base + "/bulk-delete")
+    async def bulk_delete_documents(
+        tenant_slug: str,
+        request: BulkDeleteRequest,
+        collection=Depends(get_collection),
+        tenant: dict = Depends(get_tenant_info)
+    ):
+        try:
+            _check_bulk_size(request.ids)
+            result = await collection.delete_many({"id": {"$in": request.ids}})
+
+            return {
+                "status": "success",
+                "tenant": _tenant(tenant_slug, tenant),
+                "count": result.deleted_count
+            }
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error deleting {resource.name}: {str(e)}"
+            )
+
+    return router
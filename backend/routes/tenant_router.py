@@ -8,6 +8,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from typing import List, Dict
 
+import admin_stats_service
 from dependencies import (
     get_tenant_db,
     get_tenant_info,
@@ -37,13 +38,9 @@ async def test_tenant_routing(
     tenant_db = context["tenant_db"]
     tenant = context["tenant"]
     
-    # Get collection counts
-    collections = await tenant_db.list_collection_names()
-    collection_counts = {}
-    
-    for col_name in collections:
-        count = await tenant_db[col_name].count_documents({})
-        collection_counts[col_name] = count
+    # Estimated collection counts (concurrent $collStats, cached briefly)
+    stats = await admin_stats_service.database_stats(tenant_db)
+    collection_counts = {c["name"]: c["count"] for c in stats["collections"]}
     
     return {
         "status": "success",
@@ -57,9 +54,9 @@ async def test_tenant_routing(
             "database_name": tenant.get("database_name", f"vitingo_t_{tenant_slug}")
         },
         "database_stats": {
-            "total_collections": len(collections),
+            "total_collections": stats["total"],
             "collections": collection_counts,
-            "total_documents": sum(collection_counts.values())
+            "total_documents": stats["total_documents"]
         }
     }
 
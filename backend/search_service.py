@@ -0,0 +1,269 @@
+"""
+CRM - Search Service
+Unified, diacritic-folded search index over the main CRM entities.
+
+Every indexed document gets one entry in `search_index` holding its folded
+tokens and their prefixes, so `/search?q=` is answered from a multikey index
+(typeahead: every query term matches as a prefix) instead of unanchored
+`$regex` scans. Turkish letters are folded (ı/i, ş/s, ğ/g, ç/c, ö/o, ü/u) on
+both the indexed text and the query.
+
+Entries are refreshed by `reindex()` after writes; `rebuild()` (see
+migrations/09_build_search_index.py) backfills the whole index.
+"""
+
+import logging
+import re
+import unicodedata
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from pymongo import ASCENDING, ReplaceOne
+
+logger = logging.getLogger(__name__)
+
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_LENGTH = 20
+DEFAULT_RESULT_LIMIT = 20
+MAX_RESULT_LIMIT = 100
+# Matching entries scored per query; keeps very short prefixes cheap
+CANDIDATE_LIMIT = 1000
+REBUILD_BATCH_SIZE = 500
+
+TURKISH_FOLD = str.maketrans({
+    "İ": "i", "I": "i", "ı": "i",
+    "Ş": "s", "ş": "s",
+    "Ğ": "g", "ğ": "g",
+    "Ç": "c", "ç": "c",
+    "Ö": "o", "ö": "o",
+    "Ü": "u", "ü": "u",
+})
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# entity -> collection, title fields, subtitle fields and other searchable fields
+SEARCH_ENTITIES = {
+    "customers": {
+        "collection": "customers",
+        "title": ["companyName"],
+        "subtitle": ["contactPerson", "city"],
+        "fields": ["companyTitle", "email", "phone", "mobile", "country", "sector", "taxNumber", "tags"],
+    },
+    "people": {
+        "collection": "people",
+        "title": ["first_name", "last_name"],
+        "subtitle": ["company", "job_title"],
+        "fields": ["email", "phone"],
+    },
+    "suppliers": {
+        "collection": "suppliers",
+        "title": ["company_short_name"],
+        "subtitle": ["company_title"],
+        "fields": ["email", "phone", "mobile", "tax_number", "city", "country", "specialty", "services"],
+    },
+    "opportunities": {
+        "collection": "opportunities",
+        "title": ["title"],
+        "subtitle": ["customer"],
+        "fields": ["contact_person", "trade_show", "city", "country"],
+    },
+    "products": {
+        "collection": "products",
+        "title": ["name"],
+        "subtitle": ["name_en"],
+        "fields": ["category"],
+    },
+    "fairs": {
+        "collection": "fairs",
+        "title": ["name"],
+        "subtitle": ["city", "country"],
+        "fields": ["fairCenter", "sector", "organizer", "year"],
+    },
+    "leads": {
+        "collection": "leads",
+        "title": ["companyName"],
+        "subtitle": ["contactPerson", "city"],
+        "fields": ["companyTitle", "email", "contactEmail", "phone", "contactMobile", "sector", "tags"],
+    },
+}
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip Turkish (and other) diacritics"""
+    text = text.translate(TURKISH_FOLD).lower()
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> List[str]:
+    """Folded alphanumeric tokens of `text`, in order, without duplicates"""
+    return list(dict.fromkeys(TOKEN_PATTERN.findall(fold(text))))
+
+
+def prefixes(tokens: Iterable[str]) -> List[str]:
+    """All prefixes of MIN_PREFIX_LENGTH..MAX_PREFIX_LENGTH characters"""
+    result = set()
+    for token in tokens:
+        for length in range(MIN_PREFIX_LENGTH, min(len(token), MAX_PREFIX_LENGTH) + 1):
+            result.add(token[:length])
+        if len(token) < MIN_PREFIX_LENGTH:
+            result.add(token)
+    return sorted(result)
+
+
+def _field_text(doc: Dict, fields: List[str]) -> List[str]:
+    values = []
+    for field in fields:
+        value = doc.get(field)
+        if isinstance(value, (list, tuple)):
+            values.extend(str(v) for v in value if v)
+        elif value not in (None, ""):
+            values.append(str(value))
+    return values
+
+
+def build_entry(entity: str, doc: Dict) -> Optional[Dict]:
+    """Search index entry for one document, or None if it should not be indexed"""
+    config = SEARCH_ENTITIES[entity]
+    entity_id = doc.get("id") or (str(doc["_id"]) if doc.get("_id") else None)
+    if not entity_id or doc.get("status") == "deleted":
+        return None
+
+    title_values = _field_text(doc, config["title"])
+    subtitle_values = _field_text(doc, config["subtitle"])
+    title_tokens = tokenize(" ".join(title_values))
+    tokens = list(dict.fromkeys(
+        title_tokens + tokenize(" ".join(subtitle_values + _field_text(doc, config["fields"])))
+    ))
+    # Phone numbers are also searchable as a single run of digits
+    for phone in _field_text(doc, [f for f in config["fields"] if "phone" in f.lower() or "mobile" in f.lower()]):
+        digits = re.sub(r"\D", "", phone)
+        if digits and digits not in tokens:
+            tokens.append(digits)
+
+    return {
+        "_id": f"{entity}:{entity_id}",
+        "entity": entity,
+        "entity_id": entity_id,
+        "title": " ".join(title_values),
+        "subtitle": ", ".join(subtitle_values),
+        "title_tokens": title_tokens,
+        "tokens": tokens,
+        "prefixes": prefixes(tokens),
+        "updated_at": datetime.now(timezone.utc),
+    }
+
+
+async def ensure_search_indexes(db):
+    """Multikey prefix index answering typeahead queries"""
+    await db.search_index.create_index([("prefixes", ASCENDING), ("entity", ASCENDING)])
+    await db.search_index.create_index([("entity", ASCENDING), ("entity_id", ASCENDING)])
+
+
+async def reindex(db, entity: str, entity_id: str):
+    """Refresh the entry of one document after it was created, updated or deleted.
+
+    Indexing failures are logged and never fail the write that triggered them.
+    """
+    try:
+        collection = db[SEARCH_ENTITIES[entity]["collection"]]
+        doc = await collection.find_one({"id": entity_id})
+        entry = build_entry(entity, doc) if doc else None
+        if entry:
+            await db.search_index.replace_one({"_id": entry["_id"]}, entry, upsert=True)
+        else:
+            await db.search_index.delete_one({"_id": f"{entity}:{entity_id}"})
+    except Exception as e:
+        logger.error(f"Search index update failed for {entity}:{entity_id}: {str(e)}")
+
+
+async def remove_entity(db, entity: str):
+    """Drop every entry of one entity (used when a collection is cleared)"""
+    await db.search_index.delete_many({"entity": entity})
+
+
+async def rebuild(db, entities: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """Rebuild the index from the source collections in bulk batches"""
+    counts = {}
+    for entity in entities or SEARCH_ENTITIES:
+        collection = db[SEARCH_ENTITIES[entity]["collection"]]
+        await remove_entity(db, entity)
+        operations = []
+        counts[entity] = 0
+        async for doc in collection.find({}):
+            entry = build_entry(entity, doc)
+            if not entry:
+                continue
+            operations.append(ReplaceOne({"_id": entry["_id"]}, entry, upsert=True))
+            if len(operations) >= REBUILD_BATCH_SIZE:
+                await db.search_index.bulk_write(operations, ordered=False)
+                counts[entity] += len(operations)
+                operations = []
+        if operations:
+            await db.search_index.bulk_write(operations, ordered=False)
+            counts[entity] += len(operations)
+    return counts
+
+
+def _score_expr(terms: List[str]) -> Dict:
+    """Per term: exact title word 4, title prefix 3, exact word 2, any prefix 1"""
+    scores = []
+    for term in terms:
+        scores.append({"$switch": {
+            "branches": [
+                {"case": {"$in": [term, "$title_tokens"]}, "then": 4},
+                {"case": {"$gt": [{"$size": {"$filter": {
+                    "input": "$title_tokens",
+                    "cond": {"$eq": [{"$indexOfCP": ["$$this", term]}, 0]}
+                }}}, 0]}, "then": 3},
+                {"case": {"$in": [term, "$tokens"]}, "then": 2},
+            ],
+            "default": 1
+        }})
+    return {"$add": scores}
+
+
+async def search(db, q: str, entities: Optional[List[str]] = None,
+                 limit: int = DEFAULT_RESULT_LIMIT) -> List[Dict]:
+    """Ranked entries whose tokens start with every term of `q`"""
+    terms = [term[:MAX_PREFIX_LENGTH] for term in tokenize(q)]
+    if not terms:
+        return []
+
+    match = {"prefixes": {"$all": terms}}
+    if entities:
+        match["entity"] = {"$in": entities}
+
+    pipeline = [
+        {"$match": match},
+        {"$limit": CANDIDATE_LIMIT},
+        {"$addFields": {"score": _score_expr(terms)}},
+        {"$sort": {"score": -1, "title": 1}},
+        {"$limit": min(limit, MAX_RESULT_LIMIT)},
+        {"$project": {
+            "_id": 0,
+            "entity": 1,
+            "id": "$entity_id",
+            "title": 1,
+            "subtitle": 1,
+            "score": 1
+        }}
+    ]
+    return await db.search_index.aggregate(pipeline).to_list(None)
+
+
+async def matching_ids(db, entity: str, q: str) -> Optional[List[str]]:
+    """Ids of one entity matching `q`, for list endpoints with a search filter.
+
+    None when the index cannot answer: a term is shorter than
+    MIN_PREFIX_LENGTH (only whole one-letter words are indexed) or the entity
+    has no entries yet (index not built). Callers then fall back to a regex.
+    """
+    terms = [term[:MAX_PREFIX_LENGTH] for term in tokenize(q)]
+    if not terms:
+        return []
+    if any(len(term) < MIN_PREFIX_LENGTH for term in terms):
+        return None
+    if not await db.search_index.find_one({"entity": entity}, {"_id": 1}):
+        return None
+    cursor = db.search_index.find({"prefixes": {"$all": terms}, "entity": entity}, {"_id": 0, "entity_id": 1})
+    return [entry["entity_id"] async for entry in cursor]
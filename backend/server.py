@@ -40,9 +40,6 @@ from reportlab.lib.units import inch, mm, cm
 import base64
 import asyncio
 from emergentintegrations.llm.openai.image_generation import OpenAIImageGeneration
-from emergentintegrations.llm.chat import LlmChat, UserMessage, ImageContent
-from openai import AsyncOpenAI
-import aiohttp
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib import colors
 from reportlab.pdfgen import canvas
@@ -66,12 +63,45 @@ from routes import sales_reports as sales_reports_router
 from routers import feature_flags_router
 from routers import global_data_router
 from routers import package_features_router
+from routers import platform_tenants_router
+from routers import jobs_router
 
 # Import email routes
 import email_routes
 
+# Import passive lead rule
+import passive_lead_service
+
+# Request-scoped batched lookups (customers, suppliers, users, projects)
+from entity_loader import RequestLoaders, request_loaders
+
+# Native JSON encoder used as the default response class
+from json_response import FastJSONResponse
+
+# Aggregation-based accounting reports
+import report_service
+import search_service
+import geo_index
+import reference_cache
+import admin_stats_service
+import tenant_template
+
+# Durable background jobs (email sending etc.)
+import job_queue
+import job_handlers
+
+# Concurrent, cached AI stand design generation
+import stand_design_service
+
+# Compiled contract templates, PDF rendering in a worker pool
+import contract_renderer
+
+# Keyset pagination for list endpoints
+from pagination import PageParams, fetch_page, ensure_pagination_indexes
+
 # Import proposal routes
 from proposal_endpoints import proposal_router
+from proposal_service import ensure_proposal_indexes
 from company_group_endpoints import company_group_router
 
 # Validation functions for bank information
@@ -133,9 +163,10 @@ def serialize_document(doc):
 mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
+get_loaders = request_loaders(db)
 
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -817,6 +848,7 @@ async def create_fair(fair_input: FairCreate):
         
         # Insert to MongoDB
         result = await db.fairs.insert_one(fair_obj.dict())
+        await search_service.reindex(db, "fairs", fair_obj.id)
         
         if result.inserted_id:
             logger.info(f"Fair created successfully: {fair_obj.name}")
@@ -865,6 +897,7 @@ async def update_fair(fair_id: str, fair_input: FairCreate):
             {"id": fair_id},
             {"$set": update_data}
         )
+        await search_service.reindex(db, "fairs", fair_id)
         
         if result.modified_count:
             updated_fair = await db.fairs.find_one({"id": fair_id})
@@ -923,6 +956,9 @@ async def bulk_import_fairs(data: dict):
                 errors.append(f"Error importing {fair_data.get('name', 'unknown')}: {str(e)}")
                 logger.error(f"Error importing fair: {str(e)}")
         
+        if imported_count:
+            await search_service.rebuild(db, ["fairs"])
+        
         return {
             "success": True,
             "count": imported_count,
@@ -938,6 +974,7 @@ async def delete_fair(fair_id: str):
     """Delete a fair"""
     try:
         result = await db.fairs.delete_one({"id": fair_id})
+        await search_service.reindex(db, "fairs", fair_id)
         
         if result.deleted_count:
             return {"message": "Fair deleted successfully"}
@@ -955,6 +992,7 @@ async def delete_all_fairs():
     """Delete all fairs from the database"""
     try:
         result = await db.fairs.delete_many({})
+        await search_service.remove_entity(db, "fairs")
         
         return {
             "message": f"Successfully deleted {result.deleted_count} fairs",
@@ -1145,12 +1183,16 @@ async def delete_payment_profile(profile_id: str):
 
 # Countries Endpoints
 @api_router.get("/library/countries", response_model=List[LibraryCountry])
-async def get_countries():
-    """Get all countries with Turkish locale sorting"""
-    try:
-        # Use Turkish locale collation for proper alphabetical sorting
-        countries = await db.countries.find().sort("name", 1).collation({"locale": "tr"}).to_list(None)
-        return [LibraryCountry(**country) for country in countries]
+async def get_countries(request: Request, q: Optional[str] = None, limit: int = 20):
+    """Get all countries with Turkish alphabetical sorting, or typeahead matches for `q`"""
+    try:
+        geo = await geo_index.get(db)
+        if q:
+            return [LibraryCountry(**country) for country in geo.search_countries(q, max(1, limit))]
+        return geo.cached_response(
+            request, "library_countries",
+            lambda: [LibraryCountry(**country).dict() for country in geo.countries]
+        )
     except Exception as e:
         logger.error(f"Error getting countries: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1161,6 +1203,7 @@ async def create_country(country: LibraryCountry):
     try:
         country_dict = country.dict()
         await db.countries.insert_one(country_dict)
+        await geo_index.invalidate(db)
         return country
     except Exception as e:
         logger.error(f"Error creating country: {str(e)}")
@@ -1176,6 +1219,7 @@ async def update_country(country_id: str, country: LibraryCountry):
         )
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Country not found")
+        await geo_index.invalidate(db)
         return country
     except HTTPException:
         raise
@@ -1194,6 +1238,7 @@ async def update_country(country_id: str, country: LibraryCountry):
         )
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Country not found")
+        await geo_index.invalidate(db)
         return {"message": "Country updated successfully"}
     except HTTPException:
         raise
@@ -1208,6 +1253,7 @@ async def delete_country(country_id: str):
         result = await db.countries.delete_one({"id": country_id})
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Country not found")
+        await geo_index.invalidate(db)
         return {"message": "Country deleted successfully"}
     except HTTPException:
         raise
@@ -1217,30 +1263,33 @@ async def delete_country(country_id: str):
 
 # Cities Endpoints
 @api_router.get("/library/cities", response_model=List[LibraryCity])
-async def get_cities(country: Optional[str] = None):
-    """Get all cities, optionally filtered by country"""
-    try:
-        # Build query filter
-        query = {}
-        if country:
-            query["country"] = country
-            logger.info(f"Fetching cities for country: '{country}'")
-        
-        cities = await db.cities.find(query).sort("name", 1).to_list(None)
-        logger.info(f"Found {len(cities)} cities" + (f" for country '{country}'" if country else ""))
-        return [LibraryCity(**city) for city in cities]
+async def get_cities(request: Request, country: Optional[str] = None, q: Optional[str] = None, limit: int = 20):
+    """Get all cities, optionally filtered by country, or typeahead matches for `q`"""
+    try:
+        geo = await geo_index.get(db)
+        if q:
+            cities = geo.search_cities(q, country=country, limit=max(1, limit))
+            return [LibraryCity(**city) for city in cities]
+        
+        cities = geo_index.matching(geo.cities, country=country) if country else geo.cities
+        return geo.cached_response(
+            request, f"library_cities:{country or ''}",
+            lambda: [LibraryCity(**city).dict() for city in cities]
+        )
     except Exception as e:
         logger.error(f"Error getting cities: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/library/cities/{country}", response_model=List[LibraryCity])
-async def get_cities_by_country(country: str):
+async def get_cities_by_country(request: Request, country: str):
     """Get cities for a specific country"""
     try:
-        logger.info(f"Fetching cities for country: '{country}'")
-        cities = await db.cities.find({"country": country}).sort("name", 1).to_list(None)
-        logger.info(f"Found {len(cities)} cities for country '{country}'")
-        return [LibraryCity(**city) for city in cities]
+        geo = await geo_index.get(db)
+        cities = geo_index.matching(geo.cities, country=country)
+        return geo.cached_response(
+            request, f"library_cities:{country}",
+            lambda: [LibraryCity(**city).dict() for city in cities]
+        )
     except Exception as e:
         logger.error(f"Error getting cities for country {country}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1251,6 +1300,7 @@ async def create_city(city: LibraryCity):
     try:
         city_dict = city.dict()
         await db.cities.insert_one(city_dict)
+        await geo_index.invalidate(db)
         return city
     except Exception as e:
         logger.error(f"Error creating city: {str(e)}")
@@ -1266,6 +1316,7 @@ async def update_city(city_id: str, city: LibraryCity):
         )
         if result.modified_count == 0:
             raise HTTPException(status_code=404, detail="City not found")
+        await geo_index.invalidate(db)
         return city
     except HTTPException:
         raise
@@ -1280,6 +1331,7 @@ async def delete_city(city_id: str):
         result = await db.cities.delete_one({"id": city_id})
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="City not found")
+        await geo_index.invalidate(db)
         return {"message": "City deleted successfully"}
     except HTTPException:
         raise
@@ -1288,15 +1340,20 @@ async def delete_city(city_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 # ==================== PHONE CODES ====================
+@reference_cache.reference("library_phone_codes", ["phone_codes"])
+async def load_library_phone_codes(db):
+    """Load all phone codes"""
+    phone_codes = await db.phone_codes.find().sort("country", 1).collation({"locale": "tr"}).to_list(None)
+    # Remove _id from MongoDB documents
+    for code in phone_codes:
+        code.pop('_id', None)
+    return [LibraryPhoneCode(**code) for code in phone_codes]
+
 @api_router.get("/library/phone-codes", response_model=List[LibraryPhoneCode])
-async def get_phone_codes():
+async def get_phone_codes(request: Request):
     """Get all phone codes"""
     try:
-        phone_codes = await db.phone_codes.find().sort("country", 1).collation({"locale": "tr"}).to_list(None)
-        # Remove _id from MongoDB documents
-        for code in phone_codes:
-            code.pop('_id', None)
-        return [LibraryPhoneCode(**code) for code in phone_codes]
+        return await reference_cache.response(request, db, "library_phone_codes")
     except Exception as e:
         logger.error(f"Error getting phone codes: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1321,6 +1378,7 @@ async def create_phone_code(phone_code: LibraryPhoneCode):
         
         code_dict = phone_code.dict()
         result = await db.phone_codes.insert_one(code_dict)
+        await reference_cache.bump(db, "phone_codes")
         return phone_code
     except HTTPException:
         raise
@@ -1337,6 +1395,7 @@ async def update_phone_code(code_id: str, phone_code: LibraryPhoneCode):
             {"id": code_id}, 
             {"$set": code_dict}
         )
+        await reference_cache.bump(db, "phone_codes")
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Phone code not found")
         return {"message": "Phone code updated successfully"}
@@ -1351,6 +1410,7 @@ async def delete_phone_code(code_id: str):
     """Delete a phone code"""
     try:
         result = await db.phone_codes.delete_one({"id": code_id})
+        await reference_cache.bump(db, "phone_codes")
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Phone code not found")
         return {"message": "Phone code deleted successfully"}
@@ -1392,6 +1452,7 @@ async def initialize_phone_codes(force: bool = False):
         
         # Insert all phone codes
         result = await db.phone_codes.insert_many(phone_codes_to_insert)
+        await reference_cache.bump(db, "phone_codes")
         
         return {
             "message": "Phone codes initialized successfully",
@@ -1551,12 +1612,17 @@ async def bulk_import_convention_centers(data: dict):
 
 # ==================== LIBRARY SECTORS ENDPOINTS ====================
 
+@reference_cache.reference("library_sectors", ["sectors"])
+async def load_library_sectors(db):
+    """Load all sectors"""
+    sectors = await db.sectors.find().to_list(length=None)
+    return [serialize_document(sector) for sector in sectors]
+
 @api_router.get("/library/sectors")
-async def get_sectors():
+async def get_sectors(request: Request):
     """Get all sectors"""
     try:
-        sectors = await db.sectors.find().to_list(length=None)
-        return [serialize_document(sector) for sector in sectors]
+        return await reference_cache.response(request, db, "library_sectors")
     except Exception as e:
         logger.error(f"Error fetching sectors: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1572,6 +1638,7 @@ async def create_sector(sector: LibrarySector):
         
         sector_dict = sector.dict()
         await db.sectors.insert_one(sector_dict)
+        await reference_cache.bump(db, "sectors")
         return sector
     except HTTPException:
         raise
@@ -1595,6 +1662,7 @@ async def update_sector(sector_id: str, sector: LibrarySector):
             {"id": sector_id},
             {"$set": sector_dict}
         )
+        await reference_cache.bump(db, "sectors")
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Sektör bulunamadı")
@@ -1611,6 +1679,7 @@ async def delete_sector(sector_id: str):
     """Delete a sector"""
     try:
         result = await db.sectors.delete_one({"id": sector_id})
+        await reference_cache.bump(db, "sectors")
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Sektör bulunamadı")
         return {"message": "Sektör başarıyla silindi"}
@@ -1666,6 +1735,9 @@ async def bulk_import_sectors(data: dict):
                 error_count += 1
                 errors.append(f"Satır {line_num}: {str(err)}")
         
+        if success_count:
+            await reference_cache.bump(db, "sectors")
+        
         return {
             "message": "Toplu içe aktarma tamamlandı",
             "created": success_count,
@@ -1693,76 +1765,16 @@ async def seed_default_sectors(force: bool = False):
                 "note": "Yeniden yüklemek için force=true parametresini kullanın"
             }
         
-        # Default sectors list
-        default_sectors = [
-            "Tarım ve Hayvancılık", "Ormancılık", "Balıkçılık ve Su Ürünleri",
-            "Madencilik ve Maden İşleme", "Gıda Üretimi", "İçecek Üretimi",
-            "Tekstil ve Kumaş", "Hazır Giyim ve Konfeksiyon", "Deri ve Ayakkabı",
-            "Mobilya ve Dekorasyon", "Ağaç ve Orman Ürünleri", "Kağıt ve Ambalaj",
-            "Matbaacılık ve Basım", "Kimya ve Kimyasal Ürünler", "Boya ve Kaplama",
-            "Kozmetik ve Kişisel Bakım Ürünleri", "İlaç ve Ecza", "Biyoteknoloji",
-            "Plastik ve Kauçuk", "Cam ve Cam Ürünleri", "Seramik ve Porselen",
-            "Çimento ve Beton", "Yapı Malzemeleri", "Demir ve Çelik",
-            "Metal İşleme", "Döküm ve Dövme", "Makine ve Ekipman İmalatı",
-            "Endüstriyel Otomasyon", "Elektrik ve Elektronik", "Aydınlatma",
-            "Beyaz Eşya ve Ev Aletleri", "Bilgisayar ve Donanım", "Yarı İletken ve Çip",
-            "Otomotiv", "Otomotiv Yan Sanayi", "Motosiklet ve Bisiklet",
-            "Havacılık ve Uzay", "Gemi ve Yat Yapımı", "Raylı Sistemler",
-            "Savunma Sanayi", "Medikal ve Tıbbi Cihazlar", "Laboratuvar Ekipmanları",
-            "Optik ve Hassas Aletler", "Enerji Üretimi ve Dağıtımı", "Yenilenebilir Enerji",
-            "Petrol ve Doğalgaz", "Nükleer Enerji", "Su Arıtma ve Dağıtımı",
-            "Atık Yönetimi ve Geri Dönüşüm", "Çevre Teknolojileri", "İnşaat ve Müteahhitlik",
-            "Altyapı ve Üstyapı", "Prefabrik ve Modüler Yapılar", "Gayrimenkul Geliştirme",
-            "Gayrimenkul Danışmanlığı", "Mimarlık", "Mühendislik Hizmetleri",
-            "İç Mimarlık ve Tasarım", "Peyzaj ve Çevre Düzenleme", "Taşımacılık ve Nakliye",
-            "Lojistik ve Depolama", "Kurye ve Kargo", "Gümrük ve Dış Ticaret",
-            "Denizcilik ve Liman Hizmetleri", "Toptan Ticaret", "Perakende Ticaret",
-            "E-Ticaret", "İthalat ve İhracat", "Otelcilik ve Konaklama",
-            "Restoran ve Yeme-İçme", "Catering ve Yemek Hizmetleri", "Turizm ve Seyahat",
-            "Eğlence ve Rekreasyon", "Bilgi Teknolojileri", "Yazılım Geliştirme",
-            "Mobil Uygulama", "Bulut Hizmetleri", "Siber Güvenlik",
-            "Yapay Zeka ve Veri Bilimi", "Telekomünikasyon", "İnternet Hizmetleri",
-            "Medya ve Yayıncılık", "Film ve Dizi Yapımı", "Müzik ve Ses Prodüksiyonu",
-            "Oyun ve Dijital Eğlence", "Animasyon ve Görsel Efekt", "Fotoğrafçılık ve Video",
-            "Reklamcılık", "Halkla İlişkiler", "Dijital Pazarlama",
-            "Marka ve Strateji Danışmanlığı", "Grafik ve Tasarım", "Baskı ve Promosyon Ürünleri",
-            "Tabela ve Reklam Panoları", "Fuar ve Stand Hizmetleri", "Sergi ve Müze Sistemleri",
-            "Etkinlik ve Organizasyon", "Kongre ve Toplantı Hizmetleri", "Bankacılık",
-            "Sigortacılık", "Yatırım ve Portföy Yönetimi", "Fintech ve Ödeme Sistemleri",
-            "Leasing ve Faktoring", "Kredi ve Finansman", "Sağlık Hizmetleri",
-            "Hastane ve Klinikler", "Diş Hekimliği", "Veterinerlik",
-            "Eczane ve İlaç Dağıtımı", "Yaşlı ve Hasta Bakımı", "Güzellik ve Estetik",
-            "Eğitim ve Öğretim", "Mesleki Eğitim ve Kurslar", "Dil Eğitimi",
-            "E-Öğrenme", "Araştırma ve Geliştirme (Ar-Ge)", "Danışmanlık (Yönetim)",
-            "Danışmanlık (Teknik)", "Hukuk Hizmetleri", "Muhasebe ve Mali Müşavirlik",
-            "Denetim ve Teftiş", "İnsan Kaynakları ve İşe Alım", "Çeviri ve Tercümanlık",
-            "Güvenlik ve Koruma", "Temizlik Hizmetleri", "Tesis ve Bina Yönetimi",
-            "Peyzaj Bakımı ve Bahçecilik", "Kuru Temizleme ve Çamaşırhane", "Tamir ve Bakım Hizmetleri",
-            "Kuaför ve Berber", "Spor ve Fitness", "Spor Ekipmanları",
-            "Oyuncak ve Oyun", "Hobi ve El Sanatları", "Kuyumculuk ve Mücevher",
-            "Saat ve Aksesuar", "Hediyelik Eşya", "Büro Malzemeleri ve Kırtasiye",
-            "Endüstriyel Sarf Malzemeleri", "Tarım Makineleri ve Ekipmanları", "İklimlendirme ve Havalandırma (HVAC)",
-            "Asansör ve Yürüyen Merdiven", "Yangın ve Güvenlik Sistemleri", "Ölçüm ve Test Cihazları",
-            "Hidrolik ve Pnömatik", "Kaynak ve Kesim Teknolojileri", "Tekstil Makineleri",
-            "Paketleme ve Dolum Makineleri", "Robot ve Otomasyon Sistemleri", "Kamu ve Belediye Hizmetleri",
-            "Sivil Toplum ve STK", "Uluslararası Kuruluşlar"
-        ]
-        
         if force:
             # Delete all existing sectors
             await db.sectors.delete_many({})
         
         # Insert all default sectors
-        sectors_to_insert = []
-        for sector_name in default_sectors:
-            sectors_to_insert.append({
-                "id": str(uuid.uuid4()),
-                "name": sector_name,
-                "description": ""
-            })
+        sectors_to_insert = tenant_template.default_sectors()
         
         if sectors_to_insert:
             await db.sectors.insert_many(sectors_to_insert)
+            await reference_cache.bump(db, "sectors")
         
         return {
             "message": "Default sektörler başarıyla yüklendi",
@@ -1799,6 +1811,9 @@ async def bulk_import_countries(data: dict):
                 await db.cities.insert_one(city.dict())
                 cities_imported += 1
         
+        if countries_imported or cities_imported:
+            await geo_index.invalidate(db)
+        
         return {
             "message": "Toplu içe aktarma başarılı",
             "countries_imported": countries_imported,
@@ -1851,6 +1866,7 @@ async def initialize_default_countries(force_reload: bool = False):
             await db.cities.insert_one(city.dict())
             cities_imported += 1
         
+        await geo_index.invalidate(db)
         final_countries = await db.countries.count_documents({})
         final_cities = await db.cities.count_documents({})
         
@@ -1870,12 +1886,17 @@ async def initialize_default_countries(force_reload: bool = False):
         raise HTTPException(status_code=500, detail=str(e))
 
 # Currencies Endpoints
+@reference_cache.reference("library_currencies", ["currencies"])
+async def load_library_currencies(db):
+    """Load all currencies"""
+    currencies = await db.currencies.find().sort("code", 1).to_list(1000)
+    return [LibraryCurrency(**currency) for currency in currencies]
+
 @api_router.get("/library/currencies", response_model=List[LibraryCurrency])
-async def get_currencies():
+async def get_currencies(request: Request):
     """Get all currencies"""
     try:
-        currencies = await db.currencies.find().sort("code", 1).to_list(1000)
-        return [LibraryCurrency(**currency) for currency in currencies]
+        return await reference_cache.response(request, db, "library_currencies")
     except Exception as e:
         logger.error(f"Error getting currencies: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1886,6 +1907,7 @@ async def create_currency(currency: LibraryCurrency):
     try:
         currency_dict = currency.dict()
         await db.currencies.insert_one(currency_dict)
+        await reference_cache.bump(db, "currencies")
         return currency
     except Exception as e:
         logger.error(f"Error creating currency: {str(e)}")
@@ -1899,6 +1921,7 @@ async def update_currency(currency_id: str, currency: LibraryCurrency):
             {"id": currency_id},
             {"$set": currency.dict()}
         )
+        await reference_cache.bump(db, "currencies")
         if result.modified_count == 0:
             raise HTTPException(status_code=404, detail="Currency not found")
         return currency
@@ -1913,6 +1936,7 @@ async def delete_currency(currency_id: str):
     """Delete a currency"""
     try:
         result = await db.currencies.delete_one({"id": currency_id})
+        await reference_cache.bump(db, "currencies")
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Currency not found")
         return {"message": "Currency deleted successfully"}
@@ -1977,12 +2001,17 @@ async def delete_fair_center(center_id: str):
 
 # ==================== LIBRARY POSITIONS ENDPOINTS ====================
 
+@reference_cache.reference("library_positions", ["library"])
+async def load_library_positions(db):
+    """Load all positions from library"""
+    positions = await db.library.find({"category": "position"}, {"_id": 0}).to_list(length=None)
+    return positions
+
 @api_router.get("/library/positions")
-async def get_positions():
+async def get_positions(request: Request):
     """Get all positions from library"""
     try:
-        positions = await db.library.find({"category": "position"}, {"_id": 0}).to_list(length=None)
-        return positions
+        return await reference_cache.response(request, db, "library_positions")
     except Exception as e:
         logger.error(f"Error getting positions: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -2000,6 +2029,7 @@ async def create_position(position_data: dict):
         }
         
         await db.library.insert_one(position)
+        await reference_cache.bump(db, "library")
         return {"success": True, "message": "Position created", "position": position}
     except Exception as e:
         logger.error(f"Error creating position: {str(e)}")
@@ -2010,6 +2040,7 @@ async def delete_position(position_id: str):
     """Delete a position from library"""
     try:
         result = await db.library.delete_one({"id": position_id, "category": "position"})
+        await reference_cache.bump(db, "library")
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Position not found")
         return {"success": True, "message": "Position deleted"}
@@ -2447,7 +2478,8 @@ async def get_currency_rates():
     """Get current currency rates from TCMB"""
     try:
         url = "https://www.tcmb.gov.tr/kurlar/today.xml"
-        response = requests.get(url, timeout=10)
+        # requests is blocking; keep it off the event loop
+        response = await asyncio.to_thread(requests.get, url, timeout=10)
         root = ET.fromstring(response.content)
         
         rates = []
@@ -2520,42 +2552,11 @@ async def convert_currency(try_amount: float):
 async def get_passive_lead_stats():
     """Get passive leads statistics"""
     try:
-        # Get current date
-        now = datetime.now(timezone.utc)
-        threshold_days = 20
-        
-        # Calculate cutoff date for passive leads
-        passive_cutoff = now - timedelta(days=threshold_days)
-        
-        # Query passive leads (leads with no activity for 20+ days)
-        passive_leads = await db.leads.find({
-            "status": "passive"
-        }).to_list(length=None)
-        
-        # Calculate recently passive (last 7 days)
-        recent_cutoff = now - timedelta(days=7)
-        recently_passive = await db.leads.count_documents({
-            "status": "passive",
-            "passive_since": {"$gte": recent_cutoff}
-        })
-        
-        # Calculate statistics
-        total_passive = len(passive_leads)
-        passive_value = sum(lead.get("value", 0) for lead in passive_leads)
-        
-        # Calculate average passive days
-        avg_passive_days = 0
-        if passive_leads:
-            total_days = sum((now - datetime.fromisoformat(lead.get("passive_since", now.isoformat()))).days 
-                           for lead in passive_leads if lead.get("passive_since"))
-            avg_passive_days = total_days / len(passive_leads) if passive_leads else 0
+        stats = await passive_lead_service.get_passive_stats(db)
         
         return PassiveLeadStats(
-            total_passive_leads=total_passive,
-            recently_passive=recently_passive,
-            passive_value=passive_value,
-            average_passive_days=avg_passive_days,
-            threshold_days=threshold_days
+            **stats,
+            threshold_days=passive_lead_service.PASSIVE_THRESHOLD_DAYS
         )
         
     except Exception as e:
@@ -2571,46 +2572,14 @@ async def get_passive_lead_stats():
 
 @api_router.post("/leads/transfer-passive")
 async def transfer_passive_leads():
-    """Automatically transfer leads to passive based on 20-day rule"""
+    """Transfer leads to passive based on 20-day rule (also runs as a background job)"""
     try:
-        now = datetime.now(timezone.utc)
-        threshold_days = 20
-        cutoff_date = now - timedelta(days=threshold_days)
-        
-        # Find active leads with no activity for 20+ days
-        leads_to_transfer = await db.leads.find({
-            "status": "active",
-            "last_activity": {"$lte": cutoff_date}
-        }).to_list(length=None)
-        
-        transferred_count = 0
-        transferred_value = 0
-        
-        for lead in leads_to_transfer:
-            # Update lead to passive
-            days_inactive = (now - datetime.fromisoformat(lead["last_activity"])).days
-            
-            await db.leads.update_one(
-                {"_id": lead["_id"]},
-                {
-                    "$set": {
-                        "status": "passive",
-                        "passive_since": now.isoformat(),
-                        "reason": f"{days_inactive} gün boyunca işlem yok - Otomatik transfer"
-                    }
-                }
-            )
-            
-            transferred_count += 1
-            transferred_value += lead.get("value", 0)
-            
-            logger.info(f"Lead transferred to passive: {lead['name']} - {days_inactive} days inactive")
+        result = await passive_lead_service.transfer_stale_leads(db)
+        transferred_count = result["transferred_count"]
         
         return {
             "success": True,
-            "transferred_count": transferred_count,
-            "transferred_value": transferred_value,
-            "threshold_days": threshold_days,
+            **result,
             "message": f"{transferred_count} lead pasif duruma aktarıldı"
         }
         
@@ -2627,44 +2596,7 @@ async def transfer_passive_leads():
 async def check_passive_candidates():
     """Check which leads are candidates for passive transfer"""
     try:
-        now = datetime.now(timezone.utc)
-        threshold_days = 20
-        cutoff_date = now - timedelta(days=threshold_days)
-        
-        # Find active leads approaching or past threshold
-        candidates = await db.leads.find({
-            "status": "active"
-        }).to_list(length=None)
-        
-        result = {
-            "ready_for_transfer": [],
-            "approaching_threshold": [],
-            "threshold_days": threshold_days
-        }
-        
-        for lead in candidates:
-            last_activity = datetime.fromisoformat(lead["last_activity"])
-            days_inactive = (now - last_activity).days
-            
-            if days_inactive >= threshold_days:
-                result["ready_for_transfer"].append({
-                    "id": lead.get("id"),
-                    "name": lead["name"],
-                    "days_inactive": days_inactive,
-                    "value": lead.get("value", 0),
-                    "last_activity": lead["last_activity"]
-                })
-            elif days_inactive >= (threshold_days - 5):  # 15+ days
-                result["approaching_threshold"].append({
-                    "id": lead.get("id"),
-                    "name": lead["name"],
-                    "days_inactive": days_inactive,
-                    "days_until_passive": threshold_days - days_inactive,
-                    "value": lead.get("value", 0),
-                    "last_activity": lead["last_activity"]
-                })
-        
-        return result
+        return await passive_lead_service.get_passive_candidates(db)
         
     except Exception as e:
         logger.error(f"Error checking passive candidates: {str(e)}")
@@ -2747,34 +2679,32 @@ async def send_survey_invitation(
             "deliveryDate": delivery_date
         }
         
-        # Send email via SendGrid
-        email_result = email_service.send_survey_invitation(customer_data, project_data, survey_link)
-        
-        if email_result["success"]:
-            # Create invitation record only if email sent successfully
-            invitation = SurveyInvitation(
-                customer_id=customer_id,
-                project_id=project_id,
-                survey_token=survey_token,
-                email=email,
-                survey_link=survey_link
-            )
-            
-            # Save to database
-            await db.survey_invitations.insert_one(invitation.dict())
-            
-            return {
-                "success": True,
-                "survey_token": survey_token,
-                "survey_link": survey_link,
-                "message": f"Survey invitation sent successfully to {email}",
-                "email_status": email_result
-            }
-        else:
-            return {
-                "success": False,
-                "error": f"Failed to send email: {email_result.get('error', 'Unknown error')}"
-            }
+        invitation = SurveyInvitation(
+            customer_id=customer_id,
+            project_id=project_id,
+            survey_token=survey_token,
+            email=email,
+            survey_link=survey_link
+        )
+        invitation_dict = invitation.dict()
+        invitation_dict["email_status"] = "queued"
+        await db.survey_invitations.insert_one(invitation_dict)
+        
+        # The email is sent by a background job (see job_handlers)
+        job = await job_queue.enqueue(db, "email.survey_invitation", {
+            "customer_data": customer_data,
+            "project_data": project_data,
+            "survey_link": survey_link,
+            "survey_token": survey_token
+        }, idempotency_key=f"survey_invitation:{survey_token}")
+        
+        return {
+            "success": True,
+            "survey_token": survey_token,
+            "survey_link": survey_link,
+            "message": f"Survey invitation queued for {email}",
+            "email_status": {"status": "queued", "job_id": job["id"]}
+        }
         
     except Exception as e:
         logger.error(f"Error sending survey invitation: {str(e)}")
@@ -2790,7 +2720,7 @@ class TestEmailRequest(BaseModel):
 async def send_test_email(request: TestEmailRequest):
     """Send test email to verify SendGrid configuration"""
     try:
-        result = email_service.send_test_email(request.email)
+        result = await email_service.send_test_email(request.email)
         return result
     except Exception as e:
         logger.error(f"Error sending test email: {str(e)}")
@@ -2827,7 +2757,7 @@ class CustomerEmailRequest(BaseModel):
 async def send_user_email(request: UserEmailRequest):
     """Send email from user to user via CRM system"""
     try:
-        result = email_service.send_user_email(
+        result = await email_service.send_user_email(
             to_email=request.to,
             to_name=request.to_name,
             from_email=request.from_email,
@@ -2870,7 +2800,7 @@ async def send_user_email(request: UserEmailRequest):
 async def send_customer_email(request: CustomerEmailRequest):
     """Send email to customer via CRM system"""
     try:
-        result = email_service.send_user_email(  # We can reuse the same email service method
+        result = await email_service.send_user_email(  # We can reuse the same email service method
             to_email=request.to,
             to_name=request.to_name,
             from_email=request.from_email,
@@ -2943,44 +2873,44 @@ async def send_arbitrary_survey_invitation(request: ArbitrarySurveyRequest):
             "deliveryDate": datetime.now().isoformat()
         }
         
-        # Send email via SendGrid
-        email_result = email_service.send_survey_invitation(customer_data, project_data, survey_link)
-        
-        if email_result["success"]:
-            # Create invitation record with arbitrary flag
-            invitation = SurveyInvitation(
-                customer_id="arbitrary",
-                project_id="arbitrary", 
-                survey_token=survey_token,
-                email=request.email,
-                survey_link=survey_link
-            )
-            
-            # Add extra fields for arbitrary surveys
-            invitation_dict = invitation.dict()
-            invitation_dict.update({
-                "is_arbitrary": True,
-                "contact_name": request.contact_name,
-                "company_name": request.company_name,
-                "project_name": request.project_name,
-                "created_at": datetime.now().isoformat()
-            })
-            
-            # Save to database
-            await db.survey_invitations.insert_one(invitation_dict)
-            
-            return {
-                "success": True,
-                "survey_token": survey_token,
-                "survey_link": survey_link,
-                "message": f"Survey invitation sent successfully to {request.email}",
-                "email_status": email_result
-            }
-        else:
-            return {
-                "success": False,
-                "error": f"Failed to send email: {email_result.get('error', 'Unknown error')}"
-            }
+        # Create invitation record with arbitrary flag
+        invitation = SurveyInvitation(
+            customer_id="arbitrary",
+            project_id="arbitrary", 
+            survey_token=survey_token,
+            email=request.email,
+            survey_link=survey_link
+        )
+        
+        # Add extra fields for arbitrary surveys
+        invitation_dict = invitation.dict()
+        invitation_dict.update({
+            "is_arbitrary": True,
+            "contact_name": request.contact_name,
+            "company_name": request.company_name,
+            "project_name": request.project_name,
+            "created_at": datetime.now().isoformat(),
+            "email_status": "queued"
+        })
+        
+        # Save to database
+        await db.survey_invitations.insert_one(invitation_dict)
+        
+        # The email is sent by a background job (see job_handlers)
+        job = await job_queue.enqueue(db, "email.survey_invitation", {
+            "customer_data": customer_data,
+            "project_data": project_data,
+            "survey_link": survey_link,
+            "survey_token": survey_token
+        }, idempotency_key=f"survey_invitation:{survey_token}")
+        
+        return {
+            "success": True,
+            "survey_token": survey_token,
+            "survey_link": survey_link,
+            "message": f"Survey invitation queued for {request.email}",
+            "email_status": {"status": "queued", "job_id": job["id"]}
+        }
         
     except Exception as e:
         logger.error(f"Error sending arbitrary survey invitation: {str(e)}")
@@ -3033,45 +2963,45 @@ async def send_handover_form(request: HandoverRequest):
             "language": request.language
         }
         
-        # Send email via SendGrid
-        email_result = email_service.send_handover_invitation(customer_data, project_data, handover_link)
-        
-        if email_result["success"]:
-            # Create handover invitation record
-            handover_invitation = {
-                "customer_id": request.customer_id,
-                "project_id": request.project_id,
-                "handover_token": handover_token,
-                "email": request.email,
-                "handover_link": handover_link,
-                "customer_name": request.customer_name,
-                "contact_name": request.contact_name,
-                "project_name": request.project_name,
-                "customer_representative": request.customer_representative,
-                "language": request.language,
-                "status": "pending",
-                "sent_at": datetime.now().isoformat(),
-                "completed_at": None,
-                "signature_data": None,
-                "auto_survey_triggered": False,
-                "survey_token": None
-            }
-            
-            # Save to database
-            await db.handover_invitations.insert_one(handover_invitation)
-            
-            return {
-                "success": True,
-                "handover_token": handover_token,
-                "handover_link": handover_link,
-                "message": f"Handover form sent successfully to {request.email}",
-                "email_status": email_result
-            }
-        else:
-            return {
-                "success": False,
-                "error": f"Failed to send email: {email_result.get('error', 'Unknown error')}"
-            }
+        # Create handover invitation record
+        handover_invitation = {
+            "customer_id": request.customer_id,
+            "project_id": request.project_id,
+            "handover_token": handover_token,
+            "email": request.email,
+            "handover_link": handover_link,
+            "customer_name": request.customer_name,
+            "contact_name": request.contact_name,
+            "project_name": request.project_name,
+            "customer_representative": request.customer_representative,
+            "language": request.language,
+            "status": "pending",
+            "sent_at": datetime.now().isoformat(),
+            "completed_at": None,
+            "signature_data": None,
+            "auto_survey_triggered": False,
+            "survey_token": None,
+            "email_status": "queued"
+        }
+        
+        # Save to database
+        await db.handover_invitations.insert_one(handover_invitation)
+        
+        # The email is sent by a background job (see job_handlers)
+        job = await job_queue.enqueue(db, "email.handover_invitation", {
+            "customer_data": customer_data,
+            "project_data": project_data,
+            "handover_link": handover_link,
+            "handover_token": handover_token
+        }, idempotency_key=f"handover_invitation:{handover_token}")
+        
+        return {
+            "success": True,
+            "handover_token": handover_token,
+            "handover_link": handover_link,
+            "message": f"Handover form queued for {request.email}",
+            "email_status": {"status": "queued", "job_id": job["id"]}
+        }
         
     except Exception as e:
         logger.error(f"Error sending handover form: {str(e)}")
@@ -3112,47 +3042,47 @@ async def send_arbitrary_handover_form(request: ArbitraryHandoverRequest):
             "language": request.language
         }
         
-        # Send email via SendGrid
-        email_result = email_service.send_handover_invitation(customer_data, project_data, handover_link)
-        
-        if email_result["success"]:
-            # Create handover invitation record with arbitrary flag
-            handover_invitation = {
-                "customer_id": "arbitrary",
-                "project_id": "arbitrary",
-                "handover_token": handover_token,
-                "email": request.email,
-                "handover_link": handover_link,
-                "customer_name": request.company_name or "Arbitrary Customer",
-                "contact_name": request.contact_name,
-                "project_name": request.project_name,
-                "customer_representative": request.customer_representative,
-                "language": request.language,
-                "country": request.country,
-                "status": "pending",
-                "sent_at": datetime.now().isoformat(),
-                "completed_at": None,
-                "signature_data": None,
-                "auto_survey_triggered": False,
-                "survey_token": None,
-                "is_arbitrary": True
-            }
-            
-            # Save to database
-            await db.handover_invitations.insert_one(handover_invitation)
-            
-            return {
-                "success": True,
-                "handover_token": handover_token,
-                "handover_link": handover_link,
-                "message": f"Handover form sent successfully to {request.email}",
-                "email_status": email_result
-            }
-        else:
-            return {
-                "success": False,
-                "error": f"Failed to send email: {email_result.get('error', 'Unknown error')}"
-            }
+        # Create handover invitation record with arbitrary flag
+        handover_invitation = {
+            "customer_id": "arbitrary",
+            "project_id": "arbitrary",
+            "handover_token": handover_token,
+            "email": request.email,
+            "handover_link": handover_link,
+            "customer_name": request.company_name or "Arbitrary Customer",
+            "contact_name": request.contact_name,
+            "project_name": request.project_name,
+            "customer_representative": request.customer_representative,
+            "language": request.language,
+            "country": request.country,
+            "status": "pending",
+            "sent_at": datetime.now().isoformat(),
+            "completed_at": None,
+            "signature_data": None,
+            "auto_survey_triggered": False,
+            "survey_token": None,
+            "is_arbitrary": True,
+            "email_status": "queued"
+        }
+        
+        # Save to database
+        await db.handover_invitations.insert_one(handover_invitation)
+        
+        # The email is sent by a background job (see job_handlers)
+        job = await job_queue.enqueue(db, "email.handover_invitation", {
+            "customer_data": customer_data,
+            "project_data": project_data,
+            "handover_link": handover_link,
+            "handover_token": handover_token
+        }, idempotency_key=f"handover_invitation:{handover_token}")
+        
+        return {
+            "success": True,
+            "handover_token": handover_token,
+            "handover_link": handover_link,
+            "message": f"Handover form queued for {request.email}",
+            "email_status": {"status": "queued", "job_id": job["id"]}
+        }
         
     except Exception as e:
         logger.error(f"Error sending arbitrary handover form: {str(e)}")
@@ -3580,6 +3510,7 @@ async def create_customer(customer_data: dict):
         
         # Insert to MongoDB
         await db.customers.insert_one(customer_dict)
+        await search_service.reindex(db, "customers", customer.id)
         
         logger.info(f"Customer created in database: {customer.id}")
         return customer
@@ -3590,12 +3521,15 @@ async def create_customer(customer_data: dict):
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/customers")
-async def get_customers():
-    """Get all customers"""
-    customers = await db.customers.find().to_list(length=None)
-    # Serialize all documents properly
-    serialized_customers = [serialize_document(customer) for customer in customers]
-    return JSONResponse(content=serialized_customers)
+async def get_customers(page_params: PageParams = Depends()):
+    """Get customers (keyset paginated when cursor/limit is given)"""
+    if page_params.legacy:
+        customers = await db.customers.find().to_list(length=None)
+        # ObjectId/datetime values are encoded by the response class
+        return FastJSONResponse(content=customers)
+    
+    page = await fetch_page(db.customers, {}, page_params, sort_key="createdAt")
+    return page.to_response()
 
 @api_router.get("/customers/{customer_id}")
 async def get_customer(customer_id: str):
@@ -3642,6 +3576,7 @@ async def update_customer(customer_id: str, customer_data: dict):
             {"id": customer_id},
             {"$set": customer_data}
         )
+        await search_service.reindex(db, "customers", customer_id)
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Customer not found")
@@ -3764,6 +3699,7 @@ async def delete_customer(customer_id: str):
         
         # No related records, safe to delete
         result = await db.customers.delete_one({"id": customer_id})
+        await search_service.reindex(db, "customers", customer_id)
         
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Customer not found")
@@ -3982,41 +3918,25 @@ async def get_cities_by_country(
 ):
     """Get cities by country with optional search, pagination"""
     try:
+        iso2 = iso2.upper()
+        geo = await geo_index.get(db)
+        
         # Validate ISO2 code
-        country = await db.countries.find_one({"iso2": iso2.upper()})
-        if not country:
+        if not geo_index.matching(geo.countries, iso2=iso2):
             raise HTTPException(status_code=404, detail="Country not found")
         
-        # Create search filter
-        search_filter = {"country_iso2": iso2.upper()}
+        # Accent-insensitive prefix search, capitals and most populous first
         if query:
-            # Support fuzzy search with accent tolerance for city names
-            query_regex = query.replace("i", "[iıİI]").replace("u", "[uüUÜ]").replace("o", "[oöOÖ]").replace("c", "[cçCÇ]").replace("s", "[sşSŞ]").replace("g", "[gğGĞ]")
-            search_filter["name"] = {"$regex": query_regex, "$options": "i"}
-        
-        # Calculate skip for pagination
-        skip = (page - 1) * limit
-        
-        # Get cities with pagination
-        cities = await db.cities.find(search_filter)\
-            .sort([("is_capital", -1), ("population", -1), ("name", 1)])\
-            .skip(skip)\
-            .limit(limit)\
-            .to_list(length=limit)
-        
-        # Get total count for pagination info
-        total_count = await db.cities.count_documents(search_filter)
+            ranked = geo.search_cities(query, country=iso2)
+        else:
+            ranked = geo.ranked_cities(iso2)
+        cities, pagination = geo_index.paginate(
+            [city for city in ranked if city.get("country_iso2") == iso2], page, limit
+        )
         
         return {
             "cities": [LibraryCity(**city) for city in cities],
-            "pagination": {
-                "page": page,
-                "limit": limit,
-                "total_count": total_count,
-                "total_pages": (total_count + limit - 1) // limit,
-                "has_next": skip + len(cities) < total_count,
-                "has_prev": page > 1
-            }
+            "pagination": pagination
         }
         
     except HTTPException:
@@ -4037,10 +3957,15 @@ async def get_products(category: str = None, search: str = None, active_only: bo
         if category:
             filter_query["category"] = category
         if search:
-            filter_query["$or"] = [
-                {"name": {"$regex": search, "$options": "i"}},
-                {"name_en": {"$regex": search, "$options": "i"}}
-            ]
+            # Word-prefix match from the search index; substring regex when it cannot answer
+            ids = await search_service.matching_ids(db, "products", search)
+            if ids is None:
+                filter_query["$or"] = [
+                    {"name": {"$regex": re.escape(search), "$options": "i"}},
+                    {"name_en": {"$regex": re.escape(search), "$options": "i"}}
+                ]
+            else:
+                filter_query["id"] = {"$in": ids}
         
         # Get products
         products = await db.products.find(filter_query)\
@@ -4064,6 +3989,7 @@ async def create_product(product: Product):
         
         product_dict = product.dict()
         result = await db.products.insert_one(product_dict)
+        await search_service.reindex(db, "products", product.id)
         
         if result.inserted_id:
             return {"success": True, "message": "Product created successfully", "product": product}
@@ -4104,6 +4030,7 @@ async def update_product(product_id: str, product: Product):
             {"id": product_id},
             {"$set": product_dict}
         )
+        await search_service.reindex(db, "products", product_id)
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Product not found")
@@ -4249,10 +4176,12 @@ async def create_invoice(invoice_input: InvoiceCreate):
         logger.info(f"Creating invoice object with data: {invoice_dict}")
         
         invoice_obj = Invoice(**invoice_dict)
+        invoice_doc = invoice_obj.dict()
+        invoice_doc["dueAt"] = report_service.invoice_due_at(invoice_doc)
         
         # Insert to MongoDB
         logger.info("Inserting invoice to database...")
-        result = await db.invoices.insert_one(invoice_obj.dict())
+        result = await db.invoices.insert_one(invoice_doc)
         
         if result.inserted_id:
             logger.info(f"Invoice created successfully: {invoice_obj.invoice_number} with ID: {result.inserted_id}")
@@ -4269,11 +4198,17 @@ async def create_invoice(invoice_input: InvoiceCreate):
         raise HTTPException(status_code=500, detail=f"Fatura kaydedilirken beklenmeyen hata: {str(e)}")
 
 @api_router.get("/invoices", response_model=List[Invoice])
-async def get_invoices():
-    """Get all invoices"""
+async def get_invoices(page_params: PageParams = Depends()):
+    """Get invoices (keyset paginated when cursor/limit is given)"""
     try:
+        if not page_params.legacy:
+            page = await fetch_page(db.invoices, {}, page_params)
+            return page.to_response(Invoice)
+        
         invoices = await db.invoices.find().to_list(1000)
         return [Invoice(**invoice) for invoice in invoices]
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting invoices: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error getting invoices: {str(e)}")
@@ -4313,11 +4248,18 @@ async def get_invoice(invoice_id: str):
 async def update_invoice_status(invoice_id: str, status: str):
     """Update invoice status"""
     try:
-        # Update invoice status
-        result = await db.invoices.update_one(
-            {"id": invoice_id},
-            {"$set": {"status": status, "updated_at": datetime.utcnow()}}
+        invoice = await db.invoices.find_one(
+            {"id": invoice_id}, {"_id": 0, "date": 1, "payment_term": 1, "dueDate": 1, "due_date": 1}
         )
+        if not invoice:
+            raise HTTPException(status_code=404, detail="Invoice not found")
+        
+        # Update invoice status; also fills dueAt on invoices created before it existed
+        update = {"status": status, "updated_at": datetime.utcnow()}
+        due_at = report_service.invoice_due_at(invoice)
+        if due_at:
+            update["dueAt"] = due_at
+        result = await db.invoices.update_one({"id": invoice_id}, {"$set": update})
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Invoice not found")
@@ -4483,12 +4425,18 @@ async def create_customer_prospect(prospect_data: CustomerProspectCreate):
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/customer-prospects", response_model=List[CustomerProspect])
-async def get_customer_prospects():
-    """Get all customer prospects"""
+async def get_customer_prospects(page_params: PageParams = Depends()):
+    """Get customer prospects (keyset paginated when cursor/limit is given)"""
     try:
+        if not page_params.legacy:
+            page = await fetch_page(db.customer_prospects, {}, page_params)
+            return page.to_response(CustomerProspect)
+        
         prospects = await db.customer_prospects.find().to_list(length=None)
         return [CustomerProspect(**prospect) for prospect in prospects]
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting customer prospects: {str(e)}")
         return []
@@ -4550,6 +4498,7 @@ async def create_customer_type(customer_type_data: CustomerTypeCreate):
         
         # Insert to MongoDB
         await db.customer_types.insert_one(customer_type_dict)
+        await reference_cache.bump(db, "customer_types")
         
         logger.info(f"Customer type created: {customer_type.name}")
         return customer_type
@@ -4560,30 +4509,34 @@ async def create_customer_type(customer_type_data: CustomerTypeCreate):
         logger.error(f"Error creating customer type: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@reference_cache.reference("customer_types", ["customer_types"])
+async def load_customer_types(db):
+    """Load all customer types"""
+    customer_types = await db.customer_types.find().sort("name", 1).to_list(length=None)
+    
+    # If no data, insert default types
+    if not customer_types:
+        default_types = [
+            {"name": "Firma", "value": "firma"},
+            {"name": "Ajans", "value": "ajans"},
+            {"name": "Devlet Kurumu", "value": "devlet_kurumu"},
+            {"name": "Dernek veya Vakıf", "value": "dernek_vakif"}
+        ]
+        
+        for type_data in default_types:
+            customer_type = CustomerType(**type_data)
+            await db.customer_types.insert_one(customer_type.dict())
+        
+        # Fetch again after inserting defaults
+        customer_types = await db.customer_types.find().sort("name", 1).to_list(length=None)
+        
+    return [CustomerType(**ct) for ct in customer_types]
+
 @api_router.get("/customer-types", response_model=List[CustomerType])
-async def get_customer_types():
+async def get_customer_types(request: Request):
     """Get all customer types"""
     try:
-        customer_types = await db.customer_types.find().sort("name", 1).to_list(length=None)
-        
-        # If no data, insert default types
-        if not customer_types:
-            default_types = [
-                {"name": "Firma", "value": "firma"},
-                {"name": "Ajans", "value": "ajans"},
-                {"name": "Devlet Kurumu", "value": "devlet_kurumu"},
-                {"name": "Dernek veya Vakıf", "value": "dernek_vakif"}
-            ]
-            
-            for type_data in default_types:
-                customer_type = CustomerType(**type_data)
-                await db.customer_types.insert_one(customer_type.dict())
-            
-            # Fetch again after inserting defaults
-            customer_types = await db.customer_types.find().sort("name", 1).to_list(length=None)
-            
-        return [CustomerType(**ct) for ct in customer_types]
-        
+        return await reference_cache.response(request, db, "customer_types")
     except Exception as e:
         logger.error(f"Error getting customer types: {str(e)}")
         return []
@@ -4605,6 +4558,7 @@ async def update_customer_type(customer_type_id: str, customer_type_data: Custom
             {"id": customer_type_id},
             {"$set": customer_type_dict}
         )
+        await reference_cache.bump(db, "customer_types")
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Müşteri türü bulunamadı")
@@ -4623,6 +4577,7 @@ async def delete_customer_type(customer_type_id: str):
     """Delete a customer type"""
     try:
         result = await db.customer_types.delete_one({"id": customer_type_id})
+        await reference_cache.bump(db, "customer_types")
         
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Müşteri türü bulunamadı")
@@ -4661,6 +4616,7 @@ async def create_sector(sector_data: SectorCreate):
         
         # Insert to MongoDB
         await db.sectors.insert_one(sector_dict)
+        await reference_cache.bump(db, "sectors")
         
         logger.info(f"Sector created: {sector.name}")
         return sector
@@ -4743,6 +4699,7 @@ async def get_sectors():
             for sector_data in default_sectors:
                 sector = Sector(**sector_data)
                 await db.sectors.insert_one(sector.dict())
+            await reference_cache.bump(db, "sectors")
             
             # Fetch again after inserting defaults
             sectors = await db.sectors.find().sort("name", 1).to_list(length=None)
@@ -4758,6 +4715,7 @@ async def delete_sector(sector_id: str):
     """Delete a sector"""
     try:
         result = await db.sectors.delete_one({"id": sector_id})
+        await reference_cache.bump(db, "sectors")
         
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Sektör bulunamadı")
@@ -4799,6 +4757,7 @@ async def create_country(country_data: CountryCreate):
         
         # Insert to MongoDB
         await db.countries.insert_one(country_dict)
+        await geo_index.invalidate(db)
         
         logger.info(f"Country created: {country.name}")
         return country
@@ -4868,6 +4827,7 @@ async def create_city(city_data: CityCreate):
         
         # Insert to MongoDB
         await db.cities.insert_one(city_dict)
+        await geo_index.invalidate(db)
         
         logger.info(f"City created: {city.name} ({city.country_code})")
         return city
@@ -4879,22 +4839,28 @@ async def create_city(city_data: CityCreate):
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/cities", response_model=List[LibraryCity])
-async def get_cities():
+async def get_cities(request: Request):
     """Get all cities"""
     try:
-        cities = await db.cities.find().sort("name", 1).to_list(length=None)
-        return [LibraryCity(**city) for city in cities]
+        geo = await geo_index.get(db)
+        return geo.cached_response(
+            request, "cities", lambda: [LibraryCity(**city).dict() for city in geo.cities]
+        )
         
     except Exception as e:
         logger.error(f"Error getting cities: {str(e)}")
         return []
 
 @api_router.get("/cities/{country_code}", response_model=List[LibraryCity])
-async def get_cities_by_country(country_code: str):
+async def get_cities_by_country(request: Request, country_code: str):
     """Get cities by country code"""
     try:
-        cities = await db.cities.find({"country_code": country_code.upper()}).sort("name", 1).to_list(length=None)
-        return [LibraryCity(**city) for city in cities]
+        geo = await geo_index.get(db)
+        cities = geo_index.matching(geo.cities, country_code=country_code.upper())
+        return geo.cached_response(
+            request, f"cities:{country_code.upper()}",
+            lambda: [LibraryCity(**city).dict() for city in cities]
+        )
         
     except Exception as e:
         logger.error(f"Error getting cities for country {country_code}: {str(e)}")
@@ -5095,14 +5061,14 @@ async def get_handover_receipt(receipt_id: str):
 
 
 @api_router.post("/handover-receipts")
-async def create_handover_receipt(data: dict):
+async def create_handover_receipt(data: dict, loaders: RequestLoaders = Depends(get_loaders)):
     """Yeni teslim belgesi oluştur"""
     try:
         receipt_id = str(uuid4())
         
         # Proje bilgilerini çek
         if data.get("projectId"):
-            project = await db.projects.find_one({"id": data["projectId"]}, {"_id": 0})
+            project = await loaders.projects.load(data["projectId"])
             if project:
                 data["projectName"] = project.get("name", "")
                 data["customerId"] = project.get("customerId", "")
@@ -5115,7 +5081,7 @@ async def create_handover_receipt(data: dict):
                 
                 # Müşteri bilgilerini çek
                 if data.get("customerId"):
-                    customer = await db.customers.find_one({"id": data["customerId"]}, {"_id": 0})
+                    customer = await loaders.customers.load(data["customerId"])
                     if customer:
                         data["customerName"] = customer.get("name", "")
                         data["customerEmail"] = customer.get("email", "")
@@ -5405,6 +5371,7 @@ async def get_countries():
             ]
             for country in default_countries:
                 await db.countries.insert_one(country)
+            await geo_index.invalidate(db)
             countries = await db.countries.find().to_list(1000)
         
         return countries
@@ -5441,6 +5408,7 @@ async def add_country(country_data: dict):
         }
         
         result = await db.countries.insert_one(new_country)
+        await geo_index.invalidate(db)
         
         if result.inserted_id:
             logger.info(f"Country added successfully: {country_name}")
@@ -5606,28 +5574,33 @@ class SupplierContactUpdate(BaseModel):
 # ===================== SUPPLIER MANAGEMENT ENDPOINTS =====================
 
 # Supplier Categories (Tedarikçi Türü) Endpoints
+@reference_cache.reference("supplier_categories", ["supplier_categories"])
+async def load_supplier_categories(db):
+    """Load all supplier categories"""
+    categories = await db.supplier_categories.find({"is_active": True}).to_list(1000)
+    if not categories:
+        # Seed default categories if none exist
+        default_categories = [
+            {"name": "Tedarikçi"},
+            {"name": "Usta"},
+            {"name": "3D Tasarımcı"},
+            {"name": "Grafik Tasarımcı"},
+            {"name": "Yazılımcı"},
+            {"name": "Partner"}
+        ]
+        for cat_data in default_categories:
+            category = SupplierCategory(**cat_data)
+            await db.supplier_categories.insert_one(category.dict())
+        
+        categories = await db.supplier_categories.find({"is_active": True}).to_list(1000)
+    
+    return [SupplierCategory(**category) for category in categories]
+
 @api_router.get("/supplier-categories", response_model=List[SupplierCategory])
-async def get_supplier_categories():
+async def get_supplier_categories(request: Request):
     """Get all supplier categories"""
     try:
-        categories = await db.supplier_categories.find({"is_active": True}).to_list(1000)
-        if not categories:
-            # Seed default categories if none exist
-            default_categories = [
-                {"name": "Tedarikçi"},
-                {"name": "Usta"},
-                {"name": "3D Tasarımcı"},
-                {"name": "Grafik Tasarımcı"},
-                {"name": "Yazılımcı"},
-                {"name": "Partner"}
-            ]
-            for cat_data in default_categories:
-                category = SupplierCategory(**cat_data)
-                await db.supplier_categories.insert_one(category.dict())
-            
-            categories = await db.supplier_categories.find({"is_active": True}).to_list(1000)
-        
-        return [SupplierCategory(**category) for category in categories]
+        return await reference_cache.response(request, db, "supplier_categories")
     except Exception as e:
         logger.error(f"Error getting supplier categories: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -5643,6 +5616,7 @@ async def create_supplier_category(category_data: SupplierCategoryCreate):
         
         category = SupplierCategory(**category_data.dict())
         await db.supplier_categories.insert_one(category.dict())
+        await reference_cache.bump(db, "supplier_categories")
         
         logger.info(f"Supplier category created: {category.name}")
         return category
@@ -5772,6 +5746,7 @@ async def create_supplier(supplier_data: SupplierCreate):
         
         supplier = Supplier(**supplier_data.dict())
         await db.suppliers.insert_one(supplier.dict())
+        await search_service.reindex(db, "suppliers", supplier.id)
         
         logger.info(f"Supplier created: {supplier.company_short_name}")
         return supplier
@@ -5782,10 +5757,15 @@ async def create_supplier(supplier_data: SupplierCreate):
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/suppliers", response_model=List[Supplier])
-async def get_suppliers():
-    """Get all suppliers with specialty names"""
+async def get_suppliers(page_params: PageParams = Depends()):
+    """Get suppliers with specialty names (keyset paginated when cursor/limit is given)"""
     try:
-        suppliers = await db.suppliers.find().to_list(1000)
+        if page_params.legacy:
+            suppliers = await db.suppliers.find().to_list(1000)
+        else:
+            page = await fetch_page(db.suppliers, {}, page_params)
+            suppliers = page.items
+        
         # Add specialty names to suppliers
         for supplier in suppliers:
             if supplier.get('specialty_id'):
@@ -5796,7 +5776,12 @@ async def get_suppliers():
                     supplier['specialty'] = 'Belirtilmemiş'
             else:
                 supplier['specialty'] = 'Belirtilmemiş'
-        return [Supplier(**supplier) for supplier in suppliers]
+        
+        if page_params.legacy:
+            return [Supplier(**supplier) for supplier in suppliers]
+        return page.to_response(Supplier)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting suppliers: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -5843,6 +5828,7 @@ async def update_supplier(supplier_id: str, supplier_data: SupplierUpdate):
             {"id": supplier_id},
             {"$set": update_data}
         )
+        await search_service.reindex(db, "suppliers", supplier_id)
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Tedarikçi bulunamadı")
@@ -5879,6 +5865,7 @@ async def delete_supplier(supplier_id: str):
         else:
             # No related records - safe to delete
             await db.suppliers.delete_one({"id": supplier_id})
+            await search_service.reindex(db, "suppliers", supplier_id)
             return {"success": True, "message": "Tedarikçi başarıyla silindi"}
     except HTTPException:
         raise
@@ -5994,7 +5981,7 @@ class BankEmailRequest(BaseModel):
 async def send_bank_email(request: BankEmailRequest):
     """Send bank details via email using SendGrid"""
     try:
-        result = email_service.send_user_email(
+        result = await email_service.send_user_email(
             to_email=request.to,
             to_name=request.to_name,
             from_email=request.from_email,
@@ -6231,21 +6218,29 @@ async def create_expense_receipt(receipt_data: ExpenseReceiptCreate):
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/expense-receipts", response_model=List[ExpenseReceipt])
-async def get_expense_receipts(status: Optional[str] = None):
-    """Get expense receipts, optionally filtered by status"""
+async def get_expense_receipts(status: Optional[str] = None, page_params: PageParams = Depends()):
+    """Get expense receipts, optionally filtered by status (keyset paginated when cursor/limit is given)"""
     try:
         query = {}
         if status:
             query["status"] = status
-            
-        receipts = await db.expense_receipts.find(query).to_list(length=None)
+        
+        if page_params.legacy:
+            receipts = await db.expense_receipts.find(query).to_list(length=None)
+        else:
+            page = await fetch_page(db.expense_receipts, query, page_params)
+            receipts = page.items
         
         # Parse dates
         for receipt in receipts:
             if isinstance(receipt.get('date'), str):
                 receipt['date'] = datetime.fromisoformat(receipt['date']).date()
         
-        return [ExpenseReceipt(**receipt) for receipt in receipts]
+        if page_params.legacy:
+            return [ExpenseReceipt(**receipt) for receipt in receipts]
+        return page.to_response(ExpenseReceipt)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting expense receipts: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -6389,9 +6384,7 @@ async def send_expense_receipt_approval_email(receipt, approval_key):
             logger.error(f"No email found for supplier contact: {receipt.supplier_id}")
             return
         
-        # Get SendGrid settings
-        sendgrid_api_key = os.environ.get('SENDGRID_API_KEY')
-        if not sendgrid_api_key:
+        if not email_service.configured:
             logger.warning("SendGrid API key not configured")
             return
         
@@ -6421,21 +6414,18 @@ Vitingo CRM Sistemi
 """
         
         # Send email
-        if Mail:
-            message = Mail(
-                from_email='noreply@vitingo.com',
-                to_emails=contact_email,
-                subject=f'Gider Makbuzu Onayı - {receipt.receipt_number}',
-                plain_text_content=email_content
-            )
-            
-            try:
-                from sendgrid import SendGridAPIClient
-                sg = SendGridAPIClient(api_key=sendgrid_api_key)
-                response = sg.send(message)
-                logger.info(f"Approval email sent for receipt {receipt.receipt_number} to {contact_email}")
-            except Exception as e:
-                logger.error(f"SendGrid error: {str(e)}")
+        result = await email_service.send_email(
+            to_email=contact_email,
+            subject=f'Gider Makbuzu Onayı - {receipt.receipt_number}',
+            html_content=None,
+            plain_content=email_content,
+            from_email='noreply@vitingo.com',
+            from_name=None
+        )
+        if result.get("success"):
+            logger.info(f"Approval email sent for receipt {receipt.receipt_number} to {contact_email}")
+        else:
+            logger.error(f"SendGrid error: {result.get('error')}")
         
     except Exception as e:
         logger.error(f"Error sending approval email: {str(e)}")
@@ -6586,9 +6576,7 @@ async def send_expense_receipt_email(request: ExpenseReceiptEmailRequest):
         if not receipt:
             raise HTTPException(status_code=404, detail="Expense receipt not found")
         
-        # Get SendGrid settings from environment
-        sendgrid_api_key = os.environ.get('SENDGRID_API_KEY')
-        if not sendgrid_api_key:
+        if not email_service.configured:
             return {"success": False, "message": "E-posta servisi yapılandırılmamış"}
         
         # Create standard email content with proper Vitingo format
@@ -6646,56 +6634,34 @@ Vitingo CRM Sistemi"""
         # Create sender name in format "Vitingo CRM - {User Name}"
         sender_display_name = f"Vitingo CRM - {request.sender_name}" if request.sender_name else "Vitingo CRM"
         
-        # Send email using SendGrid with proper from_email format
-        try:
-            from sendgrid.helpers.mail import Email
-            from_email_obj = Email(email='info@quattrostand.com', name=sender_display_name)
-        except ImportError:
-            from_email_obj = f"{sender_display_name} <info@quattrostand.com>"
+        # Add PDF attachment if generated successfully
+        attachments = []
+        if pdf_data:
+            attachments.append({
+                "name": f"Gider_Makbuzu_{receipt.get('receipt_number', 'N_A')}.pdf",
+                "type": "application/pdf",
+                "data": base64.b64encode(pdf_data).decode()
+            })
+            logger.info(f"PDF attachment created for receipt {receipt.get('receipt_number')}")
         
-        message = Mail(
-            from_email=from_email_obj,
-            to_emails=request.to,
+        result = await email_service.send_email(
+            to_email=request.to,
             subject=request.subject,
-            plain_text_content=plain_content,
-            html_content=html_content
+            html_content=html_content,
+            plain_content=plain_content,
+            from_email='info@quattrostand.com',
+            from_name=sender_display_name,
+            attachments=attachments
         )
+        if not result.get("success"):
+            logger.error(f"SendGrid error: {result.get('error')}")
+            return {"success": False, "message": f"E-posta gönderilemedi: {result.get('error')}"}
         
-        # Add PDF attachment if generated successfully
-        if pdf_data:
-            try:
-                from sendgrid.helpers.mail import Attachment, FileContent, FileName, FileType, Disposition
-                
-                # Convert PDF to base64
-                pdf_base64 = base64.b64encode(pdf_data).decode()
-                
-                # Create attachment
-                attachment = Attachment()
-                attachment.file_content = FileContent(pdf_base64)
-                attachment.file_type = FileType('application/pdf')
-                attachment.file_name = FileName(f"Gider_Makbuzu_{receipt.get('receipt_number', 'N_A')}.pdf")
-                attachment.disposition = Disposition('attachment')
-                
-                message.attachment = [attachment]
-                logger.info(f"PDF attachment created for receipt {receipt.get('receipt_number')}")
-                
-            except Exception as pdf_error:
-                logger.error(f"Error adding PDF attachment: {str(pdf_error)}")
-                # Continue without attachment
-        
-        try:
-            from sendgrid import SendGridAPIClient
-            sg = SendGridAPIClient(api_key=sendgrid_api_key)
-            response = sg.send(message)
-            
-            return {
-                "success": True, 
-                "message": "E-posta başarıyla gönderildi",
-                "receipt_number": receipt.get('receipt_number')
-            }
-        except Exception as e:
-            logger.error(f"SendGrid error: {str(e)}")
-            return {"success": False, "message": f"E-posta gönderilemedi: {str(e)}"}
+        return {
+            "success": True, 
+            "message": "E-posta başarıyla gönderildi",
+            "receipt_number": receipt.get('receipt_number')
+        }
             
     except HTTPException:
         raise
@@ -6846,7 +6812,7 @@ async def send_contact_email(request: ContactEmailRequest):
         from_email = "noreply@vendormate.com"
         from_name = "VendorMate CRM"
         
-        result = email_service.send_user_email(
+        result = await email_service.send_user_email(
             to_email=request.to,
             to_name=contact.get("full_name", "Değerli Müşterimiz") if contact else "Değerli Müşterimiz",
             from_email=from_email,
@@ -6889,35 +6855,22 @@ async def send_contact_email(request: ContactEmailRequest):
 # ===================== GEO DATA ENDPOINTS =====================
 
 @api_router.get("/geo/countries")
-async def get_countries(query: str = ""):
-    """Get all countries with optional search query"""
+async def get_countries(request: Request, query: str = "", limit: Optional[int] = None):
+    """Get all countries, or accent-insensitive typeahead matches for `query`"""
     try:
-        # Use database instead of hardcoded data
-        filter_query = {}
-        if query:
-            # Support fuzzy search with accent tolerance
-            query_regex = query.replace("i", "[iıİI]").replace("u", "[uüUÜ]").replace("o", "[oöOÖ]").replace("c", "[cçCÇ]").replace("s", "[sşSŞ]").replace("g", "[gğGĞ]")
-            filter_query = {
-                "$or": [
-                    {"name": {"$regex": query_regex, "$options": "i"}},
-                    {"iso2": {"$regex": query, "$options": "i"}},
-                    {"iso3": {"$regex": query, "$options": "i"}}
-                ]
-            }
+        geo = await geo_index.get(db)
         
-        countries = await db.countries.find(filter_query).sort("name", 1).to_list(length=None)
-        
-        # Convert MongoDB documents to API format
-        result = []
-        for country in countries:
-            result.append({
+        def to_api(country):
+            return {
                 "code": country.get("iso2", ""),
                 "name": country.get("name", ""),
                 "iso2": country.get("iso2", ""),
                 "iso3": country.get("iso3", "")
-            })
+            }
         
-        return result
+        if query:
+            return [to_api(country) for country in geo.search_countries(query, limit)]
+        return geo.cached_response(request, "geo_countries", lambda: [to_api(country) for country in geo.countries])
     except Exception as e:
         logger.error(f"Error fetching countries: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -7006,6 +6959,7 @@ async def create_person(person_data: PersonCreate):
         
         # Insert to MongoDB
         await db.people.insert_one(person_dict)
+        await search_service.reindex(db, "people", person.id)
         
         logger.info(f"Person created: {person.id}")
         return person
@@ -7015,10 +6969,14 @@ async def create_person(person_data: PersonCreate):
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/people")
-async def get_people():
-    """Get all people"""
+async def get_people(page_params: PageParams = Depends()):
+    """Get people (keyset paginated when cursor/limit is given)"""
     try:
-        people = await db.people.find({}, {"_id": 0}).to_list(length=None)
+        if page_params.legacy:
+            people = await db.people.find({}, {"_id": 0}).to_list(length=None)
+        else:
+            page = await fetch_page(db.people, {}, page_params)
+            people = page.items
         
         # Add fullName field for frontend compatibility
         for person in people:
@@ -7027,8 +6985,12 @@ async def get_people():
             elif "firstName" in person and "lastName" in person:
                 person["fullName"] = f"{person['firstName']} {person['lastName']}"
         
-        return people
+        if page_params.legacy:
+            return people
+        return page.to_response()
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting people: {str(e)}")
         return []
@@ -7065,6 +7027,7 @@ async def update_person(person_id: str, person_data: PersonUpdate):
             {"id": person_id},
             {"$set": update_data}
         )
+        await search_service.reindex(db, "people", person_id)
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Person not found")
@@ -7088,6 +7051,7 @@ async def delete_person(person_id: str):
             raise HTTPException(status_code=404, detail="Person not found")
         
         result = await db.people.delete_one({"id": person_id})
+        await search_service.reindex(db, "people", person_id)
         
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Person not found")
@@ -7276,6 +7240,7 @@ async def create_opportunity(opportunity_input: OpportunityCreate):
         
         # Insert into database
         result = await db.opportunities.insert_one(opportunity_data)
+        await search_service.reindex(db, "opportunities", opportunity_data["id"])
         
         # Return created opportunity
         created_opportunity = await db.opportunities.find_one({"_id": result.inserted_id})
@@ -7289,9 +7254,10 @@ async def create_opportunity(opportunity_input: OpportunityCreate):
 async def get_opportunities(
     status: Optional[str] = None,
     stage: Optional[str] = None,
-    customer: Optional[str] = None
+    customer: Optional[str] = None,
+    page_params: PageParams = Depends()
 ):
-    """Get all opportunities with optional filtering"""
+    """Get opportunities with optional filtering (keyset paginated when cursor/limit is given)"""
     try:
         # Build query filters
         query = {}
@@ -7302,9 +7268,15 @@ async def get_opportunities(
         if customer:
             query["customer"] = {"$regex": customer, "$options": "i"}  # Case-insensitive search
         
+        if not page_params.legacy:
+            page = await fetch_page(db.opportunities, query, page_params)
+            return page.to_response(Opportunity)
+        
         opportunities = await db.opportunities.find(query).sort("created_at", -1).to_list(length=None)
         return [Opportunity(**opportunity) for opportunity in opportunities]
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching opportunities: {str(e)}")
         return []
@@ -7343,6 +7315,7 @@ async def update_opportunity(opportunity_id: str, opportunity_input: Opportunity
                 {"id": opportunity_id},
                 {"$set": update_data}
             )
+            await search_service.reindex(db, "opportunities", opportunity_id)
         
         # Return updated opportunity
         updated_opportunity = await db.opportunities.find_one({"id": opportunity_id})
@@ -7365,6 +7338,7 @@ async def delete_opportunity(opportunity_id: str):
         
         # Delete the opportunity
         result = await db.opportunities.delete_one({"id": opportunity_id})
+        await search_service.reindex(db, "opportunities", opportunity_id)
         
         if result.deleted_count == 1:
             return {"message": "Opportunity deleted successfully", "id": opportunity_id}
@@ -7533,12 +7507,17 @@ class AvansUpdate(BaseModel):
     notes: Optional[str] = None
 
 # Status Endpoints
+@reference_cache.reference("opportunity_statuses", ["opportunity_statuses"])
+async def load_opportunity_statuses(db):
+    """Load all opportunity statuses"""
+    statuses = await db.opportunity_statuses.find({"is_active": True}).sort("created_at", 1).to_list(length=None)
+    return [OpportunityStatus(**status) for status in statuses]
+
 @api_router.get("/opportunity-statuses")
-async def get_opportunity_statuses():
+async def get_opportunity_statuses(request: Request):
     """Get all opportunity statuses"""
     try:
-        statuses = await db.opportunity_statuses.find({"is_active": True}).sort("created_at", 1).to_list(length=None)
-        return [OpportunityStatus(**status) for status in statuses]
+        return await reference_cache.response(request, db, "opportunity_statuses")
     except Exception as e:
         logger.error(f"Error fetching opportunity statuses: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -7568,6 +7547,7 @@ async def create_opportunity_status(status_input: StatusCreate):
         }
         
         result = await db.opportunity_statuses.insert_one(status_data)
+        await reference_cache.bump(db, "opportunity_statuses")
         created_status = await db.opportunity_statuses.find_one({"_id": result.inserted_id})
         
         return OpportunityStatus(**created_status)
@@ -7591,6 +7571,7 @@ async def delete_opportunity_status(status_id: str):
             {"id": status_id},
             {"$set": {"is_active": False, "updated_at": datetime.now(timezone.utc)}}
         )
+        await reference_cache.bump(db, "opportunity_statuses")
         
         return {"message": "Durum başarıyla silindi", "id": status_id}
         
@@ -7601,12 +7582,17 @@ async def delete_opportunity_status(status_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 # Stage Endpoints
+@reference_cache.reference("opportunity_stages", ["opportunity_stages"])
+async def load_opportunity_stages(db):
+    """Load all opportunity stages"""
+    stages = await db.opportunity_stages.find({"is_active": True}).sort("created_at", 1).to_list(length=None)
+    return [OpportunityStage(**stage) for stage in stages]
+
 @api_router.get("/opportunity-stages")
-async def get_opportunity_stages():
+async def get_opportunity_stages(request: Request):
     """Get all opportunity stages"""
     try:
-        stages = await db.opportunity_stages.find({"is_active": True}).sort("created_at", 1).to_list(length=None)
-        return [OpportunityStage(**stage) for stage in stages]
+        return await reference_cache.response(request, db, "opportunity_stages")
     except Exception as e:
         logger.error(f"Error fetching opportunity stages: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -7636,6 +7622,7 @@ async def create_opportunity_stage(stage_input: StageCreate):
         }
         
         result = await db.opportunity_stages.insert_one(stage_data)
+        await reference_cache.bump(db, "opportunity_stages")
         created_stage = await db.opportunity_stages.find_one({"_id": result.inserted_id})
         
         return OpportunityStage(**created_stage)
@@ -7659,6 +7646,7 @@ async def delete_opportunity_stage(stage_id: str):
             {"id": stage_id},
             {"$set": {"is_active": False, "updated_at": datetime.now(timezone.utc)}}
         )
+        await reference_cache.bump(db, "opportunity_stages")
         
         return {"message": "Aşama başarıyla silindi", "id": stage_id}
         
@@ -7670,12 +7658,17 @@ async def delete_opportunity_stage(stage_id: str):
 
 # ===================== PROJECT TYPE ENDPOINTS =====================
 
+@reference_cache.reference("project_types", ["project_types"])
+async def load_project_types(db):
+    """Load all project types"""
+    project_types = await db.project_types.find({"is_active": True}).sort("created_at", 1).to_list(length=None)
+    return [ProjectType(**project_type) for project_type in project_types]
+
 @api_router.get("/project-types")
-async def get_project_types():
+async def get_project_types(request: Request):
     """Get all project types"""
     try:
-        project_types = await db.project_types.find({"is_active": True}).sort("created_at", 1).to_list(length=None)
-        return [ProjectType(**project_type) for project_type in project_types]
+        return await reference_cache.response(request, db, "project_types")
     except Exception as e:
         logger.error(f"Error fetching project types: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -7705,6 +7698,7 @@ async def create_project_type(project_type_input: ProjectTypeCreate):
         }
         
         result = await db.project_types.insert_one(project_type_data)
+        await reference_cache.bump(db, "project_types")
         created_project_type = await db.project_types.find_one({"_id": result.inserted_id})
         
         return ProjectType(**created_project_type)
@@ -7728,6 +7722,7 @@ async def delete_project_type(project_type_id: str):
             {"id": project_type_id},
             {"$set": {"is_active": False, "updated_at": datetime.now(timezone.utc)}}
         )
+        await reference_cache.bump(db, "project_types")
         
         return {"message": "Proje türü başarıyla silindi", "id": project_type_id}
         
@@ -7740,11 +7735,17 @@ async def delete_project_type(project_type_id: str):
 # ===================== AVANS (ADVANCE) ENDPOINTS =====================
 
 @api_router.get("/avans")
-async def get_all_avans():
-    """Get all advances"""
+async def get_all_avans(page_params: PageParams = Depends()):
+    """Get advances (keyset paginated when cursor/limit is given)"""
     try:
+        if not page_params.legacy:
+            page = await fetch_page(db.advances, {}, page_params)
+            return page.to_response(Avans)
+        
         advances = await db.advances.find().sort("created_at", -1).to_list(length=None)
         return [Avans(**advance) for advance in advances]
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching advances: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -8073,7 +8074,7 @@ async def create_collection_receipt(receipt_input: CollectionReceiptCreate):
                     pdf_link
                 )
                 
-                email_service.send_email(
+                await email_service.send_email(
                     to_email=receipt_input.payer_email,
                     subject=f"Ödeme Onayı ve Tahsilat Makbuzu - {receipt_number}",
                     html_content=email_content
@@ -8726,7 +8727,7 @@ class CollectionCreate(BaseModel):
     collection_items: List[CollectionItem]
 
 @api_router.post("/collections", response_model=Collection)
-async def create_collection(collection_data: CollectionCreate):
+async def create_collection(collection_data: CollectionCreate, loaders: RequestLoaders = Depends(get_loaders)):
     """Create a new collection entry and automatically send receipt"""
     try:
         # Generate collection number
@@ -8743,12 +8744,12 @@ async def create_collection(collection_data: CollectionCreate):
         contact_email = ""
         
         if collection_data.customer_type == "customer" and collection_data.customer_id:
-            customer = await db.customers.find_one({"id": collection_data.customer_id})
+            customer = await loaders.customers.load(collection_data.customer_id)
             if customer:
                 customer_name = customer.get("companyName", "")
                 customer_email = customer.get("email", "")
         elif collection_data.customer_type == "supplier" and collection_data.supplier_id:
-            supplier = await db.suppliers.find_one({"id": collection_data.supplier_id})
+            supplier = await loaders.suppliers.load(collection_data.supplier_id)
             if supplier:
                 customer_name = supplier.get("company_short_name", "")
                 customer_email = supplier.get("email", "")
@@ -8931,6 +8932,7 @@ async def create_mock_customers():
         
         # Insert all mock customers
         await db.customers.insert_many(mock_customers)
+        await search_service.rebuild(db, ["customers"])
         logger.info(f"Created {len(mock_customers)} mock customers")
         
         return {
@@ -9876,174 +9878,178 @@ async def get_brief_form_schema(country: str = "US"):
 
 # ===================== STAND ELEMENTS ENDPOINTS =====================
 
-@api_router.get("/stand-elements")
-async def get_stand_elements():
-    """Get all stand elements configuration with recursive structure"""
-    try:
-        elements = await db.stand_elements.find().to_list(length=None)
-        
-        # If no custom elements exist, create default recursive configuration
-        if not elements:
-            default_elements = [
-                {
-                    "key": "flooring",
-                    "label": "Zemin",
-                    "icon": "🟫",
-                    "required": True,
-                    "structure": {
-                        "raised36mm": {
-                            "key": "raised36mm",
-                            "label": "36mm Yükseltilmiş Zemin",
-                            "element_type": "option",
-                            "children": {
-                                "carpet": {
-                                    "key": "carpet",
-                                    "label": "Halı Kaplama",
-                                    "icon": "🟫",
-                                    "element_type": "option",
-                                    "children": {
-                                        "carpet_type": {
-                                            "key": "carpet_type",
-                                            "label": "Halı Türü",
-                                            "element_type": "property",
-                                            "input_type": "select",
-                                            "options": ["İnce Tüylü", "Kalın Tüylü", "Düz Dokuma", "Berber Halısı"]
-                                        },
-                                        "color": {
-                                            "key": "color",
-                                            "label": "Renk",
-                                            "element_type": "property",
-                                            "input_type": "select",
-                                            "options": ["Gri", "Bej", "Lacivert", "Kırmızı", "Yeşil", "Siyah"]
-                                        },
-                                        "quantity": {
-                                            "key": "quantity",
-                                            "label": "Miktar",
-                                            "element_type": "unit",
-                                            "input_type": "number",
-                                            "unit": "m²"
-                                        }
+@reference_cache.reference("stand_elements", ["stand_elements"])
+async def load_stand_elements(db):
+    """Load all stand elements configuration with recursive structure"""
+    elements = await db.stand_elements.find().to_list(length=None)
+    
+    # If no custom elements exist, create default recursive configuration
+    if not elements:
+        default_elements = [
+            {
+                "key": "flooring",
+                "label": "Zemin",
+                "icon": "🟫",
+                "required": True,
+                "structure": {
+                    "raised36mm": {
+                        "key": "raised36mm",
+                        "label": "36mm Yükseltilmiş Zemin",
+                        "element_type": "option",
+                        "children": {
+                            "carpet": {
+                                "key": "carpet",
+                                "label": "Halı Kaplama",
+                                "icon": "🟫",
+                                "element_type": "option",
+                                "children": {
+                                    "carpet_type": {
+                                        "key": "carpet_type",
+                                        "label": "Halı Türü",
+                                        "element_type": "property",
+                                        "input_type": "select",
+                                        "options": ["İnce Tüylü", "Kalın Tüylü", "Düz Dokuma", "Berber Halısı"]
+                                    },
+                                    "color": {
+                                        "key": "color",
+                                        "label": "Renk",
+                                        "element_type": "property",
+                                        "input_type": "select",
+                                        "options": ["Gri", "Bej", "Lacivert", "Kırmızı", "Yeşil", "Siyah"]
+                                    },
+                                    "quantity": {
+                                        "key": "quantity",
+                                        "label": "Miktar",
+                                        "element_type": "unit",
+                                        "input_type": "number",
+                                        "unit": "m²"
                                     }
-                                },
-                                "parquet": {
-                                    "key": "parquet",
-                                    "label": "Parke Kaplama",
-                                    "icon": "🪵",
-                                    "element_type": "option",
-                                    "children": {
-                                        "wood_type": {
-                                            "key": "wood_type",
-                                            "label": "Ahşap Türü",
-                                            "element_type": "property",
-                                            "input_type": "select",
-                                            "options": ["Meşe", "Ceviz", "Kayın", "Laminat"]
-                                        },
-                                        "color": {
-                                            "key": "color",
-                                            "label": "Renk Tonu",
-                                            "element_type": "property",
-                                            "input_type": "select",
-                                            "options": ["Açık Ton", "Orta Ton", "Koyu Ton", "Doğal"]
-                                        },
-                                        "quantity": {
-                                            "key": "quantity",
-                                            "label": "Miktar",
-                                            "element_type": "unit",
-                                            "input_type": "number",
-                                            "unit": "m²"
-                                        }
+                                }
+                            },
+                            "parquet": {
+                                "key": "parquet",
+                                "label": "Parke Kaplama",
+                                "icon": "🪵",
+                                "element_type": "option",
+                                "children": {
+                                    "wood_type": {
+                                        "key": "wood_type",
+                                        "label": "Ahşap Türü",
+                                        "element_type": "property",
+                                        "input_type": "select",
+                                        "options": ["Meşe", "Ceviz", "Kayın", "Laminat"]
+                                    },
+                                    "color": {
+                                        "key": "color",
+                                        "label": "Renk Tonu",
+                                        "element_type": "property",
+                                        "input_type": "select",
+                                        "options": ["Açık Ton", "Orta Ton", "Koyu Ton", "Doğal"]
+                                    },
+                                    "quantity": {
+                                        "key": "quantity",
+                                        "label": "Miktar",
+                                        "element_type": "unit",
+                                        "input_type": "number",
+                                        "unit": "m²"
                                     }
                                 }
                             }
-                        },
-                        "standard": {
-                            "key": "standard",
-                            "label": "Standart Zemin",
-                            "element_type": "option"
                         }
                     },
-                    "created_by": "system"
+                    "standard": {
+                        "key": "standard",
+                        "label": "Standart Zemin",
+                        "element_type": "option"
+                    }
                 },
-                {
-                    "key": "furniture",
-                    "label": "Mobilya",
-                    "icon": "🪑",
-                    "required": False,
-                    "structure": {
-                        "seating": {
-                            "key": "seating",
-                            "label": "Oturma Grupları",
-                            "element_type": "option",
-                            "children": {
-                                "armchairs": {
-                                    "key": "armchairs",
-                                    "label": "Berjer/Koltuk",
-                                    "icon": "🛋️",
-                                    "element_type": "option",
-                                    "children": {
-                                        "style": {
-                                            "key": "style",
-                                            "label": "Stil",
-                                            "element_type": "property",
-                                            "input_type": "select",
-                                            "options": ["Modern", "Klasik", "Avangard", "Minimalist"]
-                                        },
-                                        "fabric_type": {
-                                            "key": "fabric_type",
-                                            "label": "Kumaş Türü",
-                                            "element_type": "property",
-                                            "input_type": "select",
-                                            "options": ["Deri", "Kumaş", "Suni Deri", "Kadife"]
-                                        },
-                                        "color": {
-                                            "key": "color",
-                                            "label": "Renk",
-                                            "element_type": "property",
-                                            "input_type": "select",
-                                            "options": ["Siyah", "Beyaz", "Gri", "Kahverengi", "Lacivert", "Kırmızı"]
-                                        },
-                                        "quantity": {
-                                            "key": "quantity",
-                                            "label": "Miktar",
-                                            "element_type": "unit",
-                                            "input_type": "number",
-                                            "unit": "adet"
-                                        }
+                "created_by": "system"
+            },
+            {
+                "key": "furniture",
+                "label": "Mobilya",
+                "icon": "🪑",
+                "required": False,
+                "structure": {
+                    "seating": {
+                        "key": "seating",
+                        "label": "Oturma Grupları",
+                        "element_type": "option",
+                        "children": {
+                            "armchairs": {
+                                "key": "armchairs",
+                                "label": "Berjer/Koltuk",
+                                "icon": "🛋️",
+                                "element_type": "option",
+                                "children": {
+                                    "style": {
+                                        "key": "style",
+                                        "label": "Stil",
+                                        "element_type": "property",
+                                        "input_type": "select",
+                                        "options": ["Modern", "Klasik", "Avangard", "Minimalist"]
+                                    },
+                                    "fabric_type": {
+                                        "key": "fabric_type",
+                                        "label": "Kumaş Türü",
+                                        "element_type": "property",
+                                        "input_type": "select",
+                                        "options": ["Deri", "Kumaş", "Suni Deri", "Kadife"]
+                                    },
+                                    "color": {
+                                        "key": "color",
+                                        "label": "Renk",
+                                        "element_type": "property",
+                                        "input_type": "select",
+                                        "options": ["Siyah", "Beyaz", "Gri", "Kahverengi", "Lacivert", "Kırmızı"]
+                                    },
+                                    "quantity": {
+                                        "key": "quantity",
+                                        "label": "Miktar",
+                                        "element_type": "unit",
+                                        "input_type": "number",
+                                        "unit": "adet"
                                     }
-                                },
-                                "sofas": {
-                                    "key": "sofas",
-                                    "label": "Kanepe Takımı",
-                                    "icon": "🛋️",
-                                    "element_type": "option"
                                 }
+                            },
+                            "sofas": {
+                                "key": "sofas",
+                                "label": "Kanepe Takımı",
+                                "icon": "🛋️",
+                                "element_type": "option"
                             }
                         }
-                    },
-                    "created_by": "system"
-                }
-            ]
-            
-            for element_data in default_elements:
-                element = StandElement(**element_data)
-                await db.stand_elements.insert_one(element.dict())
-                logger.info(f"Created default recursive stand element: {element.key}")
-            
-            # Fetch again after inserting defaults
-            elements = await db.stand_elements.find().to_list(length=None)
-        
-        # Return recursive structure directly
-        config = {}
-        for element in elements:
-            config[element['key']] = {
-                'label': element['label'],
-                'icon': element.get('icon'),
-                'required': element.get('required', False),
-                'structure': element.get('structure', {})
+                    }
+                },
+                "created_by": "system"
             }
+        ]
         
-        return config
+        for element_data in default_elements:
+            element = StandElement(**element_data)
+            await db.stand_elements.insert_one(element.dict())
+            logger.info(f"Created default recursive stand element: {element.key}")
         
+        # Fetch again after inserting defaults
+        elements = await db.stand_elements.find().to_list(length=None)
+    
+    # Return recursive structure directly
+    config = {}
+    for element in elements:
+        config[element['key']] = {
+            'label': element['label'],
+            'icon': element.get('icon'),
+            'required': element.get('required', False),
+            'structure': element.get('structure', {})
+        }
+    
+    return config
+
+@api_router.get("/stand-elements")
+async def get_stand_elements(request: Request):
+    """Get all stand elements configuration with recursive structure"""
+    try:
+        return await reference_cache.response(request, db, "stand_elements")
     except Exception as e:
         logger.error(f"Error getting stand elements: {str(e)}")
         return {}
@@ -10113,6 +10119,7 @@ async def create_stand_element(element_data: StandElementCreate):
                         }
                     }
                 )
+                await reference_cache.bump(db, "stand_elements")
             else:
                 # Adding to nested children - build MongoDB update path
                 update_path = f"structure.{'.children.'.join(path_parts[1:])}.children.{element_data.key}"
@@ -10125,6 +10132,7 @@ async def create_stand_element(element_data: StandElementCreate):
                         }
                     }
                 )
+                await reference_cache.bump(db, "stand_elements")
             
             return {"success": True, "message": f"Element {element_data.key} added to path {element_data.parent_path}"}
         
@@ -10151,6 +10159,7 @@ async def create_stand_element(element_data: StandElementCreate):
             )
             
             await db.stand_elements.insert_one(element.dict())
+            await reference_cache.bump(db, "stand_elements")
             
             return {"success": True, "message": f"Main element {element_data.key} created successfully"}
         
@@ -10206,6 +10215,7 @@ async def update_stand_element(element_key: str, update_data: StandElementCreate
                 {"key": main_element_key},
                 {"$set": update_fields}
             )
+            await reference_cache.bump(db, "stand_elements")
             
             return {"success": True, "message": f"Element {element_key} at path {update_data.parent_path} updated successfully"}
         
@@ -10227,6 +10237,7 @@ async def update_stand_element(element_key: str, update_data: StandElementCreate
                 {"key": element_key},
                 {"$set": update_fields}
             )
+            await reference_cache.bump(db, "stand_elements")
             
             return {"success": True, "message": f"Main element {element_key} updated successfully"}
         
@@ -10267,12 +10278,14 @@ async def delete_stand_element(element_key: str, parent_path: str = None):
                     "$set": {"updated_at": datetime.utcnow()}
                 }
             )
+            await reference_cache.bump(db, "stand_elements")
             
             return {"success": True, "message": f"Element {element_key} deleted from path {parent_path}"}
         
         else:
             # Deleting main element
             result = await db.stand_elements.delete_one({"key": element_key})
+            await reference_cache.bump(db, "stand_elements")
             
             if result.deleted_count == 0:
                 raise HTTPException(status_code=404, detail="Element not found")
@@ -10296,6 +10309,7 @@ class DesignRequest(BaseModel):
     brief_data: dict  # Brief form data including dimensions, stand elements etc.
     uploaded_images: List[ImageUpload] = []
     logo_image: Optional[ImageUpload] = None
+    refresh: bool = False  # Bypass the analysis/image caches and generate fresh designs
 
 class GeneratedDesign(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -10304,182 +10318,141 @@ class GeneratedDesign(BaseModel):
     brief_id: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+def _design_provider():
+    """Configured design provider; 500 like before when the API key is missing"""
+    try:
+        return stand_design_service.get_provider()
+    except stand_design_service.DesignProviderNotConfigured as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _sse(event: Dict) -> str:
+    """Server-sent event frame"""
+    return f"event: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
+
 @api_router.post("/analyze-uploaded-images")
 async def analyze_uploaded_images(images: List[ImageUpload]):
-    """Analyze uploaded design inspiration images using OpenAI Vision API"""
+    """Analyze uploaded design inspiration images using OpenAI Vision API (cached by image content)"""
     try:
-        load_dotenv()
-        api_key = os.environ.get('EMERGENT_LLM_KEY')
-        if not api_key:
-            raise HTTPException(status_code=500, detail="EMERGENT_LLM_KEY not configured")
-        
-        analyses = []
-        
-        for image in images:
-            try:
-                # Create a new chat instance for image analysis
-                chat = LlmChat(
-                    api_key=api_key,
-                    session_id=f"image-analysis-{uuid.uuid4()}",
-                    system_message="You are an expert in exhibition stand design. Analyze the provided image and extract design elements, colors, style, materials, layout concepts that could inspire new designs."
-                ).with_model("openai", "gpt-4o")
-                
-                # Create image content for analysis
-                image_content = ImageContent(image_base64=image.image_data)
-                
-                # Analyze the image
-                user_message = UserMessage(
-                    text="Please analyze this exhibition stand design image and provide detailed insights about: 1) Design style and aesthetic, 2) Color palette used, 3) Materials visible, 4) Layout and space organization, 5) Key design elements that make it effective, 6) Lighting concepts, 7) Brand presentation approaches. Focus on elements that could inspire new stand designs.",
-                    file_contents=[image_content]
-                )
-                
-                response = await chat.send_message(user_message)
-                
-                analyses.append({
-                    "filename": image.filename,
-                    "analysis": response,
-                    "status": "success"
-                })
-                
-            except Exception as e:
-                logger.error(f"Error analyzing image {image.filename}: {str(e)}")
-                analyses.append({
-                    "filename": image.filename,
-                    "analysis": f"Analysis failed: {str(e)}",
-                    "status": "error"
-                })
-        
+        provider = _design_provider()
+        analyses = await stand_design_service.analyze_images(db, provider, [image.dict() for image in images])
         return {"analyses": analyses}
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in analyze_uploaded_images: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.post("/generate-stand-designs")
 async def generate_stand_designs(request: DesignRequest):
-    """Generate stand design concepts using OpenAI Image Generation"""
-    try:
-        load_dotenv()
-        api_key = os.environ.get('EMERGENT_LLM_KEY')
-        if not api_key:
-            raise HTTPException(status_code=500, detail="EMERGENT_LLM_KEY not configured")
-        
-        # Initialize direct OpenAI client to avoid EmergentIntegrations issues
-        openai_client = AsyncOpenAI(api_key=api_key)
-        
-        # Analyze uploaded images if provided
-        design_inspiration = ""
-        if request.uploaded_images:
-            image_analyses = await analyze_uploaded_images(request.uploaded_images)
-            inspiration_texts = [analysis["analysis"] for analysis in image_analyses["analyses"] if analysis["status"] == "success"]
-            if inspiration_texts:
-                design_inspiration = f"\n\nDesign Inspiration from uploaded images:\n" + "\n".join(inspiration_texts[:3])  # Limit to 3 analyses
-        
-        # Extract brief information
-        brief = request.brief_data
-        stand_elements = brief.get('standElements', {})
-        # Handle both dict and list formats from frontend
-        if isinstance(stand_elements, dict):
-            selected_elements = [k for k, v in stand_elements.items() if v]
-        else:
-            selected_elements = stand_elements if isinstance(stand_elements, list) else []
-        
-        service_elements = brief.get('serviceElements', {})
-        # Handle both dict and list formats from frontend  
-        if isinstance(service_elements, dict):
-            selected_services = [k for k, v in service_elements.items() if v]
-        else:
-            selected_services = service_elements if isinstance(service_elements, list) else []
-        
-        # Build comprehensive design prompts
-        base_prompts = [
-            # Modern & Minimalist
-            f"Modern minimalist exhibition stand design, {brief.get('standDimensions', '3x3 meters')}, clean lines, white and corporate color palette, featuring {', '.join(selected_elements[:3]) if selected_elements else 'display areas'}, professional lighting, company branding space, high-end materials, glass and metal accents, spacious layout",
-            
-            # Tech & Innovation
-            f"High-tech innovation exhibition stand, {brief.get('standDimensions', '3x3 meters')}, LED screens, interactive displays, futuristic design, blue and white color scheme, featuring {', '.join(selected_elements[:3]) if selected_elements else 'technology showcase'}, ambient lighting, sleek surfaces, digital elements",
-            
-            # Warm & Inviting
-            f"Warm inviting exhibition stand design, {brief.get('standDimensions', '3x3 meters')}, wood materials, comfortable seating area, earth tones, featuring {', '.join(selected_elements[:3]) if selected_elements else 'meeting spaces'}, soft lighting, natural materials, welcoming atmosphere",
-            
-            # Bold & Creative
-            f"Bold creative exhibition stand, {brief.get('standDimensions', '3x3 meters')}, vibrant colors, artistic elements, dynamic layout, featuring {', '.join(selected_elements[:3]) if selected_elements else 'creative displays'}, dramatic lighting, unique shapes, eye-catching design",
-            
-            # Luxury & Premium
-            f"Luxury premium exhibition stand, {brief.get('standDimensions', '3x3 meters')}, premium materials, marble accents, gold details, sophisticated design, featuring {', '.join(selected_elements[:3]) if selected_elements else 'VIP areas'}, elegant lighting, high-end finishes",
-            
-            # Industrial & Modern
-            f"Industrial modern exhibition stand, {brief.get('standDimensions', '3x3 meters')}, metal framework, concrete elements, industrial lighting, featuring {', '.join(selected_elements[:3]) if selected_elements else 'product displays'}, raw materials, urban aesthetic",
-            
-            # Open & Airy
-            f"Open airy exhibition stand design, {brief.get('standDimensions', '3x3 meters')}, glass walls, transparent elements, light colors, featuring {', '.join(selected_elements[:3]) if selected_elements else 'open spaces'}, natural lighting, spacious feel",
-            
-            # Sustainable & Eco
-            f"Sustainable eco-friendly exhibition stand, {brief.get('standDimensions', '3x3 meters')}, recycled materials, green elements, natural wood, featuring {', '.join(selected_elements[:3]) if selected_elements else 'eco displays'}, energy-efficient lighting, sustainable design",
-            
-            # Dynamic & Interactive
-            f"Dynamic interactive exhibition stand, {brief.get('standDimensions', '3x3 meters')}, curved surfaces, interactive zones, bright colors, featuring {', '.join(selected_elements[:3]) if selected_elements else 'engagement areas'}, dynamic lighting, movement elements",
-            
-            # Classic & Professional
-            f"Classic professional exhibition stand, {brief.get('standDimensions', '3x3 meters')}, traditional materials, corporate colors, formal layout, featuring {', '.join(selected_elements[:3]) if selected_elements else 'business areas'}, professional lighting, timeless design"
-        ]
-        
-        # Add common suffixes to all prompts
-        common_suffix = f"{design_inspiration}, photorealistic, professional trade show environment, 8K quality, architectural visualization style, detailed render"
+    """Generate stand design concepts using OpenAI Image Generation (concurrent, cached per prompt)"""
+    try:
+        provider = _design_provider()
         
         generated_designs = []
+        async for event in stand_design_service.run_pipeline(
+            db, provider, request.brief_data, [image.dict() for image in request.uploaded_images], request.refresh
+        ):
+            if event["event"] == "design":
+                generated_designs.append((event["index"], event["design"]))
         
-        for i, base_prompt in enumerate(base_prompts):
-            try:
-                full_prompt = base_prompt + common_suffix
-                
-                # Generate image using direct OpenAI client
-                response = await openai_client.images.generate(
-                    model="dall-e-3",
-                    prompt=full_prompt,
-                    size="1024x1024",
-                    quality="standard",
-                    n=1
-                )
-                
-                # Get image URL and download
-                image_url = response.data[0].url
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(image_url) as img_response:
-                        if img_response.status == 200:
-                            images = [await img_response.read()]
-                        else:
-                            images = []
-                
-                if images and len(images) > 0:
-                    # Convert to base64
-                    image_base64 = base64.b64encode(images[0]).decode('utf-8')
-                    
-                    design = GeneratedDesign(
-                        image_data=image_base64,
-                        prompt_used=full_prompt,
-                        brief_id=brief.get('id')
-                    )
-                    
-                    # Save to database
-                    await db.generated_designs.insert_one(design.dict())
-                    
-                    generated_designs.append(design)
-                    
-                    logger.info(f"Generated design {i+1}/10 successfully")
-                else:
-                    logger.error(f"No image generated for prompt {i+1}")
-                    
-            except Exception as e:
-                logger.error(f"Error generating design {i+1}: {str(e)}")
-                continue
-        
-        return {"designs": generated_designs, "total_generated": len(generated_designs)}
+        # Same order as the prompts, whatever order they completed in
+        designs = [design for _, design in sorted(generated_designs, key=lambda item: item[0])]
+        return {"designs": designs, "total_generated": len(designs)}
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in generate_stand_designs: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.post("/generate-stand-designs/stream")
+async def stream_stand_designs(request: DesignRequest):
+    """Generate stand designs and stream each one as it completes (text/event-stream)"""
+    provider = _design_provider()
+    
+    async def events():
+        try:
+            async for event in stand_design_service.run_pipeline(
+                db, provider, request.brief_data, [image.dict() for image in request.uploaded_images], request.refresh
+            ):
+                yield _sse(event)
+        except Exception as e:
+            logger.error(f"Error in stream_stand_designs: {str(e)}")
+            yield _sse({"event": "error", "index": None, "error": str(e)})
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@api_router.post("/generate-stand-designs/runs")
+async def create_stand_design_run(request: DesignRequest):
+    """Queue stand design generation as a background job; follow it via /design-runs/{run_id}"""
+    try:
+        _design_provider()
+        run = await stand_design_service.create_run(
+            db, request.brief_data, [image.dict() for image in request.uploaded_images], request.refresh
+        )
+        job = await job_queue.enqueue(db, "design.generate_stand_designs", {"run_id": run["id"]})
+        return {**run, "job_id": job["id"]}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating stand design run: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/design-runs/{run_id}")
+async def get_stand_design_run(run_id: str):
+    """Progress of a design run and the designs generated so far"""
+    run = await stand_design_service.get_run(db, run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Design run not found")
+    run["designs"] = await db.generated_designs.find(
+        {"id": {"$in": run["design_ids"]}}, {"_id": 0}
+    ).to_list(length=None)
+    return run
+
+@api_router.get("/design-runs/{run_id}/events")
+async def stream_stand_design_run(run_id: str, request: Request):
+    """Stream the designs of a background run as the job produces them (text/event-stream)
+
+    Stops when the client disconnects, and with a "timeout" event when the run
+    makes no progress for DESIGN_RUN_STREAM_IDLE_TIMEOUT seconds.
+    """
+    if not await stand_design_service.get_run(db, run_id):
+        raise HTTPException(status_code=404, detail="Design run not found")
+    
+    async def events():
+        loop = asyncio.get_running_loop()
+        sent = 0
+        progress = None
+        last_progress_at = loop.time()
+        while not await request.is_disconnected():
+            run = await stand_design_service.get_run(db, run_id)
+            if not run:
+                return
+            new_ids = run["design_ids"][sent:]
+            if new_ids:
+                designs = await db.generated_designs.find({"id": {"$in": new_ids}}, {"_id": 0}).to_list(length=None)
+                by_id = {design["id"]: design for design in designs}
+                for design_id in new_ids:
+                    if design_id in by_id:
+                        yield _sse({"event": "design", "design": by_id[design_id]})
+                sent += len(new_ids)
+            if run["status"] in ("succeeded", "failed"):
+                yield _sse({"event": "done", "status": run["status"], "total": run["total"],
+                            "generated": run["completed"], "errors": run["errors"]})
+                return
+            
+            current = (run["status"], sent, run.get("completed"), run.get("failed"))
+            if current != progress:
+                progress, last_progress_at = current, loop.time()
+            elif loop.time() - last_progress_at > stand_design_service.DESIGN_RUN_STREAM_IDLE_TIMEOUT:
+                yield _sse({"event": "timeout", "status": run["status"],
+                            "message": "Run made no progress; poll GET /design-runs/{id} for its result"})
+                return
+            await asyncio.sleep(1)
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 @api_router.get("/generated-designs/{brief_id}")
 async def get_generated_designs(brief_id: str):
     """Get all generated designs for a specific brief"""
@@ -10995,14 +10968,21 @@ async def create_sample_calendar_data():
 # ===================== MEETING REQUESTS ENDPOINTS =====================
 
 @api_router.post("/meeting-requests", response_model=MeetingRequest)
-async def create_meeting_request(request_data: MeetingRequestCreate, organizer_id: str = "demo_user"):
+async def create_meeting_request(
+    request_data: MeetingRequestCreate,
+    organizer_id: str = "demo_user",
+    loaders: RequestLoaders = Depends(get_loaders)
+):
     """Create a new meeting request"""
     try:
         # Use organizer_id from request data if provided, otherwise use parameter default
         actual_organizer_id = request_data.organizer_id if request_data.organizer_id else organizer_id
         
         # Get organizer name from user database
-        organizer_user = await db.users.find_one({"id": actual_organizer_id})
+        # Organizer and attendees are resolved with one users query
+        organizer_user, *attendee_users = await loaders.users.load_many(
+            [actual_organizer_id, *request_data.attendee_ids]
+        )
         if organizer_user:
             organizer_name = organizer_user["name"]
         else:
@@ -11023,9 +11003,8 @@ async def create_meeting_request(request_data: MeetingRequestCreate, organizer_i
         
         # Get attendee names from user database
         attendee_names = []
-        for attendee_id in request_data.attendee_ids:
+        for attendee_id, attendee_user in zip(request_data.attendee_ids, attendee_users):
             # Try to get from user database first
-            attendee_user = await db.users.find_one({"id": attendee_id})
             if attendee_user:
                 attendee_names.append(attendee_user["name"])
             else:
@@ -11058,11 +11037,12 @@ async def create_meeting_request(request_data: MeetingRequestCreate, organizer_i
         # Save to database
         await db.meeting_requests.insert_one(meeting_request.dict())
         
-        # Send invitation emails to all attendees
+        # Send invitation emails to all attendees (one batch job, one API call per 1000 recipients)
         try:
+            recipients = []
             for attendee_id in request_data.attendee_ids:
-                # Get attendee details
-                attendee = await db.users.find_one({"id": attendee_id})
+                # Get attendee details (memoized by the users loader)
+                attendee = await loaders.users.load(attendee_id)
                 if attendee:
                     attendee_email = attendee["email"]
                     attendee_name = attendee["name"]
@@ -11105,17 +11085,22 @@ Organize Eden: {organizer_name}
 Toplantı Yönetim Sistemi
                     """
                     
-                    # Send invitation email
-                    email_result = email_service.send_user_email(
-                        to_email=attendee_email,
-                        to_name=attendee_name,
-                        from_email="noreply@company.com",
-                        from_name="Toplantı Sistemi",
-                        subject=email_subject,
-                        body=email_body.strip()
-                    )
-                    
-                    logger.info(f"Invitation email sent to {attendee_name}: {email_result}")
+                    recipients.append({
+                        "to_email": attendee_email,
+                        "to_name": attendee_name,
+                        "body": email_body.strip()
+                    })
+            
+            if recipients:
+                # Queue invitation emails (sent by a background job)
+                job = await job_queue.enqueue(db, "email.user_email_batch", {
+                    "recipients": recipients,
+                    "from_email": "noreply@company.com",
+                    "from_name": "Toplantı Sistemi",
+                    "subject": email_subject
+                }, idempotency_key=f"meeting_invitation:{meeting_request.id}")
+                
+                logger.info(f"Invitation emails queued for {len(recipients)} attendees: job {job['id']}")
                     
         except Exception as email_error:
             logger.error(f"Failed to send invitation emails: {email_error}")
@@ -11307,17 +11292,17 @@ Tüm katılımcı yanıtlarını görmek için sisteme giriş yapabilirsiniz.
 Toplantı Yönetim Sistemi
             """
             
-            # Send email using the existing email service
-            email_result = email_service.send_user_email(
-                to_email=organizer_email,
-                to_name=organizer_name,
-                from_email="noreply@company.com",
-                from_name="Toplantı Sistemi",
-                subject=email_subject,
-                body=email_body.strip()
-            )
+            # Queue the email (sent by a background job)
+            job = await job_queue.enqueue(db, "email.user_email", {
+                "to_email": organizer_email,
+                "to_name": organizer_name,
+                "from_email": "noreply@company.com",
+                "from_name": "Toplantı Sistemi",
+                "subject": email_subject,
+                "body": email_body.strip()
+            })
             
-            logger.info(f"Email notification sent to organizer: {email_result}")
+            logger.info(f"Email notification to organizer queued: job {job['id']}")
             
         except Exception as email_error:
             logger.error(f"Failed to send email notification: {email_error}")
@@ -12085,26 +12070,8 @@ async def get_expense_categories():
     try:
         categories = await db.expense_categories.find().to_list(length=None)
         if not categories:
-            default = [
-                {"id": str(uuid.uuid4()), "name": "Konaklama", "parent_id": None, "created_at": datetime.now(timezone.utc)},
-                {"id": str(uuid.uuid4()), "name": "Ulaşım", "parent_id": None, "created_at": datetime.now(timezone.utc)},
-                {"id": str(uuid.uuid4()), "name": "Yemek", "parent_id": None, "created_at": datetime.now(timezone.utc)},
-                {"id": str(uuid.uuid4()), "name": "İletişim", "parent_id": None, "created_at": datetime.now(timezone.utc)},
-                {"id": str(uuid.uuid4()), "name": "Eğitim", "parent_id": None, "created_at": datetime.now(timezone.utc)},
-            ]
-            await db.expense_categories.insert_many(default)
-            konaklama_id = default[0]["id"]
-            ulasim_id = default[1]["id"]
-            sub_cats = [
-                {"id": str(uuid.uuid4()), "name": "Otel/Ev Giderleri", "parent_id": konaklama_id, "created_at": datetime.now(timezone.utc)},
-                {"id": str(uuid.uuid4()), "name": "Minibar Harcamaları", "parent_id": konaklama_id, "created_at": datetime.now(timezone.utc)},
-                {"id": str(uuid.uuid4()), "name": "Şehir Vergisi", "parent_id": konaklama_id, "created_at": datetime.now(timezone.utc)},
-                {"id": str(uuid.uuid4()), "name": "Uçak Bileti", "parent_id": ulasim_id, "created_at": datetime.now(timezone.utc)},
-                {"id": str(uuid.uuid4()), "name": "Tren Bileti", "parent_id": ulasim_id, "created_at": datetime.now(timezone.utc)},
-                {"id": str(uuid.uuid4()), "name": "Taksi", "parent_id": ulasim_id, "created_at": datetime.now(timezone.utc)},
-            ]
-            await db.expense_categories.insert_many(sub_cats)
-            categories = default + sub_cats
+            categories = tenant_template.default_expense_categories()
+            await db.expense_categories.insert_many(categories)
         return [serialize_document(cat) for cat in categories]
     except Exception as e:
         logger.error(f"Error getting expense categories: {str(e)}")
@@ -13455,34 +13422,11 @@ async def get_countries():
 # ===================== ADMIN ENDPOINTS =====================
 
 @api_router.get("/admin/collections")
-async def get_all_collections():
-    """Get all MongoDB collections with document counts"""
+async def get_all_collections(refresh: bool = False, growth_days: int = admin_stats_service.DEFAULT_GROWTH_DAYS):
+    """Get all MongoDB collections with estimated counts, sizes, index sizes and growth"""
     try:
-        # Get all collection names
-        collection_names = await db.list_collection_names()
-        
-        # Get stats for each collection
-        collections_data = []
-        for name in collection_names:
-            # Skip system collections
-            if name.startswith('system.'):
-                continue
-                
-            collection = db[name]
-            count = await collection.count_documents({})
-            
-            collections_data.append({
-                "name": name,
-                "count": count
-            })
-        
-        # Sort by name
-        collections_data.sort(key=lambda x: x['name'])
-        
-        return {
-            "collections": collections_data,
-            "total": len(collections_data)
-        }
+        stats = await admin_stats_service.database_stats(db, refresh=refresh)
+        return await admin_stats_service.with_growth(db, stats, days=max(1, growth_days))
     except Exception as e:
         logger.error(f"Error getting collections: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -13513,8 +13457,8 @@ async def get_collection_documents(
             if '_id' in doc and isinstance(doc['_id'], ObjectId):
                 doc['_id'] = str(doc['_id'])
         
-        # Get total count
-        total = await collection.count_documents(query)
+        # Get total count (metadata estimate when unfiltered)
+        total = await collection.count_documents(query) if query else await collection.estimated_document_count()
         
         return {
             "documents": documents,
@@ -13530,22 +13474,7 @@ async def get_collection_documents(
 async def get_collection_stats(collection_name: str):
     """Get statistics for a specific collection"""
     try:
-        collection = db[collection_name]
-        
-        # Get basic stats
-        total_docs = await collection.count_documents({})
-        
-        # Get collection stats from MongoDB
-        stats = await db.command("collStats", collection_name)
-        
-        return {
-            "name": collection_name,
-            "count": total_docs,
-            "size": stats.get('size', 0),
-            "avgObjSize": stats.get('avgObjSize', 0),
-            "storageSize": stats.get('storageSize', 0),
-            "indexes": stats.get('nindexes', 0)
-        }
+        return await admin_stats_service.collection_stats(db, collection_name)
     except Exception as e:
         logger.error(f"Error getting stats for {collection_name}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -13686,32 +13615,16 @@ class ContractTemplate(BaseModel):
 
 @api_router.post("/contracts/extract-pdf-text")
 async def extract_pdf_text(file: UploadFile = File(...)):
-    """Extract text from PDF for annotation"""
+    """Extract text from PDF for annotation (parsed in the render pool, cached by content hash)"""
     try:
-        import PyPDF2
-        import io
-        
         # Read PDF file
         pdf_content = await file.read()
-        pdf_file = io.BytesIO(pdf_content)
-        
-        # Extract text from all pages
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        pages_text = []
-        
-        for page_num in range(len(pdf_reader.pages)):
-            page = pdf_reader.pages[page_num]
-            text = page.extract_text()
-            pages_text.append({
-                "page_number": page_num + 1,
-                "text": text,
-                "lines": text.split('\n') if text else []
-            })
+        extracted = await contract_renderer.extract_pdf_text_cached(db, pdf_content)
         
         return {
             "filename": file.filename,
-            "total_pages": len(pdf_reader.pages),
-            "pages": pages_text
+            "total_pages": extracted["total_pages"],
+            "pages": extracted["pages"]
         }
     except Exception as e:
         logger.error(f"Error extracting PDF text: {str(e)}")
@@ -13810,6 +13723,7 @@ async def update_contract_template(template_id: str, template_data: ContractTemp
         if result.modified_count == 0 and result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Şablon bulunamadı")
         
+        contract_renderer.invalidate(template_id)
         logger.info(f"Contract template updated: {template_id}")
         return {
             "success": True,
@@ -13827,6 +13741,7 @@ async def delete_contract_template(template_id: str):
     """Delete a contract template"""
     try:
         result = await db.contract_templates.delete_one({"id": template_id})
+        contract_renderer.invalidate(template_id)
         
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Şablon bulunamadı")
@@ -13869,59 +13784,40 @@ class ContractGenerateRequest(BaseModel):
     save_contract: Optional[bool] = False
     created_by: Optional[str] = None
 
+class ContractBatchItem(BaseModel):
+    field_values: Dict[str, Any]
+    contract_title: Optional[str] = None
+
+class ContractBatchGenerateRequest(BaseModel):
+    template_id: str
+    items: List[ContractBatchItem]
+    shared_field_values: Dict[str, Any] = {}  # Same for every item, e.g. fair name and dates
+    contract_title: Optional[str] = "Yeni Sözleşme"
+    save_contracts: bool = True
+    status: Optional[str] = "active"
+    created_by: Optional[str] = None
+
 # ===================== CONTRACTS (Saved Contracts) CRUD =====================
 
 @api_router.post("/contracts")
 async def create_contract(contract_data: ContractCreate):
     """Create and save a new contract"""
     try:
-        # Get template
-        template = await db.contract_templates.find_one({"id": contract_data.template_id})
+        # Get template (compiled once, cached until it is updated)
+        template = await contract_renderer.get_compiled_template(db, contract_data.template_id)
         if not template:
             raise HTTPException(status_code=404, detail="Şablon bulunamadı")
         
-        # Generate PDF content
-        html_content = """
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <style>
-                body { font-family: Arial, sans-serif; line-height: 1.6; margin: 40px; font-size: 12pt; }
-                .page { page-break-after: always; margin-bottom: 40px; }
-                .page:last-child { page-break-after: auto; }
-                pre { white-space: pre-wrap; font-family: Arial, sans-serif; font-size: 12pt; }
-            </style>
-        </head>
-        <body>
-        """
-        
-        for page in template.get('pages', []):
-            page_text = page.get('text', '')
-            for field in template.get('fields', []):
-                placeholder = field.get('placeholder', '')
-                field_key = field.get('field_key', '')
-                field_value = contract_data.field_values.get(field_key, '[DOLDURULMADI]')
-                page_text = page_text.replace(placeholder, str(field_value))
-            
-            html_content += f'<div class="page"><pre>{page_text}</pre></div>'
-        
-        html_content += "</body></html>"
-        
         # Generate PDF
-        from weasyprint import HTML
-        import io
         import base64
-        
-        pdf_buffer = io.BytesIO()
-        HTML(string=html_content, encoding='utf-8').write_pdf(pdf_buffer)
-        pdf_buffer.seek(0)
-        pdf_base64 = base64.b64encode(pdf_buffer.read()).decode('utf-8')
+        pdf_bytes = await contract_renderer.render_pdf(template, contract_data.field_values, style="contract")
+        pdf_base64 = base64.b64encode(pdf_bytes).decode('utf-8')
         
         # Create contract document
         contract = Contract(
             contract_title=contract_data.contract_title,
             template_id=contract_data.template_id,
-            template_name=template.get('template_name', ''),
+            template_name=template.template_name,
             field_values=contract_data.field_values,
             status=contract_data.status,
             created_by=contract_data.created_by,
@@ -14104,106 +14000,126 @@ async def update_contract_status(contract_id: str, status: str):
 
 # ===================== CONTRACT PDF GENERATION =====================
 
+def _attachment_disposition(filename: str) -> str:
+    """Content-Disposition for a download name with Turkish characters (RFC 5987, header stays latin-1)"""
+    from urllib.parse import quote
+    return f"attachment; filename*=UTF-8''{quote(filename)}"
+
 @api_router.post("/contracts/generate")
 async def generate_contract(request: ContractGenerateRequest):
     """Generate a PDF contract from template with field values"""
     try:
-        # Get template
-        template = await db.contract_templates.find_one({"id": request.template_id})
+        # Get template (compiled once, cached until it is updated)
+        template = await contract_renderer.get_compiled_template(db, request.template_id)
         if not template:
             raise HTTPException(status_code=404, detail="Şablon bulunamadı")
         
-        # Build HTML content from pages
-        html_content = """
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <style>
-                body {
-                    font-family: Arial, sans-serif;
-                    line-height: 1.6;
-                    margin: 40px;
-                    font-size: 12pt;
-                }
-                .page {
-                    page-break-after: always;
-                    margin-bottom: 40px;
-                }
-                .page:last-child {
-                    page-break-after: auto;
-                }
-                .page-number {
-                    text-align: center;
-                    font-size: 10pt;
-                    color: #666;
-                    margin-bottom: 20px;
-                }
-                pre {
-                    white-space: pre-wrap;
-                    font-family: Arial, sans-serif;
-                    font-size: 12pt;
-                }
-            </style>
-        </head>
-        <body>
-        """
-        
-        # Replace placeholders in each page
-        for page in template.get('pages', []):
-            page_text = page.get('text', '')
-            
-            # Replace field placeholders with actual values
-            for field in template.get('fields', []):
-                placeholder = field.get('placeholder', '')
-                field_key = field.get('field_key', '')
-                field_value = request.field_values.get(field_key, '[DOLDURULMADI]')
-                
-                # Replace placeholder with value
-                page_text = page_text.replace(placeholder, str(field_value))
-            
-            html_content += f"""
-            <div class="page">
-                <div class="page-number">Sayfa {page.get('page_number', 1)}</div>
-                <pre>{page_text}</pre>
-            </div>
-            """
+        # Encode filename properly for Turkish characters
+        content_disposition = _attachment_disposition(f"{request.contract_title}.pdf")
         
-        html_content += """
-        </body>
-        </html>
-        """
-        
-        # Generate PDF using WeasyPrint
+        # Generate PDF using WeasyPrint (in the render pool)
         try:
-            from weasyprint import HTML, CSS
-            import io
-            
-            pdf_buffer = io.BytesIO()
-            # Encode HTML content as UTF-8 to handle Turkish characters
-            html_bytes = html_content.encode('utf-8')
-            HTML(string=html_content, encoding='utf-8').write_pdf(pdf_buffer)
-            pdf_buffer.seek(0)
-            
-            # Return PDF as response
-            from fastapi.responses import StreamingResponse
-            # Encode filename properly for Turkish characters
-            safe_filename = request.contract_title.encode('utf-8').decode('utf-8')
-            return StreamingResponse(
-                pdf_buffer,
-                media_type="application/pdf",
-                headers={
-                    "Content-Disposition": f"attachment; filename*=UTF-8''{safe_filename}.pdf"
-                }
-            )
+            pdf_bytes = await contract_renderer.render_pdf(template, request.field_values)
         except ImportError:
             raise HTTPException(status_code=500, detail="WeasyPrint kütüphanesi yüklü değil")
         
+        # Return PDF as response
+        from fastapi.responses import StreamingResponse
+        import io
+        return StreamingResponse(
+            io.BytesIO(pdf_bytes),
+            media_type="application/pdf",
+            headers={"Content-Disposition": content_disposition}
+        )
+
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error generating contract: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Sözleşme oluşturulamadı: {str(e)}")
 
+@api_router.post("/contracts/generate-batch")
+async def generate_contracts_batch(request: ContractBatchGenerateRequest):
+    """Generate one contract per item (e.g. every exhibitor of a fair) from a single template
+
+    Items are rendered in parallel in the render pool. With save_contracts the
+    contracts are stored like POST /contracts, otherwise a ZIP of the PDFs is returned.
+    """
+    try:
+        if not request.items:
+            raise HTTPException(status_code=400, detail="En az bir sözleşme gerekli")
+        if len(request.items) > contract_renderer.MAX_BATCH_ITEMS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Tek seferde en fazla {contract_renderer.MAX_BATCH_ITEMS} sözleşme oluşturulabilir"
+            )
+        if request.save_contracts and not request.created_by:
+            raise HTTPException(status_code=400, detail="created_by gerekli")
+        # Built before rendering so a bad title cannot fail after N PDFs were made
+        content_disposition = _attachment_disposition(f"{request.contract_title}.zip")
+        
+        template = await contract_renderer.get_compiled_template(db, request.template_id)
+        if not template:
+            raise HTTPException(status_code=404, detail="Şablon bulunamadı")
+        
+        # Item values override the shared ones
+        field_values_list = [{**request.shared_field_values, **item.field_values} for item in request.items]
+        style = "contract" if request.save_contracts else "document"
+        try:
+            pdfs = await contract_renderer.render_pdfs(template, field_values_list, style=style)
+        except ImportError:
+            raise HTTPException(status_code=500, detail="WeasyPrint kütüphanesi yüklü değil")
+        
+        import base64
+        import io
+        import zipfile
+        
+        if request.save_contracts:
+            contracts = [
+                Contract(
+                    contract_title=item.contract_title or request.contract_title,
+                    template_id=request.template_id,
+                    template_name=template.template_name,
+                    field_values=field_values,
+                    status=request.status,
+                    created_by=request.created_by,
+                    pdf_content=base64.b64encode(pdf).decode('utf-8')
+                )
+                for item, field_values, pdf in zip(request.items, field_values_list, pdfs)
+            ]
+            await db.contracts.insert_many([contract.dict() for contract in contracts])
+            logger.info(f"{len(contracts)} contracts created from template {request.template_id} by {request.created_by}")
+            return {
+                "success": True,
+                "message": f"{len(contracts)} sözleşme başarıyla oluşturuldu",
+                "contract_ids": [contract.id for contract in contracts],
+                "count": len(contracts)
+            }
+        
+        zip_buffer = io.BytesIO()
+        used_names = set()
+        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            for index, (item, pdf) in enumerate(zip(request.items, pdfs), start=1):
+                name = (item.contract_title or f"{request.contract_title} {index}").replace("/", "-")
+                if name in used_names:
+                    name = f"{name} ({index})"
+                used_names.add(name)
+                archive.writestr(f"{name}.pdf", pdf)
+        zip_buffer.seek(0)
+        
+        from fastapi.responses import StreamingResponse
+        return StreamingResponse(
+            zip_buffer,
+            media_type="application/zip",
+            headers={"Content-Disposition": content_disposition}
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating contract batch: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Sözleşmeler oluşturulamadı: {str(e)}")
+
 # ===================== FILE UPLOAD ENDPOINTS =====================
 
 @api_router.post("/upload")
@@ -14647,29 +14563,7 @@ async def seed_default_design_templates():
         if existing > 0:
             return {"message": "Varsayılan şablonlar zaten mevcut", "count": existing}
         
-        default_templates = [
-            {
-                "id": str(uuid.uuid4()),
-                "name": "Teklif Kapak 1",
-                "category": "cover_page",
-                "image_url": "https://customer-assets.emergentagent.com/job_docgen-pro-9/artifacts/5rm7sspq_Untitled%20design.jpg",
-                "created_at": datetime.now(timezone.utc).isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "Teklif Kapak 2",
-                "category": "cover_page",
-                "image_url": "https://customer-assets.emergentagent.com/job_docgen-pro-9/artifacts/wddz4erk_Untitled%20design%20%281%29.jpg",
-                "created_at": datetime.now(timezone.utc).isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "Teklif Kapak 3",
-                "category": "cover_page",
-                "image_url": "https://customer-assets.emergentagent.com/job_docgen-pro-9/artifacts/hjdqqruu_Untitled%20design%20%282%29.jpg",
-                "created_at": datetime.now(timezone.utc).isoformat()
-            }
-        ]
+        default_templates = tenant_template.default_design_templates()
         
         await db.design_templates.insert_many(default_templates)
         return {"message": "Varsayılan şablonlar eklendi", "count": len(default_templates)}
@@ -15134,219 +15028,7 @@ async def seed_transaction_types():
         if count > 0:
             return {"message": "Transaction types already exist", "count": count}
         
-        default_types = [
-            {
-                "id": str(uuid.uuid4()),
-                "name": "Tahsilat",
-                "nameEn": "Collection",
-                "icon": "💰",
-                "color": "green",
-                "description": "Gelen ödemeler",
-                "direction": "in",
-                "isSystem": True,
-                "isActive": True,
-                "order": 1,
-                "subTypes": [
-                    {"id": str(uuid.uuid4()), "name": "Müşteri Tahsilatı", "isActive": True},
-                    {"id": str(uuid.uuid4()), "name": "Proje Tahsilatı", "isActive": True},
-                    {"id": str(uuid.uuid4()), "name": "Avans Tahsilatı", "isActive": True},
-                    {"id": str(uuid.uuid4()), "name": "Depozito İadesi", "isActive": True}
-                ],
-                "createdAt": datetime.now(timezone.utc).isoformat(),
-                "updatedAt": datetime.now(timezone.utc).isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "Ödeme",
-                "nameEn": "Payment",
-                "icon": "💸",
-                "color": "red",
-                "description": "Yapılan ödemeler",
-                "direction": "out",
-                "isSystem": True,
-                "isActive": True,
-                "order": 2,
-                "subTypes": [
-                    {"id": str(uuid.uuid4()), "name": "Tedarikçi Ödemesi", "isActive": True},
-                    {"id": str(uuid.uuid4()), "name": "Personel Ödemesi", "isActive": True},
-                    {"id": str(uuid.uuid4()), "name": "Freelancer Ödemesi", "isActive": True},
-                    {"id": str(uuid.uuid4()), "name": "Kira Ödemesi", "isActive": True},
-                    {"id": str(uuid.uuid4()), "name": "Vergi Ödemesi", "isActive": True},
-                    {"id": str(uuid.uuid4()), "name": "Sigorta Ödemesi", "isActive": True}
-                ],
-                "createdAt": datetime.now(timezone.utc).isoformat(),
-                "updatedAt": datetime.now(timezone.utc).isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "Döviz Alım",
-                "nameEn": "FX Buy",
-                "icon": "🔄",
-                "color": "blue",
-                "description": "Döviz alış işlemleri",
-                "direction": "both",
-                "isSystem": True,
-                "isActive": True,
-                "order": 3,
-                "subTypes": [
-                    {"id": str(uuid.uuid4()), "name": "USD → AED", "isActive": True},
-                    {"id": str(uuid.uuid4()), "name": "EUR → AED", "isActive": True},
-                    {"id": str(uuid.uuid4()), "name": "GBP → AED", "isActive": True},
-                    {"id": str(uuid.uuid4()), "name": "TRY → AED", "isActive": True}
-                ],
-                "createdAt": datetime.now(timezone.utc).isoformat(),
-                "updatedAt": datetime.now(timezone.utc).isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "Döviz Satım",
-                "nameEn": "FX Sell",
-                "icon": "💱",
-                "color": "purple",
-                "description": "Döviz satış işlemleri",
-                "direction": "both",
-                "isSystem": True,
-                "isActive": True,
-                "order": 4,
-                "subTypes": [
-                    {"id": str(uuid.uuid4()), "name": "AED → USD", "isActive": True},
-                    {"id": str(uuid.uuid4()), "name": "AED → EUR", "isActive": True},
-                    {"id": str(uuid.uuid4()), "name": "AED → TRY", "isActive": True}
-                ],
-                "createdAt": datetime.now(timezone.utc).isoformat(),
-                "updatedAt": datetime.now(timezone.utc).isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "Transfer",
-                "nameEn": "Transfer",
-                "icon": "↔️",
-                "color": "indigo",
-                "description": "Hesaplar arası transfer",
-                "direction": "both",
-                "isSystem": True,
-                "isActive": True,
-                "order": 5,
-                "subTypes": [
-                    {"id": str(uuid.uuid4()), "name": "Dahili Transfer", "isActive": True},
-                    {"id": str(uuid.uuid4()), "name": "Harici Transfer", "isActive": True},
-                    {"id": str(uuid.uuid4()), "name": "Swift Transfer", "isActive": True}
-                ],
-                "createdAt": datetime.now(timezone.utc).isoformat(),
-                "updatedAt": datetime.now(timezone.utc).isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "Nakit Yatan",
-                "nameEn": "Cash Deposit",
-                "icon": "🏧",
-                "color": "teal",
-                "description": "Nakit para yatırma",
-                "direction": "in",
-                "isSystem": True,
-                "isActive": True,
-                "order": 6,
-                "subTypes": [
-                    {"id": str(uuid.uuid4()), "name": "Şube Yatırım", "isActive": True},
-                    {"id": str(uuid.uuid4()), "name": "ATM Yatırım", "isActive": True}
-                ],
-                "createdAt": datetime.now(timezone.utc).isoformat(),
-                "updatedAt": datetime.now(timezone.utc).isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "Nakit Çekilen",
-                "nameEn": "Cash Withdrawal",
-                "icon": "💵",
-                "color": "orange",
-                "description": "Nakit para çekme",
-                "direction": "out",
-                "isSystem": True,
-                "isActive": True,
-                "order": 7,
-                "subTypes": [
-                    {"id": str(uuid.uuid4()), "name": "Şube Çekim", "isActive": True},
-                    {"id": str(uuid.uuid4()), "name": "ATM Çekim", "isActive": True}
-                ],
-                "createdAt": datetime.now(timezone.utc).isoformat(),
-                "updatedAt": datetime.now(timezone.utc).isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "Banka Masrafı",
-                "nameEn": "Bank Fee",
-                "icon": "🏦",
-                "color": "gray",
-                "description": "Banka ücretleri",
-                "direction": "out",
-                "isSystem": True,
-                "isActive": True,
-                "order": 8,
-                "subTypes": [
-                    {"id": str(uuid.uuid4()), "name": "Swift Ücreti", "isActive": True},
-                    {"id": str(uuid.uuid4()), "name": "Hesap İşletim Ücreti", "isActive": True},
-                    {"id": str(uuid.uuid4()), "name": "Havale Ücreti", "isActive": True},
-                    {"id": str(uuid.uuid4()), "name": "Kart Ücreti", "isActive": True}
-                ],
-                "createdAt": datetime.now(timezone.utc).isoformat(),
-                "updatedAt": datetime.now(timezone.utc).isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "Cashback",
-                "nameEn": "Cashback",
-                "icon": "🎁",
-                "color": "pink",
-                "description": "Geri ödeme/ödül",
-                "direction": "in",
-                "isSystem": True,
-                "isActive": True,
-                "order": 9,
-                "subTypes": [
-                    {"id": str(uuid.uuid4()), "name": "Kart Cashback", "isActive": True},
-                    {"id": str(uuid.uuid4()), "name": "Kampanya İadesi", "isActive": True}
-                ],
-                "createdAt": datetime.now(timezone.utc).isoformat(),
-                "updatedAt": datetime.now(timezone.utc).isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "İade",
-                "nameEn": "Refund",
-                "icon": "↩️",
-                "color": "amber",
-                "description": "İade işlemleri",
-                "direction": "both",
-                "isSystem": True,
-                "isActive": True,
-                "order": 10,
-                "subTypes": [
-                    {"id": str(uuid.uuid4()), "name": "Müşteri İadesi", "isActive": True},
-                    {"id": str(uuid.uuid4()), "name": "Tedarikçi İadesi", "isActive": True},
-                    {"id": str(uuid.uuid4()), "name": "Hatalı İşlem Düzeltme", "isActive": True}
-                ],
-                "createdAt": datetime.now(timezone.utc).isoformat(),
-                "updatedAt": datetime.now(timezone.utc).isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "Faiz",
-                "nameEn": "Interest",
-                "icon": "📈",
-                "color": "emerald",
-                "description": "Faiz gelirleri",
-                "direction": "in",
-                "isSystem": True,
-                "isActive": True,
-                "order": 11,
-                "subTypes": [
-                    {"id": str(uuid.uuid4()), "name": "Mevduat Faizi", "isActive": True},
-                    {"id": str(uuid.uuid4()), "name": "Gecikme Faizi", "isActive": True}
-                ],
-                "createdAt": datetime.now(timezone.utc).isoformat(),
-                "updatedAt": datetime.now(timezone.utc).isoformat()
-            }
-        ]
+        default_types = tenant_template.default_transaction_types()
         
         await db.transaction_types.insert_many(default_types)
         
@@ -17702,145 +17384,64 @@ async def check_due_invoices():
 # ==================== RAPORLAMA API ====================
 
 @api_router.get("/reports/aging")
-async def get_aging_report():
-    """Alacak Yaşlandırma Raporu"""
+async def get_aging_report(as_of: Optional[str] = None, customer_id: Optional[str] = None):
+    """Alacak Yaşlandırma Raporu (as_of: YYYY-MM-DD, customer_id: müşteri bazında detay)"""
     try:
-        today = datetime.now()
-        today_str = today.strftime("%Y-%m-%d")
-        
-        invoices = await db.invoices.find({"status": {"$ne": "deleted"}}, {"_id": 0}).to_list(None)
-        
-        aging_buckets = {
-            "current": {"label": "Güncel (0-30)", "count": 0, "amount": 0, "invoices": []},
-            "days_31_60": {"label": "31-60 Gün", "count": 0, "amount": 0, "invoices": []},
-            "days_61_90": {"label": "61-90 Gün", "count": 0, "amount": 0, "invoices": []},
-            "days_91_120": {"label": "91-120 Gün", "count": 0, "amount": 0, "invoices": []},
-            "over_120": {"label": "120+ Gün", "count": 0, "amount": 0, "invoices": []}
-        }
-        
-        total_receivables = 0
-        
-        for inv in invoices:
-            due_date = inv.get("dueDate") or inv.get("due_date")
-            if not due_date:
-                continue
-            
-            paid = inv.get("paidAmount", 0) or 0
-            total = inv.get("total", 0) or inv.get("grandTotal", 0) or 0
-            remaining = total - paid
-            
-            if remaining <= 0:
-                continue
-            
-            total_receivables += remaining
-            
+        as_of_dt = None
+        if as_of:
             try:
-                due_dt = datetime.strptime(str(due_date)[:10], "%Y-%m-%d")
-                days_overdue = (today - due_dt).days
-            except:
-                days_overdue = 0
-            
-            invoice_data = {
-                "id": inv.get("id") or str(inv.get("_id")),
-                "invoiceNo": inv.get("invoice_number") or inv.get("invoiceNo") or "",
-                "customerName": inv.get("customerName") or inv.get("customer_name") or "",
-                "dueDate": str(due_date)[:10],
-                "total": total,
-                "paid": paid,
-                "remaining": remaining,
-                "daysOverdue": max(0, days_overdue)
-            }
-            
-            if days_overdue <= 30:
-                aging_buckets["current"]["count"] += 1
-                aging_buckets["current"]["amount"] += remaining
-                aging_buckets["current"]["invoices"].append(invoice_data)
-            elif days_overdue <= 60:
-                aging_buckets["days_31_60"]["count"] += 1
-                aging_buckets["days_31_60"]["amount"] += remaining
-                aging_buckets["days_31_60"]["invoices"].append(invoice_data)
-            elif days_overdue <= 90:
-                aging_buckets["days_61_90"]["count"] += 1
-                aging_buckets["days_61_90"]["amount"] += remaining
-                aging_buckets["days_61_90"]["invoices"].append(invoice_data)
-            elif days_overdue <= 120:
-                aging_buckets["days_91_120"]["count"] += 1
-                aging_buckets["days_91_120"]["amount"] += remaining
-                aging_buckets["days_91_120"]["invoices"].append(invoice_data)
-            else:
-                aging_buckets["over_120"]["count"] += 1
-                aging_buckets["over_120"]["amount"] += remaining
-                aging_buckets["over_120"]["invoices"].append(invoice_data)
+                as_of_dt = datetime.strptime(as_of, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="as_of YYYY-MM-DD formatında olmalıdır")
         
-        # Her bucket'taki faturaları tutara göre sırala
-        for bucket in aging_buckets.values():
-            bucket["invoices"] = sorted(bucket["invoices"], key=lambda x: x["remaining"], reverse=True)[:20]
+        report = await report_service.aging_report(db, as_of=as_of_dt, customer_id=customer_id)
         
         return {
             "generatedAt": datetime.now().isoformat(),
-            "totalReceivables": total_receivables,
-            "buckets": aging_buckets
+            **report
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating aging report: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @api_router.get("/reports/income-expense")
-async def get_income_expense_report(months: int = 12):
-    """Gelir/Gider Analizi Raporu"""
+async def get_income_expense_report(
+    months: int = 12,
+    start_month: Optional[str] = None,
+    end_month: Optional[str] = None,
+    currency: Optional[str] = None
+):
+    """Gelir/Gider Analizi Raporu (start_month/end_month: YYYY-MM, currency: hedef para birimi)"""
     try:
-        result = []
+        if start_month or end_month:
+            try:
+                start = datetime.strptime(start_month or end_month, "%Y-%m").strftime("%Y-%m")
+                end = datetime.strptime(end_month or datetime.now().strftime("%Y-%m"), "%Y-%m").strftime("%Y-%m")
+            except ValueError:
+                raise HTTPException(status_code=400, detail="start_month/end_month YYYY-MM formatında olmalıdır")
+            if start > end:
+                raise HTTPException(status_code=400, detail="start_month, end_month'tan sonra olamaz")
+            month_keys = report_service.month_range(start, end)
+            period = f"{start} - {end}"
+        else:
+            month_keys = report_service.last_n_months(max(1, months))
+            period = f"Son {months} ay"
         
-        for i in range(months - 1, -1, -1):
-            month_date = datetime.now() - timedelta(days=i * 30)
-            month_str = month_date.strftime("%Y-%m")
-            month_label = month_date.strftime("%b %Y")
-            
-            # Faturalar (Gelir)
-            invoices = await db.invoices.find({
-                "status": {"$ne": "deleted"},
-                "date": {"$regex": f"^{month_str}"}
-            }, {"_id": 0}).to_list(None)
-            
-            income = sum(inv.get("total", 0) or inv.get("grandTotal", 0) or 0 for inv in invoices)
-            
-            # Tahsilatlar
-            collections = await db.collections_new.find({
-                "status": {"$ne": "deleted"},
-                "date": {"$regex": f"^{month_str}"}
-            }, {"_id": 0}).to_list(None)
-            
-            collected = sum(c.get("amount", 0) for c in collections)
-            
-            # Ödemeler (Gider)
-            payments = await db.payments_new.find({
-                "status": {"$ne": "deleted"},
-                "date": {"$regex": f"^{month_str}"}
-            }, {"_id": 0}).to_list(None)
-            
-            expense = sum(p.get("amount", 0) for p in payments)
-            
-            # Gider makbuzları
-            expenses = await db.expense_receipts.find({
-                "status": {"$ne": "deleted"},
-                "date": {"$regex": f"^{month_str}"}
-            }, {"_id": 0}).to_list(None)
-            
-            other_expenses = sum(e.get("amount", 0) or e.get("total", 0) or 0 for e in expenses)
-            
-            result.append({
-                "month": month_label,
-                "monthKey": month_str,
-                "income": income,
-                "collected": collected,
-                "expense": expense + other_expenses,
-                "profit": income - expense - other_expenses,
-                "invoiceCount": len(invoices),
-                "collectionCount": len(collections),
-                "paymentCount": len(payments)
-            })
+        rates = None
+        if currency:
+            currency = currency.upper()
+            rates = {rate.code: rate.selling_rate for rate in await get_currency_rates()}
+            if currency != "TRY" and currency not in rates:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Desteklenmeyen para birimi: {currency} (desteklenen: TRY, {', '.join(sorted(rates))})"
+                )
+        
+        result, unconverted = await report_service.income_expense_report(db, month_keys, currency=currency, rates=rates)
         
         # Toplamlar
         totals = {
@@ -17854,115 +17455,62 @@ async def get_income_expense_report(months: int = 12):
         
         return {
             "generatedAt": datetime.now().isoformat(),
-            "period": f"Son {months} ay",
+            "period": period,
+            "currency": currency,
             "months": result,
-            "totals": totals
+            "totals": totals,
+            # Source currencies without a rate, left out of the converted totals
+            "unconvertedAmounts": unconverted
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating income/expense report: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @api_router.get("/reports/customer-performance")
-async def get_customer_performance_report(limit: int = 20):
+async def get_customer_performance_report(
+    limit: int = 20,
+    compare_to: Optional[str] = None
+):
     """Müşteri Performans Raporu"""
     try:
-        customers = await db.customers.find({"status": {"$ne": "deleted"}}, {"_id": 0}).to_list(None)
-        
-        customer_stats = []
-        
-        for customer in customers:
-            customer_id = customer.get("id") or str(customer.get("_id"))
-            customer_name = customer.get("companyName") or customer.get("name") or "İsimsiz"
-            
-            # Faturalar
-            invoices = await db.invoices.find({
-                "$or": [
-                    {"customerId": customer_id},
-                    {"customer_id": customer_id}
-                ],
-                "status": {"$ne": "deleted"}
-            }, {"_id": 0}).to_list(None)
-            
-            total_invoiced = sum(inv.get("total", 0) or inv.get("grandTotal", 0) or 0 for inv in invoices)
-            total_paid = sum(inv.get("paidAmount", 0) or 0 for inv in invoices)
-            total_remaining = total_invoiced - total_paid
-            
-            # Tahsilatlar
-            collections = await db.collections_new.find({
-                "customerId": customer_id,
-                "status": {"$ne": "deleted"}
-            }, {"_id": 0}).to_list(None)
-            
-            total_collected = sum(c.get("amount", 0) for c in collections)
-            
-            # Gecikmiş ödemeler
-            today_str = datetime.now().strftime("%Y-%m-%d")
-            overdue_amount = 0
-            overdue_count = 0
-            
-            for inv in invoices:
-                due_date = inv.get("dueDate") or inv.get("due_date")
-                if due_date and str(due_date)[:10] < today_str:
-                    paid = inv.get("paidAmount", 0) or 0
-                    total = inv.get("total", 0) or inv.get("grandTotal", 0) or 0
-                    remaining = total - paid
-                    if remaining > 0:
-                        overdue_amount += remaining
-                        overdue_count += 1
-            
-            # Ödeme performansı (0-100)
-            payment_score = 100
-            if total_invoiced > 0:
-                payment_ratio = total_paid / total_invoiced * 100
-                payment_score = min(100, payment_ratio)
-            
-            if overdue_amount > 0:
-                payment_score = max(0, payment_score - (overdue_count * 10))
-            
-            if total_invoiced > 0 or total_remaining > 0:
-                customer_stats.append({
-                    "id": customer_id,
-                    "name": customer_name,
-                    "email": customer.get("email", ""),
-                    "phone": customer.get("phone", ""),
-                    "totalInvoiced": total_invoiced,
-                    "totalPaid": total_paid,
-                    "totalRemaining": total_remaining,
-                    "totalCollected": total_collected,
-                    "overdueAmount": overdue_amount,
-                    "overdueCount": overdue_count,
-                    "invoiceCount": len(invoices),
-                    "paymentScore": round(payment_score, 1),
-                    "status": "good" if payment_score >= 80 else "warning" if payment_score >= 50 else "risk"
-                })
-        
-        # Toplam ciro'ya göre sırala
-        customer_stats.sort(key=lambda x: x["totalInvoiced"], reverse=True)
-        
-        # Özet
-        summary = {
-            "totalCustomers": len(customer_stats),
-            "totalInvoiced": sum(c["totalInvoiced"] for c in customer_stats),
-            "totalCollected": sum(c["totalCollected"] for c in customer_stats),
-            "totalRemaining": sum(c["totalRemaining"] for c in customer_stats),
-            "totalOverdue": sum(c["overdueAmount"] for c in customer_stats),
-            "goodCustomers": len([c for c in customer_stats if c["status"] == "good"]),
-            "warningCustomers": len([c for c in customer_stats if c["status"] == "warning"]),
-            "riskCustomers": len([c for c in customer_stats if c["status"] == "risk"])
-        }
-        
+        report = await report_service.customer_performance_report(db, limit=limit)
+
+        if compare_to:
+            try:
+                datetime.strptime(compare_to, "%Y-%m-%d")
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Geçersiz tarih formatı (YYYY-MM-DD)")
+            snapshot = await report_service.get_customer_performance_snapshot(db, compare_to)
+            if not snapshot:
+                raise HTTPException(status_code=404, detail="Bu tarih için performans görüntüsü bulunamadı")
+            report = report_service.compare_with_snapshot(report, snapshot)
+
         return {
             "generatedAt": datetime.now().isoformat(),
-            "summary": summary,
-            "customers": customer_stats[:limit]
+            **report
         }
-        
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating customer performance report: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@api_router.post("/reports/customer-performance/snapshot")
+async def create_customer_performance_snapshot():
+    """Müşteri performans görüntüsünü şimdi kaydet"""
+    try:
+        snapshot = await report_service.save_customer_performance_snapshot(db)
+        return {"date": snapshot["date"], "summary": snapshot["summary"], "customerCount": len(snapshot["customers"])}
+    except Exception as e:
+        logger.error(f"Error saving customer performance snapshot: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 # ==================== END RAPORLAMA API ====================
 
 # ==================== WHATSAPP MESAJ API ====================
@@ -18126,7 +17674,7 @@ async def get_whatsapp_logs(limit: int = 50):
 
 
 @api_router.post("/whatsapp/bulk-reminder")
-async def send_bulk_payment_reminder():
+async def send_bulk_payment_reminder(loaders: RequestLoaders = Depends(get_loaders)):
     """Vadesi geçmiş müşterilere toplu hatırlatma gönder"""
     try:
         today = datetime.now().strftime("%Y-%m-%d")
@@ -18134,7 +17682,7 @@ async def send_bulk_payment_reminder():
         # Vadesi geçmiş faturaları bul
         invoices = await db.invoices.find({"status": {"$ne": "deleted"}}, {"_id": 0}).to_list(None)
         
-        reminders = []
+        overdue = []
         
         for inv in invoices:
             due_date = inv.get("dueDate") or inv.get("due_date")
@@ -18152,14 +17700,15 @@ async def send_bulk_payment_reminder():
             if not customer_id:
                 continue
             
-            # Müşteri bilgilerini al
-            customer = await db.customers.find_one({
-                "$or": [
-                    {"id": customer_id},
-                    {"_id": ObjectId(customer_id) if len(str(customer_id)) == 24 else None}
-                ]
-            }, {"_id": 0})
-            
+            overdue.append((inv, due_date, remaining, customer_id))
+        
+        # Müşteri bilgilerini tek sorguda al
+        customers = await loaders.customers.load_map(customer_id for _, _, _, customer_id in overdue)
+        
+        reminders = []
+        
+        for inv, due_date, remaining, customer_id in overdue:
+            customer = customers.get(str(customer_id))
             if not customer or not customer.get("phone"):
                 continue
             
@@ -18664,6 +18213,72 @@ async def export_statement_pdf(account_id: str):
 
 # ==================== END PDF EXPORT API'LERİ ====================
 
+# ==================== BOOTSTRAP API ====================
+
+BOOTSTRAP_REFERENCE_KEYS = [
+    "library_currencies", "library_phone_codes", "library_sectors", "library_positions",
+    "customer_types", "opportunity_stages", "opportunity_statuses", "project_types",
+    "stand_elements", "supplier_categories"
+]
+BOOTSTRAP_GLOBAL_KEYS = ["global_currencies", "global_languages"]
+
+
+@api_router.get("/bootstrap")
+async def get_bootstrap(request: Request):
+    """Sayfa açılışında gereken tüm referans listeleri tek yanıtta (ETag ile önbelleklenir)"""
+    try:
+        sources = [(db, key) for key in BOOTSTRAP_REFERENCE_KEYS]
+        sources += [(global_data_router.db, key) for key in BOOTSTRAP_GLOBAL_KEYS]
+        return await reference_cache.bootstrap_response(request, sources)
+    except Exception as e:
+        logger.error(f"Error building bootstrap data: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# ==================== END BOOTSTRAP API ====================
+
+# ==================== ARAMA API ====================
+
+@api_router.get("/search")
+async def search_entities(q: str, types: Optional[str] = None, limit: int = search_service.DEFAULT_RESULT_LIMIT):
+    """Müşteri, kişi, tedarikçi, fırsat, ürün, fuar ve lead'lerde birleşik arama (yazarken öneri)"""
+    try:
+        entities = None
+        if types:
+            entities = [t.strip() for t in types.split(",") if t.strip()]
+            unknown = [t for t in entities if t not in search_service.SEARCH_ENTITIES]
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Geçersiz arama türü: {', '.join(unknown)}")
+
+        results = await search_service.search(db, q, entities=entities, limit=max(1, limit))
+        return {"query": q, "results": results}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error searching: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@api_router.post("/search/reindex")
+async def rebuild_search_index(types: Optional[str] = None):
+    """Arama indeksini kaynak koleksiyonlardan yeniden oluştur"""
+    try:
+        entities = [t.strip() for t in types.split(",") if t.strip()] if types else None
+        if entities:
+            unknown = [t for t in entities if t not in search_service.SEARCH_ENTITIES]
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Geçersiz arama türü: {', '.join(unknown)}")
+        counts = await search_service.rebuild(db, entities)
+        return {"success": True, "indexed": counts}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error rebuilding search index: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# ==================== END ARAMA API ====================
+
 # ===================== MAIN APP SETUP =====================
 
 # Include the API router in the main app
@@ -18708,6 +18323,8 @@ app.include_router(sales_reports_router.router)
 app.include_router(feature_flags_router.router)
 app.include_router(global_data_router.router)
 app.include_router(package_features_router.router)
+app.include_router(platform_tenants_router.router)
+app.include_router(jobs_router.router)
 
 # Include tenant-aware routers (Multi-Tenant SaaS)
 from routes import tenant_router as tenant_routes
@@ -18756,6 +18373,67 @@ app.include_router(tenant_briefs_router.router)
 app.include_router(tenant_users_router.router)
 app.include_router(tenant_reports_router.router)
 
+# ===================== BACKGROUND JOBS =====================
+
+background_tasks: List[asyncio.Task] = []
+
+@app.on_event("startup")
+async def start_background_jobs():
+    """Create supporting indexes and start periodic jobs"""
+    try:
+        await passive_lead_service.ensure_passive_lead_indexes(db)
+    except Exception as e:
+        logger.error(f"Error creating passive lead indexes: {str(e)}")
+    try:
+        await ensure_pagination_indexes(db)
+    except Exception as e:
+        logger.error(f"Error creating pagination indexes: {str(e)}")
+    try:
+        await search_service.ensure_search_indexes(db)
+    except Exception as e:
+        logger.error(f"Error creating search indexes: {str(e)}")
+    try:
+        await report_service.ensure_report_indexes(db)
+    except Exception as e:
+        logger.error(f"Error creating report indexes: {str(e)}")
+    try:
+        await geo_index.get(db)
+    except Exception as e:
+        logger.error(f"Error loading geo index: {str(e)}")
+    try:
+        await job_queue.ensure_job_indexes(db)
+    except Exception as e:
+        logger.error(f"Error creating job indexes: {str(e)}")
+    try:
+        await stand_design_service.ensure_design_indexes(db)
+    except Exception as e:
+        logger.error(f"Error creating design indexes: {str(e)}")
+    try:
+        await contract_renderer.ensure_contract_indexes(db)
+    except Exception as e:
+        logger.error(f"Error creating contract indexes: {str(e)}")
+    try:
+        await ensure_proposal_indexes()
+    except Exception as e:
+        logger.error(f"Error creating proposal indexes: {str(e)}")
+    if job_queue.JOB_WORKERS_IN_PROCESS:
+        background_tasks.append(asyncio.create_task(job_queue.JobWorker(db).run()))
+    if admin_stats_service.COLLECTION_STATS_SNAPSHOTS:
+        background_tasks.append(asyncio.create_task(admin_stats_service.run_collection_stats_snapshot_job(db)))
+    background_tasks.append(asyncio.create_task(passive_lead_service.run_passive_lead_job(db)))
+    if report_service.CUSTOMER_PERFORMANCE_SNAPSHOTS:
+        background_tasks.append(asyncio.create_task(report_service.run_customer_performance_snapshot_job(db)))
+
+@app.on_event("shutdown")
+async def stop_background_jobs():
+    """Cancel periodic jobs, close pooled email connections and the contract render pool"""
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    background_tasks.clear()
+    await email_service.close()
+    contract_renderer.shutdown()
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -0,0 +1,459 @@
+"""
+CRM - Stand Design Service
+AI stand design generation for a brief: inspiration image analysis plus one
+generated image per design prompt.
+
+Image requests fan out concurrently (at most DESIGN_IMAGE_CONCURRENCY at a
+time) and results are cached in MongoDB so a regenerated brief only pays for
+what changed:
+
+- design_image_analyses: vision analysis per image content hash
+- design_image_cache: generated image per normalized prompt hash
+
+`run_pipeline()` yields progress events as each analysis/design completes;
+it backs the synchronous endpoint, the SSE stream and the
+"design.generate_stand_designs" background job (see job_handlers).
+
+The provider is chosen by STAND_DESIGN_PROVIDER: "openai" (default) or
+"fake", which returns deterministic analyses and images without network
+access for tests and local development.
+"""
+
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+import re
+import struct
+import uuid
+import zlib
+from datetime import datetime, timezone
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from pymongo import ASCENDING, ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+STAND_DESIGN_PROVIDER = os.environ.get("STAND_DESIGN_PROVIDER", "openai").lower()
+DESIGN_IMAGE_CONCURRENCY = int(os.environ.get("DESIGN_IMAGE_CONCURRENCY", "4"))
+DESIGN_ANALYSIS_CONCURRENCY = int(os.environ.get("DESIGN_ANALYSIS_CONCURRENCY", "3"))
+DESIGN_CACHE_TTL_DAYS = int(os.environ.get("DESIGN_CACHE_TTL_DAYS", "30"))
+FAKE_DESIGN_LATENCY = float(os.environ.get("FAKE_DESIGN_LATENCY", "0"))
+# /design-runs/{id}/events gives up when a run makes no progress for this long (e.g. no worker)
+DESIGN_RUN_STREAM_IDLE_TIMEOUT = float(os.environ.get("DESIGN_RUN_STREAM_IDLE_TIMEOUT", "300"))
+
+ANALYSES_COLLECTION = "design_image_analyses"
+IMAGE_CACHE_COLLECTION = "design_image_cache"
+RUNS_COLLECTION = "design_runs"
+
+MAX_INSPIRATION_ANALYSES = 3
+
+ANALYSIS_SYSTEM_MESSAGE = "You are an expert in exhibition stand design. Analyze the provided image and extract design elements, colors, style, materials, layout concepts that could inspire new designs."
+ANALYSIS_PROMPT = "Please analyze this exhibition stand design image and provide detailed insights about: 1) Design style and aesthetic, 2) Color palette used, 3) Materials visible, 4) Layout and space organization, 5) Key design elements that make it effective, 6) Lighting concepts, 7) Brand presentation approaches. Focus on elements that could inspire new stand designs."
+
+
+class DesignProviderNotConfigured(Exception):
+    """The selected provider is missing its credentials"""
+
+
+# ===================== PROVIDERS =====================
+
+class DesignProvider:
+    """Vision analysis and image generation backend"""
+
+    name = "base"
+    analysis_model = ""
+    image_model = ""
+
+    async def analyze_image(self, image_base64: str) -> str:
+        raise NotImplementedError
+
+    async def generate_image(self, prompt: str) -> bytes:
+        raise NotImplementedError
+
+
+class OpenAIDesignProvider(DesignProvider):
+    """gpt-4o vision via emergentintegrations, dall-e-3 via the OpenAI client"""
+
+    name = "openai"
+    analysis_model = "gpt-4o"
+    image_model = "dall-e-3"
+    image_size = "1024x1024"
+    image_quality = "standard"
+
+    def __init__(self, api_key: str):
+        from openai import AsyncOpenAI
+
+        self.api_key = api_key
+        self.client = AsyncOpenAI(api_key=api_key)
+
+    async def analyze_image(self, image_base64: str) -> str:
+        from emergentintegrations.llm.chat import ImageContent, LlmChat, UserMessage
+
+        chat = LlmChat(
+            api_key=self.api_key,
+            session_id=f"image-analysis-{uuid.uuid4()}",
+            system_message=ANALYSIS_SYSTEM_MESSAGE
+        ).with_model("openai", self.analysis_model)
+        return await chat.send_message(UserMessage(
+            text=ANALYSIS_PROMPT,
+            file_contents=[ImageContent(image_base64=image_base64)]
+        ))
+
+    async def generate_image(self, prompt: str) -> bytes:
+        # b64_json returns the image in the response, no second download round trip
+        response = await self.client.images.generate(
+            model=self.image_model,
+            prompt=prompt,
+            size=self.image_size,
+            quality=self.image_quality,
+            response_format="b64_json",
+            n=1
+        )
+        return base64.b64decode(response.data[0].b64_json)
+
+
+def _png(width: int, height: int, rgb: bytes) -> bytes:
+    """Minimal single-color PNG"""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    rows = b"".join(b"\x00" + rgb * width for _ in range(height))
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(rows))
+            + chunk(b"IEND", b""))
+
+
+class FakeDesignProvider(DesignProvider):
+    """Deterministic offline provider; counts calls so tests can assert cache hits"""
+
+    name = "fake"
+    analysis_model = "fake-vision"
+    image_model = "fake-image"
+
+    def __init__(self, latency: float = FAKE_DESIGN_LATENCY):
+        self.latency = latency
+        self.analysis_calls = 0
+        self.image_calls = 0
+
+    async def analyze_image(self, image_base64: str) -> str:
+        self.analysis_calls += 1
+        await asyncio.sleep(self.latency)
+        return f"Fake analysis {hashlib.sha256(image_base64.encode()).hexdigest()[:12]}: modern style, white and blue palette"
+
+    async def generate_image(self, prompt: str) -> bytes:
+        self.image_calls += 1
+        await asyncio.sleep(self.latency)
+        return _png(8, 8, hashlib.sha256(prompt.encode()).digest()[:3])
+
+
+def get_provider() -> DesignProvider:
+    if STAND_DESIGN_PROVIDER == "fake":
+        return FakeDesignProvider()
+    api_key = os.environ.get("EMERGENT_LLM_KEY")
+    if not api_key:
+        raise DesignProviderNotConfigured("EMERGENT_LLM_KEY not configured")
+    return OpenAIDesignProvider(api_key)
+
+
+# ===================== CACHE KEYS =====================
+
+def image_content_hash(image_base64: str) -> str:
+    """Hash of the decoded image bytes, so data URL prefixes and padding do not matter"""
+    data = image_base64.split(",", 1)[1] if image_base64.startswith("data:") else image_base64
+    try:
+        raw = base64.b64decode(data)
+    except ValueError:
+        raw = data.encode()
+    return hashlib.sha256(raw).hexdigest()
+
+
+def normalize_prompt(prompt: str) -> str:
+    return re.sub(r"\s+", " ", prompt).strip().lower()
+
+
+def prompt_hash(provider: DesignProvider, prompt: str) -> str:
+    return hashlib.sha256(f"{provider.image_model}|{normalize_prompt(prompt)}".encode()).hexdigest()
+
+
+async def ensure_design_indexes(db):
+    ttl = DESIGN_CACHE_TTL_DAYS * 86400
+    await db[ANALYSES_COLLECTION].create_index([("key", ASCENDING)], unique=True)
+    await db[ANALYSES_COLLECTION].create_index([("created_at", ASCENDING)], expireAfterSeconds=ttl)
+    await db[IMAGE_CACHE_COLLECTION].create_index([("key", ASCENDING)], unique=True)
+    await db[IMAGE_CACHE_COLLECTION].create_index([("created_at", ASCENDING)], expireAfterSeconds=ttl)
+    await db.generated_designs.create_index([("brief_id", ASCENDING), ("prompt_hash", ASCENDING)])
+    await db[RUNS_COLLECTION].create_index([("id", ASCENDING)], unique=True)
+
+
+# Identical requests in flight in this process share one provider call
+_inflight: Dict[str, asyncio.Future] = {}
+
+
+class _OwnerCancelled(Exception):
+    """The request computing a shared value was cancelled; waiters compute it themselves"""
+
+
+async def _cached(db, collection: str, key: str, field: str, compute: Callable[[], Awaitable[str]],
+                  refresh: bool, extra: Optional[Dict] = None) -> tuple:
+    """(value, from_cache) for `key`, computing and storing it on a miss"""
+    if not refresh:
+        cached = await db[collection].find_one({"key": key}, {"_id": 0, field: 1})
+        if cached:
+            return cached[field], True
+
+    inflight_key = f"{collection}:{key}"
+    pending = _inflight.get(inflight_key)
+    while pending is not None:
+        try:
+            return await asyncio.shield(pending), True
+        except _OwnerCancelled:
+            pending = _inflight.get(inflight_key)
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[inflight_key] = future
+    try:
+        value = await compute()
+        await db[collection].update_one(
+            {"key": key},
+            {"$set": {field: value, "created_at": datetime.now(timezone.utc), **(extra or {})}},
+            upsert=True
+        )
+        future.set_result(value)
+        return value, False
+    except asyncio.CancelledError:
+        # e.g. an SSE client disconnected: other requests waiting on this value must
+        # not see the cancellation, they retry instead
+        future.set_exception(_OwnerCancelled())
+        future.exception()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        # Nobody else may be waiting; retrieve it so asyncio does not log it as unhandled
+        future.exception()
+        raise
+    finally:
+        _inflight.pop(inflight_key, None)
+
+
+# ===================== PIPELINE =====================
+
+async def analyze_images(db, provider: DesignProvider, images: List[Dict], refresh: bool = False) -> List[Dict]:
+    """Analyses of [{filename, image_data}] in input order, cached by image content"""
+    semaphore = asyncio.Semaphore(DESIGN_ANALYSIS_CONCURRENCY)
+
+    async def analyze(image: Dict) -> Dict:
+        key = f"{provider.analysis_model}:{image_content_hash(image['image_data'])}"
+        try:
+            async with semaphore:
+                analysis, cached = await _cached(
+                    db, ANALYSES_COLLECTION, key, "analysis",
+                    lambda: provider.analyze_image(image["image_data"]),
+                    refresh, {"model": provider.analysis_model}
+                )
+            return {"filename": image["filename"], "analysis": analysis, "status": "success", "cached": cached}
+        except Exception as e:
+            logger.error(f"Error analyzing image {image['filename']}: {str(e)}")
+            return {"filename": image["filename"], "analysis": f"Analysis failed: {str(e)}", "status": "error"}
+
+    return list(await asyncio.gather(*(analyze(image) for image in images)))
+
+
+def _selected(elements) -> List[str]:
+    # Handle both dict and list formats from frontend
+    if isinstance(elements, dict):
+        return [k for k, v in elements.items() if v]
+    return elements if isinstance(elements, list) else []
+
+
+def build_prompts(brief: Dict, design_inspiration: str = "") -> List[str]:
+    """One full prompt per design style"""
+    selected_elements = _selected(brief.get('standElements', {}))
+    dimensions = brief.get('standDimensions', '3x3 meters')
+
+    def featuring(fallback: str) -> str:
+        return ', '.join(selected_elements[:3]) if selected_elements else fallback
+
+    base_prompts = [
+        # Modern & Minimalist
+        f"Modern minimalist exhibition stand design, {dimensions}, clean lines, white and corporate color palette, featuring {featuring('display areas')}, professional lighting, company branding space, high-end materials, glass and metal accents, spacious layout",
+
+        # Tech & Innovation
+        f"High-tech innovation exhibition stand, {dimensions}, LED screens, interactive displays, futuristic design, blue and white color scheme, featuring {featuring('technology showcase')}, ambient lighting, sleek surfaces, digital elements",
+
+        # Warm & Inviting
+        f"Warm inviting exhibition stand design, {dimensions}, wood materials, comfortable seating area, earth tones, featuring {featuring('meeting spaces')}, soft lighting, natural materials, welcoming atmosphere",
+
+        # Bold & Creative
+        f"Bold creative exhibition stand, {dimensions}, vibrant colors, artistic elements, dynamic layout, featuring {featuring('creative displays')}, dramatic lighting, unique shapes, eye-catching design",
+
+        # Luxury & Premium
+        f"Luxury premium exhibition stand, {dimensions}, premium materials, marble accents, gold details, sophisticated design, featuring {featuring('VIP areas')}, elegant lighting, high-end finishes",
+
+        # Industrial & Modern
+        f"Industrial modern exhibition stand, {dimensions}, metal framework, concrete elements, industrial lighting, featuring {featuring('product displays')}, raw materials, urban aesthetic",
+
+        # Open & Airy
+        f"Open airy exhibition stand design, {dimensions}, glass walls, transparent elements, light colors, featuring {featuring('open spaces')}, natural lighting, spacious feel",
+
+        # Sustainable & Eco
+        f"Sustainable eco-friendly exhibition stand, {dimensions}, recycled materials, green elements, natural wood, featuring {featuring('eco displays')}, energy-efficient lighting, sustainable design",
+
+        # Dynamic & Interactive
+        f"Dynamic interactive exhibition stand, {dimensions}, curved surfaces, interactive zones, bright colors, featuring {featuring('engagement areas')}, dynamic lighting, movement elements",
+
+        # Classic & Professional
+        f"Classic professional exhibition stand, {dimensions}, traditional materials, corporate colors, formal layout, featuring {featuring('business areas')}, professional lighting, timeless design"
+    ]
+
+    # Add common suffixes to all prompts
+    common_suffix = f"{design_inspiration}, photorealistic, professional trade show environment, 8K quality, architectural visualization style, detailed render"
+    return [base_prompt + common_suffix for base_prompt in base_prompts]
+
+
+async def generate_design(db, provider: DesignProvider, prompt: str, brief_id: Optional[str],
+                          refresh: bool = False) -> Dict:
+    """Generated design for one prompt, stored under the brief (one per brief and prompt)"""
+    key = prompt_hash(provider, prompt)
+
+    async def render() -> str:
+        return base64.b64encode(await provider.generate_image(prompt)).decode("utf-8")
+
+    image_data, cached = await _cached(db, IMAGE_CACHE_COLLECTION, key, "image_data", render, refresh,
+                                       {"prompt": prompt, "model": provider.image_model})
+    design = {
+        "image_data": image_data,
+        "prompt_used": prompt,
+        "prompt_hash": key,
+        "brief_id": brief_id,
+        "cached": cached,
+        "created_at": datetime.now(timezone.utc)
+    }
+    if brief_id:
+        stored = await db.generated_designs.find_one_and_update(
+            {"brief_id": brief_id, "prompt_hash": key},
+            {"$set": design, "$setOnInsert": {"id": str(uuid.uuid4())}},
+            projection={"_id": 0},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return stored
+    design["id"] = str(uuid.uuid4())
+    await db.generated_designs.insert_one(dict(design))
+    return design
+
+
+async def run_pipeline(db, provider: DesignProvider, brief: Dict, images: List[Dict],
+                       refresh: bool = False) -> AsyncIterator[Dict]:
+    """Yield "analysis", "start", one "design"/"error" per prompt as it completes, then "done" """
+    design_inspiration = ""
+    if images:
+        analyses = await analyze_images(db, provider, images, refresh)
+        yield {"event": "analysis", "analyses": analyses}
+        inspiration_texts = [analysis["analysis"] for analysis in analyses if analysis["status"] == "success"]
+        if inspiration_texts:
+            design_inspiration = "\n\nDesign Inspiration from uploaded images:\n" + "\n".join(
+                inspiration_texts[:MAX_INSPIRATION_ANALYSES]
+            )
+
+    prompts = build_prompts(brief, design_inspiration)
+    yield {"event": "start", "total": len(prompts)}
+
+    semaphore = asyncio.Semaphore(DESIGN_IMAGE_CONCURRENCY)
+
+    async def one(index: int, prompt: str) -> Dict:
+        try:
+            async with semaphore:
+                design = await generate_design(db, provider, prompt, brief.get('id'), refresh)
+            logger.info(f"Generated design {index + 1}/{len(prompts)} successfully")
+            return {"event": "design", "index": index, "design": design}
+        except Exception as e:
+            logger.error(f"Error generating design {index + 1}: {str(e)}")
+            return {"event": "error", "index": index, "error": str(e)}
+
+    tasks = [asyncio.create_task(one(index, prompt)) for index, prompt in enumerate(prompts)]
+    generated = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            event = await next_done
+            generated += event["event"] == "design"
+            yield event
+    finally:
+        # Client went away or the job was cancelled: stop paying for the rest
+        for task in tasks:
+            task.cancel()
+    yield {"event": "done", "total": len(prompts), "generated": generated}
+
+
+# ===================== RUNS =====================
+
+async def create_run(db, brief: Dict, images: List[Dict], refresh: bool = False) -> Dict:
+    """Run record the background job fills in; the inputs are dropped when it finishes"""
+    now = datetime.now(timezone.utc)
+    run = {
+        "id": str(uuid.uuid4()),
+        "brief_id": brief.get('id'),
+        "brief_data": brief,
+        "uploaded_images": images,
+        "refresh": refresh,
+        "status": "queued",
+        "total": None,
+        "completed": 0,
+        "failed": 0,
+        "design_ids": [],
+        "errors": [],
+        "created_at": now,
+        "updated_at": now,
+        "finished_at": None
+    }
+    await db[RUNS_COLLECTION].insert_one(dict(run))
+    return public_run(run)
+
+
+def public_run(run: Dict) -> Dict:
+    return {k: v for k, v in run.items() if k not in ("_id", "brief_data", "uploaded_images")}
+
+
+async def get_run(db, run_id: str) -> Optional[Dict]:
+    run = await db[RUNS_COLLECTION].find_one({"id": run_id}, {"brief_data": 0, "uploaded_images": 0})
+    return public_run(run) if run else None
+
+
+async def execute_run(db, run_id: str, provider: Optional[DesignProvider] = None) -> Dict:
+    """Run the pipeline for a stored run, recording progress after every design"""
+    run = await db[RUNS_COLLECTION].find_one({"id": run_id})
+    if not run:
+        raise LookupError(f"Design run {run_id} not found")
+    provider = provider or get_provider()
+    runs = db[RUNS_COLLECTION]
+
+    def progress(update: Dict) -> Awaitable:
+        update.setdefault("$set", {})["updated_at"] = datetime.now(timezone.utc)
+        return runs.update_one({"id": run_id}, update)
+
+    # A retried job starts over; cached designs make the repeat cheap
+    await progress({"$set": {"status": "running", "completed": 0, "failed": 0, "design_ids": [], "errors": []}})
+    async for event in run_pipeline(db, provider, run["brief_data"], run.get("uploaded_images") or [],
+                                    run.get("refresh", False)):
+        if event["event"] == "start":
+            await progress({"$set": {"total": event["total"]}})
+        elif event["event"] == "design":
+            await progress({"$inc": {"completed": 1}, "$push": {"design_ids": event["design"]["id"]}})
+        elif event["event"] == "error":
+            await progress({"$inc": {"failed": 1}, "$push": {"errors": {"index": event["index"], "error": event["error"]}}})
+        elif event["event"] == "done":
+            await progress({
+                "$set": {"status": "succeeded", "finished_at": datetime.now(timezone.utc)},
+                "$unset": {"uploaded_images": ""}
+            })
+    return await get_run(db, run_id)
+
+
+async def mark_run_failed(db, run_id: str, error: str):
+    await db[RUNS_COLLECTION].update_one(
+        {"id": run_id},
+        {"$set": {"status": "failed", "finished_at": datetime.now(timezone.utc),
+                  "updated_at": datetime.now(timezone.utc)},
+         "$push": {"errors": {"index": None, "error": error}}}
+    )
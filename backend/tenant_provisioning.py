@@ -0,0 +1,207 @@
+"""
+CRM - Tenant Provisioning Service
+Creates tenant databases from the versioned tenant template.
+
+A new tenant needs its platform records (tenant, owner user) and a database
+with every collection, index and seed document of
+`tenant_template.TENANT_TEMPLATE`. Collections are created and their indexes
+built concurrently (one `createIndexes` command per collection), seed data is
+written with one `insert_many` per collection, and the applied template
+version is recorded in the tenant database so `apply_template()` can upgrade
+older tenants later.
+"""
+
+import asyncio
+import logging
+import re
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict
+
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import CollectionInvalid, DuplicateKeyError, OperationFailure
+
+import entitlements
+from auth_utils import get_password_hash_async
+from tenant_template import TENANT_TEMPLATE
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_STATE_COLLECTION = "tenant_template_state"
+SLUG_PATTERN = re.compile(r"^[a-z0-9][a-z0-9_]{1,47}$")
+
+
+class ProvisioningError(Exception):
+    """The tenant cannot be created (invalid or duplicate slug, duplicate owner email)"""
+
+
+_platform_indexes_ready = False
+
+
+async def ensure_platform_indexes(platform_db):
+    """Unique tenant slugs and owner emails, so concurrent signups cannot both insert"""
+    global _platform_indexes_ready
+    if _platform_indexes_ready:
+        return
+    try:
+        await asyncio.gather(
+            platform_db.tenants.create_index([("slug", ASCENDING)], unique=True),
+            platform_db.users.create_index([("email", ASCENDING)], unique=True)
+        )
+        _platform_indexes_ready = True
+    except OperationFailure as e:
+        # Existing duplicates; the find_one checks below still apply
+        logger.error(f"Unique platform tenant/user indexes not created: {str(e)}")
+
+
+def tenant_db_name(slug: str) -> str:
+    return f"vitingo_t_{slug}"
+
+
+async def applied_template_version(db) -> int:
+    state = await db[TEMPLATE_STATE_COLLECTION].find_one({"_id": "template"})
+    return state["version"] if state else 0
+
+
+async def apply_template(db, template: Dict = TENANT_TEMPLATE) -> Dict:
+    """Create missing collections and indexes and seed empty collections.
+
+    Idempotent: existing indexes are left as they are and collections that
+    already hold documents are never re-seeded.
+    """
+    started = time.perf_counter()
+    existing = set(await db.list_collection_names())
+
+    async def create_collection(name: str, indexes):
+        if name not in existing:
+            try:
+                await db.create_collection(name)
+            except CollectionInvalid:
+                pass  # Created concurrently
+        if indexes:
+            await db[name].create_indexes([IndexModel(keys, **options) for keys, options in indexes])
+
+    await asyncio.gather(*[
+        create_collection(name, indexes) for name, indexes in template["collections"].items()
+    ])
+    collections_done = time.perf_counter()
+
+    async def seed(name: str, build) -> int:
+        if await db[name].estimated_document_count() > 0:
+            return 0
+        docs = build()
+        if docs:
+            await db[name].insert_many(docs, ordered=False)
+        return len(docs)
+
+    seed_names = list(template["seeds"])
+    seeded = await asyncio.gather(*[seed(name, template["seeds"][name]) for name in seed_names])
+
+    await db[TEMPLATE_STATE_COLLECTION].replace_one({"_id": "template"}, {
+        "_id": "template",
+        "version": template["version"],
+        "applied_at": datetime.now(timezone.utc)
+    }, upsert=True)
+
+    finished = time.perf_counter()
+    return {
+        "database": db.name,
+        "template_version": template["version"],
+        "collections": len(template["collections"]),
+        "seeded": {name: count for name, count in zip(seed_names, seeded) if count},
+        "timings_ms": {
+            "collections_and_indexes": round((collections_done - started) * 1000, 1),
+            "seeds": round((finished - collections_done) * 1000, 1),
+            "total": round((finished - started) * 1000, 1)
+        }
+    }
+
+
+async def provision_tenant(client, slug: str, name: str, owner_email: str, owner_name: str,
+                           owner_password: str, package_key: str = "starter") -> Dict:
+    """Create the tenant record, its owner user and its database from the template"""
+    started = time.perf_counter()
+    if not SLUG_PATTERN.match(slug):
+        raise ProvisioningError("Geçersiz tenant slug (küçük harf, rakam ve '_' kullanın)")
+
+    snapshot = await entitlements.get()
+    package = snapshot.packages.get(package_key)
+    if package_key != entitlements.DEFAULT_PACKAGE_KEY and (package is None or not package.get("is_active", True)):
+        raise ProvisioningError(f"Geçersiz paket: {package_key}")
+
+    platform_db = client["vitingo_platform"]
+    await ensure_platform_indexes(platform_db)
+    existing_tenant, existing_user = await asyncio.gather(
+        platform_db.tenants.find_one({"slug": slug}, {"_id": 1}),
+        platform_db.users.find_one({"email": owner_email}, {"_id": 1})
+    )
+    if existing_tenant:
+        raise ProvisioningError(f"'{slug}' tenant'ı zaten mevcut")
+    if existing_user:
+        raise ProvisioningError(f"'{owner_email}' e-posta adresi zaten kayıtlı")
+
+    now = datetime.now(timezone.utc)
+    tenant_id = f"ten_{uuid.uuid4().hex[:12]}"
+    db_name = tenant_db_name(slug)
+    tenant = {
+        "id": tenant_id,
+        "slug": slug,
+        "name": name,
+        "database_name": db_name,
+        "status": "active",
+        "subscription": {
+            "package_key": package_key,
+            "status": "active",
+            "started_at": now,
+            "next_billing_date": None
+        },
+        "owner": {"email": owner_email, "name": owner_name},
+        "settings": {"timezone": "Europe/Istanbul", "language": "tr", "currency": "TRY"},
+        "template_version": TENANT_TEMPLATE["version"],
+        "created_at": now,
+        "updated_at": now,
+        "is_active": True
+    }
+    owner = {
+        "id": f"usr_{uuid.uuid4().hex[:12]}",
+        "tenant_id": tenant_id,
+        "email": owner_email,
+        "name": owner_name,
+        "role": "admin",
+        "status": "active",
+        "permissions": ["*"],
+        "created_at": now,
+        "updated_at": now,
+        "last_login": None,
+        "is_active": True
+    }
+
+    # The database template and the bcrypt hash run side by side
+    template_result, password_hash = await asyncio.gather(
+        apply_template(client[db_name]),
+        get_password_hash_async(owner_password)
+    )
+    owner["password_hash"] = password_hash
+    try:
+        await platform_db.tenants.insert_one(tenant)
+    except DuplicateKeyError:
+        # A concurrent signup took the slug; the database is theirs, leave it
+        raise ProvisioningError(f"'{slug}' tenant'ı zaten mevcut")
+    try:
+        await platform_db.users.insert_one(owner)
+    except DuplicateKeyError:
+        # A concurrent signup took the email: undo this tenant
+        await platform_db.tenants.delete_one({"id": tenant_id})
+        await client.drop_database(db_name)
+        raise ProvisioningError(f"'{owner_email}' e-posta adresi zaten kayıtlı")
+    await entitlements.invalidate()
+
+    logger.info(f"Tenant provisioned: {slug} ({db_name}) in {(time.perf_counter() - started) * 1000:.0f} ms")
+    tenant.pop("_id", None)
+    return {
+        "tenant": tenant,
+        "owner": {key: owner[key] for key in ("id", "email", "name", "role")},
+        "template": template_result,
+        "total_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
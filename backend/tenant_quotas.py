@@ -0,0 +1,308 @@
+"""
+CRM - Tenant Quota Service
+Per-tenant request concurrency and query budgets on the shared Motor client.
+
+Every tenant request passes `admit()` (used by `dependencies.get_tenant_db`
+and `dependencies.get_full_tenant_context`):
+at most `max_concurrent_requests` requests of one tenant touch the database
+at a time, the next ones wait up to TENANT_QUEUE_TIMEOUT seconds and are then
+rejected with 429. The tenant database handed to the endpoint is a
+QuotaDatabase: reads get `maxTimeMS` (`query_max_time_ms`) and cursors may
+return at most `query_max_docs` documents, so one tenant's unbounded report
+cannot hold the pool for everyone else.
+
+`query_max_docs` limits the documents a cursor returns to the application,
+not the documents the server examines: MongoDB has no per-query cap on
+examined documents, so the scan itself is bounded by `maxTimeMS` only.
+Aggregations are counted by their output rows.
+
+Budgets come from the tenant's package limits (see package_features_router
+seed data); a missing limit falls back to the defaults below and -1 means
+unlimited, like the other package limits. Counters per tenant are exposed
+by `stats()`.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from fastapi import HTTPException
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import ExecutionTimeout
+
+import entitlements
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENT_REQUESTS = int(os.environ.get("TENANT_MAX_CONCURRENT_REQUESTS", "8"))
+DEFAULT_QUERY_MAX_TIME_MS = int(os.environ.get("TENANT_QUERY_MAX_TIME_MS", "15000"))
+DEFAULT_QUERY_MAX_DOCS = int(os.environ.get("TENANT_QUERY_MAX_DOCS", "50000"))
+TENANT_QUEUE_TIMEOUT = float(os.environ.get("TENANT_QUEUE_TIMEOUT", "2"))
+TENANT_QUOTAS_ENABLED = os.environ.get("TENANT_QUOTAS_ENABLED", "true").lower() == "true"
+
+UNLIMITED = -1
+
+
+class TenantQuota:
+    """Budgets of one tenant plus its live counters"""
+
+    def __init__(self, tenant_slug: str):
+        self.tenant_slug = tenant_slug
+        self.max_concurrent = DEFAULT_MAX_CONCURRENT_REQUESTS
+        self.max_time_ms = DEFAULT_QUERY_MAX_TIME_MS
+        self.max_docs = DEFAULT_QUERY_MAX_DOCS
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self.in_flight_requests = 0
+        self.in_flight_queries = 0
+        self.peak_in_flight_queries = 0
+        self.requests = 0
+        self.queries = 0
+        self.rejected_requests = 0
+        self.timeouts = 0
+        self.budget_exceeded = 0
+        self.queue_wait_ms = 0.0
+
+    def configure(self, limits: Dict):
+        """Apply package limits; the semaphore is replaced when the concurrency changes"""
+        max_concurrent = limits.get("max_concurrent_requests", DEFAULT_MAX_CONCURRENT_REQUESTS)
+        self.max_time_ms = limits.get("query_max_time_ms", DEFAULT_QUERY_MAX_TIME_MS)
+        self.max_docs = limits.get("query_max_docs", DEFAULT_QUERY_MAX_DOCS)
+        if self.semaphore is None or max_concurrent != self.max_concurrent:
+            self.max_concurrent = max_concurrent
+            self.semaphore = None if max_concurrent == UNLIMITED else asyncio.Semaphore(max_concurrent)
+
+    def as_dict(self) -> Dict:
+        return {
+            "tenant_slug": self.tenant_slug,
+            "limits": {
+                "max_concurrent_requests": self.max_concurrent,
+                "query_max_time_ms": self.max_time_ms,
+                "query_max_docs": self.max_docs
+            },
+            "in_flight_requests": self.in_flight_requests,
+            "in_flight_queries": self.in_flight_queries,
+            "peak_in_flight_queries": self.peak_in_flight_queries,
+            "requests": self.requests,
+            "queries": self.queries,
+            "rejected_requests": self.rejected_requests,
+            "timeouts": self.timeouts,
+            "budget_exceeded": self.budget_exceeded,
+            "avg_queue_wait_ms": round(self.queue_wait_ms / self.requests, 2) if self.requests else 0.0
+        }
+
+
+_quotas: Dict[str, TenantQuota] = {}
+_UNLIMITED_LIMITS = {
+    "max_concurrent_requests": UNLIMITED,
+    "query_max_time_ms": UNLIMITED,
+    "query_max_docs": UNLIMITED
+}
+
+
+async def get_quota(tenant_slug: str) -> TenantQuota:
+    quota = _quotas.get(tenant_slug)
+    if quota is None:
+        quota = _quotas[tenant_slug] = TenantQuota(tenant_slug)
+    if TENANT_QUOTAS_ENABLED:
+        tenant = await entitlements.get_tenant(tenant_slug)
+        quota.configure(tenant.limits if tenant else {})
+    else:
+        quota.configure(_UNLIMITED_LIMITS)
+    return quota
+
+
+@asynccontextmanager
+async def admit(tenant_slug: str):
+    """Hold one of the tenant's request slots; 429 when none frees up in time"""
+    quota = await get_quota(tenant_slug)
+    semaphore = quota.semaphore
+    if semaphore is not None:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(semaphore.acquire(), TENANT_QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            quota.rejected_requests += 1
+            logger.warning(f"Tenant {tenant_slug} request rejected: {quota.max_concurrent} already in flight")
+            raise HTTPException(
+                status_code=429,
+                detail=f"Too many concurrent requests for tenant {tenant_slug}, please retry",
+                headers={"Retry-After": "1"}
+            )
+        quota.queue_wait_ms += (time.perf_counter() - started) * 1000
+
+    quota.requests += 1
+    quota.in_flight_requests += 1
+    try:
+        yield quota
+    finally:
+        quota.in_flight_requests -= 1
+        if semaphore is not None:
+            semaphore.release()
+
+
+def stats(tenant_slug: Optional[str] = None) -> Dict:
+    """Counters of one tenant, or of all tenants seen by this process"""
+    if tenant_slug:
+        quota = _quotas.get(tenant_slug)
+        return quota.as_dict() if quota else TenantQuota(tenant_slug).as_dict()
+    return {
+        "enabled": TENANT_QUOTAS_ENABLED,
+        "tenants": sorted((quota.as_dict() for quota in _quotas.values()),
+                          key=lambda q: q["in_flight_queries"], reverse=True)
+    }
+
+
+# ===================== DATABASE WRAPPERS =====================
+
+class _Tracked:
+    """Count a database round trip as in flight and turn maxTimeMS expiry into a 503"""
+
+    def __init__(self, quota: TenantQuota, new_query: bool = True):
+        self.quota = quota
+        self.new_query = new_query
+
+    def __enter__(self):
+        quota = self.quota
+        quota.queries += self.new_query
+        quota.in_flight_queries += 1
+        quota.peak_in_flight_queries = max(quota.peak_in_flight_queries, quota.in_flight_queries)
+
+    def __exit__(self, exc_type, exc, tb):
+        self.quota.in_flight_queries -= 1
+        if exc_type is not None and issubclass(exc_type, ExecutionTimeout):
+            self.quota.timeouts += 1
+            raise HTTPException(
+                status_code=503,
+                detail=f"Query exceeded the time budget of {self.quota.max_time_ms} ms"
+            ) from exc
+        return False
+
+
+def _budget_exceeded(quota: TenantQuota):
+    quota.budget_exceeded += 1
+    raise HTTPException(
+        status_code=422,
+        detail=f"Query returns more than {quota.max_docs} documents, use filters or pagination"
+    )
+
+
+class QuotaCursor:
+    """Cursor wrapper enforcing the document budget on to_list() and iteration"""
+
+    def __init__(self, cursor, quota: TenantQuota):
+        self._cursor = cursor
+        self._quota = quota
+
+    def __getattr__(self, name):
+        attr = getattr(self._cursor, name)
+        if not callable(attr):
+            return attr
+
+        def chained(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            return self if result is self._cursor else result
+        return chained
+
+    async def to_list(self, length: Optional[int] = None):
+        max_docs = self._quota.max_docs
+        limited = max_docs != UNLIMITED and (length is None or length > max_docs)
+        with _Tracked(self._quota):
+            docs = await self._cursor.to_list(max_docs + 1 if limited else length)
+        if limited and len(docs) > max_docs:
+            _budget_exceeded(self._quota)
+        return docs
+
+    def __aiter__(self):
+        self._returned = 0
+        return self
+
+    async def __anext__(self):
+        # Only the first fetch counts as a new query; later ones are getMore batches
+        with _Tracked(self._quota, new_query=self._returned == 0):
+            doc = await self._cursor.next()
+        self._returned += 1
+        if self._quota.max_docs != UNLIMITED and self._returned > self._quota.max_docs:
+            _budget_exceeded(self._quota)
+        return doc
+
+
+class QuotaCollection:
+    """AsyncIOMotorCollection wrapper: maxTimeMS on reads, in-flight counting on everything"""
+
+    # method -> its time limit argument
+    _TIMED = {
+        "find_one": "max_time_ms",
+        "count_documents": "maxTimeMS",
+        "estimated_document_count": "maxTimeMS",
+        "distinct": "maxTimeMS",
+        "find_one_and_update": "maxTimeMS",
+        "find_one_and_replace": "maxTimeMS",
+        "find_one_and_delete": "maxTimeMS",
+    }
+    _TRACKED = ("insert_one", "insert_many", "update_one", "update_many", "replace_one",
+                "delete_one", "delete_many", "bulk_write", "create_index", "create_indexes")
+
+    def __init__(self, collection: AsyncIOMotorCollection, quota: TenantQuota):
+        self._collection = collection
+        self._quota = quota
+
+    def _time_limited(self) -> bool:
+        return self._quota.max_time_ms != UNLIMITED
+
+    def find(self, *args, **kwargs) -> QuotaCursor:
+        if self._time_limited():
+            kwargs.setdefault("max_time_ms", self._quota.max_time_ms)
+        return QuotaCursor(self._collection.find(*args, **kwargs), self._quota)
+
+    def aggregate(self, pipeline, *args, **kwargs) -> QuotaCursor:
+        if self._time_limited():
+            kwargs.setdefault("maxTimeMS", self._quota.max_time_ms)
+        return QuotaCursor(self._collection.aggregate(pipeline, *args, **kwargs), self._quota)
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if isinstance(attr, AsyncIOMotorCollection):
+            # Sub-collections (db.foo.bar)
+            return QuotaCollection(attr, self._quota)
+        if name not in self._TIMED and name not in self._TRACKED:
+            return attr
+
+        async def tracked(*args, **kwargs):
+            if name in self._TIMED and self._time_limited():
+                kwargs.setdefault(self._TIMED[name], self._quota.max_time_ms)
+            with _Tracked(self._quota):
+                return await attr(*args, **kwargs)
+        return tracked
+
+    def __getitem__(self, name):
+        return QuotaCollection(self._collection[name], self._quota)
+
+
+class QuotaDatabase:
+    """AsyncIOMotorDatabase wrapper whose collections enforce the tenant's quota"""
+
+    def __init__(self, db, quota: TenantQuota):
+        self._db = db
+        self._quota = quota
+
+    @property
+    def delegate(self):
+        """The unwrapped Motor database"""
+        return self._db
+
+    def __getitem__(self, name) -> QuotaCollection:
+        return QuotaCollection(self._db[name], self._quota)
+
+    def get_collection(self, name, *args, **kwargs) -> QuotaCollection:
+        return QuotaCollection(self._db.get_collection(name, *args, **kwargs), self._quota)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        attr = getattr(self._db, name)
+        if isinstance(attr, AsyncIOMotorCollection):
+            return QuotaCollection(attr, self._quota)
+        return attr
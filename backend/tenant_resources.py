@@ -0,0 +1,211 @@
+"""
+CRM - Tenant Resources
+Declarative definitions of the tenant-scoped CRUD collections.
+
+A TenantResource names its collection and URL path, the pydantic model
+create/update payloads are validated with, the query parameters that may
+filter a list and the fields it may be sorted by. The indexes backing those
+filters and sorts are derived from the same declaration, so the generic
+router (`routes/tenant_resource_router.py`) and the tenant template
+(`tenant_template.TENANT_COLLECTIONS`) always agree.
+
+Documents carry a `version` that every write increments; updates and deletes
+that send the version they read are rejected with 409 if it has changed.
+"""
+
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from pymongo import ASCENDING, DESCENDING
+
+
+class TenantDocument(BaseModel):
+    """Base payload of tenant resources; unknown fields are stored as sent"""
+    id: Optional[str] = None
+    version: Optional[int] = None
+
+    class Config:
+        extra = "allow"
+
+
+class TenantResource:
+    """One tenant collection exposed under /api/{tenant_slug}/{path}"""
+
+    def __init__(
+        self,
+        collection: str,
+        path: str,
+        name: str,
+        label: str,
+        model: Type[TenantDocument] = TenantDocument,
+        filters: Optional[Mapping[str, Tuple[str, type]]] = None,
+        sorts: Sequence[str] = ("createdAt", "updatedAt"),
+        default_sort: str = "-createdAt",
+        indexes: Sequence[Tuple[List, Dict]] = (),
+    ):
+        self.collection = collection
+        self.path = path
+        self.name = name  # plural, for messages: "bank accounts"
+        self.label = label  # singular, for messages: "Bank account"
+        self.model = model
+        # query parameter -> (document field, type)
+        self.filters = dict(filters or {})
+        self.sorts = tuple(sorts)
+        self.default_sort = default_sort
+        self.indexes = list(indexes)
+
+    def build_query(self, params: Mapping[str, str]) -> Dict:
+        """Mongo filter from the declared query parameters; others are ignored"""
+        query = {}
+        for param, (field, cast) in self.filters.items():
+            value = params.get(param)
+            if value in (None, ""):
+                continue
+            try:
+                query[field] = cast(value)
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"Invalid value for {param}: {value}")
+        return query
+
+    def parse_sort(self, sort: Optional[str]) -> Tuple[str, bool]:
+        """`field` or `-field` -> (field, descending)"""
+        sort = sort or self.default_sort
+        descending = sort.startswith("-")
+        field = sort.lstrip("-")
+        if field not in self.sorts:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid sort: {field} (allowed: {', '.join(self.sorts)})"
+            )
+        return field, descending
+
+    def index_specs(self) -> List[Tuple[List, Dict]]:
+        """(keys, options) of every index the list, get and sort paths rely on"""
+        default_field, default_descending = self.parse_sort(None)
+        default_direction = DESCENDING if default_descending else ASCENDING
+
+        specs = [([("id", ASCENDING)], {"unique": True})]
+        # Keyset pagination walks (sort_key, id)
+        specs += [([(field, DESCENDING), ("id", DESCENDING)], {}) for field in self.sorts]
+        # Filtered lists in the default order
+        specs += [
+            ([(field, ASCENDING), (default_field, default_direction), ("id", default_direction)], {})
+            for field, _ in self.filters.values()
+        ]
+        specs += self.indexes
+
+        unique_specs, seen = [], set()
+        for keys, options in specs:
+            key = tuple(keys)
+            if key not in seen:
+                seen.add(key)
+                unique_specs.append((keys, options))
+        return unique_specs
+
+
+# ===================== MODELS =====================
+
+class Bank(TenantDocument):
+    status: Optional[str] = "active"  # active, inactive
+    currency: Optional[str] = None
+
+
+class Brief(TenantDocument):
+    projectId: Optional[str] = None
+    status: Optional[str] = "draft"  # draft, finalized
+
+
+class Contract(TenantDocument):
+    customerId: Optional[str] = None
+    status: Optional[str] = "draft"  # draft, active, expired, terminated
+
+
+class ExpenseReceipt(TenantDocument):
+    category: Optional[str] = None
+    status: Optional[str] = "pending"  # pending, approved, rejected
+
+
+class Fair(TenantDocument):
+    year: Optional[int] = None
+    status: Optional[str] = "planning"  # planning, active, completed, cancelled
+
+
+class Project(TenantDocument):
+    customerId: Optional[str] = None
+    status: Optional[str] = None
+
+
+class Proposal(TenantDocument):
+    customerId: Optional[str] = None
+    status: Optional[str] = "draft"  # draft, sent, accepted, rejected
+
+
+class Supplier(TenantDocument):
+    category: Optional[str] = None
+    status: Optional[str] = "active"  # active, inactive
+
+
+class Task(TenantDocument):
+    assigned_to: Optional[str] = None
+    status: Optional[str] = None
+
+
+# ===================== RESOURCES =====================
+
+BANKS = TenantResource(
+    "banks", "banks", "bank accounts", "Bank account", Bank,
+    filters={"status": ("status", str), "currency": ("currency", str)},
+)
+
+BRIEFS = TenantResource(
+    "briefs", "briefs", "briefs", "Brief", Brief,
+    filters={"project_id": ("projectId", str), "status": ("status", str)},
+)
+
+CONTRACTS = TenantResource(
+    "contracts", "contracts", "contracts", "Contract", Contract,
+    filters={"status": ("status", str), "customer_id": ("customerId", str)},
+    sorts=("createdAt", "updatedAt", "startDate"),
+    default_sort="-startDate",
+)
+
+EXPENSE_RECEIPTS = TenantResource(
+    "expense_receipts", "expense-receipts", "expense receipts", "Expense receipt", ExpenseReceipt,
+    filters={"status": ("status", str), "category": ("category", str)},
+    sorts=("createdAt", "updatedAt", "date"),
+    default_sort="-date",
+)
+
+FAIRS = TenantResource(
+    "fairs", "fairs", "fairs", "Fair", Fair,
+    filters={"status": ("status", str), "year": ("year", int)},
+    sorts=("createdAt", "updatedAt", "startDate"),
+    default_sort="-startDate",
+)
+
+PROJECTS = TenantResource(
+    "projects", "projects", "projects", "Project", Project,
+    filters={"status": ("status", str), "customer_id": ("customerId", str)},
+)
+
+PROPOSALS = TenantResource(
+    "proposals", "proposals", "proposals", "Proposal", Proposal,
+    filters={"status": ("status", str), "customer_id": ("customerId", str)},
+    indexes=[([("created_at", DESCENDING)], {})],
+)
+
+SUPPLIERS = TenantResource(
+    "suppliers", "suppliers", "suppliers", "Supplier", Supplier,
+    filters={"status": ("status", str), "category": ("category", str)},
+    sorts=("createdAt", "updatedAt", "company_short_name"),
+)
+
+TASKS = TenantResource(
+    "tasks", "tasks", "tasks", "Task", Task,
+    filters={"status": ("status", str), "assigned_to": ("assigned_to", str)},
+)
+
+TENANT_RESOURCES = [
+    BANKS, BRIEFS, CONTRACTS, EXPENSE_RECEIPTS, FAIRS, PROJECTS, PROPOSALS, SUPPLIERS, TASKS,
+]
@@ -0,0 +1,386 @@
+"""
+CRM - Tenant Template
+Versioned blueprint of a tenant database: collections, indexes and seed data.
+
+`tenant_provisioning.apply_template()` creates every collection and index
+of TENANT_TEMPLATE and bulk-inserts the seed documents into collections that
+are still empty. Bump TEMPLATE_VERSION whenever collections, indexes or seeds
+change so existing tenants can be upgraded. The seed builders are also used
+by the per-collection seed endpoints in server.py.
+"""
+
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+from pymongo import ASCENDING, DESCENDING
+
+from tenant_resources import TENANT_RESOURCES
+
+TEMPLATE_VERSION = 3
+
+DEFAULT_SECTOR_NAMES = [
+    "Tarım ve Hayvancılık", "Ormancılık", "Balıkçılık ve Su Ürünleri",
+    "Madencilik ve Maden İşleme", "Gıda Üretimi", "İçecek Üretimi",
+    "Tekstil ve Kumaş", "Hazır Giyim ve Konfeksiyon", "Deri ve Ayakkabı",
+    "Mobilya ve Dekorasyon", "Ağaç ve Orman Ürünleri", "Kağıt ve Ambalaj",
+    "Matbaacılık ve Basım", "Kimya ve Kimyasal Ürünler", "Boya ve Kaplama",
+    "Kozmetik ve Kişisel Bakım Ürünleri", "İlaç ve Ecza", "Biyoteknoloji",
+    "Plastik ve Kauçuk", "Cam ve Cam Ürünleri", "Seramik ve Porselen",
+    "Çimento ve Beton", "Yapı Malzemeleri", "Demir ve Çelik",
+    "Metal İşleme", "Döküm ve Dövme", "Makine ve Ekipman İmalatı",
+    "Endüstriyel Otomasyon", "Elektrik ve Elektronik", "Aydınlatma",
+    "Beyaz Eşya ve Ev Aletleri", "Bilgisayar ve Donanım", "Yarı İletken ve Çip",
+    "Otomotiv", "Otomotiv Yan Sanayi", "Motosiklet ve Bisiklet",
+    "Havacılık ve Uzay", "Gemi ve Yat Yapımı", "Raylı Sistemler",
+    "Savunma Sanayi", "Medikal ve Tıbbi Cihazlar", "Laboratuvar Ekipmanları",
+    "Optik ve Hassas Aletler", "Enerji Üretimi ve Dağıtımı", "Yenilenebilir Enerji",
+    "Petrol ve Doğalgaz", "Nükleer Enerji", "Su Arıtma ve Dağıtımı",
+    "Atık Yönetimi ve Geri Dönüşüm", "Çevre Teknolojileri", "İnşaat ve Müteahhitlik",
+    "Altyapı ve Üstyapı", "Prefabrik ve Modüler Yapılar", "Gayrimenkul Geliştirme",
+    "Gayrimenkul Danışmanlığı", "Mimarlık", "Mühendislik Hizmetleri",
+    "İç Mimarlık ve Tasarım", "Peyzaj ve Çevre Düzenleme", "Taşımacılık ve Nakliye",
+    "Lojistik ve Depolama", "Kurye ve Kargo", "Gümrük ve Dış Ticaret",
+    "Denizcilik ve Liman Hizmetleri", "Toptan Ticaret", "Perakende Ticaret",
+    "E-Ticaret", "İthalat ve İhracat", "Otelcilik ve Konaklama",
+    "Restoran ve Yeme-İçme", "Catering ve Yemek Hizmetleri", "Turizm ve Seyahat",
+    "Eğlence ve Rekreasyon", "Bilgi Teknolojileri", "Yazılım Geliştirme",
+    "Mobil Uygulama", "Bulut Hizmetleri", "Siber Güvenlik",
+    "Yapay Zeka ve Veri Bilimi", "Telekomünikasyon", "İnternet Hizmetleri",
+    "Medya ve Yayıncılık", "Film ve Dizi Yapımı", "Müzik ve Ses Prodüksiyonu",
+    "Oyun ve Dijital Eğlence", "Animasyon ve Görsel Efekt", "Fotoğrafçılık ve Video",
+    "Reklamcılık", "Halkla İlişkiler", "Dijital Pazarlama",
+    "Marka ve Strateji Danışmanlığı", "Grafik ve Tasarım", "Baskı ve Promosyon Ürünleri",
+    "Tabela ve Reklam Panoları", "Fuar ve Stand Hizmetleri", "Sergi ve Müze Sistemleri",
+    "Etkinlik ve Organizasyon", "Kongre ve Toplantı Hizmetleri", "Bankacılık",
+    "Sigortacılık", "Yatırım ve Portföy Yönetimi", "Fintech ve Ödeme Sistemleri",
+    "Leasing ve Faktoring", "Kredi ve Finansman", "Sağlık Hizmetleri",
+    "Hastane ve Klinikler", "Diş Hekimliği", "Veterinerlik",
+    "Eczane ve İlaç Dağıtımı", "Yaşlı ve Hasta Bakımı", "Güzellik ve Estetik",
+    "Eğitim ve Öğretim", "Mesleki Eğitim ve Kurslar", "Dil Eğitimi",
+    "E-Öğrenme", "Araştırma ve Geliştirme (Ar-Ge)", "Danışmanlık (Yönetim)",
+    "Danışmanlık (Teknik)", "Hukuk Hizmetleri", "Muhasebe ve Mali Müşavirlik",
+    "Denetim ve Teftiş", "İnsan Kaynakları ve İşe Alım", "Çeviri ve Tercümanlık",
+    "Güvenlik ve Koruma", "Temizlik Hizmetleri", "Tesis ve Bina Yönetimi",
+    "Peyzaj Bakımı ve Bahçecilik", "Kuru Temizleme ve Çamaşırhane", "Tamir ve Bakım Hizmetleri",
+    "Kuaför ve Berber", "Spor ve Fitness", "Spor Ekipmanları",
+    "Oyuncak ve Oyun", "Hobi ve El Sanatları", "Kuyumculuk ve Mücevher",
+    "Saat ve Aksesuar", "Hediyelik Eşya", "Büro Malzemeleri ve Kırtasiye",
+    "Endüstriyel Sarf Malzemeleri", "Tarım Makineleri ve Ekipmanları", "İklimlendirme ve Havalandırma (HVAC)",
+    "Asansör ve Yürüyen Merdiven", "Yangın ve Güvenlik Sistemleri", "Ölçüm ve Test Cihazları",
+    "Hidrolik ve Pnömatik", "Kaynak ve Kesim Teknolojileri", "Tekstil Makineleri",
+    "Paketleme ve Dolum Makineleri", "Robot ve Otomasyon Sistemleri", "Kamu ve Belediye Hizmetleri",
+    "Sivil Toplum ve STK", "Uluslararası Kuruluşlar"
+]
+
+
+def default_sectors() -> List[Dict]:
+    return [{"id": str(uuid.uuid4()), "name": name, "description": ""} for name in DEFAULT_SECTOR_NAMES]
+
+
+def default_transaction_types() -> List[Dict]:
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "name": "Tahsilat",
+            "nameEn": "Collection",
+            "icon": "💰",
+            "color": "green",
+            "description": "Gelen ödemeler",
+            "direction": "in",
+            "isSystem": True,
+            "isActive": True,
+            "order": 1,
+            "subTypes": [
+                {"id": str(uuid.uuid4()), "name": "Müşteri Tahsilatı", "isActive": True},
+                {"id": str(uuid.uuid4()), "name": "Proje Tahsilatı", "isActive": True},
+                {"id": str(uuid.uuid4()), "name": "Avans Tahsilatı", "isActive": True},
+                {"id": str(uuid.uuid4()), "name": "Depozito İadesi", "isActive": True}
+            ],
+            "createdAt": datetime.now(timezone.utc).isoformat(),
+            "updatedAt": datetime.now(timezone.utc).isoformat()
+        },
+        {
+            "id": str(uuid.uuid4()),
+            "name": "Ödeme",
+            "nameEn": "Payment",
+            "icon": "💸",
+            "color": "red",
+            "description": "Yapılan ödemeler",
+            "direction": "out",
+            "isSystem": True,
+            "isActive": True,
+            "order": 2,
+            "subTypes": [
+                {"id": str(uuid.uuid4()), "name": "Tedarikçi Ödemesi", "isActive": True},
+                {"id": str(uuid.uuid4()), "name": "Personel Ödemesi", "isActive": True},
+                {"id": str(uuid.uuid4()), "name": "Freelancer Ödemesi", "isActive": True},
+                {"id": str(uuid.uuid4()), "name": "Kira Ödemesi", "isActive": True},
+                {"id": str(uuid.uuid4()), "name": "Vergi Ödemesi", "isActive": True},
+                {"id": str(uuid.uuid4()), "name": "Sigorta Ödemesi", "isActive": True}
+            ],
+            "createdAt": datetime.now(timezone.utc).isoformat(),
+            "updatedAt": datetime.now(timezone.utc).isoformat()
+        },
+        {
+            "id": str(uuid.uuid4()),
+            "name": "Döviz Alım",
+            "nameEn": "FX Buy",
+            "icon": "🔄",
+            "color": "blue",
+            "description": "Döviz alış işlemleri",
+            "direction": "both",
+            "isSystem": True,
+            "isActive": True,
+            "order": 3,
+            "subTypes": [
+                {"id": str(uuid.uuid4()), "name": "USD → AED", "isActive": True},
+                {"id": str(uuid.uuid4()), "name": "EUR → AED", "isActive": True},
+                {"id": str(uuid.uuid4()), "name": "GBP → AED", "isActive": True},
+                {"id": str(uuid.uuid4()), "name": "TRY → AED", "isActive": True}
+            ],
+            "createdAt": datetime.now(timezone.utc).isoformat(),
+            "updatedAt": datetime.now(timezone.utc).isoformat()
+        },
+        {
+            "id": str(uuid.uuid4()),
+            "name": "Döviz Satım",
+            "nameEn": "FX Sell",
+            "icon": "💱",
+            "color": "purple",
+            "description": "Döviz satış işlemleri",
+            "direction": "both",
+            "isSystem": True,
+            "isActive": True,
+            "order": 4,
+            "subTypes": [
+                {"id": str(uuid.uuid4()), "name": "AED → USD", "isActive": True},
+                {"id": str(uuid.uuid4()), "name": "AED → EUR", "isActive": True},
+                {"id": str(uuid.uuid4()), "name": "AED → TRY", "isActive": True}
+            ],
+            "createdAt": datetime.now(timezone.utc).isoformat(),
+            "updatedAt": datetime.now(timezone.utc).isoformat()
+        },
+        {
+            "id": str(uuid.uuid4()),
+            "name": "Transfer",
+            "nameEn": "Transfer",
+            "icon": "↔️",
+            "color": "indigo",
+            "description": "Hesaplar arası transfer",
+            "direction": "both",
+            "isSystem": True,
+            "isActive": True,
+            "order": 5,
+            "subTypes": [
+                {"id": str(uuid.uuid4()), "name": "Dahili Transfer", "isActive": True},
+                {"id": str(uuid.uuid4()), "name": "Harici Transfer", "isActive": True},
+                {"id": str(uuid.uuid4()), "name": "Swift Transfer", "isActive": True}
+            ],
+            "createdAt": datetime.now(timezone.utc).isoformat(),
+            "updatedAt": datetime.now(timezone.utc).isoformat()
+        },
+        {
+            "id": str(uuid.uuid4()),
+            "name": "Nakit Yatan",
+            "nameEn": "Cash Deposit",
+            "icon": "🏧",
+            "color": "teal",
+            "description": "Nakit para yatırma",
+            "direction": "in",
+            "isSystem": True,
+            "isActive": True,
+            "order": 6,
+            "subTypes": [
+                {"id": str(uuid.uuid4()), "name": "Şube Yatırım", "isActive": True},
+                {"id": str(uuid.uuid4()), "name": "ATM Yatırım", "isActive": True}
+            ],
+            "createdAt": datetime.now(timezone.utc).isoformat(),
+            "updatedAt": datetime.now(timezone.utc).isoformat()
+        },
+        {
+            "id": str(uuid.uuid4()),
+            "name": "Nakit Çekilen",
+            "nameEn": "Cash Withdrawal",
+            "icon": "💵",
+            "color": "orange",
+            "description": "Nakit para çekme",
+            "direction": "out",
+            "isSystem": True,
+            "isActive": True,
+            "order": 7,
+            "subTypes": [
+                {"id": str(uuid.uuid4()), "name": "Şube Çekim", "isActive": True},
+                {"id": str(uuid.uuid4()), "name": "ATM Çekim", "isActive": True}
+            ],
+            "createdAt": datetime.now(timezone.utc).isoformat(),
+            "updatedAt": datetime.now(timezone.utc).isoformat()
+        },
+        {
+            "id": str(uuid.uuid4()),
+            "name": "Banka Masrafı",
+            "nameEn": "Bank Fee",
+            "icon": "🏦",
+            "color": "gray",
+            "description": "Banka ücretleri",
+            "direction": "out",
+            "isSystem": True,
+            "isActive": True,
+            "order": 8,
+            "subTypes": [
+                {"id": str(uuid.uuid4()), "name": "Swift Ücreti", "isActive": True},
+                {"id": str(uuid.uuid4()), "name": "Hesap İşletim Ücreti", "isActive": True},
+                {"id": str(uuid.uuid4()), "name": "Havale Ücreti", "isActive": True},
+                {"id": str(uuid.uuid4()), "name": "Kart Ücreti", "isActive": True}
+            ],
+            "createdAt": datetime.now(timezone.utc).isoformat(),
+            "updatedAt": datetime.now(timezone.utc).isoformat()
+        },
+        {
+            "id": str(uuid.uuid4()),
+            "name": "Cashback",
+            "nameEn": "Cashback",
+            "icon": "🎁",
+            "color": "pink",
+            "description": "Geri ödeme/ödül",
+            "direction": "in",
+            "isSystem": True,
+            "isActive": True,
+            "order": 9,
+            "subTypes": [
+                {"id": str(uuid.uuid4()), "name": "Kart Cashback", "isActive": True},
+                {"id": str(uuid.uuid4()), "name": "Kampanya İadesi", "isActive": True}
+            ],
+            "createdAt": datetime.now(timezone.utc).isoformat(),
+            "updatedAt": datetime.now(timezone.utc).isoformat()
+        },
+        {
+            "id": str(uuid.uuid4()),
+            "name": "İade",
+            "nameEn": "Refund",
+            "icon": "↩️",
+            "color": "amber",
+            "description": "İade işlemleri",
+            "direction": "both",
+            "isSystem": True,
+            "isActive": True,
+            "order": 10,
+            "subTypes": [
+                {"id": str(uuid.uuid4()), "name": "Müşteri İadesi", "isActive": True},
+                {"id": str(uuid.uuid4()), "name": "Tedarikçi İadesi", "isActive": True},
+                {"id": str(uuid.uuid4()), "name": "Hatalı İşlem Düzeltme", "isActive": True}
+            ],
+            "createdAt": datetime.now(timezone.utc).isoformat(),
+            "updatedAt": datetime.now(timezone.utc).isoformat()
+        },
+        {
+            "id": str(uuid.uuid4()),
+            "name": "Faiz",
+            "nameEn": "Interest",
+            "icon": "📈",
+            "color": "emerald",
+            "description": "Faiz gelirleri",
+            "direction": "in",
+            "isSystem": True,
+            "isActive": True,
+            "order": 11,
+            "subTypes": [
+                {"id": str(uuid.uuid4()), "name": "Mevduat Faizi", "isActive": True},
+                {"id": str(uuid.uuid4()), "name": "Gecikme Faizi", "isActive": True}
+            ],
+            "createdAt": datetime.now(timezone.utc).isoformat(),
+            "updatedAt": datetime.now(timezone.utc).isoformat()
+        }
+    ]
+
+
+def default_design_templates() -> List[Dict]:
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "name": "Teklif Kapak 1",
+            "category": "cover_page",
+            "image_url": "https://customer-assets.emergentagent.com/job_docgen-pro-9/artifacts/5rm7sspq_Untitled%20design.jpg",
+            "created_at": datetime.now(timezone.utc).isoformat()
+        },
+        {
+            "id": str(uuid.uuid4()),
+            "name": "Teklif Kapak 2",
+            "category": "cover_page",
+            "image_url": "https://customer-assets.emergentagent.com/job_docgen-pro-9/artifacts/wddz4erk_Untitled%20design%20%281%29.jpg",
+            "created_at": datetime.now(timezone.utc).isoformat()
+        },
+        {
+            "id": str(uuid.uuid4()),
+            "name": "Teklif Kapak 3",
+            "category": "cover_page",
+            "image_url": "https://customer-assets.emergentagent.com/job_docgen-pro-9/artifacts/hjdqqruu_Untitled%20design%20%282%29.jpg",
+            "created_at": datetime.now(timezone.utc).isoformat()
+        }
+    ]
+
+
+def default_expense_categories() -> List[Dict]:
+    """Top-level categories followed by their sub-categories (parent_id)"""
+    now = datetime.now(timezone.utc)
+    default = [
+        {"id": str(uuid.uuid4()), "name": "Konaklama", "parent_id": None, "created_at": now},
+        {"id": str(uuid.uuid4()), "name": "Ulaşım", "parent_id": None, "created_at": now},
+        {"id": str(uuid.uuid4()), "name": "Yemek", "parent_id": None, "created_at": now},
+        {"id": str(uuid.uuid4()), "name": "İletişim", "parent_id": None, "created_at": now},
+        {"id": str(uuid.uuid4()), "name": "Eğitim", "parent_id": None, "created_at": now},
+    ]
+    konaklama_id = default[0]["id"]
+    ulasim_id = default[1]["id"]
+    sub_cats = [
+        {"id": str(uuid.uuid4()), "name": "Otel/Ev Giderleri", "parent_id": konaklama_id, "created_at": now},
+        {"id": str(uuid.uuid4()), "name": "Minibar Harcamaları", "parent_id": konaklama_id, "created_at": now},
+        {"id": str(uuid.uuid4()), "name": "Şehir Vergisi", "parent_id": konaklama_id, "created_at": now},
+        {"id": str(uuid.uuid4()), "name": "Uçak Bileti", "parent_id": ulasim_id, "created_at": now},
+        {"id": str(uuid.uuid4()), "name": "Tren Bileti", "parent_id": ulasim_id, "created_at": now},
+        {"id": str(uuid.uuid4()), "name": "Taksi", "parent_id": ulasim_id, "created_at": now},
+    ]
+    return default + sub_cats
+
+
+def _id_index(*extra) -> List:
+    return [([("id", ASCENDING)], {"unique": True}), *extra]
+
+
+# collection -> [(keys, options)]
+TENANT_COLLECTIONS: Dict[str, List] = {
+    "customers": _id_index(([("email", ASCENDING)], {}), ([("companyName", ASCENDING)], {})),
+    "people": _id_index(([("email", ASCENDING)], {})),
+    "opportunities": _id_index(([("status", ASCENDING)], {}), ([("created_at", DESCENDING)], {})),
+    "products": _id_index(([("category", ASCENDING)], {})),
+    "leads": _id_index(([("status", ASCENDING)], {})),
+    "invoices": _id_index(([("customerId", ASCENDING)], {}), ([("status", ASCENDING), ("date", DESCENDING)], {})),
+    "collections_new": _id_index(([("customerId", ASCENDING)], {})),
+    "calendar_events": _id_index(([("start_date", ASCENDING)], {})),
+    "documents": _id_index(([("entity_type", ASCENDING), ("entity_id", ASCENDING)], {})),
+    "activities": _id_index(([("entity_type", ASCENDING), ("entity_id", ASCENDING)], {}), ([("created_at", DESCENDING)], {})),
+    "settings": [([("key", ASCENDING)], {"unique": True})],
+    "users": _id_index(([("email", ASCENDING)], {})),
+    "sectors": _id_index(([("name", ASCENDING)], {})),
+    "transaction_types": _id_index(([("order", ASCENDING)], {})),
+    "design_templates": _id_index(([("category", ASCENDING)], {})),
+    "expense_categories": _id_index(([("parent_id", ASCENDING)], {})),
+    "opportunity_statuses": [([("value", ASCENDING)], {})],
+    "opportunity_stages": [([("value", ASCENDING)], {})],
+    # Filter, sort and keyset pagination indexes of the generic tenant resources
+    **{resource.collection: resource.index_specs() for resource in TENANT_RESOURCES},
+}
+
+# collection -> builder of its seed documents (inserted only into empty collections)
+TENANT_SEEDS: Dict[str, Callable[[], List[Dict]]] = {
+    "sectors": default_sectors,
+    "transaction_types": default_transaction_types,
+    "design_templates": default_design_templates,
+    "expense_categories": default_expense_categories,
+}
+
+TENANT_TEMPLATE = {
+    "version": TEMPLATE_VERSION,
+    "collections": TENANT_COLLECTIONS,
+    "seeds": TENANT_SEEDS,
+}
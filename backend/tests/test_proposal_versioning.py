@@ -0,0 +1,150 @@
+"""
+Tests for the proposal version diffs: diff_snapshots/apply_diff round trips
+and checkpoint scheduling.
+
+Run from backend/:  python -m pytest tests
+"""
+
+import copy
+
+import pytest
+
+import proposal_versioning
+from proposal_versioning import apply_diff, diff_snapshots, is_checkpoint_due, reconstruct
+
+
+def _item(item_id, **fields):
+    return {"id": item_id, "description": f"Kalem {item_id}", "quantity": 1.0, "unit_price": 100.0, **fields}
+
+
+BASE = {
+    "modules": [
+        {"id": "m1", "module_type": "cover_page", "content": {"title": "Teklif"}},
+        {"id": "m2", "module_type": "pricing", "content": {"title": "Fiyatlar"}},
+    ],
+    "line_items": [_item("a"), _item("b"), _item("c"), _item("d")],
+    "pricing_summary": {"subtotal": 400.0, "discount_type": "none", "total": 400.0},
+    "settings": {"currency": "EUR", "language": "tr"},
+}
+
+
+def _edited(**changes):
+    snapshot = copy.deepcopy(BASE)
+    snapshot.update(changes)
+    return snapshot
+
+
+def _round_trip(old, new):
+    before = copy.deepcopy(old)
+    diff = diff_snapshots(old, new)
+    assert apply_diff(old, diff) == new
+    assert old == before, "apply_diff must not modify its input"
+    return diff
+
+
+def test_identical_snapshots_have_empty_diff():
+    assert diff_snapshots(BASE, copy.deepcopy(BASE)) == {}
+    assert apply_diff(BASE, {}) == BASE
+
+
+def test_changed_field_is_stored_as_set():
+    new = _edited(line_items=[_item("a"), _item("b", unit_price=120.0), _item("c"), _item("d")])
+    diff = _round_trip(BASE, new)
+    assert diff["line_items"]["changed"] == [{"id": "b", "set": {"unit_price": 120.0}, "unset": []}]
+    assert diff["line_items"]["order"] is None
+
+
+def test_removed_field_is_unset():
+    item = _item("a")
+    del item["unit_price"]
+    diff = _round_trip(BASE, _edited(line_items=[item, _item("b"), _item("c"), _item("d")]))
+    assert diff["line_items"]["changed"][0]["unset"] == ["unit_price"]
+
+
+def test_removals():
+    diff = _round_trip(BASE, _edited(line_items=[_item("a"), _item("d")]))
+    assert diff["line_items"]["removed"] == ["b", "c"]
+    assert diff["line_items"]["order"] is None
+
+
+def test_additions_are_appended():
+    diff = _round_trip(BASE, _edited(line_items=BASE["line_items"] + [_item("e")]))
+    assert diff["line_items"]["added"] == [_item("e")]
+    assert diff["line_items"]["order"] is None
+
+
+def test_reorder_keeps_order():
+    diff = _round_trip(BASE, _edited(line_items=[_item("c"), _item("a"), _item("d"), _item("b")]))
+    assert diff["line_items"]["order"] == ["c", "a", "d", "b"]
+    assert diff["line_items"]["changed"] == []
+
+
+def test_insert_in_the_middle_with_removal_and_edit():
+    new = _edited(line_items=[_item("a"), _item("e"), _item("c", quantity=3.0), _item("d")])
+    diff = _round_trip(BASE, new)
+    assert diff["line_items"]["removed"] == ["b"]
+    assert diff["line_items"]["order"] == ["a", "e", "c", "d"]
+
+
+def test_dict_keys_set_and_unset():
+    settings = {"currency": "USD", "page_orientation": "landscape"}
+    diff = _round_trip(BASE, _edited(settings=settings))
+    assert diff["settings"] == {"set": {"currency": "USD", "page_orientation": "landscape"}, "unset": ["language"]}
+
+
+@pytest.mark.parametrize("old_items, new_items", [
+    ([_item("a"), _item("a")], [_item("a")]),  # repeated ids
+    ([{"description": "no id"}], [{"description": "still no id"}]),
+    (["plain", "strings"], ["plain"]),
+])
+def test_lists_without_unique_ids_are_replaced(old_items, new_items):
+    diff = _round_trip(_edited(line_items=old_items), _edited(line_items=new_items))
+    assert diff["line_items"] == {"replace": new_items}
+
+
+def test_added_and_removed_top_level_keys():
+    new = copy.deepcopy(BASE)
+    del new["settings"]
+    new["notes"] = "Yeni not"
+    diff = diff_snapshots(BASE, new)
+    assert diff["settings"] == {"replace": None}
+    assert diff["notes"] == {"replace": "Yeni not"}
+    # Snapshots always carry the same keys; a dropped one comes back as None
+    assert apply_diff(BASE, diff) == {**new, "settings": None}
+
+
+def test_reconstruct_applies_a_chain_of_diffs():
+    versions = [BASE]
+    versions.append(_edited(line_items=[_item("b"), _item("a"), _item("c"), _item("d")]))
+    versions.append(_edited(line_items=[_item("b"), _item("c", unit_price=80.0), _item("d"), _item("e")]))
+    versions.append(_edited(line_items=[_item("e"), _item("d")], settings={"currency": "TRY"}))
+    diffs = [diff_snapshots(old, new) for old, new in zip(versions, versions[1:])]
+    for count in range(len(diffs) + 1):
+        assert reconstruct(BASE, diffs[:count]) == versions[count]
+
+
+# ===================== CHECKPOINTS =====================
+
+def test_first_version_is_a_checkpoint():
+    assert is_checkpoint_due(None)
+
+
+def test_checkpoint_every_interval(monkeypatch):
+    monkeypatch.setattr(proposal_versioning, "PROPOSAL_VERSION_CHECKPOINT_INTERVAL", 4)
+    # chain_length of the previous version: 0 is a checkpoint, then deltas 1..3
+    assert [is_checkpoint_due(length) for length in range(4)] == [False, False, False, True]
+
+    chain_length, storage = None, []
+    for _ in range(9):
+        if is_checkpoint_due(chain_length):
+            chain_length = 0
+            storage.append("full")
+        else:
+            chain_length += 1
+            storage.append("delta")
+    assert storage == ["full", "delta", "delta", "delta"] * 2 + ["full"]
+
+
+def test_interval_of_one_stores_every_version_in_full(monkeypatch):
+    monkeypatch.setattr(proposal_versioning, "PROPOSAL_VERSION_CHECKPOINT_INTERVAL", 1)
+    assert is_checkpoint_due(0)
@@ -0,0 +1,128 @@
+"""
+Tests for the tenant resource declarations and the keyset filter they page with.
+
+Run from backend/:  python -m pytest tests
+"""
+
+import pytest
+from fastapi import HTTPException
+from pymongo import ASCENDING, DESCENDING
+
+from pagination import decode_cursor, encode_cursor, keyset_filter
+from tenant_resources import CONTRACTS, FAIRS, TENANT_RESOURCES, TenantResource
+
+
+# ===================== parse_sort =====================
+
+def test_parse_sort_uses_default_sort():
+    assert TenantResource("things", "things", "things", "Thing").parse_sort(None) == ("createdAt", True)
+    assert CONTRACTS.parse_sort(None) == ("startDate", True)
+
+
+def test_parse_sort_direction_prefix():
+    assert FAIRS.parse_sort("startDate") == ("startDate", False)
+    assert FAIRS.parse_sort("-updatedAt") == ("updatedAt", True)
+
+
+def test_parse_sort_rejects_undeclared_field():
+    with pytest.raises(HTTPException) as error:
+        CONTRACTS.parse_sort("-customerId")
+    assert error.value.status_code == 400
+    assert "startDate" in error.value.detail
+
+
+def test_default_sort_is_declared_for_every_resource():
+    for resource in TENANT_RESOURCES:
+        field, _ = resource.parse_sort(None)
+        assert field in resource.sorts, resource.collection
+
+
+def test_index_specs_cover_id_and_every_sort():
+    specs = CONTRACTS.index_specs()
+    assert specs[0] == ([("id", ASCENDING)], {"unique": True})
+    keys = [keys for keys, _ in specs]
+    for field in CONTRACTS.sorts:
+        assert [(field, DESCENDING), ("id", DESCENDING)] in keys
+    assert len(keys) == len({tuple(key) for key in keys})
+
+
+# ===================== keyset_filter =====================
+
+def _value(doc, field):
+    return doc.get(field)
+
+
+def _matches(doc, query):
+    """Enough of MongoDB's matcher for keyset filters: $or, $lt, $gt, $ne, equality (None = null/missing)"""
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(_matches(doc, clause) for clause in condition):
+                return False
+            continue
+        value = _value(doc, key)
+        if isinstance(condition, dict):
+            for op, operand in condition.items():
+                if op == "$ne":
+                    if value == operand:
+                        return False
+                elif value is None:
+                    # Comparisons never match null/missing
+                    return False
+                elif op == "$lt" and not value < operand:
+                    return False
+                elif op == "$gt" and not value > operand:
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+
+def _sorted(docs, sort_key, descending):
+    """MongoDB order on (sort_key, id): null/missing sort lowest"""
+    def key(doc):
+        value = doc.get(sort_key)
+        return (value is not None, value if value is not None else 0, doc["id"])
+    return sorted(docs, key=key, reverse=descending)
+
+
+def _walk(docs, sort_key, descending, limit):
+    """Page through `docs` the way fetch_page does, via encoded cursors"""
+    seen, cursor = [], None
+    while True:
+        candidates = docs
+        if cursor:
+            sort_value, doc_id = decode_cursor(cursor)
+            candidates = [doc for doc in docs if _matches(doc, keyset_filter(sort_key, sort_value, doc_id, descending))]
+        page = _sorted(candidates, sort_key, descending)[:limit]
+        if not page:
+            return seen
+        seen.extend(doc["id"] for doc in page)
+        cursor = encode_cursor(page[-1].get(sort_key), page[-1]["id"])
+
+
+DOCS = [
+    {"id": "a", "startDate": "2026-03-01"},
+    {"id": "b", "startDate": "2026-01-15"},
+    {"id": "c", "startDate": "2026-03-01"},
+    {"id": "d"},
+    {"id": "e", "startDate": None},
+    {"id": "f", "startDate": "2025-12-31"},
+    {"id": "g", "startDate": "2026-03-01"},
+]
+
+
+@pytest.mark.parametrize("descending", [True, False])
+@pytest.mark.parametrize("limit", [1, 2, 3, 10])
+def test_keyset_walk_visits_every_document_once_in_order(descending, limit):
+    expected = [doc["id"] for doc in _sorted(DOCS, "startDate", descending)]
+    assert _walk(DOCS, "startDate", descending, limit) == expected
+
+
+def test_keyset_filter_descending_includes_nulls_after_values():
+    query = keyset_filter("startDate", "2026-01-15", "b", descending=True)
+    assert {"startDate": None} in query["$or"]
+
+
+def test_keyset_filter_ascending_from_null_moves_on_to_values():
+    query = keyset_filter("startDate", None, "d", descending=False)
+    assert query == {"$or": [{"startDate": None, "id": {"$gt": "d"}}, {"startDate": {"$ne": None}}]}